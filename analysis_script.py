@@ -1,75 +1,125 @@
 import pandas as pd
 import numpy as np
-from sklearn.model_selection import train_test_split
-from sklearn.ensemble import RandomForestClassifier
-from sklearn.metrics import classification_report
-import joblib
+import hashlib
+import json
+import argparse
+import time
 import os
 
+from armazenamento_particionado import CONJUNTO_PROCESSADO, CONJUNTO_FINAL, caminho_catalogo, gravar_conjunto, ler_conjunto, selecionar_linhas
+from esquema_performance import ErroEsquema
+from perfil_pipeline import marcar_subetapa
+
 # --- Configurações ---
 
 PASTA_DADOS = 'data'
-ARQUIVO_CSV_PROCESSADO = os.path.join(PASTA_DADOS, 'performance_reconciliada_e_analisada.csv')
-ARQUIVO_CSV_FINAL = os.path.join(PASTA_DADOS, 'performance_final_para_db.csv')
+ARQUIVO_CSV_PROCESSADO = caminho_catalogo(CONJUNTO_PROCESSADO)
+ARQUIVO_CSV_FINAL = caminho_catalogo(CONJUNTO_FINAL)
 ARQUIVO_MODELO = os.path.join(PASTA_DADOS, 'modelo_previsao_lesao.pkl')
 TREINAR_MODELO = True
 
-def executar_analise_e_previsao():
-    """
-    Carrega os dados processados, treina um modelo de ML para prever lesões
-    e adiciona as previsões ao DataFrame.
-    """
-    print("Iniciando a análise e a previsão de lesões...")
+# Avaliação walk-forward (validação temporal)
 
-    try:
-        df = pd.read_csv(ARQUIVO_CSV_PROCESSADO)
-        print(f"Dados processados carregados com sucesso. Total de {len(df)} registros.")
-    except FileNotFoundError:
-        print(f"Erro: Arquivo '{ARQUIVO_CSV_PROCESSADO}' não encontrado.")
-        print("Por favor, execute 'processador_dados.py' primeiro.")
-        return
+PASTA_CACHE_FOLDS = os.path.join(PASTA_DADOS, 'cache_folds')
+ARQUIVO_RELATORIO_WALK_FORWARD = os.path.join(PASTA_DADOS, 'relatorio_walk_forward.csv')
+NUM_FOLDS_WALK_FORWARD = 5
+PARAMETROS_MODELO_PADRAO = {'n_estimators': 100, 'random_state': 42}
 
-    # --- Pré-processamento e Engenharia de Features para o modelo de ML ---
+# Features usadas pelo modelo (a ordem importa para a previsão)
+
+FEATURES_MODELO = [
+    'Carga_Aguda', 'Carga_Cronica', 'Relacao_Carga_Aguda_Cronica',
+    'Relacao_Carga_Aguda_Cronica_EWMA', 'Monotonia_Treino', 'Tensao_Treino',
+    'Num_Sprints', 'Distancia_Percorrida_(km)',
+    'Dias_Desde_Ultima_Lesao', 'Num_Lesoes_Anteriores',
+    'VO2_Media_7d', 'Dist_Media_7d', 'Sprints_Media_7d'
+]
+VARIAVEL_ALVO = 'Lesao_Ocorreu'
+COLUNAS_OBRIGATORIAS_MODELO = ['Nome_Padronizado', 'Data', *FEATURES_MODELO, VARIAVEL_ALVO]
 
-    df['Data'] = pd.to_datetime(df['Data'])
-    
+def preparar_dados_modelo(df):
+    """
+    Aplica o pré-processamento comum ao treino e à avaliação: variável-alvo inteira e
+    preenchimento de NaNs nas features ('Data' já vem convertida pelo esquema).
+    """
     # Preenche NaNs na coluna 'Num_Lesoes_Anteriores'
 
     df['Num_Lesoes_Anteriores'] = df['Num_Lesoes_Anteriores'].fillna(0)
 
     # --- TRATAMENTO CRÍTICO PARA A VARIÁVEL-ALVO ---
 
-    df['Lesao_Ocorreu'] = df['Lesao_Ocorreu'].astype(int)
-    
-    # --- Definição de Features e Variável-Alvo ---
-
-    features = [
-        'Carga_Aguda', 'Carga_Cronica', 'Relacao_Carga_Aguda_Cronica',
-        'Num_Sprints', 'Distancia_Percorrida_(km)',
-        'Dias_Desde_Ultima_Lesao', 'Num_Lesoes_Anteriores',
-        'VO2_Media_7d', 'Dist_Media_7d', 'Sprints_Media_7d'
-    ]
-    variavel_alvo = 'Lesao_Ocorreu'
+    df[VARIAVEL_ALVO] = df[VARIAVEL_ALVO].astype(int)
 
     # --- TRATAMENTO DOS VALORES FALTANTES (NaNs) nas features ---
 
     print("\nVerificando e tratando valores faltantes (NaNs) nas features...")
-    for col in features:
+    for col in FEATURES_MODELO:
         if df[col].isnull().any():
             print(f"  > Preenchendo NaNs na coluna '{col}' com 0.")
             df[col] = df[col].fillna(0)
-    
+    return df
+
+def executar_analise_e_previsao(df=None, salvar=True, filtros=None):
+    """
+    Carrega os dados processados, treina um modelo de ML para prever lesões
+    e adiciona as previsões ao DataFrame, que é salvo em partições (se 'salvar') e retornado.
+    Se 'df' for informado (modo em memória), uma cópia dele é usada no lugar das partições.
+    Com 'filtros' (elencos, temporadas, meses), o modelo compartilhado (usado pela API de
+    previsão e pela ingestão em streaming) continua sendo treinado com todo o histórico
+    processado; só as previsões das partições selecionadas são regravadas no conjunto final.
+    """
+    print("Iniciando a análise e a previsão de lesões...")
+
+    # Dependências pesadas importadas apenas quando a etapa de treino é executada
+
+    from sklearn.model_selection import train_test_split
+    from sklearn.ensemble import RandomForestClassifier
+    from sklearn.metrics import classification_report
+    import joblib
+
+    marcar_subetapa('leitura_csv')
+    try:
+        if df is None:
+            df = ler_conjunto(CONJUNTO_PROCESSADO, colunas_obrigatorias=COLUNAS_OBRIGATORIAS_MODELO)
+            if df is None:
+                raise FileNotFoundError(ARQUIVO_CSV_PROCESSADO)
+            print(f"Dados processados carregados com sucesso. Total de {len(df)} registros.")
+        else:
+            df = df.copy()
+            print(f"Dados processados recebidos em memória. Total de {len(df)} registros.")
+    except FileNotFoundError:
+        print(f"Erro: Arquivo '{ARQUIVO_CSV_PROCESSADO}' não encontrado.")
+        print("Por favor, execute 'processador_dados.py' primeiro.")
+        return False
+    except ErroEsquema as e:
+        print(f"Erro: dados processados fora do esquema: {e}")
+        return False
+    if df.empty:
+        print(f"Erro: não há dados processados em '{ARQUIVO_CSV_PROCESSADO}' para treinar o modelo.")
+        return False
+    if filtros and not selecionar_linhas(df, filtros).any():
+        print(f"Erro: nenhuma partição processada corresponde aos filtros {filtros}.")
+        return False
+
+    # --- Pré-processamento e Engenharia de Features para o modelo de ML ---
+
+    marcar_subetapa('preparo_features')
+    df = preparar_dados_modelo(df)
+    features = FEATURES_MODELO
+    variavel_alvo = VARIAVEL_ALVO
+
     # Verificação para garantir que o DataFrame não está vazio.
 
     if df.empty:
         print("\nERRO: Após tratar os valores faltantes, o DataFrame ainda está vazio.")
         print("Verifique os dados de entrada. A execução será interrompida.")
-        return
+        return False
 
     print(f"DataFrame pronto para o treino. Total de {len(df)} registros restantes.")
 
     # --- Treinamento e Previsão ---
 
+    marcar_subetapa('treino_modelo')
     if TREINAR_MODELO:
         print("\nTreinando um novo modelo de Machine Learning...")
         X = df[features]
@@ -93,17 +143,239 @@ def executar_analise_e_previsao():
             print("Modelo carregado com sucesso.")
         except FileNotFoundError:
             print(f"Erro: Arquivo do modelo '{ARQUIVO_MODELO}' não encontrado. Por favor, execute o script com TREINAR_MODELO = True para treiná-lo primeiro.")
-            return
+            return False
 
     # Realiza a previsão com o modelo treinado (ou carregado) no DataFrame completo
 
+    marcar_subetapa('previsao')
     df['Risco_Lesao_ML'] = modelo.predict(df[features])
     df['Risco_Lesao_ML'] = df['Risco_Lesao_ML'].astype(int)
 
-    df.to_csv(ARQUIVO_CSV_FINAL, index=False)
-    print(f"\nAnálise concluída. DataFrame final (com previsões de ML) salvo em: {ARQUIVO_CSV_FINAL}")
+    if filtros:
+        df = df[selecionar_linhas(df, filtros)].reset_index(drop=True)
+
+    if salvar:
+        marcar_subetapa('escrita_csv')
+        gravar_conjunto(df, CONJUNTO_FINAL, filtros)
+        print(f"\nAnálise concluída. DataFrame final (com previsões de ML) salvo em: {ARQUIVO_CSV_FINAL}")
+    else:
+        print("\nAnálise concluída. DataFrame final (com previsões de ML) mantido em memória.")
+    return df
+
+# --- Avaliação Walk-Forward (validação temporal) ---
+
+def gerar_folds_walk_forward(df, num_folds=NUM_FOLDS_WALK_FORWARD, agrupar_por_jogador=False):
+    """
+    Divide as datas únicas em (num_folds + 1) blocos consecutivos. O fold k treina
+    com todas as datas anteriores ao bloco k+1 e testa nesse bloco, sem nunca usar
+    dados futuros no treino. Com 'agrupar_por_jogador', cada fold também reserva um
+    grupo de jogadores que fica fora do treino e é avaliado apenas no teste.
+    """
+    if num_folds < 1:
+        raise ValueError(f"O número de folds walk-forward deve ser pelo menos 1 (recebido: {num_folds}).")
+    datas_unicas = np.sort(df['Data'].unique())
+    if len(datas_unicas) < num_folds + 1:
+        raise ValueError(f"Datas insuficientes ({len(datas_unicas)}) para {num_folds} folds walk-forward; use menos folds ou selecione mais partições.")
+
+    blocos_datas = np.array_split(datas_unicas, num_folds + 1)
+    valores_data = df['Data'].values
+
+    if agrupar_por_jogador:
+        jogadores = np.sort(df['Nome_Padronizado'].unique())
+        grupos_jogadores = np.array_split(jogadores, num_folds)
+        valores_jogador = df['Nome_Padronizado'].values
+
+    folds = []
+    for k in range(num_folds):
+        inicio_teste = blocos_datas[k + 1][0]
+        fim_teste = blocos_datas[k + 1][-1]
+        mascara_treino = valores_data < inicio_teste
+        mascara_teste = (valores_data >= inicio_teste) & (valores_data <= fim_teste)
+
+        if agrupar_por_jogador:
+            mascara_grupo = np.isin(valores_jogador, grupos_jogadores[k])
+            mascara_treino &= ~mascara_grupo
+            mascara_teste &= mascara_grupo
+
+        folds.append({
+            'fold': k,
+            'inicio_teste': pd.Timestamp(inicio_teste).strftime('%Y-%m-%d'),
+            'fim_teste': pd.Timestamp(fim_teste).strftime('%Y-%m-%d'),
+            'indices_treino': np.flatnonzero(mascara_treino),
+            'indices_teste': np.flatnonzero(mascara_teste),
+        })
+    return folds
+
+def calcular_hash_dados(df):
+    """
+    Calcula um hash estável das colunas usadas na avaliação, usado como chave do cache de folds.
+    """
+    colunas = FEATURES_MODELO + [VARIAVEL_ALVO, 'Data', 'Nome_Padronizado']
+    valores = pd.util.hash_pandas_object(df[colunas], index=False).values
+    return hashlib.sha1(valores.tobytes()).hexdigest()[:16]
+
+def salvar_slices_folds_em_cache(df, folds, hash_dados, agrupar_por_jogador):
+    """
+    Salva em disco os slices de features/alvo de cada fold (uma vez por versão dos dados)
+    e remove os slices de versões anteriores. Os workers leem esses arquivos com
+    memory-map, sem copiar o DataFrame inteiro.
+    """
+    import joblib
+
+    os.makedirs(PASTA_CACHE_FOLDS, exist_ok=True)
+    for arquivo in os.listdir(PASTA_CACHE_FOLDS):
+        if arquivo.endswith('.joblib') and not arquivo.startswith(f"{hash_dados}_"):
+            os.remove(os.path.join(PASTA_CACHE_FOLDS, arquivo))
+    sufixo = 'grupo' if agrupar_por_jogador else 'tempo'
+    X = df[FEATURES_MODELO].to_numpy(dtype=np.float64)
+    y = df[VARIAVEL_ALVO].to_numpy(dtype=np.int64)
+
+    caminhos = []
+    for fold in folds:
+        caminho = os.path.join(PASTA_CACHE_FOLDS, f"{hash_dados}_{sufixo}_{len(folds)}_{fold['fold']}.joblib")
+        if not os.path.exists(caminho):
+            joblib.dump({
+                'X_treino': X[fold['indices_treino']], 'y_treino': y[fold['indices_treino']],
+                'X_teste': X[fold['indices_teste']], 'y_teste': y[fold['indices_teste']],
+            }, caminho)
+        caminhos.append(caminho)
+    return caminhos
+
+def avaliar_fold(caminho_fold, info_fold, nome_configuracao, parametros_modelo):
+    """
+    Treina e avalia um único fold a partir do cache em disco. Executado em paralelo.
+    """
+    from sklearn.ensemble import RandomForestClassifier
+    from sklearn.metrics import precision_score, recall_score, f1_score, roc_auc_score
+    import joblib
+
+    slices = joblib.load(caminho_fold, mmap_mode='r')
+    resultado = {
+        'configuracao': nome_configuracao,
+        'fold': info_fold['fold'],
+        'inicio_teste': info_fold['inicio_teste'],
+        'fim_teste': info_fold['fim_teste'],
+        'n_treino': len(slices['y_treino']),
+        'n_teste': len(slices['y_teste']),
+        'positivos_teste': int(np.sum(slices['y_teste'])),
+    }
+    if resultado['n_treino'] == 0 or resultado['n_teste'] == 0:
+        return resultado
+
+    inicio = time.perf_counter()
+    modelo = RandomForestClassifier(**{**parametros_modelo, 'n_jobs': 1})
+    modelo.fit(slices['X_treino'], slices['y_treino'])
+    resultado['tempo_treino_s'] = round(time.perf_counter() - inicio, 3)
+
+    y_previsao = modelo.predict(slices['X_teste'])
+    resultado['precisao'] = precision_score(slices['y_teste'], y_previsao, zero_division=0)
+    resultado['recall'] = recall_score(slices['y_teste'], y_previsao, zero_division=0)
+    resultado['f1'] = f1_score(slices['y_teste'], y_previsao, zero_division=0)
+
+    classes = list(modelo.classes_)
+    if 1 in classes and len(np.unique(slices['y_teste'])) > 1:
+        probabilidades = modelo.predict_proba(slices['X_teste'])[:, classes.index(1)]
+        resultado['roc_auc'] = roc_auc_score(slices['y_teste'], probabilidades)
+    else:
+        resultado['roc_auc'] = np.nan
+    return resultado
+
+def executar_avaliacao_walk_forward(configuracoes=None, num_folds=NUM_FOLDS_WALK_FORWARD,
+                                    agrupar_por_jogador=False, n_jobs=-1, filtros=None):
+    """
+    Avalia uma ou mais configurações do modelo com splits walk-forward por 'Data'
+    (opcionalmente agrupados por jogador), rodando os folds em paralelo, e salva
+    um relatório com as métricas por fold e agregadas por configuração. Com 'filtros',
+    apenas as partições processadas selecionadas são lidas. Retorna o relatório ou
+    False em caso de erro.
+    """
+    print("Iniciando a avaliação walk-forward do modelo de lesões...")
+    from joblib import Parallel, delayed
+
+    if configuracoes is None:
+        configuracoes = {'padrao': PARAMETROS_MODELO_PADRAO}
+
+    try:
+        df = ler_conjunto(CONJUNTO_PROCESSADO, filtros, colunas_obrigatorias=COLUNAS_OBRIGATORIAS_MODELO)
+    except ErroEsquema as e:
+        print(f"Erro: dados processados fora do esquema: {e}")
+        return False
+    if df is None:
+        print(f"Erro: Arquivo '{ARQUIVO_CSV_PROCESSADO}' não encontrado.")
+        print("Por favor, execute 'processador_dados.py' primeiro.")
+        return False
+    if df.empty:
+        if filtros:
+            print(f"Erro: nenhuma partição processada corresponde aos filtros {filtros}.")
+        else:
+            print(f"Erro: não há dados processados em '{ARQUIVO_CSV_PROCESSADO}' para a avaliação.")
+        return False
+
+    df = preparar_dados_modelo(df)
+    df = df.sort_values(by='Data', kind='stable').reset_index(drop=True)
+
+    try:
+        folds = gerar_folds_walk_forward(df, num_folds, agrupar_por_jogador)
+    except ValueError as e:
+        print(f"Erro: {e}")
+        return False
+    caminhos_folds = salvar_slices_folds_em_cache(df, folds, calcular_hash_dados(df), agrupar_por_jogador)
+    print(f"{len(folds)} folds preparados (cache em '{PASTA_CACHE_FOLDS}'), {len(configuracoes)} configuração(ões).")
+
+    tarefas = [
+        delayed(avaliar_fold)(caminho, {k: v for k, v in fold.items() if not k.startswith('indices')}, nome, parametros)
+        for nome, parametros in configuracoes.items()
+        for caminho, fold in zip(caminhos_folds, folds)
+    ]
+    resultados = Parallel(n_jobs=n_jobs)(tarefas)
+
+    df_folds = pd.DataFrame(resultados)
+    metricas = [m for m in ['precisao', 'recall', 'f1', 'roc_auc', 'tempo_treino_s'] if m in df_folds.columns]
+    df_agregado = df_folds.groupby('configuracao')[metricas].agg(['mean', 'std'])
+    df_agregado.columns = [f"{metrica}_{estatistica}" for metrica, estatistica in df_agregado.columns]
+
+    print("\nMétricas por fold:")
+    print(df_folds.to_string(index=False))
+    print("\nMétricas agregadas por configuração:")
+    print(df_agregado.to_string())
+
+    df_relatorio = pd.concat([df_folds, df_agregado.reset_index().assign(fold='agregado')], ignore_index=True)
+    df_relatorio.to_csv(ARQUIVO_RELATORIO_WALK_FORWARD, index=False)
+    print(f"\nRelatório walk-forward salvo em: {ARQUIVO_RELATORIO_WALK_FORWARD}")
+    return df_relatorio
 
 # --- Ponto de entrada do script ---
 
 if __name__ == "__main__":
-    executar_analise_e_previsao()
\ No newline at end of file
+    parser = argparse.ArgumentParser(description="Treino do modelo de lesões ou avaliação walk-forward.")
+    parser.add_argument('--walk-forward', action='store_true', help="Executa a avaliação walk-forward em vez do treino.")
+    parser.add_argument('--folds', type=int, default=NUM_FOLDS_WALK_FORWARD, help="Número de folds walk-forward.")
+    parser.add_argument('--agrupar-jogador', action='store_true', help="Reserva um grupo de jogadores fora do treino em cada fold.")
+    parser.add_argument('--n-jobs', type=int, default=-1, help="Número de processos paralelos (-1 = todos os núcleos).")
+    parser.add_argument('--configuracoes', help="Configurações a comparar, em JSON: '{\"nome\": {parâmetros}}'. "
+                                                "Os parâmetros omitidos usam os padrões do modelo.")
+    parser.add_argument('--elenco', dest='elencos', nargs='+', help="Lê apenas as partições destes elencos.")
+    parser.add_argument('--temporada', dest='temporadas', nargs='+', type=int, help="Lê apenas as partições destas temporadas.")
+    parser.add_argument('--mes', dest='meses', nargs='+', help="Lê apenas as partições destes meses (AAAA-MM).")
+    args = parser.parse_args()
+    filtros = {chave: getattr(args, chave) for chave in ('elencos', 'temporadas', 'meses') if getattr(args, chave)} or None
+
+    if args.folds < 1:
+        parser.error("--folds deve ser pelo menos 1.")
+
+    configuracoes = None
+    if args.configuracoes:
+        try:
+            configuracoes = json.loads(args.configuracoes)
+        except json.JSONDecodeError as e:
+            parser.error(f"--configuracoes não é um JSON válido: {e}")
+        if not configuracoes or not isinstance(configuracoes, dict) or not all(isinstance(p, dict) for p in configuracoes.values()):
+            parser.error("--configuracoes deve ser um objeto JSON {\"nome\": {parâmetros}}.")
+        configuracoes = {nome: {**PARAMETROS_MODELO_PADRAO, **parametros} for nome, parametros in configuracoes.items()}
+
+    if args.walk_forward:
+        resultado = executar_avaliacao_walk_forward(configuracoes=configuracoes, num_folds=args.folds, agrupar_por_jogador=args.agrupar_jogador,
+                                                    n_jobs=args.n_jobs, filtros=filtros)
+    else:
+        resultado = executar_analise_e_previsao(filtros=filtros)
+    raise SystemExit(1 if resultado is False else 0)
@@ -0,0 +1,538 @@
+import hashlib
+import json
+import os
+import re
+
+import pandas as pd
+
+from esquema_performance import FORMATO_DATA, aplicar_esquema, ler_csv_performance
+
+# --- Configurações ---
+
+PASTA_DADOS = 'data'
+PASTA_PARTICOES = os.path.join(PASTA_DADOS, 'particoes')
+NOME_ARQUIVO_CATALOGO = '_catalogo.json'
+NOME_ARQUIVO_PARTICAO = 'dados.csv'
+
+# Conjuntos intermediários da pipeline: cada um é uma pasta de partições
+# (elenco=.../temporada=.../mes=.../dados.csv) descrita por um catálogo JSON. As sessões
+# recebidas pela ingestão em streaming são guardadas como chegaram em CONJUNTO_RECEBIDO,
+# que é, com CONJUNTO_GERADO, a entrada do processamento
+
+CONJUNTO_GERADO = 'gerados'
+CONJUNTO_RECEBIDO = 'recebidos'
+CONJUNTO_PROCESSADO = 'processados'
+CONJUNTO_FINAL = 'finais'
+
+# Chaves de partição. Registros sem a coluna 'Elenco' (como os do gerador) pertencem
+# ao ELENCO_PADRAO; a temporada é identificada pelo ano em que começa (com
+# MES_INICIO_TEMPORADA = 1, temporadas de calendário, como as das seleções)
+
+COLUNA_ELENCO = 'Elenco'
+COLUNA_TEMPORADA = 'Temporada'
+COLUNA_MES = 'Mes'
+COLUNAS_PARTICAO = [COLUNA_ELENCO, COLUNA_TEMPORADA, COLUNA_MES]
+ELENCO_PADRAO = 'BR-2002'
+MES_INICIO_TEMPORADA = 1
+
+# No banco, cada partição é uma tabela própria; o catálogo guarda as linhas, o intervalo
+# de datas e os jogadores de cada partição, e uma visão com o nome da tabela original
+# une todas as partições para as consultas que não filtram
+
+NOME_TABELA = 'performance_atletas'
+NOME_TABELA_PARTICOES = 'particoes_performance'
+NOME_TABELA_PARTICOES_JOGADORES = 'particoes_performance_jogadores'
+
+# O SQLite aceita até 500 termos em um SELECT composto; uniões maiores são aninhadas
+
+MAX_TABELAS_POR_UNIAO = 400
+
+# Filtros aceitos (todos opcionais): 'elencos', 'temporadas', 'meses' (AAAA-MM),
+# 'data_inicio', 'data_fim', 'jogadores' e 'temporadas_recentes' (as N últimas
+# temporadas de cada jogador ou, sem filtro de jogadores, de cada elenco)
+
+# --- Chaves de partição ---
+
+def _como_lista(valor):
+    if valor is None:
+        return None
+    if isinstance(valor, (str, int)):
+        return [valor]
+    return list(valor)
+
+def _normalizar_nome(valor):
+    return re.sub(r'[^0-9A-Za-z]+', '_', str(valor)).strip('_') or 'sem_nome'
+
+def adicionar_chaves_particao(df, elenco=ELENCO_PADRAO):
+    """
+    Acrescenta (no lugar) as colunas de partição: 'Elenco' (mantido se já existir),
+    'Temporada' e 'Mes', derivadas de 'Data'. Retorna o próprio DataFrame.
+    """
+    datas = pd.to_datetime(df['Data'])
+    if COLUNA_ELENCO in df.columns:
+        df[COLUNA_ELENCO] = df[COLUNA_ELENCO].fillna(elenco)
+    else:
+        df[COLUNA_ELENCO] = elenco
+    df[COLUNA_TEMPORADA] = (datas.dt.year - (datas.dt.month < MES_INICIO_TEMPORADA)).astype('int64')
+
+    # Formata cada mês distinto uma única vez
+    codigos, meses = pd.factorize(datas.dt.year * 100 + datas.dt.month)
+    rotulos = pd.Index([f'{mes // 100:04d}-{mes % 100:02d}' for mes in meses], dtype=object)
+    df[COLUNA_MES] = rotulos.take(codigos).to_numpy()
+    return df
+
+def selecionar_linhas(df, filtros):
+    """
+    Máscara das linhas do DataFrame que atendem aos filtros de partição e de datas.
+    """
+    filtros = filtros or {}
+    mascara = pd.Series(True, index=df.index)
+    for chave, coluna in (('elencos', COLUNA_ELENCO), ('temporadas', COLUNA_TEMPORADA), ('meses', COLUNA_MES)):
+        if filtros.get(chave) is not None:
+            valores = _como_lista(filtros[chave])
+            mascara &= df[coluna].isin([int(valor) for valor in valores] if coluna == COLUNA_TEMPORADA else valores)
+    if filtros.get('data_inicio') is not None or filtros.get('data_fim') is not None:
+        datas = pd.to_datetime(df['Data'])
+        if filtros.get('data_inicio') is not None:
+            mascara &= datas >= pd.Timestamp(filtros['data_inicio'])
+        if filtros.get('data_fim') is not None:
+            mascara &= datas < pd.Timestamp(filtros['data_fim']) + pd.Timedelta(days=1)
+    return mascara
+
+# --- Poda de partições ---
+
+def podar_particoes(catalogo, filtros=None):
+    """
+    Seleciona as partições que podem conter linhas que atendem aos filtros, usando
+    apenas o catálogo (uma linha por partição e jogador, com as chaves de partição,
+    'Data_Min', 'Data_Max' e 'Jogador'). Retorna {partição: jogadores selecionados},
+    com None quando todos os jogadores da partição interessam.
+    """
+    filtros = filtros or {}
+    selecao = catalogo
+    if filtros.get('elencos') is not None:
+        selecao = selecao[selecao[COLUNA_ELENCO].isin(_como_lista(filtros['elencos']))]
+    if filtros.get('temporadas') is not None:
+        selecao = selecao[selecao[COLUNA_TEMPORADA].isin([int(temporada) for temporada in _como_lista(filtros['temporadas'])])]
+    if filtros.get('meses') is not None:
+        selecao = selecao[selecao[COLUNA_MES].isin(_como_lista(filtros['meses']))]
+    if filtros.get('data_inicio') is not None:
+        selecao = selecao[selecao['Data_Max'] >= pd.Timestamp(filtros['data_inicio']).strftime('%Y-%m-%d')]
+    if filtros.get('data_fim') is not None:
+        selecao = selecao[selecao['Data_Min'] <= pd.Timestamp(filtros['data_fim']).strftime('%Y-%m-%d')]
+    if filtros.get('jogadores') is not None:
+        selecao = selecao[selecao['Jogador'].isin(_como_lista(filtros['jogadores']))]
+    if filtros.get('temporadas_recentes') is not None:
+        grupo = 'Jogador' if filtros.get('jogadores') is not None else COLUNA_ELENCO
+        ultima_temporada = selecao.groupby(grupo)[COLUNA_TEMPORADA].transform('max')
+        selecao = selecao[selecao[COLUNA_TEMPORADA] > ultima_temporada - int(filtros['temporadas_recentes'])]
+
+    selecao = selecao.sort_values([*COLUNAS_PARTICAO, 'Particao'], kind='stable')
+    if filtros.get('jogadores') is None:
+        return dict.fromkeys(selecao['Particao'].unique())
+    return {particao: sorted(jogadores) for particao, jogadores in selecao.groupby('Particao', sort=False)['Jogador']}
+
+# --- Conjuntos intermediários (arquivos) ---
+
+def caminho_catalogo(conjunto, pasta=PASTA_PARTICOES):
+    """
+    Caminho do catálogo do conjunto: é o arquivo que representa o conjunto no executor
+    da pipeline (o hash dele muda sempre que alguma partição muda).
+    """
+    return os.path.join(pasta, conjunto, NOME_ARQUIVO_CATALOGO)
+
+def carregar_catalogo(conjunto, pasta=PASTA_PARTICOES):
+    """
+    Retorna o catálogo do conjunto ({'coluna_jogador', 'particoes': [...]}) ou None se o conjunto não existir.
+    """
+    caminho = caminho_catalogo(conjunto, pasta)
+    if not os.path.exists(caminho):
+        return None
+    with open(caminho, encoding='utf-8') as arquivo:
+        return json.load(arquivo)
+
+def _catalogo_por_jogador(catalogo):
+    linhas = [
+        {'Particao': particao['Caminho'], **{coluna: particao[coluna] for coluna in COLUNAS_PARTICAO},
+         'Data_Min': particao['Data_Min'], 'Data_Max': particao['Data_Max'], 'Jogador': jogador}
+        for particao in catalogo['particoes'] for jogador in particao['Jogadores']
+    ]
+    return pd.DataFrame(linhas, columns=['Particao', *COLUNAS_PARTICAO, 'Data_Min', 'Data_Max', 'Jogador'])
+
+def contar_linhas_conjunto(conjunto, pasta=PASTA_PARTICOES):
+    catalogo = carregar_catalogo(conjunto, pasta)
+    return sum(particao['Linhas'] for particao in catalogo['particoes']) if catalogo else 0
+
+def gravar_conjunto(df, conjunto, filtros=None, pasta=PASTA_PARTICOES, acrescentar=False):
+    """
+    Grava o DataFrame como partições do conjunto e atualiza o catálogo. Sem 'filtros',
+    o conjunto inteiro é substituído; com 'filtros', apenas as partições selecionadas
+    por eles são substituídas (ou removidas, se não houver mais linhas para elas) e as
+    demais são mantidas. Com 'acrescentar' (ingestão em streaming), as linhas são
+    acrescentadas às partições que recebem dados e as demais ficam intactas. Partições
+    com conteúdo idêntico ao já gravado não são reescritas. Retorna o catálogo gravado.
+    """
+    if COLUNA_MES not in df.columns or COLUNA_TEMPORADA not in df.columns:
+        adicionar_chaves_particao(df)
+    pasta_conjunto = os.path.join(pasta, conjunto)
+    coluna_jogador = 'Nome_Padronizado' if 'Nome_Padronizado' in df.columns else 'Nome_Jogador'
+
+    catalogo_anterior = carregar_catalogo(conjunto, pasta) or {'particoes': []}
+    anteriores = {particao['Caminho']: particao for particao in catalogo_anterior['particoes']}
+    if acrescentar:
+        substituidas = set()
+    else:
+        substituidas = set(podar_particoes(_catalogo_por_jogador(catalogo_anterior), filtros)) if filtros else set(anteriores)
+
+    novas = {}
+    for (elenco, temporada, mes), posicoes in df.groupby(COLUNAS_PARTICAO, sort=True).indices.items():
+        caminho_relativo = '/'.join([f'elenco={_normalizar_nome(elenco)}', f'temporada={temporada}', f'mes={mes}', NOME_ARQUIVO_PARTICAO])
+        destino = os.path.join(pasta_conjunto, *caminho_relativo.split('/'))
+        anterior = anteriores.get(caminho_relativo)
+        parte = df.iloc[posicoes]
+        if acrescentar and anterior and os.path.exists(destino):
+            parte = pd.concat([ler_csv_performance(destino, categorizar=False), parte], ignore_index=True)
+        parte = aplicar_esquema(parte.copy(), categorizar=False, origem=conjunto)
+        conteudo = parte.to_csv(index=False, date_format=FORMATO_DATA).encode('utf-8')
+        hash_particao = hashlib.sha256(conteudo).hexdigest()[:16]
+
+        if not (anterior and anterior['Hash'] == hash_particao and os.path.exists(destino)):
+            os.makedirs(os.path.dirname(destino), exist_ok=True)
+            with open(destino + '.tmp', 'wb') as arquivo:
+                arquivo.write(conteudo)
+            os.replace(destino + '.tmp', destino)
+
+        datas = pd.to_datetime(parte['Data'])
+        novas[caminho_relativo] = {
+            'Caminho': caminho_relativo, COLUNA_ELENCO: elenco, COLUNA_TEMPORADA: int(temporada), COLUNA_MES: mes,
+            'Linhas': len(parte), 'Data_Min': datas.min().strftime('%Y-%m-%d'), 'Data_Max': datas.max().strftime('%Y-%m-%d'),
+            'Jogadores': sorted(parte[coluna_jogador].dropna().unique().tolist()), 'Hash': hash_particao,
+        }
+
+    # Partições substituídas que deixaram de ter linhas são removidas do disco
+    for caminho_relativo in substituidas - set(novas):
+        arquivo = os.path.join(pasta_conjunto, *caminho_relativo.split('/'))
+        if os.path.exists(arquivo):
+            os.remove(arquivo)
+        pasta_particao = os.path.dirname(arquivo)
+        while pasta_particao != pasta_conjunto and os.path.isdir(pasta_particao) and not os.listdir(pasta_particao):
+            os.rmdir(pasta_particao)
+            pasta_particao = os.path.dirname(pasta_particao)
+
+    mantidas = {caminho: particao for caminho, particao in anteriores.items() if caminho not in substituidas}
+    particoes = sorted({**mantidas, **novas}.values(), key=lambda particao: [particao[coluna] for coluna in COLUNAS_PARTICAO])
+    catalogo = {'conjunto': conjunto, 'coluna_jogador': coluna_jogador, 'particoes': particoes}
+
+    os.makedirs(pasta_conjunto, exist_ok=True)
+    caminho = caminho_catalogo(conjunto, pasta)
+    with open(caminho + '.tmp', 'w', encoding='utf-8') as arquivo:
+        json.dump(catalogo, arquivo, indent=1, ensure_ascii=False)
+    os.replace(caminho + '.tmp', caminho)
+    return catalogo
+
+def ler_conjunto(conjunto, filtros=None, pasta=PASTA_PARTICOES, colunas_obrigatorias=()):
+    """
+    Lê apenas as partições do conjunto selecionadas pelos filtros (poda pelo catálogo),
+    nos tipos do esquema do registro de performance, e aplica às linhas os filtros de
+    jogadores e de datas. Retorna None se o conjunto não existir e um DataFrame vazio se
+    nenhuma partição for selecionada; levanta ErroEsquema se uma partição não seguir o esquema.
+    """
+    catalogo = carregar_catalogo(conjunto, pasta)
+    if catalogo is None:
+        return None
+    selecionadas = podar_particoes(_catalogo_por_jogador(catalogo), filtros)
+    if not selecionadas:
+        return pd.DataFrame()
+
+    partes = []
+    for caminho_relativo, jogadores in selecionadas.items():
+        # Os textos só viram categóricos depois da concatenação, com as categorias de todas as partes
+        parte = ler_csv_performance(os.path.join(pasta, conjunto, *caminho_relativo.split('/')), colunas_obrigatorias, categorizar=False)
+        if jogadores is not None:
+            parte = parte[parte[catalogo['coluna_jogador']].isin(jogadores)]
+        partes.append(parte)
+    df = aplicar_esquema(pd.concat(partes, ignore_index=True), origem=conjunto)
+    if filtros and (filtros.get('data_inicio') is not None or filtros.get('data_fim') is not None):
+        df = df[selecionar_linhas(df, {'data_inicio': filtros.get('data_inicio'), 'data_fim': filtros.get('data_fim')})].reset_index(drop=True)
+    return df
+
+def ampliar_filtros_elenco(conjunto, filtros, pasta=PASTA_PARTICOES):
+    """
+    Filtros de leitura para reprocessar as partições selecionadas por 'filtros': todo o
+    histórico dos elencos dessas partições, do qual dependem as imputações por posição,
+    as EWMA e a reconciliação de nomes do processamento.
+    """
+    catalogo = carregar_catalogo(conjunto, pasta)
+    if not filtros or catalogo is None:
+        return filtros
+    selecionadas = set(podar_particoes(_catalogo_por_jogador(catalogo), filtros))
+    elencos = sorted({particao[COLUNA_ELENCO] for particao in catalogo['particoes'] if particao['Caminho'] in selecionadas})
+    return {'elencos': elencos} if elencos else filtros
+
+# --- Partições no banco de dados (SQLite) ---
+
+def nome_tabela_particao(elenco, temporada, mes, nome_base=NOME_TABELA):
+    return f"{nome_base}__{_normalizar_nome(elenco).lower()}__{temporada}__{mes.replace('-', '_')}"
+
+def _garantir_catalogo_sql(conexao):
+    from sqlalchemy import text
+
+    conexao.execute(text(
+        f'CREATE TABLE IF NOT EXISTS {NOME_TABELA_PARTICOES} ("Tabela" TEXT PRIMARY KEY, "Elenco" TEXT, "Temporada" INTEGER, '
+        '"Mes" TEXT, "Linhas" INTEGER, "Data_Min" TEXT, "Data_Max" TEXT)'
+    ))
+    conexao.execute(text(
+        f'CREATE TABLE IF NOT EXISTS {NOME_TABELA_PARTICOES_JOGADORES} ("Tabela" TEXT, "Nome_Padronizado" TEXT, "Posicao" TEXT, '
+        '"Linhas" INTEGER, "Data_Min" TEXT, "Data_Max" TEXT, "Hash_Dados" TEXT, PRIMARY KEY ("Tabela", "Nome_Padronizado"))'
+    ))
+    conexao.execute(text(
+        f'CREATE INDEX IF NOT EXISTS idx_{NOME_TABELA_PARTICOES_JOGADORES}_jogador ON {NOME_TABELA_PARTICOES_JOGADORES} ("Nome_Padronizado")'
+    ))
+
+def _tipo_objeto_sql(conexao, nome):
+    from sqlalchemy import text
+    return conexao.execute(text('SELECT type FROM sqlite_master WHERE name = :nome'), {'nome': nome}).scalar()
+
+def carregar_catalogo_sql(conexao):
+    """
+    Catálogo de partições do banco, uma linha por partição e jogador (None se o banco não
+    estiver particionado).
+    """
+    from sqlalchemy import text
+
+    if _tipo_objeto_sql(conexao, NOME_TABELA_PARTICOES) != 'table':
+        return None
+    return pd.read_sql(text(
+        f'SELECT p."Tabela" AS "Particao", p."Elenco", p."Temporada", p."Mes", p."Data_Min", p."Data_Max", j."Nome_Padronizado" AS "Jogador" '
+        f'FROM {NOME_TABELA_PARTICOES} p JOIN {NOME_TABELA_PARTICOES_JOGADORES} j ON j."Tabela" = p."Tabela"'
+    ), conexao)
+
+def listar_particoes_sql(conexao, filtros=None, nome_base=NOME_TABELA):
+    """
+    Tabelas de partição selecionadas pelos filtros: {tabela: jogadores ou None}. Em um
+    banco ainda não particionado, a tabela original é a única "partição".
+    """
+    catalogo = carregar_catalogo_sql(conexao)
+    if catalogo is None:
+        if _tipo_objeto_sql(conexao, nome_base) != 'table':
+            return {}
+        jogadores = (filtros or {}).get('jogadores')
+        return {nome_base: sorted(_como_lista(jogadores)) if jogadores is not None else None}
+    return podar_particoes(catalogo, filtros)
+
+def _colunas_tabela(conexao, tabela):
+    from sqlalchemy import text
+    return [linha[1] for linha in conexao.execute(text(f'PRAGMA table_info("{tabela}")'))]
+
+def _montar_uniao(selecoes):
+    """
+    Une as consultas (uma por partição) com UNION ALL, aninhando em grupos de até
+    MAX_TABELAS_POR_UNIAO termos.
+    """
+    if len(selecoes) <= MAX_TABELAS_POR_UNIAO:
+        return ' UNION ALL '.join(selecoes)
+    grupos = [selecoes[i:i + MAX_TABELAS_POR_UNIAO] for i in range(0, len(selecoes), MAX_TABELAS_POR_UNIAO)]
+    return _montar_uniao([f'SELECT * FROM ({" UNION ALL ".join(grupo)})' for grupo in grupos])
+
+def montar_consulta_particoes(conexao, colunas=None, filtros=None, ordem=None, nome_base=NOME_TABELA):
+    """
+    Monta a consulta que lê 'colunas' (todas, se None) apenas das partições selecionadas
+    pelos filtros, com os filtros de jogadores e de datas aplicados dentro de cada
+    partição (cobertos pelo índice por jogador e data). Retorna (sql, parâmetros), ou
+    (None, {}) se nenhuma partição for selecionada.
+    """
+    filtros = filtros or {}
+    selecionadas = listar_particoes_sql(conexao, filtros, nome_base)
+    if not selecionadas:
+        return None, {}
+
+    colunas_por_tabela = {tabela: _colunas_tabela(conexao, tabela) for tabela in selecionadas}
+    if colunas is None:
+        colunas = list(dict.fromkeys(coluna for colunas_tabela in colunas_por_tabela.values() for coluna in colunas_tabela))
+
+    parametros = {}
+    chaves_jogadores = {}
+    condicoes_datas = []
+    if filtros.get('data_inicio') is not None:
+        parametros['data_inicio'] = pd.Timestamp(filtros['data_inicio']).strftime('%Y-%m-%d')
+        condicoes_datas.append('"Data" >= :data_inicio')
+    if filtros.get('data_fim') is not None:
+        parametros['data_fim_exclusiva'] = (pd.Timestamp(filtros['data_fim']) + pd.Timedelta(days=1)).strftime('%Y-%m-%d')
+        condicoes_datas.append('"Data" < :data_fim_exclusiva')
+
+    selecoes = []
+    for tabela, jogadores in selecionadas.items():
+        lista_colunas = ', '.join(f'"{coluna}"' if coluna in colunas_por_tabela[tabela] else f'NULL AS "{coluna}"' for coluna in colunas)
+        condicoes = list(condicoes_datas)
+        if jogadores is not None:
+            for jogador in jogadores:
+                chaves_jogadores.setdefault(jogador, f'jogador_{len(chaves_jogadores)}')
+            condicoes.append(f'"Nome_Padronizado" IN ({", ".join(":" + chaves_jogadores[jogador] for jogador in jogadores)})')
+        selecoes.append(f'SELECT {lista_colunas} FROM "{tabela}"' + (f' WHERE {" AND ".join(condicoes)}' if condicoes else ''))
+    parametros.update({chave: jogador for jogador, chave in chaves_jogadores.items()})
+
+    sql = _montar_uniao(selecoes)
+    if ordem:
+        sql += ' ORDER BY ' + ', '.join(f'"{coluna}"' for coluna in ordem)
+    return sql, parametros
+
+def consultar_particoes(conexao, colunas=None, filtros=None, ordem=None, nome_base=NOME_TABELA):
+    """
+    Lê em um DataFrame as linhas das partições selecionadas pelos filtros.
+    """
+    from sqlalchemy import text
+
+    sql, parametros = montar_consulta_particoes(conexao, colunas, filtros, ordem, nome_base)
+    if sql is None:
+        return pd.DataFrame(columns=colunas)
+    return pd.read_sql(text(sql), conexao, params=parametros, parse_dates=['Data'])
+
+def recriar_visao_particoes(conexao, nome_base=NOME_TABELA):
+    """
+    Recria a visão com o nome da tabela original, unindo todas as partições (as colunas
+    ausentes em alguma partição aparecem como NULL).
+    """
+    from sqlalchemy import text
+
+    conexao.execute(text(f'DROP VIEW IF EXISTS "{nome_base}"'))
+    sql, _ = montar_consulta_particoes(conexao, nome_base=nome_base)
+    if sql is not None:
+        conexao.execute(text(f'CREATE VIEW "{nome_base}" AS {sql}'))
+
+def criar_indices_particoes(conexao, tabelas=None):
+    """
+    Cria (se ainda não existir) o índice por jogador e data de cada tabela de partição.
+    """
+    from sqlalchemy import text
+
+    if tabelas is None:
+        catalogo = carregar_catalogo_sql(conexao)
+        tabelas = [] if catalogo is None else catalogo['Particao'].unique()
+    for tabela in tabelas:
+        conexao.execute(text(f'CREATE INDEX IF NOT EXISTS "idx_{tabela}" ON "{tabela}" ("Nome_Padronizado", "Data")'))
+
+def _resumir_jogadores_particoes(df, hashes_linhas, nome_base=NOME_TABELA):
+    """
+    Uma linha por partição e jogador: linhas, intervalo de datas, posição mais recente e
+    hash do conteúdo (a partir dos hashes das linhas).
+    """
+    datas = pd.to_datetime(df['Data']).dt.normalize()
+    resumo = []
+    for (elenco, temporada, mes, nome), posicoes in df.groupby([*COLUNAS_PARTICAO, 'Nome_Padronizado'], sort=True).indices.items():
+        datas_jogador = datas.iloc[posicoes]
+        resumo.append({
+            'Tabela': nome_tabela_particao(elenco, temporada, mes, nome_base), COLUNA_ELENCO: elenco, COLUNA_TEMPORADA: int(temporada), COLUNA_MES: mes,
+            'Nome_Padronizado': nome, 'Posicao': df['Posicao'].iloc[posicoes[datas_jogador.to_numpy().argmax()]],
+            'Linhas': len(posicoes), 'Data_Min': datas_jogador.min().strftime('%Y-%m-%d'), 'Data_Max': datas_jogador.max().strftime('%Y-%m-%d'),
+            'Hash_Dados': hashlib.sha256(hashes_linhas[posicoes].tobytes()).hexdigest()[:16],
+        })
+    return pd.DataFrame(resumo)
+
+def gravar_particoes_sql(conexao, df, filtros=None, acrescentar=False, nome_base=NOME_TABELA):
+    """
+    Grava o DataFrame nas tabelas de partição (criando-as quando preciso) e atualiza o
+    catálogo e a visão, dentro da transação de 'conexao'.
+    - Sem 'acrescentar', as partições selecionadas pelos filtros (todas, sem filtros) são
+      substituídas pelas linhas do DataFrame; as demais ficam intactas.
+    - Com 'acrescentar' (ingestão em streaming), as linhas são acrescentadas às partições.
+    Um banco no formato antigo (uma única tabela) é convertido para partições antes de
+    uma gravação parcial. Retorna as tabelas gravadas.
+    """
+    from sqlalchemy import text
+
+    df = df.reset_index(drop=True)
+    if COLUNA_MES not in df.columns or COLUNA_TEMPORADA not in df.columns:
+        df = adicionar_chaves_particao(df.copy())
+
+    if _tipo_objeto_sql(conexao, nome_base) == 'table':
+        if acrescentar or filtros:
+            print(f"Convertendo a tabela '{nome_base}' para o formato particionado...")
+            legado = pd.read_sql(text(f'SELECT * FROM "{nome_base}"'), conexao, parse_dates=['Data'])
+            conexao.execute(text(f'DROP TABLE "{nome_base}"'))
+            gravar_particoes_sql(conexao, legado, nome_base=nome_base)
+        else:
+            conexao.execute(text(f'DROP TABLE "{nome_base}"'))
+    _garantir_catalogo_sql(conexao)
+    tabelas_anteriores = set(conexao.execute(text(f'SELECT "Tabela" FROM {NOME_TABELA_PARTICOES}')).scalars())
+
+    if not acrescentar:
+        for tabela in listar_particoes_sql(conexao, {chave: valor for chave, valor in (filtros or {}).items() if chave != 'jogadores'}, nome_base):
+            conexao.execute(text(f'DROP TABLE IF EXISTS "{tabela}"'))
+            conexao.execute(text(f'DELETE FROM {NOME_TABELA_PARTICOES} WHERE "Tabela" = :tabela'), {'tabela': tabela})
+            conexao.execute(text(f'DELETE FROM {NOME_TABELA_PARTICOES_JOGADORES} WHERE "Tabela" = :tabela'), {'tabela': tabela})
+
+    resumo = _resumir_jogadores_particoes(df, pd.util.hash_pandas_object(df, index=False).to_numpy(), nome_base)
+    tabelas = []
+    for (elenco, temporada, mes), posicoes in df.groupby(COLUNAS_PARTICAO, sort=True).indices.items():
+        tabela = nome_tabela_particao(elenco, temporada, mes, nome_base)
+        df.iloc[posicoes].to_sql(tabela, conexao, if_exists='append' if acrescentar else 'replace', index=False)
+        if not acrescentar:
+            conexao.execute(text(f'DELETE FROM {NOME_TABELA_PARTICOES_JOGADORES} WHERE "Tabela" = :tabela'), {'tabela': tabela})
+        tabelas.append(tabela)
+    criar_indices_particoes(conexao, tabelas)
+
+    # Ao acrescentar, o resumo de cada jogador é combinado com o já registrado (o hash é encadeado)
+    if acrescentar and not resumo.empty:
+        parametros = {f'tabela_{i}': tabela for i, tabela in enumerate(tabelas)}
+        anteriores = pd.read_sql(text(
+            f'SELECT * FROM {NOME_TABELA_PARTICOES_JOGADORES} WHERE "Tabela" IN ({", ".join(":" + chave for chave in parametros)})'
+        ), conexao, params=parametros).set_index(['Tabela', 'Nome_Padronizado'])
+        for indice, linha in resumo.iterrows():
+            chave = (linha['Tabela'], linha['Nome_Padronizado'])
+            if chave in anteriores.index:
+                anterior = anteriores.loc[chave]
+                resumo.at[indice, 'Linhas'] = linha['Linhas'] + int(anterior['Linhas'])
+                resumo.at[indice, 'Data_Min'] = min(linha['Data_Min'], anterior['Data_Min'])
+                resumo.at[indice, 'Data_Max'] = max(linha['Data_Max'], anterior['Data_Max'])
+                resumo.at[indice, 'Hash_Dados'] = hashlib.sha256((anterior['Hash_Dados'] + linha['Hash_Dados']).encode()).hexdigest()[:16]
+
+    for tabela, resumo_tabela in resumo.groupby('Tabela', sort=False):
+        conexao.execute(text(f'DELETE FROM {NOME_TABELA_PARTICOES_JOGADORES} WHERE "Tabela" = :tabela AND "Nome_Padronizado" IN '
+                             f'({", ".join(f":nome_{i}" for i in range(len(resumo_tabela)))})'),
+                        {'tabela': tabela, **{f'nome_{i}': nome for i, nome in enumerate(resumo_tabela['Nome_Padronizado'])}})
+        resumo_tabela[['Tabela', 'Nome_Padronizado', 'Posicao', 'Linhas', 'Data_Min', 'Data_Max', 'Hash_Dados']].to_sql(
+            NOME_TABELA_PARTICOES_JOGADORES, conexao, if_exists='append', index=False
+        )
+        conexao.execute(text(f'DELETE FROM {NOME_TABELA_PARTICOES} WHERE "Tabela" = :tabela'), {'tabela': tabela})
+        conexao.execute(text(
+            f'INSERT INTO {NOME_TABELA_PARTICOES} SELECT :tabela, :elenco, :temporada, :mes, SUM("Linhas"), MIN("Data_Min"), MAX("Data_Max") '
+            f'FROM {NOME_TABELA_PARTICOES_JOGADORES} WHERE "Tabela" = :tabela'
+        ), {'tabela': tabela, 'elenco': resumo_tabela[COLUNA_ELENCO].iloc[0], 'temporada': int(resumo_tabela[COLUNA_TEMPORADA].iloc[0]),
+            'mes': resumo_tabela[COLUNA_MES].iloc[0]})
+
+    tabelas_atuais = set(conexao.execute(text(f'SELECT "Tabela" FROM {NOME_TABELA_PARTICOES}')).scalars())
+    if tabelas_atuais != tabelas_anteriores or _tipo_objeto_sql(conexao, nome_base) != 'view':
+        recriar_visao_particoes(conexao, nome_base)
+    return tabelas
+
+def calcular_versoes_jogadores(conexao, jogadores=None):
+    """
+    Versão dos dados de cada jogador a partir do catálogo: o hash dos hashes das suas
+    partições (muda sempre que alguma partição do jogador muda) e o total de linhas.
+    """
+    from sqlalchemy import text
+
+    catalogo = pd.read_sql(text(
+        f'SELECT "Nome_Padronizado", "Tabela", "Hash_Dados", "Linhas" FROM {NOME_TABELA_PARTICOES_JOGADORES} ORDER BY "Nome_Padronizado", "Tabela"'
+    ), conexao)
+    if jogadores is not None:
+        catalogo = catalogo[catalogo['Nome_Padronizado'].isin(_como_lista(jogadores))]
+    return pd.DataFrame([
+        {'Nome_Padronizado': nome,
+         'Hash_Dados': hashlib.sha256(';'.join(grupo['Tabela'] + ':' + grupo['Hash_Dados']).encode()).hexdigest()[:16],
+         'Linhas': int(grupo['Linhas'].sum())}
+        for nome, grupo in catalogo.groupby('Nome_Padronizado', sort=True)
+    ], columns=['Nome_Padronizado', 'Hash_Dados', 'Linhas'])
+
+def consultar_posicoes_jogadores(conexao, nome_base=NOME_TABELA):
+    """
+    {jogador: posição mais recente}, lido do catálogo (ou da tabela original, em um banco não particionado).
+    """
+    from sqlalchemy import text
+
+    if _tipo_objeto_sql(conexao, NOME_TABELA_PARTICOES) == 'table':
+        consulta = (f'SELECT "Nome_Padronizado", "Posicao", MAX("Data_Max") FROM {NOME_TABELA_PARTICOES_JOGADORES} '
+                    'GROUP BY "Nome_Padronizado" ORDER BY "Nome_Padronizado"')
+    else:
+        consulta = f'SELECT "Nome_Padronizado", "Posicao", MAX("Data") FROM {nome_base} GROUP BY "Nome_Padronizado" ORDER BY "Nome_Padronizado"'
+    return {nome: posicao for nome, posicao, _ in conexao.execute(text(consulta))}
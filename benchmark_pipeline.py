@@ -0,0 +1,323 @@
+import argparse
+import contextlib
+import io
+import json
+import multiprocessing
+import os
+import platform
+import queue
+import resource
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+# --- Configurações ---
+
+PASTA_DADOS = 'data'
+PASTA_BENCHMARKS = os.path.join(PASTA_DADOS, 'benchmarks')
+ARQUIVO_RESULTADO_BENCHMARK = os.path.join(PASTA_BENCHMARKS, 'ultimo_benchmark.json')
+ARQUIVO_BASELINE_BENCHMARK = os.path.join(PASTA_BENCHMARKS, 'baseline_benchmark.json')
+
+ESCALAS_PADRAO = [1, 2, 4]
+LIMIAR_REGRESSAO_PADRAO = 0.20
+SEMENTE_BENCHMARK = 2002
+
+# Intervalo com que medir_estagio verifica se o processo do estágio ainda está vivo
+
+INTERVALO_VERIFICACAO_ESTAGIO_S = 5
+
+# Duração de uma "temporada" sintética (01/01 a 29/06, como no gerador)
+
+DATA_INICIO_BENCHMARK = datetime(2002, 1, 1)
+DIAS_POR_ESCALA = 180
+
+# Métricas comparadas com o baseline (maior = pior)
+
+METRICAS_REGRESSAO = ['tempo_s', 'pico_rss_mb']
+
+# Orçamento de tempo de importação (ms, cumulativo, medido com -X importtime).
+# Nenhum desses módulos pode importar dependências pesadas no nível do módulo.
+
+ORCAMENTO_IMPORTACAO_MS = {
+    'main': 100,
+    'executor_pipeline': 100,
+    'data_generator': 1000,
+    'data_processor': 1000,
+    'analysis_script': 1000,
+    'load_to_sql': 1000,
+    'servico_previsao': 1000,
+}
+DEPENDENCIAS_PESADAS = ['dash', 'dash_bootstrap_components', 'plotly', 'flask', 'sqlalchemy', 'sklearn', 'fuzzywuzzy', 'joblib']
+
+# --- Estágios medidos ---
+# Cada estágio roda em um processo novo, dentro da pasta de trabalho da escala,
+# e retorna o número de linhas que processou.
+
+def _estagio_gerar(fator_escala):
+    import data_generator
+    from armazenamento_particionado import CONJUNTO_GERADO, contar_linhas_conjunto
+    data_fim = DATA_INICIO_BENCHMARK + timedelta(days=DIAS_POR_ESCALA * fator_escala - 1)
+    data_generator.gerar_e_salvar_dados(DATA_INICIO_BENCHMARK, data_fim, semente=SEMENTE_BENCHMARK)
+    return contar_linhas_conjunto(CONJUNTO_GERADO)
+
+def _estagio_processar(fator_escala):
+    import data_processor
+    from armazenamento_particionado import CONJUNTO_PROCESSADO, contar_linhas_conjunto
+    data_processor.executar_processamento_dados()
+    return contar_linhas_conjunto(CONJUNTO_PROCESSADO)
+
+def _estagio_treinar(fator_escala):
+    import analysis_script
+    from armazenamento_particionado import CONJUNTO_FINAL, contar_linhas_conjunto
+    analysis_script.executar_analise_e_previsao()
+    return contar_linhas_conjunto(CONJUNTO_FINAL)
+
+def _estagio_carregar_sql(fator_escala):
+    import load_to_sql
+    import sqlite3
+    load_to_sql.carregar_dados_processados_para_sql()
+    with sqlite3.connect(load_to_sql.ARQUIVO_DB) as conexao:
+        return conexao.execute(f"SELECT COUNT(*) FROM {load_to_sql.NOME_TABELA}").fetchone()[0]
+
+def _estagio_callbacks_dashboard(fator_escala):
+    import dashboard_app
+    import sqlite3
+    jogadores = dashboard_app.inicializar_dados_dashboard()
+
+    chamadas = 0
+    for jogador in jogadores:
+        dashboard_app.atualizar_info_jogador(jogador)
+        chamadas += 1
+    for jogador_1, jogador_2 in zip(jogadores, jogadores[1:]):
+        dashboard_app.atualizar_info_comparacao([jogador_1, jogador_2])
+        chamadas += 1
+    for posicao in sorted(set(dashboard_app.estado_dados['posicoes_jogadores'].values())):
+        dashboard_app.atualizar_info_comparacao(dashboard_app.selecionar_grupo_posicao(posicao))
+        chamadas += 1
+    dashboard_app.atualizar_visao_elenco('aba-elenco')
+    chamadas += 1
+    with sqlite3.connect(dashboard_app.ARQUIVO_DB) as conexao:
+        linhas = conexao.execute(f"SELECT COUNT(*) FROM {dashboard_app.NOME_TABELA}").fetchone()[0]
+    return linhas, {'chamadas_callback': chamadas}
+
+ESTAGIOS = {
+    'gerar_e_salvar_dados': _estagio_gerar,
+    'executar_processamento_dados': _estagio_processar,
+    'executar_analise_e_previsao': _estagio_treinar,
+    'carregar_dados_processados_para_sql': _estagio_carregar_sql,
+    'callbacks_dashboard': _estagio_callbacks_dashboard,
+}
+
+def _executar_estagio_isolado(nome_estagio, pasta_trabalho, fator_escala, fila):
+    """
+    Executa um estágio em um processo filho e devolve tempo, CPU e pico de RSS pela fila.
+    """
+    try:
+        pasta_projeto = os.path.dirname(os.path.abspath(__file__))
+        os.chdir(pasta_trabalho)
+        sys.path.insert(0, pasta_projeto)
+
+        saida = io.StringIO()
+        with contextlib.redirect_stdout(saida):
+            inicio_cpu = time.process_time()
+            inicio = time.perf_counter()
+            retorno = ESTAGIOS[nome_estagio](fator_escala)
+            tempo = time.perf_counter() - inicio
+            tempo_cpu = time.process_time() - inicio_cpu
+
+        linhas, extras = retorno if isinstance(retorno, tuple) else (retorno, {})
+        resultado = {
+            'estagio': nome_estagio,
+            'escala': fator_escala,
+            'tempo_s': round(tempo, 4),
+            'tempo_cpu_s': round(tempo_cpu, 4),
+            'linhas': int(linhas),
+            'linhas_por_s': round(linhas / tempo, 1) if tempo > 0 else None,
+            # ru_maxrss é reportado em KB no Linux
+            'pico_rss_mb': round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1),
+        }
+        resultado.update(extras)
+        fila.put(resultado)
+    except Exception as e:
+        fila.put({'estagio': nome_estagio, 'escala': fator_escala, 'erro': repr(e)})
+
+def medir_estagio(nome_estagio, pasta_trabalho, fator_escala):
+    """
+    Mede um estágio em um processo novo ('spawn'), para que o pico de RSS seja só dele.
+    """
+    contexto = multiprocessing.get_context('spawn')
+    fila = contexto.Queue()
+    processo = contexto.Process(target=_executar_estagio_isolado, args=(nome_estagio, pasta_trabalho, fator_escala, fila))
+    processo.start()
+    # Lê a fila com timeout para não travar se o processo filho morrer sem responder (OOM, sinal...)
+    resultado = None
+    while resultado is None:
+        try:
+            resultado = fila.get(timeout=INTERVALO_VERIFICACAO_ESTAGIO_S)
+        except queue.Empty:
+            if not processo.is_alive():
+                break
+    processo.join()
+    if resultado is None or processo.exitcode != 0:
+        return {'estagio': nome_estagio, 'escala': fator_escala,
+                'erro': f"processo do estágio terminou com código {processo.exitcode} sem resultado"}
+    return resultado
+
+# --- Orçamento de importação ---
+
+def medir_importacao(modulo):
+    """
+    Importa 'modulo' em um interpretador novo com -X importtime e retorna o tempo
+    cumulativo da importação (ms) e as dependências pesadas que ela carregou.
+    """
+    pasta_projeto = os.path.dirname(os.path.abspath(__file__))
+    processo = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', f'import {modulo}'],
+        cwd=pasta_projeto, capture_output=True, text=True
+    )
+    if processo.returncode != 0:
+        return {'modulo': modulo, 'erro': processo.stderr.strip().splitlines()[-1]}
+
+    tempo_ms = None
+    pacotes_importados = set()
+    for linha in processo.stderr.splitlines():
+        if not linha.startswith('import time:') or '|' not in linha:
+            continue
+        campos = linha.split('|')
+        nome = campos[2].strip()
+        pacotes_importados.add(nome.split('.')[0])
+        if campos[2].rstrip() == f' {modulo}':
+            tempo_ms = int(campos[1]) / 1000
+
+    return {
+        'modulo': modulo,
+        'tempo_ms': round(tempo_ms, 1) if tempo_ms is not None else None,
+        'orcamento_ms': ORCAMENTO_IMPORTACAO_MS.get(modulo),
+        'dependencias_pesadas': sorted(pacotes_importados.intersection(DEPENDENCIAS_PESADAS)),
+    }
+
+def verificar_orcamento_importacao():
+    """
+    Mede a importação de cada módulo com orçamento e retorna (medições, violações).
+    """
+    print("\n--- Orçamento de importação ---")
+    medicoes, violacoes = [], []
+    for modulo, orcamento in ORCAMENTO_IMPORTACAO_MS.items():
+        medicao = medir_importacao(modulo)
+        medicoes.append(medicao)
+        if 'erro' in medicao:
+            print(f"  {modulo:<22} ERRO: {medicao['erro']}")
+            violacoes.append(medicao)
+            continue
+        estourou = medicao['tempo_ms'] is None or medicao['tempo_ms'] > orcamento
+        marcador = 'ESTOURO' if estourou or medicao['dependencias_pesadas'] else 'ok'
+        extra = f"  pesadas: {', '.join(medicao['dependencias_pesadas'])}" if medicao['dependencias_pesadas'] else ''
+        print(f"  {modulo:<22} {medicao['tempo_ms'] or 0:>8.1f} ms (orçamento {orcamento} ms) {marcador}{extra}")
+        if marcador != 'ok':
+            violacoes.append(medicao)
+    return medicoes, violacoes
+
+# --- Execução e comparação com o baseline ---
+
+def executar_benchmark(escalas=ESCALAS_PADRAO, estagios=None):
+    """
+    Roda todos os estágios da pipeline sobre dados sintéticos em cada fator de escala
+    e retorna a lista de medições. Cada escala usa uma pasta temporária isolada.
+    """
+    estagios = estagios or list(ESTAGIOS)
+    medicoes = []
+
+    for fator_escala in escalas:
+        pasta_trabalho = tempfile.mkdtemp(prefix=f'benchmark_br2002_x{fator_escala}_')
+        os.makedirs(os.path.join(pasta_trabalho, PASTA_DADOS), exist_ok=True)
+        print(f"\n--- Escala x{fator_escala} (pasta: {pasta_trabalho}) ---")
+        try:
+            # Os estágios dependem dos arquivos dos anteriores, então sempre rodam em ordem.
+            for nome_estagio in ESTAGIOS:
+                resultado = medir_estagio(nome_estagio, pasta_trabalho, fator_escala)
+                if 'erro' in resultado:
+                    print(f"  {nome_estagio:<38} ERRO: {resultado['erro']}")
+                    medicoes.append(resultado)
+                    break
+                if nome_estagio in estagios:
+                    print(f"  {nome_estagio:<38} {resultado['tempo_s']:>8.3f} s  {resultado['linhas_por_s'] or 0:>12.1f} linhas/s  {resultado['pico_rss_mb']:>8.1f} MB")
+                    medicoes.append(resultado)
+        finally:
+            shutil.rmtree(pasta_trabalho, ignore_errors=True)
+    return medicoes
+
+def salvar_resultado_benchmark(medicoes, caminho=ARQUIVO_RESULTADO_BENCHMARK, importacao=None):
+    os.makedirs(os.path.dirname(caminho), exist_ok=True)
+    conteudo = {
+        'data_execucao': datetime.now().isoformat(timespec='seconds'),
+        'plataforma': platform.platform(),
+        'python': platform.python_version(),
+        'medicoes': medicoes,
+        'importacao': importacao or [],
+    }
+    with open(caminho, 'w', encoding='utf-8') as arquivo:
+        json.dump(conteudo, arquivo, indent=2, ensure_ascii=False)
+    print(f"\nResultados do benchmark salvos em: {caminho}")
+    return conteudo
+
+def comparar_com_baseline(medicoes, caminho_baseline=ARQUIVO_BASELINE_BENCHMARK, limiar=LIMIAR_REGRESSAO_PADRAO):
+    """
+    Compara as medições com o baseline salvo e retorna a lista de regressões
+    (métricas que pioraram mais que 'limiar', em fração).
+    """
+    if not os.path.exists(caminho_baseline):
+        print(f"\nNenhum baseline encontrado em '{caminho_baseline}'. Use --salvar-baseline para criar um.")
+        return []
+
+    with open(caminho_baseline, encoding='utf-8') as arquivo:
+        baseline = json.load(arquivo)
+    referencia = {(m['estagio'], m['escala']): m for m in baseline['medicoes'] if 'erro' not in m}
+
+    regressoes = []
+    print(f"\nComparação com o baseline de {baseline.get('data_execucao', '?')} (limiar: +{limiar:.0%}):")
+    for medicao in medicoes:
+        anterior = referencia.get((medicao['estagio'], medicao['escala']))
+        if anterior is None or 'erro' in medicao:
+            continue
+        for metrica in METRICAS_REGRESSAO:
+            valor_base, valor_atual = anterior.get(metrica), medicao.get(metrica)
+            if not valor_base or valor_atual is None:
+                continue
+            variacao = valor_atual / valor_base - 1
+            marcador = 'REGRESSÃO' if variacao > limiar else 'ok'
+            print(f"  {medicao['estagio']:<38} x{medicao['escala']:<3} {metrica:<12} {valor_base:>10.3f} -> {valor_atual:>10.3f} ({variacao:+.1%}) {marcador}")
+            if variacao > limiar:
+                regressoes.append({'estagio': medicao['estagio'], 'escala': medicao['escala'], 'metrica': metrica,
+                                   'baseline': valor_base, 'atual': valor_atual, 'variacao': round(variacao, 4)})
+    return regressoes
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Benchmark dos estágios da pipeline BR-2002 em várias escalas de dados.")
+    parser.add_argument('--escalas', type=int, nargs='+', default=ESCALAS_PADRAO, help="Fatores de escala (1 = uma temporada).")
+    parser.add_argument('--estagios', nargs='+', choices=list(ESTAGIOS), help="Reporta apenas estes estágios.")
+    parser.add_argument('--limiar', type=float, default=LIMIAR_REGRESSAO_PADRAO, help="Piora relativa tolerada antes de sinalizar regressão.")
+    parser.add_argument('--salvar-baseline', action='store_true', help="Salva esta execução como o novo baseline.")
+    parser.add_argument('--somente-importacao', action='store_true', help="Verifica apenas o orçamento de tempo de importação.")
+    args = parser.parse_args()
+
+    medicoes_importacao, violacoes_importacao = verificar_orcamento_importacao()
+    if violacoes_importacao:
+        print(f"\n{len(violacoes_importacao)} módulo(s) fora do orçamento de importação.")
+    if args.somente_importacao:
+        raise SystemExit(1 if violacoes_importacao else 0)
+
+    medicoes = executar_benchmark(args.escalas, args.estagios)
+    salvar_resultado_benchmark(medicoes, importacao=medicoes_importacao)
+
+    if args.salvar_baseline:
+        salvar_resultado_benchmark(medicoes, ARQUIVO_BASELINE_BENCHMARK, importacao=medicoes_importacao)
+        raise SystemExit(1 if violacoes_importacao else 0)
+
+    regressoes = comparar_com_baseline(medicoes, limiar=args.limiar)
+    if regressoes:
+        print(f"\n{len(regressoes)} regressão(ões) acima de {args.limiar:.0%} detectada(s).")
+    if regressoes or violacoes_importacao:
+        raise SystemExit(1)
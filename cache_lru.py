@@ -0,0 +1,80 @@
+import threading
+from collections import OrderedDict
+
+# --- Cache LRU limitado ---
+
+class CacheLRU:
+    """
+    Cache em memória com política LRU (o item usado há mais tempo sai primeiro),
+    limitado pelo número de entradas. Seguro para uso entre as threads do servidor
+    e com contadores de acertos e faltas para acompanhar a eficácia do cache.
+    """
+
+    def __init__(self, tamanho_maximo):
+        self.tamanho_maximo = tamanho_maximo
+        self._itens = OrderedDict()
+        self._trava = threading.Lock()
+        self.acertos = 0
+        self.faltas = 0
+
+    def __len__(self):
+        return len(self._itens)
+
+    def obter(self, chave):
+        """
+        Retorna (True, valor) se 'chave' estiver em cache, ou (False, None) caso contrário.
+        """
+        with self._trava:
+            if chave in self._itens:
+                self._itens.move_to_end(chave)
+                self.acertos += 1
+                return True, self._itens[chave]
+            self.faltas += 1
+            return False, None
+
+    def guardar(self, chave, valor):
+        with self._trava:
+            self._itens[chave] = valor
+            self._itens.move_to_end(chave)
+            while len(self._itens) > self.tamanho_maximo:
+                self._itens.popitem(last=False)
+
+    def obter_ou_calcular(self, chave, calcular):
+        """
+        Retorna o valor em cache para 'chave' ou chama 'calcular()', guarda e retorna o resultado.
+        O cálculo roda fora da trava, para não bloquear outras consultas.
+        """
+        encontrado, valor = self.obter(chave)
+        if encontrado:
+            return valor
+        valor = calcular()
+        self.guardar(chave, valor)
+        return valor
+
+    def limpar(self):
+        with self._trava:
+            self._itens.clear()
+
+    def chaves(self):
+        with self._trava:
+            return list(self._itens)
+
+    def descartar_se(self, predicado):
+        """
+        Remove as entradas cujas chaves satisfazem 'predicado' e retorna quantas foram removidas.
+        """
+        with self._trava:
+            chaves_removidas = [chave for chave in self._itens if predicado(chave)]
+            for chave in chaves_removidas:
+                del self._itens[chave]
+        return len(chaves_removidas)
+
+    def estatisticas(self):
+        total = self.acertos + self.faltas
+        return {
+            'entradas': len(self._itens),
+            'tamanho_maximo': self.tamanho_maximo,
+            'acertos': self.acertos,
+            'faltas': self.faltas,
+            'taxa_acerto': round(self.acertos / total, 4) if total else 0.0,
+        }
@@ -1,54 +1,89 @@
 import dash
-from dash import dcc, html, dash_table
-from dash.dependencies import Input, Output
+from dash import dcc, html, dash_table, Patch, no_update
+from dash.dependencies import Input, Output, State, MATCH
+from dash.exceptions import PreventUpdate
 import dash_bootstrap_components as dbc
 import pandas as pd
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, event, inspect, text
 import os
+import base64
+import hashlib
+import json
+import re
+import threading
+import time
+import unicodedata
+import uuid
+from datetime import datetime
+from html import escape
+from inspect import getsource
+from urllib.parse import quote
+import plotly
 import plotly.graph_objects as go
 import plotly.express as px
+from plotly.offline import get_plotlyjs
 import numpy as np
+import functools
+
+from servico_previsao import registrar_rota_previsao
+from cache_lru import CacheLRU
+from execucao_segundo_plano import ExecutorSegundoPlano, TarefaCancelada, informar_progresso
+from metricas_callbacks import atribuir_resposta, instrumentar_callback, medir_fase, registrar_cache, registrar_rota_metricas
+from armazenamento_particionado import NOME_TABELA, consultar_posicoes_jogadores, montar_consulta_particoes
+from load_to_sql import (criar_indice_consultas, NOME_TABELA_VERSOES, NOME_TABELA_SITUACAO_ATUAL,
+                         NOME_TABELA_CARGA_DIARIA, NOME_TABELA_ACWR_SEMANAL)
 
 # --- Funções de Formatação ---
 
+SUBSTITUICOES_NOMES = {
+    'Max': 'Máximo',
+    'Media': 'Média',
+    'Num': 'Número de',
+    'Distancia': 'Distância',
+    'Frequencia': 'Frequência',
+    'Pontuacao': 'Pontuação',
+    'Lesao': 'Lesão',
+    'Fadiga_Excessiva/Risco_Lesao': 'Fadiga Excessiva / Risco de Lesão',
+    'Lesao_Muscular_Leve': 'Lesão Muscular Leve',
+    'Entorse_Leve': 'Entorse Leve',
+    'Contusao': 'Contusão',
+    'Nenhuma_Lesao': 'Nenhuma Lesão',
+    'Tipo_Atividade': 'Tipo de Atividade',
+    'Carga_Aguda': 'Carga Aguda de Treino',
+    'Carga_Cronica': 'Carga Crônica de Treino',
+    'Relacao_Carga_Aguda_Cronica': 'Razão Carga Aguda/Crônica (RACR)',
+    'Relacao_Carga_Aguda_Cronica_EWMA': 'RACR (Médias Exponenciais)',
+    'Monotonia_Treino': 'Monotonia de Treino',
+    'Tensao_Treino': 'Tensão de Treino (Strain)',
+    'Dias_Desde_Ultima_Lesao': 'Dias Desde Última Lesão',
+    'Num_Lesoes_Anteriores': 'Número de Lesões Anteriores',
+    'Probabilidade_Lesao': 'Probabilidade de Lesão',
+    'Tipo_Lesao': 'Tipo de Lesão',
+    'Tempo_Ausencia': 'Tempo de Ausência',
+    'Tipo_Lesao_Formatado': 'Tipo de Lesão',
+    'Risco_Lesao_ML': 'Risco de Lesão (ML)'
+}
+
+# Substituições aplicadas a partes do nome (as entradas de nomes completos ficam de fora)
+
+SUBSTITUICOES_PARCIAIS = [
+    (parte_antiga.replace('_', ' '), parte_nova) for parte_antiga, parte_nova in SUBSTITUICOES_NOMES.items()
+    if parte_antiga not in ['Tipo_Lesao', 'Tempo_Ausencia', 'Tipo_Lesao_Formatado', 'Carga_Aguda', 'Carga_Cronica', 'Relacao_Carga_Aguda_Cronica',
+                           'Relacao_Carga_Aguda_Cronica_EWMA', 'Monotonia_Treino', 'Tensao_Treino', 'Risco_Lesao_ML']
+]
+
+@functools.lru_cache(maxsize=1024)
 def formatar_nome_coluna(nome_coluna):
     """
     Formata nomes de colunas para exibição amigável no dashboard.
     """
-    substituicoes = {
-        'Max': 'Máximo',
-        'Media': 'Média',
-        'Num': 'Número de',
-        'Distancia': 'Distância',
-        'Frequencia': 'Frequência',
-        'Pontuacao': 'Pontuação',
-        'Lesao': 'Lesão',
-        'Fadiga_Excessiva/Risco_Lesao': 'Fadiga Excessiva / Risco de Lesão',
-        'Lesao_Muscular_Leve': 'Lesão Muscular Leve',
-        'Entorse_Leve': 'Entorse Leve',
-        'Contusao': 'Contusão',
-        'Nenhuma_Lesao': 'Nenhuma Lesão',
-        'Tipo_Atividade': 'Tipo de Atividade',
-        'Carga_Aguda': 'Carga Aguda de Treino',
-        'Carga_Cronica': 'Carga Crônica de Treino',
-        'Relacao_Carga_Aguda_Cronica': 'Razão Carga Aguda/Crônica (RACR)',
-        'Dias_Desde_Ultima_Lesao': 'Dias Desde Última Lesão',
-        'Num_Lesoes_Anteriores': 'Número de Lesões Anteriores',
-        'Probabilidade_Lesao': 'Probabilidade de Lesão',
-        'Tipo_Lesao': 'Tipo de Lesão',
-        'Tempo_Ausencia': 'Tempo de Ausência',
-        'Tipo_Lesao_Formatado': 'Tipo de Lesão',
-        'Risco_Lesao_ML': 'Risco de Lesão (ML)'
-    }
-    
-    if nome_coluna in substituicoes:
-        return substituicoes[nome_coluna]
+    if nome_coluna in SUBSTITUICOES_NOMES:
+        return SUBSTITUICOES_NOMES[nome_coluna]
     
     nome_formatado = nome_coluna.replace('_', ' ')
     
-    for parte_antiga, parte_nova in substituicoes.items():
-        if parte_antiga not in ['Tipo_Lesao', 'Tempo_Ausencia', 'Tipo_Lesao_Formatado', 'Carga_Aguda', 'Carga_Cronica', 'Relacao_Carga_Aguda_Cronica', 'Risco_Lesao_ML']:
-            nome_formatado = nome_formatado.replace(parte_antiga.replace('_', ' '), parte_nova)
+    for parte_antiga, parte_nova in SUBSTITUICOES_PARCIAIS:
+        nome_formatado = nome_formatado.replace(parte_antiga, parte_nova)
             
     return nome_formatado
 
@@ -60,412 +95,1350 @@ def mapear_categoria_risco_para_texto(valor_categoria_risco):
         return 'N/A'
     return valor_categoria_risco
 
+def formatar_categorias(serie, funcao_formatacao):
+    """
+    Converte a coluna em categórica, aplicando a formatação uma única vez por rótulo distinto.
+    """
+    codigos, rotulos = pd.factorize(serie, use_na_sentinel=False)
+    codigos_formatados, rotulos_formatados = pd.factorize(pd.Index([funcao_formatacao(rotulo) for rotulo in rotulos], dtype=object))
+    return pd.Series(pd.Categorical.from_codes(codigos_formatados[codigos], categories=rotulos_formatados), index=serie.index)
+
 # --- Configurações do Banco de Dados ---
 
 PASTA_DADOS = 'data'
 ARQUIVO_DB = os.path.join(PASTA_DADOS, 'dados_performance.db')
-NOME_TABELA = 'performance_atletas'
-engine = create_engine(f'sqlite:///{ARQUIVO_DB}')
 
-# --- Carregar os Dados Iniciais ---
+# O histórico de cada jogador é lido apenas das partições (elenco, temporada e mês) das
+# suas temporadas mais recentes escolhidas no seletor de temporadas: por padrão, só a
+# TEMPORADAS_EXIBIDAS_DASHBOARD mais recente (None = todas)
+
+TEMPORADAS_EXIBIDAS_DASHBOARD = 1
+OPCOES_TEMPORADAS_DASHBOARD = {1: 'Temporada atual', 2: 'Últimas 2 temporadas', 3: 'Últimas 3 temporadas', 'todas': 'Todas as temporadas'}
+
+# No modo de produção, o banco é aberto somente para leitura e mapeado em memória:
+# as páginas do arquivo ficam no cache do sistema operacional, compartilhadas por
+# todos os workers, em vez de cada processo manter sua própria cópia dos dados.
+
+TAMANHO_MMAP_SQLITE = 512 * 1024 ** 2
+
+def criar_engine_dados(somente_leitura=False, caminho_db=ARQUIVO_DB):
+    if not somente_leitura:
+        return create_engine(f'sqlite:///{caminho_db}')
+
+    engine_leitura = create_engine(f'sqlite:///file:{os.path.abspath(caminho_db)}?mode=ro&uri=true')
+
+    @event.listens_for(engine_leitura, 'connect')
+    def configurar_conexao(conexao_dbapi, registro_conexao):
+        conexao_dbapi.execute(f'PRAGMA mmap_size={TAMANHO_MMAP_SQLITE}')
+        conexao_dbapi.execute('PRAGMA query_only=ON')
+
+    return engine_leitura
+
+engine = criar_engine_dados()
+banco_somente_leitura = False
+
+# Colunas usadas pelos callbacks e seus tipos compactos em memória: as consultas trazem
+# apenas estas colunas do jogador selecionado (textos como categóricos, métricas em
+# float32 e contagens no menor tipo inteiro adequado)
+
+TIPOS_COLUNAS_DASHBOARD = {
+    'Nome_Padronizado': 'category', 'Posicao': 'category', 'Data': 'datetime64[ns]', 'Tipo_Atividade': 'category',
+    'Distancia_Percorrida_(km)': 'float32', 'Num_Sprints': 'int16', 'VO2_Max_Estimado': 'float32', 'FC_Media_(bpm)': 'int16',
+    'Lesao_Ocorreu': 'bool', 'Tipo_Lesao': 'category', 'Tempo_Ausencia': 'int16',
+    'Pontuacao_Risco_Lesao': 'int8', 'Categoria_Risco_Lesao': 'category', 'Num_Lesoes_Anteriores': 'int16', 'Dias_Desde_Ultima_Lesao': 'float32',
+    'Relacao_Carga_Aguda_Cronica': 'float32', 'Relacao_Carga_Aguda_Cronica_EWMA': 'float32', 'Monotonia_Treino': 'float32', 'Tensao_Treino': 'float32',
+}
+COLUNAS_DASHBOARD = list(TIPOS_COLUNAS_DASHBOARD)
+
+# Dados de jogadores consultados recentemente e saídas dos callbacks já montadas
+
+TAMANHO_MAXIMO_CACHE_JOGADORES = 64
+TAMANHO_MAXIMO_CACHE_CALLBACKS = 256
+
+# Intervalo com que o observador em segundo plano verifica se o banco foi regravado
+
+INTERVALO_VERIFICACAO_DADOS_S = 2
+
+# A visão do elenco lê apenas os agregados pré-calculados pela carga (load_to_sql.py) e deve
+# ser montada dentro de ORCAMENTO_LATENCIA_ELENCO_MS; a tabela de risco é paginada, para que
+# o tamanho da resposta não cresça com o número de jogadores.
+
+ORCAMENTO_LATENCIA_ELENCO_MS = 250
+JOGADORES_POR_PAGINA_ELENCO = 20
+
+# Estado dos dados em uso pelo app (preenchido em inicializar_dados_dashboard). Ao recarregar,
+# o dicionário inteiro é substituído por um novo em uma única atribuição, de modo que os
+# callbacks sempre leem uma versão consistente (lista de jogadores, colunas e hashes).
+
+estado_dados = {'versao': None, 'nomes_jogadores': [], 'conjunto_jogadores': frozenset(), 'posicoes_jogadores': {},
+                'colunas_consulta': [], 'hashes_jogadores': {}}
+cache_jogadores = CacheLRU(TAMANHO_MAXIMO_CACHE_JOGADORES)
+cache_callbacks = CacheLRU(TAMANHO_MAXIMO_CACHE_CALLBACKS)
+
+# --- Acesso aos Dados ---
 
-def carregar_dados_do_sql():
+def obter_versao_dados(caminho_db=ARQUIVO_DB):
     """
-    Carrega os dados de performance do banco de dados SQLite.
+    Token da versão dos dados no banco: muda sempre que o arquivo SQLite é regravado.
     """
+    if not os.path.exists(caminho_db):
+        return None
+    status = os.stat(caminho_db)
+    return f"{status.st_mtime_ns}-{status.st_size}"
+
+def carregar_hashes_jogadores():
+    """
+    Hashes do conteúdo de cada jogador gravados pelo load_to_sql.py. Retorna um
+    dicionário vazio se a tabela de versões não existir (banco de uma versão anterior).
+    """
+    try:
+        with engine.connect() as conexao:
+            return dict(conexao.execute(text(f'SELECT "Nome_Padronizado", "Hash_Dados" FROM {NOME_TABELA_VERSOES}')).fetchall())
+    except Exception:
+        return {}
+
+def carregar_estado_dados():
+    """
+    Carrega do banco (do catálogo de partições) apenas a lista de jogadores, com a posição
+    mais recente de cada um, as colunas disponíveis na tabela e os hashes por jogador. O histórico de cada jogador é consultado sob demanda pelos callbacks.
+    Retorna None em caso de erro.
+    """
+    try:
+        versao = obter_versao_dados()
+        if not banco_somente_leitura:
+            criar_indice_consultas(engine)
+        colunas_tabela = {coluna['name'] for coluna in inspect(engine).get_columns(NOME_TABELA)}
+        with engine.connect() as conexao:
+            posicoes = consultar_posicoes_jogadores(conexao)
+        nomes = list(posicoes)
+        print(f"Lista de jogadores carregada do SQL com sucesso. Total de {len(nomes)} jogadores.")
+        return {
+            'versao': versao,
+            'nomes_jogadores': nomes,
+            'conjunto_jogadores': frozenset(nomes),
+            'posicoes_jogadores': posicoes,
+            'colunas_consulta': [coluna for coluna in COLUNAS_DASHBOARD if coluna in colunas_tabela],
+            'hashes_jogadores': carregar_hashes_jogadores(),
+        }
+    except Exception as e:
+        print(f"Erro ao carregar dados do banco de dados: {e}")
+        return None
+
+def obter_hash_jogador(nome_jogador, estado=None):
+    """
+    Versão dos dados do jogador: o hash da sua partição ou, sem a tabela de versões, a versão do banco inteiro.
+    """
+    estado = estado or estado_dados
+    return estado['hashes_jogadores'].get(nome_jogador, estado['versao'])
+
+def interpretar_temporadas(valor):
+    """
+    Converte o valor do seletor de temporadas (ou do parâmetro 'temporadas' da URL) no
+    filtro 'temporadas_recentes': o número de temporadas ou None para todas. Valores
+    ausentes ou inválidos usam TEMPORADAS_EXIBIDAS_DASHBOARD.
+    """
+    if valor == 'todas':
+        return None
     try:
-        df = pd.read_sql_table(NOME_TABELA, engine)
-        df['Data'] = pd.to_datetime(df['Data'])
-        
-        # Garante que 'Lesao_Ocorreu' é booleano (para filtros e lógica)
+        return int(valor) if int(valor) >= 1 else TEMPORADAS_EXIBIDAS_DASHBOARD
+    except (TypeError, ValueError):
+        return TEMPORADAS_EXIBIDAS_DASHBOARD
+
+def criar_parametro_temporadas(temporadas):
+    """
+    Parâmetro da URL do relatório para as temporadas exibidas (vazio no padrão).
+    """
+    if temporadas == TEMPORADAS_EXIBIDAS_DASHBOARD:
+        return ''
+    return f"?temporadas={'todas' if temporadas is None else temporadas}"
+
+def consultar_dados_jogadores(nomes_jogadores, colunas_consulta=None, temporadas=TEMPORADAS_EXIBIDAS_DASHBOARD):
+    """
+    Consulta em uma única instrução SQL parametrizada as linhas dos jogadores informados,
+    ordenadas por jogador e 'Data', lendo só as partições das 'temporadas' mais recentes
+    (None = todas) em que cada jogador aparece (cobertas pelo índice por jogador e data de cada partição). Cada
+    coluna é montada diretamente no tipo compacto de TIPOS_COLUNAS_DASHBOARD, os
+    rótulos de exibição são formatados uma única vez por categoria e a probabilidade
+    de lesão é calculada de uma vez para todos os jogadores.
+    """
+    colunas_consulta = colunas_consulta or estado_dados['colunas_consulta']
+    filtros = {'jogadores': list(nomes_jogadores), 'temporadas_recentes': temporadas}
+    with engine.connect() as conexao:
+        consulta, parametros = montar_consulta_particoes(conexao, colunas_consulta, filtros, ordem=['Nome_Padronizado', 'Data'])
+        linhas = conexao.execute(text(consulta), parametros).fetchall() if consulta else []
+
+    valores_por_coluna = list(zip(*linhas)) if linhas else [()] * len(colunas_consulta)
+    dados = {}
+    for coluna, valores in zip(colunas_consulta, valores_por_coluna):
+        tipo = TIPOS_COLUNAS_DASHBOARD[coluna]
+        if tipo == 'category':
+            dados[coluna] = pd.Categorical(valores)
+        elif tipo.startswith('datetime'):
+            dados[coluna] = pd.to_datetime(np.array(valores, dtype=object), format='ISO8601')
+        else:
+            dados[coluna] = np.array(valores, dtype=tipo)
+    df = pd.DataFrame(dados)
+
+    # Formatação das colunas para exibição
 
-        df['Lesao_Ocorreu'] = df['Lesao_Ocorreu'].astype(bool)
+    df['Tipo_Lesao_Formatado'] = formatar_categorias(df['Tipo_Lesao'], formatar_nome_coluna)
+    df['Categoria_Risco_Lesao_Formatado'] = formatar_categorias(df['Categoria_Risco_Lesao'], mapear_categoria_risco_para_texto)
+    df['Tipo_Atividade_Formatado'] = formatar_categorias(df['Tipo_Atividade'], formatar_nome_coluna)
+    df['Probabilidade_Lesao'] = calcular_probabilidade_lesao(df['Pontuacao_Risco_Lesao'])
+    return df
 
-        # Formatação das colunas para exibição
+def consultar_dados_jogador(nome_jogador, colunas_consulta=None, temporadas=TEMPORADAS_EXIBIDAS_DASHBOARD):
+    return consultar_dados_jogadores([nome_jogador], colunas_consulta, temporadas)
 
-        df['Tipo_Lesao_Formatado'] = df['Tipo_Lesao'].apply(formatar_nome_coluna) 
-        df['Categoria_Risco_Lesao_Formatado'] = df['Categoria_Risco_Lesao'].apply(mapear_categoria_risco_para_texto) 
-        df['Tipo_Atividade_Formatado'] = df['Tipo_Atividade'].apply(formatar_nome_coluna)
+def calcular_probabilidade_lesao(pontuacao_risco):
+    """
+    Probabilidade de lesão estimada a partir da pontuação de risco (vetorizado), limitada a [5%, 95%].
+    """
+    return np.clip(0.05 + pontuacao_risco * 0.1, 0.05, 0.95)
 
-        print(f"Dados carregados do SQL com sucesso. Total de {len(df)} registros.")
-        print(f"Colunas disponíveis em df_global: {df.columns.tolist()}")
-        print(f"Nomes de jogadores únicos no DB: {sorted(df['Nome_Padronizado'].unique().tolist())}")
-        return df
+def montar_entrada_jogador(dados):
+    """
+    Monta a entrada de um jogador usada pelos callbacks: os dados ordenados por
+    'Data', a linha mais recente, o histórico de lesões pronto para a tabela e a
+    data da última lesão. Retorna None quando o jogador não tem registros.
+    """
+    if dados.empty:
+        return None
+
+    lesoes = dados[dados['Lesao_Ocorreu']].iloc[::-1]
+    return {
+        'dados': dados,
+        'mais_recente': dados.iloc[-1],
+        'ultima_data_lesao': lesoes['Data'].iloc[0] if not lesoes.empty else pd.NaT,
+        'total_lesoes': len(lesoes),
+        'registros_lesoes': pd.DataFrame({
+            'Data': lesoes['Data'].dt.strftime('%Y-%m-%d'),
+            'Tipo_Lesao_Formatado': lesoes['Tipo_Lesao_Formatado'],
+            'Tempo_Ausencia': lesoes['Tempo_Ausencia'],
+        }).to_dict('records'),
+    }
+
+def obter_entrada_jogador(nome_jogador, estado=None, temporadas=TEMPORADAS_EXIBIDAS_DASHBOARD):
+    """
+    Retorna a entrada do jogador com as 'temporadas' mais recentes, consultando o banco
+    apenas se ela não estiver no cache para a versão atual dos dados desse jogador.
+    """
+    estado = estado or estado_dados
+    if nome_jogador not in estado['conjunto_jogadores']:
+        return None
+    return cache_jogadores.obter_ou_calcular(
+        (nome_jogador, obter_hash_jogador(nome_jogador, estado), temporadas),
+        lambda: montar_entrada_jogador(consultar_dados_jogador(nome_jogador, estado['colunas_consulta'], temporadas))
+    )
+
+def obter_entradas_jogadores(nomes_jogadores, estado=None, temporadas=TEMPORADAS_EXIBIDAS_DASHBOARD):
+    """
+    Retorna {nome: entrada} para vários jogadores (None para nomes desconhecidos). Os
+    jogadores que não estão no cache são consultados juntos, em uma única consulta.
+    """
+    estado = estado or estado_dados
+    entradas = {}
+    chaves_ausentes = {}
+    for nome in nomes_jogadores:
+        if nome not in estado['conjunto_jogadores']:
+            entradas[nome] = None
+            continue
+        chave = (nome, obter_hash_jogador(nome, estado), temporadas)
+        encontrado, entrada = cache_jogadores.obter(chave)
+        if encontrado:
+            entradas[nome] = entrada
+        else:
+            chaves_ausentes[nome] = chave
+
+    if chaves_ausentes:
+        dados = consultar_dados_jogadores(list(chaves_ausentes), estado['colunas_consulta'], temporadas)
+
+        # As linhas de cada jogador são contíguas (ordenadas por jogador e data)
+        for nome, posicoes in dados.groupby('Nome_Padronizado', observed=True, sort=False).indices.items():
+            entrada = montar_entrada_jogador(dados.iloc[posicoes[0]:posicoes[-1] + 1])
+            cache_jogadores.guardar(chaves_ausentes[nome], entrada)
+            entradas[nome] = entrada
+    return {nome: entradas.get(nome) for nome in nomes_jogadores}
+
+def carregar_agregados_elenco():
+    """
+    Lê as tabelas de agregados do elenco. Retorna None se o banco ainda não as tiver
+    (carregado por uma versão anterior da pipeline).
+    """
+    tabelas = [NOME_TABELA_SITUACAO_ATUAL, NOME_TABELA_CARGA_DIARIA, NOME_TABELA_ACWR_SEMANAL]
+    try:
+        if not set(tabelas) <= set(inspect(engine).get_table_names()):
+            return None
+        with engine.connect() as conexao:
+            agregados = {tabela: pd.read_sql(text(f'SELECT * FROM {tabela}'), conexao) for tabela in tabelas}
     except Exception as e:
-        print(f"Erro ao carregar dados do banco de dados: {e}")
-        return pd.DataFrame()
+        print(f"Erro ao carregar os agregados do elenco: {e}")
+        return None
+    agregados[NOME_TABELA_CARGA_DIARIA]['Data'] = pd.to_datetime(agregados[NOME_TABELA_CARGA_DIARIA]['Data'], format='ISO8601')
+    agregados[NOME_TABELA_ACWR_SEMANAL]['Semana'] = pd.to_datetime(agregados[NOME_TABELA_ACWR_SEMANAL]['Semana'], format='ISO8601')
+    return agregados
 
-# --- Encapsulando a Lógica do Dashboard em uma Função ---
+def inicializar_dados_dashboard():
+    """
+    Carrega a lista de jogadores do SQLite. Os dados em cache (consultas e saídas
+    de callback) pertencem à versão anterior do banco e são descartados.
+    """
+    global estado_dados
+    estado_dados = carregar_estado_dados() or {**estado_dados, 'versao': obter_versao_dados()}
+    cache_jogadores.limpar()
+    cache_callbacks.limpar()
+    return estado_dados['nomes_jogadores']
 
-def executar_app_dashboard():
-    global df_global
-    df_global = carregar_dados_do_sql()
-    nomes_jogadores = sorted(df_global['Nome_Padronizado'].unique()) if not df_global.empty else []
-    
-    app = dash.Dash(__name__, external_stylesheets=[dbc.themes.FLATLY])
+# --- Recarga dos Dados sem Reiniciar ---
 
-    app.layout = dbc.Container([
-        dbc.Row([
-            dbc.Col(
-                html.Div([
-                    html.Img(src=app.get_asset_url('cbf_2002_logo.png'),
-                             style={'height': '80px', 'marginRight': '15px', 'verticalAlign': 'middle'}),
-                    html.Span("Dashboard de Performance e Risco de Lesão", 
-                              className="h1 text-light text-center d-inline-block align-middle"),
-                    html.Span(" Seleção Brasileira 2002", 
-                              className="text-white text-center d-inline-block align-middle ms-3 fs-4")
-                ], className="d-flex align-items-center justify-content-center flex-wrap"),
-                width=12, className="text-center my-4" 
-            )
-        ], className="g-0 align-items-center justify-content-center"),
+def recarregar_dados_alterados():
+    """
+    Recarrega a lista de jogadores e os hashes por jogador e identifica os jogadores
+    cujos dados mudaram. Os que estavam em cache são consultados novamente antes da
+    troca, e o novo estado entra em uso de uma só vez; em seguida, apenas as entradas
+    dos jogadores alterados saem dos caches. Retorna o conjunto de jogadores alterados.
+    """
+    global estado_dados
+    estado_anterior = estado_dados
+    novo_estado = carregar_estado_dados()
+    if novo_estado is None:
+        return set()
 
-        dbc.Row(dbc.Col(
-            dbc.Card([
-                dbc.CardHeader(html.H4("Visualizar Dados do Jogador", className="card-title text-center text-primary")),
-                dbc.CardBody(dcc.Dropdown(
-                    id='dropdown-jogador',
-                    options=[{'label': nome, 'value': nome} for nome in nomes_jogadores],
-                    placeholder="Selecione um jogador para análise individual...",
-                    multi=False,
-                    clearable=True
-                ))
-            ], className="mb-4 shadow border-0"),
-            width=12, lg=6
-        ), justify="center"),
+    nomes = estado_anterior['conjunto_jogadores'] | novo_estado['conjunto_jogadores']
+    alterados = {nome for nome in nomes if obter_hash_jogador(nome, estado_anterior) != obter_hash_jogador(nome, novo_estado)}
 
-        dbc.Row(dbc.Col(html.Div(id='container-saida-jogador'), width=12)),
+    # Pré-carrega as novas partições dos jogadores que estavam em uso, antes da troca
+    for nome, temporadas in {(chave[0], chave[2]) for chave in cache_jogadores.chaves() if chave[0] in alterados}:
+        obter_entrada_jogador(nome, novo_estado, temporadas)
 
-        dbc.Row(dbc.Col(html.Hr(style={'borderColor': 'white', 'borderWidth': '3px'}), className="my-5")),
+    estado_dados = novo_estado
+    cache_jogadores.descartar_se(lambda chave: chave[0] in alterados and chave[1] != obter_hash_jogador(chave[0], novo_estado))
+    cache_callbacks.descartar_se(lambda chave: not alterados.isdisjoint(chave[1]) or (chave[0] == 'elenco' and bool(alterados)))
+    print(f"Dados do dashboard recarregados: {len(alterados)} de {len(nomes)} jogadores alterados.")
+    return alterados
 
-        dbc.Row(dbc.Col(html.H2("Comparação de Jogadores", className="text-light text-center mb-4"))),
+_parar_observador = threading.Event()
+_observador_dados = None
 
-        dbc.Row([
-            dbc.Col(
-                dbc.Card([
-                    dbc.CardHeader(html.H4("Selecione Jogador 1", className="card-title text-center text-primary")),
-                    dbc.CardBody(dcc.Dropdown(
-                        id='dropdown-jogador-1',
-                        options=[{'label': nome, 'value': nome} for nome in nomes_jogadores],
-                        placeholder="Selecione o primeiro jogador...",
-                        multi=False,
-                        clearable=True
-                    ))
-                ], className="mb-4 shadow border-0"),
-                width=12, lg=6
-            ),
-            dbc.Col(
-                dbc.Card([
-                    dbc.CardHeader(html.H4("Selecione Jogador 2", className="card-title text-center text-primary")),
-                    dbc.CardBody(dcc.Dropdown(
-                        id='dropdown-jogador-2',
-                        options=[{'label': nome, 'value': nome} for nome in nomes_jogadores],
-                        placeholder="Selecione o segundo jogador...",
-                        multi=False,
-                        clearable=True
-                    ))
-                ], className="mb-4 shadow border-0"),
-                width=12, lg=6
-            )
-        ], justify="center"),
+def observar_dados(intervalo_s=INTERVALO_VERIFICACAO_DADOS_S):
+    """
+    Laço do observador: recarrega os dados quando a versão do banco muda e permanece
+    estável por uma verificação (o banco pode estar sendo regravado pela pipeline).
+    """
+    versao_candidata = None
+    while not _parar_observador.wait(intervalo_s):
+        versao_atual = obter_versao_dados()
+        if versao_atual is None or versao_atual == estado_dados['versao']:
+            versao_candidata = None
+            continue
+        if versao_atual != versao_candidata:
+            versao_candidata = versao_atual
+            continue
+        try:
+            recarregar_dados_alterados()
+        except Exception as e:
+            print(f"Erro ao recarregar os dados do dashboard: {e}")
+        versao_candidata = None
+
+def iniciar_observador_dados(intervalo_s=INTERVALO_VERIFICACAO_DADOS_S):
+    """
+    Inicia (uma vez por processo) a thread que observa o banco em segundo plano.
+    """
+    global _observador_dados
+    if _observador_dados is not None and _observador_dados.is_alive():
+        return _observador_dados
+    _parar_observador.clear()
+    _observador_dados = threading.Thread(target=observar_dados, args=(intervalo_s,), name='observador-dados', daemon=True)
+    _observador_dados.start()
+    return _observador_dados
 
-        dbc.Row(dbc.Col(html.Div(id='container-saida-comparacao'), width=12))
+def parar_observador_dados():
+    _parar_observador.set()
 
-    ], fluid=True, style={'backgroundColor': '#0066CC', 'padding': '3rem'})
+# --- Componentes Compartilhados ---
 
-    # --- Callbacks ---
+# A comparação aceita até LIMITE_JOGADORES_COMPARACAO jogadores, um grupo de posição inteiro
+# no elenco da Copa; cada jogador recebe uma cor, usada em todos os seus traços.
+
+LIMITE_JOGADORES_COMPARACAO = 25
+CORES_COMPARACAO = ['#009739', '#FEDD00', '#002776', '#a8a8a8'] + px.colors.qualitative.Dark24
 
-    @app.callback(
-        Output('container-saida-jogador', 'children'),
-        Input('dropdown-jogador', 'value')
+MAPA_CORES_RISCO = {'Baixo': 'success', 'Moderado': 'warning', 'Alto': 'danger', 'Muito Alto': 'dark', 'N/A': 'secondary'}
+COLUNAS_TABELA_LESOES = ['Data', 'Tipo_Lesao_Formatado', 'Tempo_Ausencia']
+
+def formatar_texto_dias_sem_lesao(entrada_jogador):
+    """
+    Texto de dias sem lesão a partir da entrada do índice do jogador.
+    """
+    linha_dados_atual = entrada_jogador['mais_recente']
+    dias_desde_lesao = linha_dados_atual.get('Dias_Desde_Ultima_Lesao')
+    data_registro_atual = linha_dados_atual.get('Data')
+    ultima_data_lesao = entrada_jogador['ultima_data_lesao']
+
+    if pd.notna(dias_desde_lesao) and dias_desde_lesao is not None:
+        if pd.notna(ultima_data_lesao) and pd.notna(data_registro_atual):
+            return (
+                f"Última lesão em {ultima_data_lesao.strftime('%Y-%m-%d')}, "
+                f"{int(dias_desde_lesao)} dias sem lesionar "
+                f"(Data de referência: {data_registro_atual.strftime('%Y-%m-%d')})"
+            )
+        return f"{int(dias_desde_lesao)} dias sem lesionar (Data de referência: {data_registro_atual.strftime('%Y-%m-%d') if pd.notna(data_registro_atual) else 'N/A'})"
+    if entrada_jogador['total_lesoes'] == 0:
+        return "Nenhuma lesão registrada"
+    return "Informação de dias sem lesão indisponível"
+
+def criar_badge_risco(linha_dados):
+    texto_categoria_risco = linha_dados.get('Categoria_Risco_Lesao_Formatado', 'N/A')
+    cor_badge_risco = MAPA_CORES_RISCO.get(texto_categoria_risco, 'secondary')
+    return dbc.Badge(texto_categoria_risco, color=cor_badge_risco, className="me-1 fs-6")
+
+def criar_tabela_lesoes(entrada_jogador, id_tabela):
+    return dash_table.DataTable(
+        id=id_tabela,
+        columns=[{"id": col_id, "name": formatar_nome_coluna(col_id)} for col_id in COLUNAS_TABELA_LESOES],
+        data=entrada_jogador['registros_lesoes'],
+        style_table={'overflowX': 'auto'},
+        style_cell={'textAlign': 'left', 'padding': '10px'},
+        style_header={'backgroundColor': '#0066CC', 'fontWeight': 'bold', 'color': 'white'},
+        style_data_conditional=[{'if': {'row_index': 'odd'}, 'backgroundColor': 'rgb(248, 248, 248)'}]
     )
-    def atualizar_info_jogador(jogador_selecionado):
-        if jogador_selecionado is None:
-            return dbc.Alert("Selecione um jogador no menu acima para visualizar os detalhes de performance e risco de lesão.", color="info", className="text-center my-5")
 
-        jogador_df = df_global[df_global['Nome_Padronizado'] == jogador_selecionado].copy()
+def criar_cartao_resumo(nome_jogador, entrada_jogador):
+    dados_mais_recentes = entrada_jogador['mais_recente']
+    return dbc.Card([
+        dbc.CardHeader(html.H3(nome_jogador, className="card-title text-center text-primary")),
+        dbc.CardBody([
+            html.P(f"Posição: {dados_mais_recentes.get('Posicao', 'N/A')}", className="mb-0"),
+            html.P(['Risco: ', criar_badge_risco(dados_mais_recentes), f" ({dados_mais_recentes.get('Pontuacao_Risco_Lesao', 'N/A')})"], className="mb-0"),
+            html.P(formatar_texto_dias_sem_lesao(entrada_jogador), className="mb-0"),
+            html.P(f"Lesões Anteriores: {dados_mais_recentes.get('Num_Lesoes_Anteriores', 'N/A')}", className="mb-0")
+        ])
+    ], className="h-100 shadow border-0 bg-light")
 
-        if jogador_df.empty:
-            return dbc.Alert(f"Dados não encontrados para o jogador: {jogador_selecionado}", color="warning", className="text-center my-5")
+def criar_cartao_lesoes(nome_jogador, entrada_jogador, id_tabela):
+    return dbc.Card([
+        dbc.CardHeader(html.H4(f"Histórico de Lesões: {nome_jogador}", className="card-title text-center", style={'color': 'black'})),
+        dbc.CardBody(
+            criar_tabela_lesoes(entrada_jogador, id_tabela)
+            if entrada_jogador['registros_lesoes'] else html.P("Nenhuma lesão registrada.", className="text-center text-muted m-auto text-dark")
+        )
+    ], className="h-100 shadow border-0 bg-light")
 
-        dados_mais_recentes = jogador_df.sort_values(by='Data', ascending=False).iloc[0]
+# --- Séries Temporais dos Gráficos ---
 
-        # Mapeamento de cores de risco
+# Históricos com mais pontos que LIMITE_PONTOS_WEBGL são desenhados com traços WebGL (Scattergl).
+# Séries com mais de PONTOS_MAXIMOS_GRAFICO pontos são reduzidas no servidor com LTTB; ao
+# aproximar o eixo de datas, o intervalo visível é reenviado com mais detalhe.
 
-        mapa_cores_risco = {'Baixo': 'success', 'Moderado': 'warning', 'Alto': 'danger', 'Muito Alto': 'dark', 'N/A': 'secondary'} 
+LIMITE_PONTOS_WEBGL = 500
+PONTOS_MAXIMOS_GRAFICO = 1000
+TIPO_GRAFICO_SERIE = 'grafico-serie'
 
-        texto_categoria_risco = dados_mais_recentes.get('Categoria_Risco_Lesao_Formatado', 'N/A') 
-        cor_badge_risco = mapa_cores_risco.get(texto_categoria_risco, 'secondary')
+def selecionar_pontos_lttb(x, y, n_pontos):
+    """
+    Largest-Triangle-Three-Buckets: escolhe 'n_pontos' índices que preservam a forma
+    da série (picos e vales), mantendo o primeiro e o último ponto.
+    """
+    n = len(y)
+    if n <= n_pontos or n_pontos < 3:
+        return np.arange(n)
+
+    x = np.asarray(x, dtype=np.float64)
+    y = np.asarray(y, dtype=np.float64)
+    limites = np.linspace(1, n - 1, n_pontos - 1).astype(np.int64)
+    indices = np.empty(n_pontos, dtype=np.int64)
+    indices[0], indices[-1] = 0, n - 1
+
+    anterior = 0
+    for i in range(n_pontos - 2):
+        inicio, fim = limites[i], limites[i + 1]
+        proximo_fim = limites[i + 2] if i + 2 < len(limites) else n
+        media_x = x[fim:proximo_fim].mean()
+        media_y = y[fim:proximo_fim].mean()
+
+        # Área do triângulo (ponto escolhido anterior, candidato, média do próximo balde)
+        areas = np.abs((x[anterior] - media_x) * (y[inicio:fim] - y[anterior])
+                       - (x[anterior] - x[inicio:fim]) * (media_y - y[anterior]))
+        anterior = inicio + int(np.argmax(areas))
+        indices[i + 1] = anterior
+    return indices
+
+def reduzir_serie(dados, coluna, intervalo=None):
+    """
+    Linhas de 'dados' (ordenados por 'Data') a exibir para 'coluna': restritas ao
+    intervalo de datas visível, quando informado, e reduzidas com LTTB se ainda
+    passarem de PONTOS_MAXIMOS_GRAFICO.
+    """
+    if intervalo is not None:
+        inicio, fim = dados['Data'].searchsorted(intervalo[0], side='left'), dados['Data'].searchsorted(intervalo[1], side='right')
+        dados = dados.iloc[max(inicio - 1, 0):fim + 1]
+    if len(dados) <= PONTOS_MAXIMOS_GRAFICO:
+        return dados
 
-        dias_desde_lesao = dados_mais_recentes.get('Dias_Desde_Ultima_Lesao')
-        data_registro_atual = dados_mais_recentes.get('Data') 
+    dados = dados.dropna(subset=[coluna])
+    indices = selecionar_pontos_lttb(dados['Data'].to_numpy(dtype='datetime64[ns]').astype(np.int64), dados[coluna].to_numpy(dtype=np.float64), PONTOS_MAXIMOS_GRAFICO)
+    return dados.iloc[indices]
 
-        ultima_data_lesao_jogador = jogador_df[jogador_df['Lesao_Ocorreu'] == True]['Data'].max()
+def usar_webgl(dados):
+    return len(dados) > LIMITE_PONTOS_WEBGL
 
-        texto_dias = "N/A"
-        if pd.notna(dias_desde_lesao) and dias_desde_lesao is not None:
-            if pd.notna(ultima_data_lesao_jogador) and pd.notna(data_registro_atual):
-                texto_dias = (
-                    f"Última lesão em {ultima_data_lesao_jogador.strftime('%Y-%m-%d')}, "
-                    f"{int(dias_desde_lesao)} dias sem lesionar "
-                    f"(Data de referência: {data_registro_atual.strftime('%Y-%m-%d')})"
-                )
-            else:
-                texto_dias = f"{int(dias_desde_lesao)} dias sem lesionar (Data de referência: {data_registro_atual.strftime('%Y-%m-%d') if pd.notna(data_registro_atual) else 'N/A'})"
-        elif jogador_df['Lesao_Ocorreu'].sum() == 0:
-            texto_dias = "Nenhuma lesão registrada"
-        else:
-            texto_dias = "Informação de dias sem lesão indisponível"
-
-        cartao_resumo = dbc.Card([
-            dbc.CardHeader(html.H2(f"Perfil Detalhado: {jogador_selecionado}", className="card-title text-center text-primary")),
-            dbc.CardBody([
-                dbc.Row([
-                    dbc.Col(html.P(f"Posição: {dados_mais_recentes.get('Posicao', 'N/A')}", className="lead mb-0 text-dark")),
-                    dbc.Col(html.P([f"Pontuação de Risco de Lesão: {dados_mais_recentes.get('Pontuacao_Risco_Lesao', 'N/A')} (", dbc.Badge(texto_categoria_risco, color=cor_badge_risco, className="me-1 fs-6"), ")"], className="lead mb-0 text-dark")),
-                ], className="mb-3"),
-                dbc.Row([
-                    dbc.Col(html.P(texto_dias, className="lead mb-0 text-dark")),
-                    dbc.Col(html.P(f"Número de Lesões Anteriores: {dados_mais_recentes.get('Num_Lesoes_Anteriores', 'N/A')}", className="lead mb-0 text-dark"))
-                ])
-            ])
-        ], className="mb-4 shadow p-2 border-0 bg-light")
-
-        # Gráfico de Tendência de Risco de Lesão
-
-        df_tendencia_risco = jogador_df.dropna(subset=['Pontuacao_Risco_Lesao']).sort_values(by='Data')
-        if not df_tendencia_risco.empty:
-            fig_risco = px.line(df_tendencia_risco, x='Data', y='Pontuacao_Risco_Lesao', title=f'Pontuação de Risco de Lesão', labels={'Pontuacao_Risco_Lesao': 'Pontuação de Risco'}, template='plotly_white', color_discrete_sequence=['red'])
-            fig_risco.update_traces(mode='lines+markers')
-            fig_risco.update_layout(hovermode="x unified")
-        else:
-            fig_risco = go.Figure().update_layout(title="Dados de Pontuação de Risco Insuficientes")
-
-        # Calcula a Probabilidade de Lesão se não existir (baseado na pontuação de risco)
-
-        if 'Probabilidade_Lesao' not in jogador_df.columns:
-            jogador_df['Probabilidade_Lesao'] = jogador_df['Pontuacao_Risco_Lesao'].apply(lambda x: min(0.95, max(0.05, 0.05 + x * 0.1)) if pd.notna(x) else np.nan)
-        
-        df_tendencia_prob_lesao = jogador_df.dropna(subset=['Probabilidade_Lesao']).sort_values(by='Data')
-        if not df_tendencia_prob_lesao.empty:
-            fig_prob_lesao = px.line(df_tendencia_prob_lesao, x='Data', y='Probabilidade_Lesao', title=f'Probabilidade de Lesão', labels={'Probabilidade_Lesao': 'Probabilidade de Lesão (%)'}, line_shape='spline', template='plotly_white', color_discrete_sequence=['orange'])
-            fig_prob_lesao.update_traces(mode='lines+markers', hovertemplate='Data: %{x}<br>Probabilidade: %{y:.2%}')
-            fig_prob_lesao.update_layout(hovermode="x unified", yaxis_tickformat=".0%")
-            fig_prob_lesao.add_hline(y=0.5, line_dash="dot", line_color="red", annotation_text="Limiar de Alerta (50%)", annotation_position="bottom right")
-        else:
-            fig_prob_lesao = go.Figure().update_layout(title="Dados de Probabilidade de Lesão Insuficientes")
-
-        # Gráficos de Métricas de Performance
-
-        metricas_performance = ['Distancia_Percorrida_(km)', 'Num_Sprints', 'VO2_Max_Estimado', 'FC_Media_(bpm)']
-        cores_brasil = ['#009739', '#FEDD00', '#002776', '#a8a8a8'] 
-        componentes_graficos_performance = []
-
-        for i, metric in enumerate(metricas_performance):
-            if metric in jogador_df.columns and not jogador_df[metric].dropna().empty:
-                nome_metrica_formatado = formatar_nome_coluna(metric)
-                fig_perf = px.line(jogador_df.sort_values(by='Data'), x='Data', y=metric, title=f'{nome_metrica_formatado}', labels={'Data': 'Data', metric: nome_metrica_formatado}, template='plotly_white', color_discrete_sequence=[cores_brasil[i % len(cores_brasil)]])
-                fig_perf.update_traces(mode='lines+markers')
-                fig_perf.update_layout(hovermode="x unified")
-                componentes_graficos_performance.append(dbc.Col(dbc.Card(dcc.Graph(figure=fig_perf), className="h-100"), md=6, className="mb-4 shadow"))
-            else:
-                componentes_graficos_performance.append(dbc.Col(dbc.Card(dbc.CardBody(html.P(f"Dados insuficientes para {formatar_nome_coluna(metric)}.", className="text-center text-muted m-auto"))), md=6, className="mb-4 shadow d-flex align-items-center justify-content-center"))
-
-        # Histórico de Lesões (Tabela)
-
-        df_historico_lesoes = jogador_df[jogador_df['Lesao_Ocorreu'] == True].sort_values(by='Data', ascending=False).copy()
-        if 'Data' in df_historico_lesoes.columns:
-            df_historico_lesoes['Data'] = df_historico_lesoes['Data'].dt.strftime('%Y-%m-%d')
-
-        if not df_historico_lesoes.empty:
-            config_colunas = []
-            for col_id in ['Data', 'Tipo_Lesao_Formatado', 'Tempo_Ausencia']:
-                if col_id in df_historico_lesoes.columns:
-                    def_col = {"id": col_id, "name": formatar_nome_coluna(col_id)}
-                    config_colunas.append(def_col)
-
-            componente_tabela_lesao = dbc.Card([
-                dbc.CardHeader(html.H3("Histórico de Lesões", className="card-title text-center", style={'color': 'black'})), 
-                dbc.CardBody(dash_table.DataTable(
-                    id='tabela-lesao-jogador',
-                    columns=config_colunas,
-                    data=df_historico_lesoes[['Data', 'Tipo_Lesao_Formatado', 'Tempo_Ausencia']].to_dict('records'),
-                    style_table={'overflowX': 'auto'},
-                    style_cell={'textAlign': 'left', 'padding': '10px'},
-                    style_header={'backgroundColor': '#0066CC', 'fontWeight': 'bold', 'color': 'white'},
-                    style_data_conditional=[{'if': {'row_index': 'odd'}, 'backgroundColor': 'rgb(248, 248, 248)'}]
-                ))
-            ], className="mb-4 shadow border-0 bg-light")
+def criar_id_grafico(visao, series, temporadas=TEMPORADAS_EXIBIDAS_DASHBOARD):
+    """
+    ID do gráfico com o par (jogador, coluna) de cada traço e as temporadas exibidas,
+    usados para refinar os dados no zoom.
+    """
+    return {'type': TIPO_GRAFICO_SERIE, 'visao': visao, 'series': json.dumps(series, ensure_ascii=False), 'temporadas': json.dumps(temporadas)}
+
+def criar_trace_serie(dados, coluna, webgl, **kwargs):
+    """
+    Traço de linha com marcadores para a série reduzida, em WebGL para históricos longos.
+    """
+    classe_trace = go.Scattergl if webgl else go.Scatter
+    return classe_trace(x=dados['Data'], y=dados[coluna], mode='lines+markers', **kwargs)
+
+def interpretar_intervalo_zoom(relayout):
+    """
+    Extrai o intervalo de datas do 'relayoutData' de um gráfico. Retorna None ao restaurar
+    a escala automática e lança PreventUpdate para eventos que não mudam o eixo de datas.
+    """
+    if not relayout:
+        raise PreventUpdate
+    if 'xaxis.range[0]' in relayout and 'xaxis.range[1]' in relayout:
+        return pd.Timestamp(relayout['xaxis.range[0]']), pd.Timestamp(relayout['xaxis.range[1]'])
+    if 'xaxis.range' in relayout:
+        return pd.Timestamp(relayout['xaxis.range'][0]), pd.Timestamp(relayout['xaxis.range'][1])
+    if relayout.get('xaxis.autorange'):
+        return None
+    raise PreventUpdate
+
+# --- Figuras da Visão por Jogador ---
+
+METRICAS_PERFORMANCE_JOGADOR = ['Distancia_Percorrida_(km)', 'Num_Sprints', 'VO2_Max_Estimado', 'FC_Media_(bpm)']
+CORES_BRASIL = ['#009739', '#FEDD00', '#002776', '#a8a8a8']
+
+def criar_figuras_jogador(jogador_df):
+    """
+    Figuras da visão por jogador, usadas também nos relatórios estáticos: 'risco',
+    'probabilidade', 'performance' ({métrica: figura, ou None sem dados}) e 'carga'
+    ({'racr', 'tensao'}, vazio em bancos gerados antes das métricas de carga).
+    """
+
+    # Os dados do índice já estão ordenados por 'Data'. Históricos longos usam WebGL e
+    # são reduzidos com LTTB (mais detalhe ao aproximar)
+
+    webgl = usar_webgl(jogador_df)
+    modo_renderizacao = 'webgl' if webgl else 'svg'
+
+    # Tendência de Risco de Lesão
+
+    df_tendencia_risco = jogador_df.dropna(subset=['Pontuacao_Risco_Lesao'])
+    if not df_tendencia_risco.empty:
+        fig_risco = px.line(reduzir_serie(df_tendencia_risco, 'Pontuacao_Risco_Lesao'), x='Data', y='Pontuacao_Risco_Lesao', title=f'Pontuação de Risco de Lesão', labels={'Pontuacao_Risco_Lesao': 'Pontuação de Risco'}, template='plotly_white', color_discrete_sequence=['red'], render_mode=modo_renderizacao)
+        fig_risco.update_traces(mode='lines+markers')
+        fig_risco.update_layout(hovermode="x unified")
+    else:
+        fig_risco = go.Figure().update_layout(title="Dados de Pontuação de Risco Insuficientes")
+
+    # Probabilidade de Lesão (pré-calculada no índice a partir da pontuação de risco)
+
+    df_tendencia_prob_lesao = jogador_df.dropna(subset=['Probabilidade_Lesao'])
+    if not df_tendencia_prob_lesao.empty:
+        # Traços WebGL não suportam linhas suavizadas (spline)
+        fig_prob_lesao = px.line(reduzir_serie(df_tendencia_prob_lesao, 'Probabilidade_Lesao'), x='Data', y='Probabilidade_Lesao', title=f'Probabilidade de Lesão', labels={'Probabilidade_Lesao': 'Probabilidade de Lesão (%)'}, line_shape='linear' if webgl else 'spline', template='plotly_white', color_discrete_sequence=['orange'], render_mode=modo_renderizacao)
+        fig_prob_lesao.update_traces(mode='lines+markers', hovertemplate='Data: %{x}<br>Probabilidade: %{y:.2%}')
+        fig_prob_lesao.update_layout(hovermode="x unified", yaxis_tickformat=".0%")
+        fig_prob_lesao.add_hline(y=0.5, line_dash="dot", line_color="red", annotation_text="Limiar de Alerta (50%)", annotation_position="bottom right")
+    else:
+        fig_prob_lesao = go.Figure().update_layout(title="Dados de Probabilidade de Lesão Insuficientes")
+
+    # Métricas de Performance
+
+    figuras_performance = {}
+    for i, metric in enumerate(METRICAS_PERFORMANCE_JOGADOR):
+        informar_progresso(0.5 + 0.1 * i, "Montando os gráficos de performance...")
+        if metric in jogador_df.columns and not jogador_df[metric].dropna().empty:
+            nome_metrica_formatado = formatar_nome_coluna(metric)
+            fig_perf = px.line(reduzir_serie(jogador_df, metric), x='Data', y=metric, title=f'{nome_metrica_formatado}', labels={'Data': 'Data', metric: nome_metrica_formatado}, template='plotly_white', color_discrete_sequence=[CORES_BRASIL[i % len(CORES_BRASIL)]], render_mode=modo_renderizacao)
+            fig_perf.update_traces(mode='lines+markers')
+            fig_perf.update_layout(hovermode="x unified")
+            figuras_performance[metric] = fig_perf
         else:
-            componente_tabela_lesao = dbc.Card([
-                dbc.CardHeader(html.H3("Histórico de Lesões", className="card-title text-center", style={'color': 'black'})),
-                dbc.CardBody(html.P("Nenhuma lesão registrada para este jogador.", className="text-center text-muted m-auto text-dark"))
-            ], className="mb-4 shadow border-0 bg-light d-flex align-items-center justify-content-center")
+            figuras_performance[metric] = None
 
-        return html.Div([
-            cartao_resumo,
-            dbc.Row([
-                dbc.Col(dbc.Card(dcc.Graph(figure=fig_risco), className="h-100"), md=6, className="mb-4 shadow"),
-                dbc.Col(dbc.Card(dcc.Graph(figure=fig_prob_lesao), className="h-100"), md=6, className="mb-4 shadow"),
-            ], className="g-4"),
-            html.H3("Métricas de Performance", className="text-center my-4 text-light"),
-            dbc.Row(componentes_graficos_performance, className="g-4"),
-            componente_tabela_lesao
-        ], className="mt-4")
-
-    @app.callback(
-        Output('container-saida-comparacao', 'children'),
-        [Input('dropdown-jogador-1', 'value'),
-         Input('dropdown-jogador-2', 'value')]
-    )
-    def atualizar_info_comparacao(jogador_selecionado_1, jogador_selecionado_2):
-        if not jogador_selecionado_1 and not jogador_selecionado_2:
-            return dbc.Alert("Selecione dois jogadores para comparar suas performances e riscos de lesão.", color="info", className="text-center my-5")
-        if not jogador_selecionado_1 or not jogador_selecionado_2:
-            return dbc.Alert("Selecione ambos os jogadores para iniciar a comparação.", color="warning", className="text-center my-5")
-        if jogador_selecionado_1 == jogador_selecionado_2:
-            return dbc.Alert("Por favor, selecione dois jogadores diferentes para comparação.", color="danger", className="text-center my-5")
-
-        jogador_df_1 = df_global[df_global['Nome_Padronizado'] == jogador_selecionado_1].copy()
-        jogador_df_2 = df_global[df_global['Nome_Padronizado'] == jogador_selecionado_2].copy()
-
-        if jogador_df_1.empty or jogador_df_2.empty:
-            return dbc.Alert(f"Dados insuficientes para um ou ambos os jogadores: {jogador_selecionado_1}, {jogador_selecionado_2}", color="warning", className="text-center my-5")
-
-        mapa_cores_risco = {'Baixo': 'success', 'Moderado': 'warning', 'Alto': 'danger', 'Muito Alto': 'dark', 'N/A': 'secondary'}
-
-        def criar_badge_risco(linha_dados):
-            texto_categoria_risco = linha_dados.get('Categoria_Risco_Lesao_Formatado', 'N/A')
-            cor_badge_risco = mapa_cores_risco.get(texto_categoria_risco, 'secondary')
-            return dbc.Badge(texto_categoria_risco, color=cor_badge_risco, className="me-1 fs-6")
-
-        def formatar_dias_texto_comparacao(df_jogador, linha_dados_atual):
-            dias_desde_lesao = linha_dados_atual.get('Dias_Desde_Ultima_Lesao')
-            data_registro_atual = linha_dados_atual.get('Data')
-            ultima_data_lesao = df_jogador[df_jogador['Lesao_Ocorreu'] == True]['Data'].max()
-
-            if pd.notna(dias_desde_lesao) and dias_desde_lesao is not None:
-                if pd.notna(ultima_data_lesao) and pd.notna(data_registro_atual):
-                    return (
-                        f"Última lesão em {ultima_data_lesao.strftime('%Y-%m-%d')}, "
-                        f"{int(dias_desde_lesao)} dias sem lesionar "
-                        f"(Data de referência: {data_registro_atual.strftime('%Y-%m-%d')})"
-                    )
-                else:
-                    return f"{int(dias_desde_lesao)} dias sem lesionar (Data de referência: {data_registro_atual.strftime('%Y-%m-%d') if pd.notna(data_registro_atual) else 'N/A'})"
-            elif df_jogador['Lesao_Ocorreu'].sum() == 0:
-                return "Nenhuma lesão registrada"
-            else:
-                return "Informação de dias sem lesão indisponível"
-
-        dados_mais_recentes_1 = jogador_df_1.sort_values(by='Data', ascending=False).iloc[0]
-        dados_mais_recentes_2 = jogador_df_2.sort_values(by='Data', ascending=False).iloc[0]
-
-        texto_dias_1 = formatar_dias_texto_comparacao(jogador_df_1, dados_mais_recentes_1)
-        texto_dias_2 = formatar_dias_texto_comparacao(jogador_df_2, dados_mais_recentes_2)
-
-        cartoes_resumo_comparacao = dbc.Row([
-            dbc.Col(dbc.Card([
-                dbc.CardHeader(html.H3(jogador_selecionado_1, className="card-title text-center text-primary")),
-                dbc.CardBody([
-                    html.P(f"Posição: {dados_mais_recentes_1.get('Posicao', 'N/A')}", className="mb-0"),
-                    html.P(['Risco: ', criar_badge_risco(dados_mais_recentes_1), f" ({dados_mais_recentes_1.get('Pontuacao_Risco_Lesao', 'N/A')})"], className="mb-0"),
-                    html.P(texto_dias_1, className="mb-0"),
-                    html.P(f"Lesões Anteriores: {dados_mais_recentes_1.get('Num_Lesoes_Anteriores', 'N/A')}", className="mb-0")
-                ])
-            ], className="h-100 shadow border-0 bg-light"), md=6),
-            dbc.Col(dbc.Card([
-                dbc.CardHeader(html.H3(jogador_selecionado_2, className="card-title text-center text-primary")),
-                dbc.CardBody([
-                    html.P(f"Posição: {dados_mais_recentes_2.get('Posicao', 'N/A')}", className="mb-0"),
-                    html.P(['Risco: ', criar_badge_risco(dados_mais_recentes_2), f" ({dados_mais_recentes_2.get('Pontuacao_Risco_Lesao', 'N/A')})"], className="mb-0"),
-                    html.P(texto_dias_2, className="mb-0"),
-                    html.P(f"Lesões Anteriores: {dados_mais_recentes_2.get('Num_Lesoes_Anteriores', 'N/A')}", className="mb-0")
-                ])
-            ], className="h-100 shadow border-0 bg-light"), md=6)
-        ], className="g-4 mb-4")
-
-        # Gráfico de comparação de risco e probabilidade
-
-        fig_comparacao_risco = go.Figure()
-
-        # Calcula a Probabilidade de Lesão se não existir (baseado na pontuação de risco)
-
-        if 'Probabilidade_Lesao' not in jogador_df_1.columns:
-            jogador_df_1['Probabilidade_Lesao'] = jogador_df_1['Pontuacao_Risco_Lesao'].apply(lambda x: min(0.95, max(0.05, 0.05 + x * 0.1)) if pd.notna(x) else np.nan)
-        if 'Probabilidade_Lesao' not in jogador_df_2.columns:
-            jogador_df_2['Probabilidade_Lesao'] = jogador_df_2['Pontuacao_Risco_Lesao'].apply(lambda x: min(0.95, max(0.05, 0.05 + x * 0.1)) if pd.notna(x) else np.nan)
-
-        fig_comparacao_risco.add_trace(go.Scatter(x=jogador_df_1['Data'], y=jogador_df_1['Pontuacao_Risco_Lesao'], mode='lines+markers', name=jogador_selecionado_1 + ' (Risco)', line=dict(color='red')))
-        fig_comparacao_risco.add_trace(go.Scatter(x=jogador_df_2['Data'], y=jogador_df_2['Pontuacao_Risco_Lesao'], mode='lines+markers', name=jogador_selecionado_2 + ' (Risco)', line=dict(color='blue')))
-        fig_comparacao_risco.add_trace(go.Scatter(x=jogador_df_1['Data'], y=jogador_df_1['Probabilidade_Lesao'], mode='lines+markers', name=jogador_selecionado_1 + ' (Probabilidade)', line=dict(color='salmon', dash='dot')))
-        fig_comparacao_risco.add_trace(go.Scatter(x=jogador_df_2['Data'], y=jogador_df_2['Probabilidade_Lesao'], mode='lines+markers', name=jogador_selecionado_2 + ' (Probabilidade)', line=dict(color='lightblue', dash='dot')))
-        
-        fig_comparacao_risco.update_layout(title='Comparação de Risco e Probabilidade de Lesão', xaxis_title='Data', yaxis_title='Valor', template='plotly_white', hovermode="x unified", legend=dict(orientation="h", yanchor="bottom", y=1.02, xanchor="right", x=1))
-
-        # Gráfico de comparação de distância percorrida
-
-        fig_comparacao_distancia = go.Figure()
-        fig_comparacao_distancia.add_trace(go.Scatter(x=jogador_df_1['Data'], y=jogador_df_1['Distancia_Percorrida_(km)'], mode='lines+markers', name=jogador_selecionado_1, line=dict(color='#009739')))
-        fig_comparacao_distancia.add_trace(go.Scatter(x=jogador_df_2['Data'], y=jogador_df_2['Distancia_Percorrida_(km)'], mode='lines+markers', name=jogador_selecionado_2, line=dict(color='#FEDD00')))
-        fig_comparacao_distancia.update_layout(title='Comparação de Distância Percorrida (km)', xaxis_title='Data', yaxis_title='Distância Percorrida (km)', template='plotly_white', hovermode="x unified", legend=dict(orientation="h", yanchor="bottom", y=1.02, xanchor="right", x=1))
-
-        # Tabelas de histórico de lesões comparativas
-
-        df_historico_lesoes_1 = jogador_df_1[jogador_df_1['Lesao_Ocorreu'] == True].sort_values(by='Data', ascending=False).copy()
-        if 'Data' in df_historico_lesoes_1.columns:
-            df_historico_lesoes_1['Data'] = df_historico_lesoes_1['Data'].dt.strftime('%Y-%m-%d')
-        config_colunas_1 = [{"id": col_id, "name": formatar_nome_coluna(col_id)} for col_id in ['Data', 'Tipo_Lesao_Formatado', 'Tempo_Ausencia'] if col_id in df_historico_lesoes_1.columns]
-        
-        tabela_lesao_1 = dbc.Card([
-            dbc.CardHeader(html.H4(f"Histórico de Lesões: {jogador_selecionado_1}", className="card-title text-center", style={'color': 'black'})),
-            dbc.CardBody(
-                dash_table.DataTable(
-                    id='tabela-lesao-jogador-1',
-                    columns=config_colunas_1,
-                    data=df_historico_lesoes_1[['Data', 'Tipo_Lesao_Formatado', 'Tempo_Ausencia']].to_dict('records'),
-                    style_table={'overflowX': 'auto'},
-                    style_cell={'textAlign': 'left', 'padding': '10px'},
-                    style_header={'backgroundColor': '#0066CC', 'fontWeight': 'bold', 'color': 'white'},
-                    style_data_conditional=[{'if': {'row_index': 'odd'}, 'backgroundColor': 'rgb(248, 248, 248)'}]
-                ) if not df_historico_lesoes_1.empty else html.P("Nenhuma lesão registrada.", className="text-center text-muted m-auto text-dark")
-            )
-        ], className="h-100 shadow border-0 bg-light")
-
-        df_historico_lesoes_2 = jogador_df_2[jogador_df_2['Lesao_Ocorreu'] == True].sort_values(by='Data', ascending=False).copy()
-        if 'Data' in df_historico_lesoes_2.columns:
-            df_historico_lesoes_2['Data'] = df_historico_lesoes_2['Data'].dt.strftime('%Y-%m-%d')
-        config_colunas_2 = [{"id": col_id, "name": formatar_nome_coluna(col_id)} for col_id in ['Data', 'Tipo_Lesao_Formatado', 'Tempo_Ausencia'] if col_id in df_historico_lesoes_2.columns]
-        
-        tabela_lesao_2 = dbc.Card([
-            dbc.CardHeader(html.H4(f"Histórico de Lesões: {jogador_selecionado_2}", className="card-title text-center", style={'color': 'black'})),
-            dbc.CardBody(
-                dash_table.DataTable(
-                    id='tabela-lesao-jogador-2',
-                    columns=config_colunas_2,
-                    data=df_historico_lesoes_2[['Data', 'Tipo_Lesao_Formatado', 'Tempo_Ausencia']].to_dict('records'),
-                    style_table={'overflowX': 'auto'},
-                    style_cell={'textAlign': 'left', 'padding': '10px'},
-                    style_header={'backgroundColor': '#0066CC', 'fontWeight': 'bold', 'color': 'white'},
-                    style_data_conditional=[{'if': {'row_index': 'odd'}, 'backgroundColor': 'rgb(248, 248, 248)'}]
-                ) if not df_historico_lesoes_2.empty else html.P("Nenhuma lesão registrada.", className="text-center text-muted m-auto text-dark")
-            )
-        ], className="h-100 shadow border-0 bg-light")
+    # Gestão de Carga: RACR por somas móveis e por médias exponenciais, monotonia e tensão de treino
+
+    figuras_carga = {}
+    if {'Relacao_Carga_Aguda_Cronica_EWMA', 'Monotonia_Treino', 'Tensao_Treino'} <= set(jogador_df.columns):
+        informar_progresso(0.9, "Montando os gráficos de carga...")
+        fig_racr = go.Figure([
+            criar_trace_serie(reduzir_serie(jogador_df, coluna), coluna, webgl, name=formatar_nome_coluna(coluna), line=dict(color=cor))
+            for coluna, cor in [('Relacao_Carga_Aguda_Cronica', CORES_BRASIL[2]), ('Relacao_Carga_Aguda_Cronica_EWMA', CORES_BRASIL[0])]
+        ])
+        fig_racr.update_layout(title='Razão Carga Aguda/Crônica', template='plotly_white', hovermode="x unified", legend=dict(orientation='h', y=-0.2))
+        fig_tensao = go.Figure([
+            criar_trace_serie(reduzir_serie(jogador_df, 'Monotonia_Treino'), 'Monotonia_Treino', webgl, name=formatar_nome_coluna('Monotonia_Treino'), line=dict(color='orange')),
+            criar_trace_serie(reduzir_serie(jogador_df, 'Tensao_Treino'), 'Tensao_Treino', webgl, name=formatar_nome_coluna('Tensao_Treino'), yaxis='y2', line=dict(color=CORES_BRASIL[2])),
+        ])
+        fig_tensao.update_layout(title='Monotonia e Tensão de Treino (7 dias)', template='plotly_white', hovermode="x unified", legend=dict(orientation='h', y=-0.2),
+                                 yaxis=dict(title='Monotonia'), yaxis2=dict(title='Tensão', overlaying='y', side='right'))
+        figuras_carga = {'racr': fig_racr, 'tensao': fig_tensao}
+
+    return {'risco': fig_risco, 'probabilidade': fig_prob_lesao, 'performance': figuras_performance, 'carga': figuras_carga}
+
+# --- Relatórios Estáticos ---
+
+# O perfil de cada jogador pode ser exportado (exportacao_relatorios.py) como uma página
+# HTML independente, com gráficos interativos (o plotly.js é gravado uma única vez na
+# pasta dos relatórios) ou como imagens PNG (requer o kaleido). O nome do arquivo leva
+# uma chave com a versão dos dados do jogador, o formato e a versão do código que monta
+# o relatório: um arquivo existente está sempre atualizado e é servido diretamente pelo
+# dashboard em ROTA_RELATORIOS/jogador/<nome>. Ao mudar o formato da página sem mexer nas
+# funções abaixo (por exemplo, em um componente compartilhado), incremente
+# VERSAO_FORMATO_RELATORIO para invalidar os relatórios já gravados.
+
+PASTA_RELATORIOS = os.path.join(PASTA_DADOS, 'relatorios')
+PASTA_RELATORIOS_JOGADORES = os.path.join(PASTA_RELATORIOS, 'jogadores')
+ARQUIVO_PLOTLYJS_RELATORIOS = f'plotly-{plotly.__version__}.min.js'
+FORMATOS_RELATORIO = ['interativo', 'imagem']
+LARGURA_IMAGEM_RELATORIO, ALTURA_IMAGEM_RELATORIO = 900, 450
+ROTA_RELATORIOS = '/relatorios'
+VERSAO_FORMATO_RELATORIO = 1
+
+ESTILO_RELATORIO = """
+body { font-family: 'Segoe UI', Arial, sans-serif; background: #0066CC; margin: 0; padding: 2rem; }
+.pagina { background: #f8f9fa; max-width: 1400px; margin: auto; padding: 2rem; border-radius: 8px; }
+h1 { color: #0066CC; text-align: center; } h2 { color: #002776; text-align: center; margin-top: 2rem; }
+.resumo { display: grid; grid-template-columns: 1fr 1fr; gap: 0.5rem 2rem; font-size: 1.15rem; }
+.graficos { display: grid; grid-template-columns: repeat(auto-fit, minmax(600px, 1fr)); gap: 1rem; }
+.grafico { background: white; box-shadow: 0 1px 4px rgba(0, 0, 0, 0.2); } .grafico img { width: 100%; }
+table { width: 100%; border-collapse: collapse; } th { background: #0066CC; color: white; text-align: left; padding: 10px; }
+td { padding: 10px; } tr:nth-child(even) td { background: rgb(248, 248, 248); }
+.rodape { color: #6c757d; text-align: center; margin-top: 2rem; font-size: 0.9rem; }
+@media print { body { background: white; padding: 0; } .grafico { break-inside: avoid; } }
+"""
+
+@functools.lru_cache(maxsize=1)
+def obter_versao_codigo_relatorios():
+    """
+    Hash do código que monta os relatórios (figuras, conversão, página e estilo), da
+    versão do formato e da versão do plotly. Mudanças no resto do dashboard não invalidam
+    os relatórios gravados.
+    """
+    partes = [getsource(funcao) for funcao in (criar_figuras_jogador, converter_figura_relatorio, montar_relatorio_html)]
+    partes += [ESTILO_RELATORIO, str(VERSAO_FORMATO_RELATORIO), plotly.__version__]
+    return hashlib.sha256('\n'.join(partes).encode('utf-8')).hexdigest()
+
+def chave_relatorio(nome_jogador, formato='interativo', estado=None):
+    conteudo = f"{nome_jogador}|{obter_hash_jogador(nome_jogador, estado)}|{formato}|{obter_versao_codigo_relatorios()}"
+    return hashlib.sha256(conteudo.encode('utf-8')).hexdigest()[:16]
+
+def caminho_relatorio(nome_jogador, formato='interativo', estado=None):
+    """
+    Arquivo do relatório do jogador para a versão atual dos seus dados: o nome do
+    jogador sem acentos nem espaços, seguido da chave do relatório.
+    """
+    return os.path.join(PASTA_RELATORIOS_JOGADORES, f"{base_arquivo_relatorio(nome_jogador)}_{chave_relatorio(nome_jogador, formato, estado)}.html")
+
+def base_arquivo_relatorio(nome_jogador):
+    base = unicodedata.normalize('NFKD', nome_jogador).encode('ascii', 'ignore').decode('ascii')
+    return re.sub(r'[^A-Za-z0-9]+', '_', base).strip('_') or 'jogador'
+
+def remover_relatorios_anteriores(nome_jogador, estado=None):
+    """
+    Remove os relatórios do jogador gravados para versões anteriores dos seus dados (ou do
+    código), mantendo os da versão atual em todos os formatos.
+    """
+    if not os.path.isdir(PASTA_RELATORIOS_JOGADORES):
+        return
+    padrao = re.compile(rf'{re.escape(base_arquivo_relatorio(nome_jogador))}_[0-9a-f]{{16}}\.html')
+    atuais = {os.path.basename(caminho_relatorio(nome_jogador, formato, estado)) for formato in FORMATOS_RELATORIO}
+    for arquivo in os.listdir(PASTA_RELATORIOS_JOGADORES):
+        if padrao.fullmatch(arquivo) and arquivo not in atuais:
+            os.remove(os.path.join(PASTA_RELATORIOS_JOGADORES, arquivo))
+
+def gravar_arquivo_relatorio(caminho, conteudo):
+    """
+    Grava com outro nome e renomeia ao final, para que o dashboard nunca sirva um arquivo incompleto.
+    """
+    os.makedirs(os.path.dirname(caminho), exist_ok=True)
+    temporario = os.path.join(os.path.dirname(caminho), f".{os.path.basename(caminho)}.{os.getpid()}.tmp")
+    with open(temporario, 'w', encoding='utf-8') as arquivo:
+        arquivo.write(conteudo)
+    os.replace(temporario, caminho)
+
+def garantir_plotlyjs_relatorios():
+    caminho = os.path.join(PASTA_RELATORIOS, ARQUIVO_PLOTLYJS_RELATORIOS)
+    if not os.path.exists(caminho):
+        gravar_arquivo_relatorio(caminho, get_plotlyjs())
+    return caminho
+
+def converter_figura_relatorio(figura, formato):
+    if formato == 'imagem':
+        imagem = figura.to_image(format='png', width=LARGURA_IMAGEM_RELATORIO, height=ALTURA_IMAGEM_RELATORIO)
+        return f'<img src="data:image/png;base64,{base64.b64encode(imagem).decode("ascii")}" alt="{escape(figura.layout.title.text or "")}">'
+    return figura.to_html(full_html=False, include_plotlyjs=False, config={'displaylogo': False})
+
+def montar_relatorio_html(nome_jogador, entrada_jogador, formato='interativo'):
+    """
+    Página HTML independente com o perfil do jogador (resumo, gráficos e histórico de
+    lesões), com o mesmo conteúdo da visão por jogador. Os relatórios interativos
+    carregam o plotly.js da pasta dos relatórios ('../', a partir da pasta dos jogadores).
+    """
+    figuras = criar_figuras_jogador(entrada_jogador['dados'])
+    lista_figuras = [figuras['risco'], figuras['probabilidade'], *[figura for figura in figuras['performance'].values() if figura is not None], *figuras['carga'].values()]
+    graficos = ''.join(f'<div class="grafico">{converter_figura_relatorio(figura, formato)}</div>' for figura in lista_figuras)
+
+    mais_recente = entrada_jogador['mais_recente']
+    resumo = [
+        f"Posição: {mais_recente.get('Posicao', 'N/A')}",
+        f"Pontuação de Risco de Lesão: {mais_recente.get('Pontuacao_Risco_Lesao', 'N/A')} ({mais_recente.get('Categoria_Risco_Lesao_Formatado', 'N/A')})",
+        formatar_texto_dias_sem_lesao(entrada_jogador),
+        f"Número de Lesões Anteriores: {mais_recente.get('Num_Lesoes_Anteriores', 'N/A')}",
+    ]
+
+    if entrada_jogador['registros_lesoes']:
+        cabecalho = ''.join(f'<th>{escape(formatar_nome_coluna(coluna))}</th>' for coluna in COLUNAS_TABELA_LESOES)
+        linhas = ''.join('<tr>' + ''.join(f'<td>{escape(str(registro[coluna]))}</td>' for coluna in COLUNAS_TABELA_LESOES) + '</tr>'
+                         for registro in entrada_jogador['registros_lesoes'])
+        tabela_lesoes = f'<table><thead><tr>{cabecalho}</tr></thead><tbody>{linhas}</tbody></table>'
+    else:
+        tabela_lesoes = '<p>Nenhuma lesão registrada para este jogador.</p>'
+
+    script_plotly = f'<script src="../{ARQUIVO_PLOTLYJS_RELATORIOS}"></script>' if formato == 'interativo' else ''
+    data_referencia = mais_recente['Data'].strftime('%Y-%m-%d') if pd.notna(mais_recente.get('Data')) else 'N/A'
+    return f"""<!DOCTYPE html>
+<html lang="pt-BR">
+<head><meta charset="utf-8"><title>Perfil Detalhado: {escape(nome_jogador)}</title><style>{ESTILO_RELATORIO}</style>{script_plotly}</head>
+<body><div class="pagina">
+<h1>Perfil Detalhado: {escape(nome_jogador)}</h1>
+<div class="resumo">{''.join(f'<p>{escape(texto)}</p>' for texto in resumo)}</div>
+<h2>Risco de Lesão, Performance e Gestão de Carga</h2>
+<div class="graficos">{graficos}</div>
+<h2>Histórico de Lesões</h2>
+{tabela_lesoes}
+<p class="rodape">Dados até {data_referencia}. Relatório gerado em {datetime.now().strftime('%Y-%m-%d %H:%M')}.</p>
+</div></body>
+</html>
+"""
+
+def registrar_rota_relatorios(servidor):
+    """
+    Registra as rotas dos relatórios estáticos em um servidor Flask (o 'app.server' do
+    dashboard): ROTA_RELATORIOS/jogador/<nome> serve o relatório exportado para a versão
+    atual dos dados do jogador ou, se ainda não houver, monta o relatório interativo e o
+    grava na pasta (os próximos pedidos, de qualquer worker, leem o arquivo); os demais
+    caminhos servem os arquivos da pasta (índice, plotly.js e relatórios exportados).
+    Com '?temporadas=N' (ou 'todas') diferente de TEMPORADAS_EXIBIDAS_DASHBOARD, o
+    relatório é montado sob demanda com essas temporadas, sem ser gravado na pasta.
+    """
+    from flask import Response, abort, request, send_file, send_from_directory
+
+    @servidor.route(f'{ROTA_RELATORIOS}/jogador/<path:nome_jogador>', methods=['GET'])
+    def rota_relatorio_jogador(nome_jogador):
+        estado = estado_dados
+        if nome_jogador not in estado['conjunto_jogadores']:
+            abort(404)
+        temporadas = interpretar_temporadas(request.args.get('temporadas'))
+        if temporadas != TEMPORADAS_EXIBIDAS_DASHBOARD:
+            entrada_jogador = obter_entrada_jogador(nome_jogador, estado, temporadas)
+            if entrada_jogador is None:
+                abort(404)
+            return Response(montar_relatorio_html(nome_jogador, entrada_jogador), mimetype='text/html')
+
+        for formato in FORMATOS_RELATORIO:
+            caminho = caminho_relatorio(nome_jogador, formato, estado)
+            if os.path.exists(caminho):
+                return send_file(os.path.abspath(caminho), mimetype='text/html')
+
+        entrada_jogador = obter_entrada_jogador(nome_jogador, estado)
+        if entrada_jogador is None:
+            abort(404)
+        conteudo = montar_relatorio_html(nome_jogador, entrada_jogador)
+        try:
+            garantir_plotlyjs_relatorios()
+            gravar_arquivo_relatorio(caminho_relatorio(nome_jogador, 'interativo', estado), conteudo)
+            remover_relatorios_anteriores(nome_jogador, estado)
+        except OSError as e:
+            print(f"Aviso: relatório de '{nome_jogador}' não foi gravado em cache: {e}")
+        return Response(conteudo, mimetype='text/html')
+
+    @servidor.route(f'{ROTA_RELATORIOS}/', defaults={'caminho': 'index.html'}, methods=['GET'])
+    @servidor.route(f'{ROTA_RELATORIOS}/<path:caminho>', methods=['GET'])
+    def rota_arquivos_relatorios(caminho):
+        if caminho == ARQUIVO_PLOTLYJS_RELATORIOS:
+            garantir_plotlyjs_relatorios()
+        return send_from_directory(os.path.abspath(PASTA_RELATORIOS), caminho)
+
+# --- Execução em Segundo Plano ---
+
+# As visões pesadas (perfil do jogador, comparação e elenco) são montadas em um pool de
+# threads do próprio processo, liberando a thread da requisição. Enquanto isso, a página
+# mostra o progresso e consulta a tarefa a cada INTERVALO_CONSULTA_TAREFAS_MS; ao mudar a
+# seleção, a tarefa anterior da mesma sessão e visão é cancelada e seu resultado descartado.
+
+INTERVALO_CONSULTA_TAREFAS_MS = 300
+VISOES_SEGUNDO_PLANO = ['jogador', 'comparacao', 'elenco']
+
+executor_segundo_plano = ExecutorSegundoPlano()
+
+def criar_placeholder_progresso(progresso=0.0, descricao=None):
+    return html.Div([
+        dbc.Progress(value=round(progresso * 100), label=f"{progresso:.0%}", striped=True, animated=True, className="mb-2"),
+        html.P(descricao or "Preparando a visualização...", className="text-center text-light")
+    ], className="my-5")
+
+def iniciar_em_segundo_plano(visao, id_sessao, chave_cache, montar):
+    """
+    Retorna (saída, id da tarefa, consulta desativada). Saídas em cache são retornadas na
+    hora; as demais são montadas em segundo plano e a página recebe o indicador de progresso.
+    """
+    grupo = (id_sessao, visao)
+    encontrado, saida = cache_callbacks.obter(chave_cache)
+    if encontrado:
+        executor_segundo_plano.cancelar_grupo(grupo)
+        return saida, None, True
+
+    def calcular():
+        saida = montar()
+        cache_callbacks.guardar(chave_cache, saida)
+        return saida
+
+    id_tarefa = executor_segundo_plano.submeter(grupo, instrumentar_callback(f'tarefa_{visao}')(calcular))
+    return criar_placeholder_progresso(), id_tarefa, False
+
+def acompanhar_tarefa(visao, id_tarefa, reiniciar):
+    """
+    Retorna (saída, id da tarefa, consulta desativada) para a consulta periódica de uma
+    tarefa. Uma tarefa desconhecida neste processo (por exemplo, iniciada em outro worker)
+    é reiniciada aqui com 'reiniciar()'. O tamanho e a serialização da resposta que
+    entrega o resultado contam nas métricas da tarefa ('tarefa_<visão>').
+    """
+    if not id_tarefa:
+        return no_update, no_update, True
+
+    situacao = executor_segundo_plano.consultar(id_tarefa)
+    if situacao['estado'] == 'executando':
+        return criar_placeholder_progresso(situacao['progresso'], situacao['descricao']), no_update, False
+    if situacao['estado'] == 'desconhecida':
+        return reiniciar()
+    if situacao['estado'] == 'falhou':
+        if isinstance(situacao['erro'], TarefaCancelada):
+            raise PreventUpdate
+        print(f"Erro ao montar a visualização em segundo plano: {situacao['erro']}")
+        return dbc.Alert("Não foi possível montar esta visualização. Tente novamente.", color="danger", className="text-center my-5"), None, True
+    atribuir_resposta(f'tarefa_{visao}')
+    return situacao['resultado'], None, True
+
+def iniciar_info_jogador(jogador_selecionado, valor_temporadas, id_sessao):
+    temporadas = interpretar_temporadas(valor_temporadas)
+    return iniciar_em_segundo_plano('jogador', id_sessao, chave_info_jogador(jogador_selecionado, temporadas), lambda: montar_info_jogador(jogador_selecionado, temporadas))
+
+def acompanhar_info_jogador(n_intervalos, id_tarefa, jogador_selecionado, valor_temporadas, id_sessao):
+    return acompanhar_tarefa('jogador', id_tarefa, lambda: iniciar_info_jogador(jogador_selecionado, valor_temporadas, id_sessao))
+
+def iniciar_info_comparacao(jogadores_selecionados, valor_temporadas, id_sessao):
+    jogadores_selecionados = list(dict.fromkeys(jogadores_selecionados or []))
+    temporadas = interpretar_temporadas(valor_temporadas)
+    return iniciar_em_segundo_plano('comparacao', id_sessao, chave_info_comparacao(jogadores_selecionados, temporadas), lambda: montar_info_comparacao(jogadores_selecionados, temporadas))
+
+def acompanhar_info_comparacao(n_intervalos, id_tarefa, jogadores_selecionados, valor_temporadas, id_sessao):
+    return acompanhar_tarefa('comparacao', id_tarefa, lambda: iniciar_info_comparacao(jogadores_selecionados, valor_temporadas, id_sessao))
+
+def iniciar_visao_elenco(aba_ativa, id_sessao):
+    if aba_ativa != 'aba-elenco':
+        raise PreventUpdate
+    return iniciar_em_segundo_plano('elenco', id_sessao, chave_visao_elenco(), montar_visao_elenco)
+
+def acompanhar_visao_elenco(n_intervalos, id_tarefa, aba_ativa, id_sessao):
+    return acompanhar_tarefa('elenco', id_tarefa, lambda: iniciar_visao_elenco(aba_ativa, id_sessao))
+
+# --- Callbacks ---
+
+def chave_info_jogador(jogador_selecionado, temporadas=TEMPORADAS_EXIBIDAS_DASHBOARD):
+    return ('jogador', (jogador_selecionado,), (obter_hash_jogador(jogador_selecionado),), temporadas)
+
+def atualizar_info_jogador(jogador_selecionado, temporadas=TEMPORADAS_EXIBIDAS_DASHBOARD):
+    """
+    Visão por jogador. A saída é reaproveitada do cache enquanto os dados do jogador não mudarem.
+    """
+    return cache_callbacks.obter_ou_calcular(chave_info_jogador(jogador_selecionado, temporadas), lambda: montar_info_jogador(jogador_selecionado, temporadas))
+
+def montar_info_jogador(jogador_selecionado, temporadas=TEMPORADAS_EXIBIDAS_DASHBOARD):
+    if jogador_selecionado is None:
+        return dbc.Alert("Selecione um jogador no menu acima para visualizar os detalhes de performance e risco de lesão.", color="info", className="text-center my-5")
+
+    informar_progresso(0.1, "Consultando os dados do jogador...")
+    with medir_fase('consulta'):
+        entrada_jogador = obter_entrada_jogador(jogador_selecionado, temporadas=temporadas)
+    informar_progresso(0.3, "Montando os gráficos de risco...")
+
+    if entrada_jogador is None:
+        return dbc.Alert(f"Dados não encontrados para o jogador: {jogador_selecionado}", color="warning", className="text-center my-5")
+
+    jogador_df = entrada_jogador['dados']
+    dados_mais_recentes = entrada_jogador['mais_recente']
+    texto_dias = formatar_texto_dias_sem_lesao(entrada_jogador)
 
-        return html.Div([
-            cartoes_resumo_comparacao,
+    cartao_resumo = dbc.Card([
+        dbc.CardHeader(html.H2(f"Perfil Detalhado: {jogador_selecionado}", className="card-title text-center text-primary")),
+        dbc.CardBody([
             dbc.Row([
-                dbc.Col(dbc.Card(dcc.Graph(figure=fig_comparacao_risco), className="h-100"), md=12, className="mb-4 shadow"),
-            ]),
+                dbc.Col(html.P(f"Posição: {dados_mais_recentes.get('Posicao', 'N/A')}", className="lead mb-0 text-dark")),
+                dbc.Col(html.P([f"Pontuação de Risco de Lesão: {dados_mais_recentes.get('Pontuacao_Risco_Lesao', 'N/A')} (", criar_badge_risco(dados_mais_recentes), ")"], className="lead mb-0 text-dark")),
+            ], className="mb-3"),
             dbc.Row([
-                dbc.Col(dbc.Card(dcc.Graph(figure=fig_comparacao_distancia), className="h-100"), md=12, className="mb-4 shadow"),
+                dbc.Col(html.P(texto_dias, className="lead mb-0 text-dark")),
+                dbc.Col(html.P(f"Número de Lesões Anteriores: {dados_mais_recentes.get('Num_Lesoes_Anteriores', 'N/A')}", className="lead mb-0 text-dark"))
             ]),
-            html.H3("Histórico de Lesões Comparativo", className="text-center my-4 text-light"),
-            dbc.Row([
-                dbc.Col(tabela_lesao_1, md=6, className="mb-4"),
-                dbc.Col(tabela_lesao_2, md=6, className="mb-4"),
-            ], className="g-4")
+            html.P(html.A("Abrir relatório para impressão", href=f"{ROTA_RELATORIOS}/jogador/{quote(jogador_selecionado)}{criar_parametro_temporadas(temporadas)}", target="_blank"), className="text-end mb-0 mt-2")
         ])
+    ], className="mb-4 shadow p-2 border-0 bg-light")
+
+    figuras = criar_figuras_jogador(jogador_df)
+
+    # Gráficos de Métricas de Performance
+
+    componentes_graficos_performance = []
+    for metric, fig_perf in figuras['performance'].items():
+        if fig_perf is not None:
+            grafico_perf = dcc.Graph(id=criar_id_grafico('jogador', [[jogador_selecionado, metric]], temporadas), figure=fig_perf)
+            componentes_graficos_performance.append(dbc.Col(dbc.Card(grafico_perf, className="h-100"), md=6, className="mb-4 shadow"))
+        else:
+            componentes_graficos_performance.append(dbc.Col(dbc.Card(dbc.CardBody(html.P(f"Dados insuficientes para {formatar_nome_coluna(metric)}.", className="text-center text-muted m-auto"))), md=6, className="mb-4 shadow d-flex align-items-center justify-content-center"))
+
+    # Gestão de Carga (bancos gerados antes das métricas de carga não têm essas colunas)
+
+    secao_carga = []
+    if figuras['carga']:
+        secao_carga = [
+            html.H3("Gestão de Carga", className="text-center my-4 text-light"),
+            dbc.Row([
+                dbc.Col(dbc.Card(dcc.Graph(id=criar_id_grafico('jogador', [[jogador_selecionado, 'Relacao_Carga_Aguda_Cronica'], [jogador_selecionado, 'Relacao_Carga_Aguda_Cronica_EWMA']], temporadas), figure=figuras['carga']['racr']), className="h-100"), md=6, className="mb-4 shadow"),
+                dbc.Col(dbc.Card(dcc.Graph(id=criar_id_grafico('jogador', [[jogador_selecionado, 'Monotonia_Treino'], [jogador_selecionado, 'Tensao_Treino']], temporadas), figure=figuras['carga']['tensao']), className="h-100"), md=6, className="mb-4 shadow"),
+            ], className="g-4"),
+        ]
+
+    # Histórico de Lesões (Tabela, pré-montada no índice)
+
+    if entrada_jogador['registros_lesoes']:
+        componente_tabela_lesao = dbc.Card([
+            dbc.CardHeader(html.H3("Histórico de Lesões", className="card-title text-center", style={'color': 'black'})), 
+            dbc.CardBody(criar_tabela_lesoes(entrada_jogador, 'tabela-lesao-jogador'))
+        ], className="mb-4 shadow border-0 bg-light")
+    else:
+        componente_tabela_lesao = dbc.Card([
+            dbc.CardHeader(html.H3("Histórico de Lesões", className="card-title text-center", style={'color': 'black'})),
+            dbc.CardBody(html.P("Nenhuma lesão registrada para este jogador.", className="text-center text-muted m-auto text-dark"))
+        ], className="mb-4 shadow border-0 bg-light d-flex align-items-center justify-content-center")
+
+    return html.Div([
+        cartao_resumo,
+        dbc.Row([
+            dbc.Col(dbc.Card(dcc.Graph(id=criar_id_grafico('jogador', [[jogador_selecionado, 'Pontuacao_Risco_Lesao']], temporadas), figure=figuras['risco']), className="h-100"), md=6, className="mb-4 shadow"),
+            dbc.Col(dbc.Card(dcc.Graph(id=criar_id_grafico('jogador', [[jogador_selecionado, 'Probabilidade_Lesao']], temporadas), figure=figuras['probabilidade']), className="h-100"), md=6, className="mb-4 shadow"),
+        ], className="g-4"),
+        html.H3("Métricas de Performance", className="text-center my-4 text-light"),
+        dbc.Row(componentes_graficos_performance, className="g-4"),
+        *secao_carga,
+        componente_tabela_lesao
+    ], className="mt-4")
+
+def chave_info_comparacao(jogadores_selecionados, temporadas=TEMPORADAS_EXIBIDAS_DASHBOARD):
+    return ('comparacao', tuple(jogadores_selecionados), tuple(obter_hash_jogador(jogador) for jogador in jogadores_selecionados), temporadas)
+
+def atualizar_info_comparacao(jogadores_selecionados, temporadas=TEMPORADAS_EXIBIDAS_DASHBOARD):
+    """
+    Comparação entre jogadores, com a mesma política de cache da visão por jogador.
+    """
+    jogadores_selecionados = list(dict.fromkeys(jogadores_selecionados or []))
+    return cache_callbacks.obter_ou_calcular(chave_info_comparacao(jogadores_selecionados, temporadas), lambda: montar_info_comparacao(jogadores_selecionados, temporadas))
+
+def montar_info_comparacao(jogadores_selecionados, temporadas=TEMPORADAS_EXIBIDAS_DASHBOARD):
+    if not jogadores_selecionados:
+        return dbc.Alert("Selecione jogadores (ou uma posição) para comparar suas performances e riscos de lesão.", color="info", className="text-center my-5")
+    if len(jogadores_selecionados) < 2:
+        return dbc.Alert("Selecione ao menos dois jogadores para iniciar a comparação.", color="warning", className="text-center my-5")
+    if len(jogadores_selecionados) > LIMITE_JOGADORES_COMPARACAO:
+        return dbc.Alert(f"Selecione no máximo {LIMITE_JOGADORES_COMPARACAO} jogadores para comparação.", color="danger", className="text-center my-5")
+
+    # Os jogadores fora do cache são consultados juntos, em uma única consulta ao banco
+
+    informar_progresso(0.1, "Consultando os dados dos jogadores...")
+    with medir_fase('consulta'):
+        entradas_jogadores = obter_entradas_jogadores(jogadores_selecionados, temporadas=temporadas)
+    jogadores_sem_dados = [jogador for jogador, entrada in entradas_jogadores.items() if entrada is None]
+    if jogadores_sem_dados:
+        return dbc.Alert(f"Dados insuficientes para os jogadores: {', '.join(jogadores_sem_dados)}", color="warning", className="text-center my-5")
+
+    largura_cartao = max(3, 12 // len(jogadores_selecionados))
+    cartoes_resumo_comparacao = dbc.Row([
+        dbc.Col(criar_cartao_resumo(jogador, entrada), md=6, xl=largura_cartao, className="mb-4")
+        for jogador, entrada in entradas_jogadores.items()
+    ], className="g-4 mb-4")
+
+    # Históricos longos usam WebGL e são reduzidos com LTTB (mais detalhe ao aproximar)
+
+    webgl = any(usar_webgl(entrada['dados']) for entrada in entradas_jogadores.values())
+
+    # Gráficos com um traço por jogador (risco e probabilidade no mesmo gráfico, na mesma cor).
+    # A ordem de 'series_*' acompanha a ordem dos traços, usada para refinar os dados no zoom.
+
+    series_risco, series_distancia = [], []
+    fig_comparacao_risco = go.Figure()
+    fig_comparacao_distancia = go.Figure()
+    for i, (jogador, entrada) in enumerate(entradas_jogadores.items()):
+        informar_progresso(0.3 + 0.6 * i / len(entradas_jogadores), f"Montando os gráficos ({i + 1} de {len(entradas_jogadores)} jogadores)...")
+        cor = CORES_COMPARACAO[i % len(CORES_COMPARACAO)]
+        jogador_df = entrada['dados']
+
+        fig_comparacao_risco.add_trace(criar_trace_serie(reduzir_serie(jogador_df, 'Pontuacao_Risco_Lesao'), 'Pontuacao_Risco_Lesao', webgl, name=jogador + ' (Risco)', legendgroup=jogador, line=dict(color=cor)))
+        fig_comparacao_risco.add_trace(criar_trace_serie(reduzir_serie(jogador_df, 'Probabilidade_Lesao'), 'Probabilidade_Lesao', webgl, name=jogador + ' (Probabilidade)', legendgroup=jogador, line=dict(color=cor, dash='dot')))
+        series_risco += [[jogador, 'Pontuacao_Risco_Lesao'], [jogador, 'Probabilidade_Lesao']]
+
+        fig_comparacao_distancia.add_trace(criar_trace_serie(reduzir_serie(jogador_df, 'Distancia_Percorrida_(km)'), 'Distancia_Percorrida_(km)', webgl, name=jogador, legendgroup=jogador, line=dict(color=cor)))
+        series_distancia.append([jogador, 'Distancia_Percorrida_(km)'])
+
+    fig_comparacao_risco.update_layout(title='Comparação de Risco e Probabilidade de Lesão', xaxis_title='Data', yaxis_title='Valor', template='plotly_white', hovermode="x unified", legend=dict(orientation="h", yanchor="bottom", y=1.02, xanchor="right", x=1))
+    fig_comparacao_distancia.update_layout(title='Comparação de Distância Percorrida (km)', xaxis_title='Data', yaxis_title='Distância Percorrida (km)', template='plotly_white', hovermode="x unified", legend=dict(orientation="h", yanchor="bottom", y=1.02, xanchor="right", x=1))
+
+    # Tabelas de histórico de lesões comparativas (pré-montadas no índice)
+
+    tabelas_lesoes = [
+        dbc.Col(criar_cartao_lesoes(jogador, entrada, f'tabela-lesao-jogador-{i}'), md=6, className="mb-4")
+        for i, (jogador, entrada) in enumerate(entradas_jogadores.items(), start=1)
+    ]
+
+    return html.Div([
+        cartoes_resumo_comparacao,
+        dbc.Row([
+            dbc.Col(dbc.Card(dcc.Graph(id=criar_id_grafico('comparacao', series_risco, temporadas), figure=fig_comparacao_risco), className="h-100"), md=12, className="mb-4 shadow"),
+        ]),
+        dbc.Row([
+            dbc.Col(dbc.Card(dcc.Graph(id=criar_id_grafico('comparacao', series_distancia, temporadas), figure=fig_comparacao_distancia), className="h-100"), md=12, className="mb-4 shadow"),
+        ]),
+        html.H3("Histórico de Lesões Comparativo", className="text-center my-4 text-light"),
+        dbc.Row(tabelas_lesoes, className="g-4")
+    ])
+
+def chave_visao_elenco():
+    return ('elenco', (), (estado_dados['versao'],))
+
+def atualizar_visao_elenco(aba_ativa):
+    """
+    Visão do elenco, montada só quando a aba é aberta e reaproveitada do cache até o banco mudar.
+    """
+    if aba_ativa != 'aba-elenco':
+        raise PreventUpdate
+    return cache_callbacks.obter_ou_calcular(chave_visao_elenco(), montar_visao_elenco)
+
+def montar_visao_elenco():
+    inicio = time.perf_counter()
+    informar_progresso(0.1, "Lendo os agregados do elenco...")
+    with medir_fase('consulta'):
+        agregados = carregar_agregados_elenco()
+    informar_progresso(0.4, "Montando a visão do elenco...")
+    if agregados is None:
+        return dbc.Alert("Agregados do elenco indisponíveis. Execute novamente a etapa de carga da pipeline (python main.py load).", color="warning", className="text-center my-5")
+
+    # A ingestão em streaming acrescenta jogadores ao fim da tabela; a ordem de exibição é refeita aqui
+
+    situacao_atual = agregados[NOME_TABELA_SITUACAO_ATUAL].sort_values('Pontuacao_Risco_Lesao', ascending=False, kind='stable')
+    carga_diaria = agregados[NOME_TABELA_CARGA_DIARIA]
+    acwr_semanal = agregados[NOME_TABELA_ACWR_SEMANAL]
+
+    # Risco atual por jogador (tabela paginada, ordenada pela pontuação de risco)
+
+    situacao_exibicao = situacao_atual.assign(
+        Categoria_Risco_Lesao=situacao_atual['Categoria_Risco_Lesao'].map(mapear_categoria_risco_para_texto),
+        Relacao_Carga_Aguda_Cronica=situacao_atual['Relacao_Carga_Aguda_Cronica'].round(2),
+        Data=situacao_atual['Data'].astype(str).str[:10],
+    )
+    colunas_situacao = [coluna for coluna in ['Nome_Padronizado', 'Posicao', 'Categoria_Risco_Lesao', 'Pontuacao_Risco_Lesao', 'Relacao_Carga_Aguda_Cronica',
+                                              'Relacao_Carga_Aguda_Cronica_EWMA', 'Tensao_Treino', 'Num_Lesoes_Anteriores', 'Data']
+                        if coluna in situacao_exibicao.columns]
+    tabela_situacao = dash_table.DataTable(
+        id='tabela-situacao-elenco',
+        columns=[{"id": col_id, "name": formatar_nome_coluna(col_id)} for col_id in colunas_situacao],
+        data=situacao_exibicao[colunas_situacao].to_dict('records'),
+        page_size=JOGADORES_POR_PAGINA_ELENCO,
+        sort_action='native',
+        filter_action='native',
+        style_table={'overflowX': 'auto'},
+        style_cell={'textAlign': 'left', 'padding': '10px'},
+        style_header={'backgroundColor': '#0066CC', 'fontWeight': 'bold', 'color': 'white'},
+        style_data_conditional=[{'if': {'row_index': 'odd'}, 'backgroundColor': 'rgb(248, 248, 248)'}]
+    )
+
+    contagem_risco = situacao_exibicao['Categoria_Risco_Lesao'].value_counts()
+    cartoes_risco = dbc.Row([
+        dbc.Col(dbc.Card(dbc.CardBody([
+            html.H3(int(contagem_risco.get(categoria, 0)), className="text-center mb-0"),
+            html.P(categoria, className="text-center mb-0"),
+        ]), color=cor, inverse=cor not in ('warning', 'secondary'), className="shadow border-0"), md=3, className="mb-4")
+        for categoria, cor in MAPA_CORES_RISCO.items() if categoria != 'N/A'
+    ], className="g-4")
+
+    # Mapa de calor do ACWR médio por semana e posição
+
+    mapa_acwr = acwr_semanal.pivot(index='Posicao', columns='Semana', values='ACWR_Medio')
+    fig_acwr = go.Figure(go.Heatmap(
+        z=mapa_acwr.to_numpy(), x=mapa_acwr.columns, y=mapa_acwr.index, colorscale='RdYlGn_r',
+        colorbar=dict(title='ACWR'), hovertemplate='Semana de %{x|%Y-%m-%d}<br>%{y}: %{z:.2f}<extra></extra>'
+    ))
+    fig_acwr.update_layout(title='ACWR Médio por Semana e Posição', template='plotly_white', xaxis_title='Semana')
+
+    # Carga total da equipe por dia (reduzida com LTTB em históricos longos)
+
+    fig_carga = go.Figure(criar_trace_serie(
+        reduzir_serie(carga_diaria, 'Distancia_Total_km'), 'Distancia_Total_km', usar_webgl(carga_diaria),
+        name='Distância Total (km)', line=dict(color='#009739')
+    ))
+    fig_carga.update_layout(title='Carga da Equipe: Distância Total por Dia (km)', xaxis_title='Data', yaxis_title='Distância Total (km)', template='plotly_white', hovermode="x unified")
+
+    totais = carga_diaria[['Distancia_Total_km', 'Sprints_Total', 'Minutos_Total']].sum()
+    resumo_carga = html.P(
+        f"Totais do período: {totais['Distancia_Total_km']:,.1f} km, {int(totais['Sprints_Total']):,} sprints, "
+        f"{int(totais['Minutos_Total']):,} minutos ({len(situacao_atual)} jogadores)",
+        className="lead text-light text-center"
+    )
+
+    visao = html.Div([
+        html.H3("Risco Atual do Elenco", className="text-center my-4 text-light"),
+        cartoes_risco,
+        dbc.Card(dbc.CardBody(tabela_situacao), className="mb-4 shadow border-0 bg-light"),
+        dbc.Row(dbc.Col(dbc.Card(dcc.Graph(id='grafico-acwr-elenco', figure=fig_acwr), className="h-100"), md=12, className="mb-4 shadow")),
+        resumo_carga,
+        dbc.Row(dbc.Col(dbc.Card(dcc.Graph(id='grafico-carga-elenco', figure=fig_carga), className="h-100"), md=12, className="mb-4 shadow")),
+    ], className="mt-4")
+
+    duracao_ms = (time.perf_counter() - inicio) * 1000
+    if duracao_ms > ORCAMENTO_LATENCIA_ELENCO_MS:
+        print(f"Aviso: visão do elenco montada em {duracao_ms:.0f} ms, acima do orçamento de {ORCAMENTO_LATENCIA_ELENCO_MS} ms.")
+    return visao
+
+def selecionar_grupo_posicao(posicao):
+    """
+    Preenche a comparação com os jogadores da posição escolhida (até LIMITE_JOGADORES_COMPARACAO).
+    """
+    jogadores_posicao = [jogador for jogador, posicao_jogador in estado_dados['posicoes_jogadores'].items() if posicao_jogador == posicao]
+    if not jogadores_posicao:
+        raise PreventUpdate
+    return jogadores_posicao[:LIMITE_JOGADORES_COMPARACAO]
+
+def atualizar_resolucao_grafico(relayout, id_grafico):
+    """
+    Ao aproximar (ou restaurar) o eixo de datas de um gráfico com séries reduzidas,
+    reenvia apenas os dados dos traços com os pontos do intervalo visível, reduzidos
+    novamente só se ainda passarem de PONTOS_MAXIMOS_GRAFICO.
+    """
+    intervalo = interpretar_intervalo_zoom(relayout)
+    atualizacao = Patch()
+    algum_traco_reduzido = False
+
+    series = json.loads(id_grafico['series'])
+    temporadas = json.loads(id_grafico['temporadas'])
+    with medir_fase('consulta'):
+        entradas_jogadores = obter_entradas_jogadores(list(dict.fromkeys(jogador for jogador, _ in series)), temporadas=temporadas)
+    for indice_traco, (jogador, coluna) in enumerate(series):
+        entrada_jogador = entradas_jogadores[jogador]
+        if entrada_jogador is None or len(entrada_jogador['dados']) <= PONTOS_MAXIMOS_GRAFICO:
+            continue
+        dados = reduzir_serie(entrada_jogador['dados'].dropna(subset=[coluna]), coluna, intervalo)
+        atualizacao['data'][indice_traco]['x'] = dados['Data']
+        atualizacao['data'][indice_traco]['y'] = dados[coluna]
+        algum_traco_reduzido = True
+
+    # Séries exibidas em resolução completa não precisam ser reenviadas
+    if not algum_traco_reduzido:
+        raise PreventUpdate
+    return atualizacao
+
+# --- Encapsulando a Lógica do Dashboard em uma Função ---
+
+def criar_app_dashboard(somente_leitura=False, observar_dados=True, limite_callback_lento_ms=None):
+    """
+    Carrega os dados, monta o layout e registra os callbacks, sem iniciar o servidor.
+    Com 'somente_leitura' (modo de produção), o banco é aberto somente para leitura e mapeado em memória.
+    Com 'observar_dados', uma thread recarrega os jogadores alterados quando a pipeline regrava o banco.
+    Com 'limite_callback_lento_ms', os callbacks mais lentos que o limite são registrados em log.
+    """
+    global engine, banco_somente_leitura
+    if somente_leitura:
+        engine = criar_engine_dados(somente_leitura=True)
+        banco_somente_leitura = True
+
+    inicializar_dados_dashboard()
+    if observar_dados:
+        iniciar_observador_dados()
     
+    app = dash.Dash(__name__, external_stylesheets=[dbc.themes.FLATLY])
+
+    # Endpoint de previsão online (modelo carregado uma única vez) servido junto ao dashboard
+
+    registrar_rota_previsao(app.server)
+
+    # Métricas dos callbacks (tempo por fase, bytes das respostas, taxas de acerto dos caches)
+
+    registrar_cache('jogadores', cache_jogadores)
+    registrar_cache('callbacks', cache_callbacks)
+    registrar_rota_metricas(app.server, limite_callback_lento_ms)
+
+    # Relatórios estáticos dos jogadores (exportados por exportacao_relatorios.py ou montados sob demanda)
+
+    registrar_rota_relatorios(app.server)
+
+    # O layout é montado a cada carregamento da página, com a lista de jogadores atual
+
+    def montar_layout():
+        opcoes_jogadores = [{'label': nome, 'value': nome} for nome in estado_dados['nomes_jogadores']]
+        opcoes_posicoes = [{'label': posicao, 'value': posicao} for posicao in sorted(set(estado_dados['posicoes_jogadores'].values()))]
+        opcoes_temporadas = [{'label': rotulo, 'value': valor} for valor, rotulo in OPCOES_TEMPORADAS_DASHBOARD.items()]
+        return dbc.Container([
+            dbc.Row([
+                dbc.Col(
+                    html.Div([
+                        html.Img(src=app.get_asset_url('cbf_2002_logo.png'),
+                                 style={'height': '80px', 'marginRight': '15px', 'verticalAlign': 'middle'}),
+                        html.Span("Dashboard de Performance e Risco de Lesão", 
+                                  className="h1 text-light text-center d-inline-block align-middle"),
+                        html.Span(" Seleção Brasileira 2002", 
+                                  className="text-white text-center d-inline-block align-middle ms-3 fs-4")
+                    ], className="d-flex align-items-center justify-content-center flex-wrap"),
+                    width=12, className="text-center my-4" 
+                )
+            ], className="g-0 align-items-center justify-content-center"),
+
+            dbc.Tabs([
+                dbc.Tab(label="Jogadores", tab_id='aba-jogadores', children=[
+                    dbc.Row([
+                        dbc.Col(
+                            dbc.Card([
+                                dbc.CardHeader(html.H4("Visualizar Dados do Jogador", className="card-title text-center text-primary")),
+                                dbc.CardBody(dcc.Dropdown(
+                                    id='dropdown-jogador',
+                                    options=opcoes_jogadores,
+                                    placeholder="Selecione um jogador para análise individual...",
+                                    multi=False,
+                                    clearable=True
+                                ))
+                            ], className="mb-4 shadow border-0"),
+                            width=12, lg=6
+                        ),
+                        dbc.Col(
+                            dbc.Card([
+                                dbc.CardHeader(html.H4("Temporadas Exibidas", className="card-title text-center text-primary")),
+                                dbc.CardBody(dcc.Dropdown(
+                                    id='dropdown-temporadas',
+                                    options=opcoes_temporadas,
+                                    value=TEMPORADAS_EXIBIDAS_DASHBOARD,
+                                    multi=False,
+                                    clearable=False
+                                ))
+                            ], className="mb-4 shadow border-0"),
+                            width=12, lg=3
+                        )
+                    ], justify="center"),
+
+                    dbc.Row(dbc.Col(html.Div(id='container-saida-jogador'), width=12)),
+
+                    dbc.Row(dbc.Col(html.Hr(style={'borderColor': 'white', 'borderWidth': '3px'}), className="my-5")),
+
+                    dbc.Row(dbc.Col(html.H2("Comparação de Jogadores", className="text-light text-center mb-4"))),
+
+                    dbc.Row([
+                        dbc.Col(
+                            dbc.Card([
+                                dbc.CardHeader(html.H4("Selecione os Jogadores", className="card-title text-center text-primary")),
+                                dbc.CardBody(dcc.Dropdown(
+                                    id='dropdown-jogadores-comparacao',
+                                    options=opcoes_jogadores,
+                                    placeholder=f"Selecione de 2 a {LIMITE_JOGADORES_COMPARACAO} jogadores...",
+                                    multi=True,
+                                    clearable=True
+                                ))
+                            ], className="mb-4 shadow border-0"),
+                            width=12, lg=8
+                        ),
+                        dbc.Col(
+                            dbc.Card([
+                                dbc.CardHeader(html.H4("Ou uma Posição", className="card-title text-center text-primary")),
+                                dbc.CardBody(dcc.Dropdown(
+                                    id='dropdown-posicao-comparacao',
+                                    options=opcoes_posicoes,
+                                    placeholder="Compare todos os jogadores de uma posição...",
+                                    multi=False,
+                                    clearable=True
+                                ))
+                            ], className="mb-4 shadow border-0"),
+                            width=12, lg=4
+                        )
+                    ], justify="center"),
+
+                    dbc.Row(dbc.Col(html.Div(id='container-saida-comparacao'), width=12))
+                ]),
+                dbc.Tab(label="Visão do Elenco", tab_id='aba-elenco', children=[
+                    dbc.Row(dbc.Col(html.Div(id='container-saida-elenco'), width=12))
+                ]),
+            ], id='abas-dashboard', active_tab='aba-jogadores', className="mb-4"),
+
+            # Sessão da página e tarefas em segundo plano de cada visão
+
+            dcc.Store(id='id-sessao', data=uuid.uuid4().hex),
+            *[dcc.Store(id=f'tarefa-{visao}') for visao in VISOES_SEGUNDO_PLANO],
+            *[dcc.Interval(id=f'intervalo-{visao}', interval=INTERVALO_CONSULTA_TAREFAS_MS, disabled=True) for visao in VISOES_SEGUNDO_PLANO]
+
+        ], fluid=True, style={'backgroundColor': '#0066CC', 'padding': '3rem'})
+
+    app.layout = montar_layout
+
+    # --- Callbacks ---
+
+    # As visões pesadas são iniciadas em segundo plano e acompanhadas pelo intervalo de cada visão
+
+    # As visões dos jogadores também são refeitas ao trocar as temporadas exibidas
+
+    entrada_temporadas = Input('dropdown-temporadas', 'value')
+    for visao, container, entradas, iniciar, acompanhar in [
+        ('jogador', 'container-saida-jogador', [Input('dropdown-jogador', 'value'), entrada_temporadas], iniciar_info_jogador, acompanhar_info_jogador),
+        ('comparacao', 'container-saida-comparacao', [Input('dropdown-jogadores-comparacao', 'value'), entrada_temporadas], iniciar_info_comparacao, acompanhar_info_comparacao),
+        ('elenco', 'container-saida-elenco', [Input('abas-dashboard', 'active_tab')], iniciar_visao_elenco, acompanhar_visao_elenco),
+    ]:
+        app.callback(
+            Output(container, 'children'),
+            Output(f'tarefa-{visao}', 'data'),
+            Output(f'intervalo-{visao}', 'disabled'),
+            *entradas,
+            State('id-sessao', 'data')
+        )(instrumentar_callback(visao)(iniciar))
+
+        app.callback(
+            Output(container, 'children', allow_duplicate=True),
+            Output(f'tarefa-{visao}', 'data', allow_duplicate=True),
+            Output(f'intervalo-{visao}', 'disabled', allow_duplicate=True),
+            Input(f'intervalo-{visao}', 'n_intervals'),
+            State(f'tarefa-{visao}', 'data'),
+            *[State(entrada.component_id, entrada.component_property) for entrada in entradas],
+            State('id-sessao', 'data'),
+            prevent_initial_call=True
+        )(instrumentar_callback(f'{visao}_progresso')(acompanhar))
+
+    app.callback(
+        Output('dropdown-jogadores-comparacao', 'value'),
+        Input('dropdown-posicao-comparacao', 'value'),
+        prevent_initial_call=True
+    )(instrumentar_callback('grupo_posicao')(selecionar_grupo_posicao))
+
+    app.callback(
+        Output({'type': TIPO_GRAFICO_SERIE, 'visao': MATCH, 'series': MATCH, 'temporadas': MATCH}, 'figure'),
+        Input({'type': TIPO_GRAFICO_SERIE, 'visao': MATCH, 'series': MATCH, 'temporadas': MATCH}, 'relayoutData'),
+        State({'type': TIPO_GRAFICO_SERIE, 'visao': MATCH, 'series': MATCH, 'temporadas': MATCH}, 'id'),
+        prevent_initial_call=True
+    )(instrumentar_callback('resolucao_grafico')(atualizar_resolucao_grafico))
+
+    return app
+
+def executar_app_dashboard(limite_callback_lento_ms=None):
+    app = criar_app_dashboard(limite_callback_lento_ms=limite_callback_lento_ms)
     app.run(debug=True)
 
 # --- Bloco de execução para permitir que o script rode sozinho ---
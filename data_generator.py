@@ -1,47 +1,151 @@
 import pandas as pd
 import numpy as np
 from datetime import datetime, timedelta
-import os
 
-def gerar_e_salvar_dados():
+from armazenamento_particionado import CONJUNTO_GERADO, caminho_catalogo, gravar_conjunto
+
+# --- Elenco e regras do modelo de sessões e lesões ---
+# Usadas pelo gerador e pelo simulador de disponibilidade (simulador_disponibilidade.py)
+
+# Lista de jogadores da Seleção do Brasil de 2002
+
+JOGADORES_SELECAO_2002 = [
+    {"Nome": "Marcos", "Posicao": "Goleiro", "Numero": 1},
+    {"Nome": "Cafu", "Posicao": "Lateral-direito", "Numero": 2},
+    {"Nome": "Lúcio", "Posicao": "Zagueiro", "Numero": 3},
+    {"Nome": "Roque Júnior", "Posicao": "Zagueiro", "Numero": 4},
+    {"Nome": "Edmilson", "Posicao": "Volante", "Numero": 5},
+    {"Nome": "Roberto Carlos", "Posicao": "Lateral-esquerdo", "Numero": 6},
+    {"Nome": "Ricardinho", "Posicao": "Meio-campista", "Numero": 7},
+    {"Nome": "Gilberto Silva", "Posicao": "Volante", "Numero": 8},
+    {"Nome": "Ronaldo", "Posicao": "Atacante", "Numero": 9},
+    {"Nome": "Rivaldo", "Posicao": "Atacante", "Numero": 10},
+    {"Nome": "Ronaldinho Gaúcho", "Posicao": "Meio-campista", "Numero": 11},
+    {"Nome": "Dida", "Posicao": "Goleiro", "Numero": 12},
+    {"Nome": "Belletti", "Posicao": "Lateral-direito", "Numero": 13},
+    {"Nome": "Anderson Polga", "Posicao": "Zagueiro", "Numero": 14},
+    {"Nome": "Kléberson", "Posicao": "Volante", "Numero": 15},
+    {"Nome": "Júnior", "Posicao": "Lateral-esquerdo", "Numero": 16},
+    {"Nome": "Denílson", "Posicao": "Meio-campista", "Numero": 17},
+    {"Nome": "Vampeta", "Posicao": "Volante", "Numero": 18},
+    {"Nome": "Juninho Paulista", "Posicao": "Meio-campista", "Numero": 19},
+    {"Nome": "Edílson", "Posicao": "Atacante", "Numero": 20},
+    {"Nome": "Luizão", "Posicao": "Atacante", "Numero": 21},
+    {"Nome": "Rogério Ceni", "Posicao": "Goleiro", "Numero": 22},
+    {"Nome": "Kaká", "Posicao": "Meio-campista", "Numero": 23}
+]
+
+PROB_DIA_DE_JOGO = 0.25
+ESCALADOS_POR_JOGO = (11, 15) # Intervalo do randint (o limite superior fica de fora)
+MINUTOS_JOGO = ([45, 90], [0.3, 0.7])
+PROB_SESSAO_LEVE_FORA_DO_JOGO = 0.6
+PROB_TREINO = 0.8 # Nem todos os jogadores treinam todos os dias
+MINUTOS_TREINO = ([0, 60, 90, 120], [0.1, 0.3, 0.4, 0.2])
+
+# Perfil de cada sessão por tipo de atividade e grupo de posição: intervalos das médias
+# sorteadas (uniforme; Sprints com randint) e desvios em torno delas (normal)
+
+GRUPOS_PERFIL_POSICAO = {
+    'Goleiro': 'Goleiro',
+    'Zagueiro': 'Zagueiro',
+    'Lateral-direito': 'Meio',
+    'Lateral-esquerdo': 'Meio',
+    'Volante': 'Meio',
+    'Meio-campista': 'Meio',
+} # Demais posições: 'Atacante'
+
+PERFIS_SESSAO = {
+    'Jogo': {
+        'Goleiro': {'Distancia': (3, 6), 'Sprints': (2, 7), 'VO2': (48, 52), 'FC': (135, 150)},
+        'Zagueiro': {'Distancia': (8, 11), 'Sprints': (15, 30), 'VO2': (53, 58), 'FC': (150, 165)},
+        'Meio': {'Distancia': (10, 14), 'Sprints': (25, 45), 'VO2': (55, 62), 'FC': (160, 180)},
+        'Atacante': {'Distancia': (9, 13), 'Sprints': (30, 50), 'VO2': (54, 60), 'FC': (155, 175)},
+    },
+    'Treino': {
+        'Goleiro': {'Distancia': (2, 5), 'Sprints': (0, 5), 'VO2': (40, 48), 'FC': (120, 140)},
+        'Zagueiro': {'Distancia': (6, 9), 'Sprints': (8, 20), 'VO2': (48, 53), 'FC': (140, 155)},
+        'Meio': {'Distancia': (8, 11), 'Sprints': (20, 35), 'VO2': (50, 58), 'FC': (150, 170)},
+        'Atacante': {'Distancia': (7, 10), 'Sprints': (25, 40), 'VO2': (48, 55), 'FC': (145, 165)},
+    },
+}
+PERFIL_SESSAO_LEVE = {'Distancia': (1, 3), 'Sprints': (0, 2), 'VO2': (40, 45), 'FC': (100, 120)}
+DESVIOS_SESSAO = {
+    'Jogo': {'Distancia': 1.5, 'Sprints': 5, 'VO2': 3, 'FC': 8},
+    'Treino': {'Distancia': 1.0, 'Sprints': 3, 'VO2': 2, 'FC': 5},
+}
+
+# Regras de lesão (só em sessões com minutos jogados): VO2 abaixo da média sorteada menos
+# o limiar ou distância acima da média mais o limiar disparam, com a probabilidade da
+# regra, uma lesão do primeiro tipo (com 'prob_primeiro_tipo') ou do segundo
+
+REGRAS_LESAO = {
+    'Jogo': {
+        'deficit_vo2': {'limiar': 5, 'probabilidade': 0.3, 'prob_primeiro_tipo': 0.6, 'tipos': ('Fadiga_Excessiva/Risco_Lesao', 'Lesao_Muscular_Leve')},
+        'excesso_distancia': {'limiar': 5, 'probabilidade': 0.2, 'prob_primeiro_tipo': 0.7, 'tipos': ('Lesao_Muscular_Leve', 'Lesao_Articular')},
+    },
+    'Treino': {
+        'deficit_vo2': {'limiar': 4, 'probabilidade': 0.25, 'prob_primeiro_tipo': 0.7, 'tipos': ('Fadiga_Excessiva/Risco_Lesao', 'Lesao_Muscular_Leve')},
+        'excesso_distancia': {'limiar': 4, 'probabilidade': 0.15, 'prob_primeiro_tipo': 0.8, 'tipos': ('Lesao_Muscular_Leve', 'Lesao_Articular')},
+    },
+}
+
+# Tempo de ausência (média e desvio, em dias) por tipo de atividade e tipo de lesão
+
+TEMPO_AUSENCIA_LESAO = {
+    'Jogo': {'Fadiga_Excessiva/Risco_Lesao': (5, 2), 'Lesao_Muscular_Leve': (10, 3), 'Lesao_Articular': (30, 7)},
+    'Treino': {'Fadiga_Excessiva/Risco_Lesao': (4, 1), 'Lesao_Muscular_Leve': (8, 2), 'Lesao_Articular': (20, 5)},
+}
+
+# Lesões sem relação com a carga, em qualquer sessão registrada
+
+PROB_LESAO_ALEATORIA = 0.005
+TIPOS_LESAO_ALEATORIA = ['Contusao', 'Entorse_Leve', 'Lesao_Muscular_Leve']
+TEMPO_AUSENCIA_LESAO_ALEATORIA = (2, 1)
+
+def sortear_medias_sessao(perfil):
+    """
+    Sorteia as médias de distância, sprints, VO2 e FC de uma sessão a partir de um perfil de PERFIS_SESSAO.
+    """
+    return (np.random.uniform(*perfil['Distancia']), np.random.randint(*perfil['Sprints']),
+            np.random.uniform(*perfil['VO2']), np.random.uniform(*perfil['FC']))
+
+def sortear_lesao(atividade, minutos_jogados, vo2_max_estimado, media_vo2, distancia_percorrida, media_dist):
     """
-    Gera dados fictícios de performance e risco de lesão para a Seleção do Brasil de 2002
-    e salva o resultado em um arquivo CSV.
+    Aplica as regras de lesão (REGRAS_LESAO e lesões aleatórias) a uma sessão registrada.
     """
-    # Lista de jogadores da Seleção do Brasil de 2002
-    jogadores = [
-        {"Nome": "Marcos", "Posicao": "Goleiro", "Numero": 1},
-        {"Nome": "Cafu", "Posicao": "Lateral-direito", "Numero": 2},
-        {"Nome": "Lúcio", "Posicao": "Zagueiro", "Numero": 3},
-        {"Nome": "Roque Júnior", "Posicao": "Zagueiro", "Numero": 4},
-        {"Nome": "Edmilson", "Posicao": "Volante", "Numero": 5},
-        {"Nome": "Roberto Carlos", "Posicao": "Lateral-esquerdo", "Numero": 6},
-        {"Nome": "Ricardinho", "Posicao": "Meio-campista", "Numero": 7},
-        {"Nome": "Gilberto Silva", "Posicao": "Volante", "Numero": 8},
-        {"Nome": "Ronaldo", "Posicao": "Atacante", "Numero": 9},
-        {"Nome": "Rivaldo", "Posicao": "Atacante", "Numero": 10},
-        {"Nome": "Ronaldinho Gaúcho", "Posicao": "Meio-campista", "Numero": 11},
-        {"Nome": "Dida", "Posicao": "Goleiro", "Numero": 12},
-        {"Nome": "Belletti", "Posicao": "Lateral-direito", "Numero": 13},
-        {"Nome": "Anderson Polga", "Posicao": "Zagueiro", "Numero": 14},
-        {"Nome": "Kléberson", "Posicao": "Volante", "Numero": 15},
-        {"Nome": "Júnior", "Posicao": "Lateral-esquerdo", "Numero": 16},
-        {"Nome": "Denílson", "Posicao": "Meio-campista", "Numero": 17},
-        {"Nome": "Vampeta", "Posicao": "Volante", "Numero": 18},
-        {"Nome": "Juninho Paulista", "Posicao": "Meio-campista", "Numero": 19},
-        {"Nome": "Edílson", "Posicao": "Atacante", "Numero": 20},
-        {"Nome": "Luizão", "Posicao": "Atacante", "Numero": 21},
-        {"Nome": "Rogério Ceni", "Posicao": "Goleiro", "Numero": 22},
-        {"Nome": "Kaká", "Posicao": "Meio-campista", "Numero": 23}
-    ]
-
-    df_jogadores = pd.DataFrame(jogadores)
-
-    data_inicio = datetime(2002, 1, 1)
-    data_fim = datetime(2002, 6, 29)
+    regras = REGRAS_LESAO[atividade]
+    if minutos_jogados > 0:
+        regra = None
+        if (vo2_max_estimado < (media_vo2 - regras['deficit_vo2']['limiar']) and np.random.rand() < regras['deficit_vo2']['probabilidade']):
+            regra = regras['deficit_vo2']
+        elif (distancia_percorrida > (media_dist + regras['excesso_distancia']['limiar']) and np.random.rand() < regras['excesso_distancia']['probabilidade']):
+            regra = regras['excesso_distancia']
+        if regra is not None:
+            tipo_lesao = regra['tipos'][0] if np.random.rand() < regra['prob_primeiro_tipo'] else regra['tipos'][1]
+            media_ausencia, desvio_ausencia = TEMPO_AUSENCIA_LESAO[atividade][tipo_lesao]
+            return {'Lesao_Ocorreu': True, 'Tipo_Lesao': tipo_lesao, 'Tempo_Ausencia': int(np.random.normal(media_ausencia, desvio_ausencia))}
+
+    if np.random.rand() < PROB_LESAO_ALEATORIA:
+        return {'Lesao_Ocorreu': True, 'Tipo_Lesao': np.random.choice(TIPOS_LESAO_ALEATORIA),
+                'Tempo_Ausencia': int(np.random.normal(*TEMPO_AUSENCIA_LESAO_ALEATORIA))}
+    return {'Lesao_Ocorreu': False, 'Tipo_Lesao': 'Nenhuma_Lesao', 'Tempo_Ausencia': 0}
+
+def gerar_e_salvar_dados(data_inicio=None, data_fim=None, semente=None, salvar=True):
+    """
+    Gera dados fictícios de performance e risco de lesão para a Seleção do Brasil de 2002,
+    salva o resultado em partições por elenco, temporada e mês (se 'salvar') e retorna o
+    DataFrame gerado.
+    O período padrão é de 01/01/2002 a 29/06/2002; 'semente' torna a geração reprodutível.
+    """
+    if semente is not None:
+        np.random.seed(semente)
+
+    df_jogadores = pd.DataFrame(JOGADORES_SELECAO_2002)
+
+    data_inicio = data_inicio or datetime(2002, 1, 1)
+    data_fim = data_fim or datetime(2002, 6, 29)
 
     dados_performance = []
-    PROB_DIA_DE_JOGO = 0.25
     data_atual = data_inicio
 
     carga_trabalho_diaria_jogador = {jogador['Nome']: [] for _, jogador in df_jogadores.iterrows()}
@@ -56,7 +160,7 @@ def gerar_e_salvar_dados():
         dia_de_jogo = np.random.rand() < PROB_DIA_DE_JOGO
 
         if dia_de_jogo:
-            jogadores_no_jogo = df_jogadores.sample(n=np.random.randint(11, 15)).index.tolist()
+            jogadores_no_jogo = df_jogadores.sample(n=np.random.randint(*ESCALADOS_POR_JOGO)).index.tolist()
             
             for index, jogador in df_jogadores.iterrows():
                 nome_original = jogador['Nome']
@@ -67,35 +171,14 @@ def gerar_e_salvar_dados():
                 escolha_fonte = 'Preparador_Fisico'
 
                 if index in jogadores_no_jogo:
-                    minutos_jogados = np.random.choice([45, 90], p=[0.3, 0.7])
+                    minutos_jogados = np.random.choice(MINUTOS_JOGO[0], p=MINUTOS_JOGO[1])
                     escolha_fonte = 'Dados_de_Jogos'
-
-                    if jogador['Posicao'] == 'Goleiro':
-                        media_dist = np.random.uniform(3, 6)
-                        media_sprints = np.random.randint(2, 7)
-                        media_vo2 = np.random.uniform(48, 52)
-                        media_fc = np.random.uniform(135, 150)
-                    elif jogador['Posicao'] == 'Zagueiro':
-                        media_dist = np.random.uniform(8, 11)
-                        media_sprints = np.random.randint(15, 30)
-                        media_vo2 = np.random.uniform(53, 58)
-                        media_fc = np.random.uniform(150, 165)
-                    elif jogador['Posicao'] in ['Lateral-direito', 'Lateral-esquerdo', 'Volante', 'Meio-campista']:
-                        media_dist = np.random.uniform(10, 14)
-                        media_sprints = np.random.randint(25, 45)
-                        media_vo2 = np.random.uniform(55, 62)
-                        media_fc = np.random.uniform(160, 180)
-                    else: # Atacante
-                        media_dist = np.random.uniform(9, 13)
-                        media_sprints = np.random.randint(30, 50)
-                        media_vo2 = np.random.uniform(54, 60)
-                        media_fc = np.random.uniform(155, 175)
+                    media_dist, media_sprints, media_vo2, media_fc = sortear_medias_sessao(
+                        PERFIS_SESSAO['Jogo'][GRUPOS_PERFIL_POSICAO.get(jogador['Posicao'], 'Atacante')]
+                    )
                 else:
-                    if np.random.rand() < 0.6:
-                        media_dist = np.random.uniform(1, 3)
-                        media_sprints = np.random.randint(0, 2)
-                        media_vo2 = np.random.uniform(40, 45)
-                        media_fc = np.random.uniform(100, 120)
+                    if np.random.rand() < PROB_SESSAO_LEVE_FORA_DO_JOGO:
+                        media_dist, media_sprints, media_vo2, media_fc = sortear_medias_sessao(PERFIL_SESSAO_LEVE)
                         escolha_fonte = np.random.choice(['Preparador_Fisico', 'Departamento_Medico'], p=[0.8, 0.2])
                     else:
                         distancia_percorrida = 0
@@ -108,10 +191,11 @@ def gerar_e_salvar_dados():
                 if escolha_fonte == 'Nenhum_Registro':
                     continue
 
-                distancia_percorrida = np.random.normal(media_dist, 1.5)
-                num_sprints = np.random.normal(media_sprints, 5)
-                vo2_max_estimado = np.random.normal(media_vo2, 3)
-                fc_media = np.random.normal(media_fc, 8)
+                desvios = DESVIOS_SESSAO['Jogo']
+                distancia_percorrida = np.random.normal(media_dist, desvios['Distancia'])
+                num_sprints = np.random.normal(media_sprints, desvios['Sprints'])
+                vo2_max_estimado = np.random.normal(media_vo2, desvios['VO2'])
+                fc_media = np.random.normal(media_fc, desvios['FC'])
 
                 if np.random.rand() < 0.05: distancia_percorrida = np.nan
                 if np.random.rand() < 0.03: vo2_max_estimado = np.nan
@@ -120,36 +204,7 @@ def gerar_e_salvar_dados():
                 if nome_original == 'Ronaldo' and np.random.rand() < 0.1: nome_exibicao = 'Ronaldo Fenômeno'
                 elif nome_original == 'Ronaldinho Gaúcho' and np.random.rand() < 0.1: nome_exibicao = 'Ronaldinho'
 
-                dados_lesao = {
-                    'Lesao_Ocorreu': False,
-                    'Tipo_Lesao': 'Nenhuma_Lesao',
-                    'Tempo_Ausencia': 0
-                }
-
-                if minutos_jogados > 0:
-                    if (vo2_max_estimado < (media_vo2 - 5) and np.random.rand() < 0.3):
-                        if np.random.rand() < 0.6:
-                            dados_lesao['Lesao_Ocorreu'] = True
-                            dados_lesao['Tipo_Lesao'] = 'Fadiga_Excessiva/Risco_Lesao'
-                            dados_lesao['Tempo_Ausencia'] = int(np.random.normal(5, 2))
-                        else:
-                            dados_lesao['Lesao_Ocorreu'] = True
-                            dados_lesao['Tipo_Lesao'] = 'Lesao_Muscular_Leve'
-                            dados_lesao['Tempo_Ausencia'] = int(np.random.normal(10, 3))
-                    elif (distancia_percorrida > (media_dist + 5) and np.random.rand() < 0.2):
-                        if np.random.rand() < 0.7:
-                            dados_lesao['Lesao_Ocorreu'] = True
-                            dados_lesao['Tipo_Lesao'] = 'Lesao_Muscular_Leve'
-                            dados_lesao['Tempo_Ausencia'] = int(np.random.normal(10, 3))
-                        else:
-                            dados_lesao['Lesao_Ocorreu'] = True
-                            dados_lesao['Tipo_Lesao'] = 'Lesao_Articular'
-                            dados_lesao['Tempo_Ausencia'] = int(np.random.normal(30, 7))
-                
-                if not dados_lesao['Lesao_Ocorreu'] and np.random.rand() < 0.005:
-                    dados_lesao['Lesao_Ocorreu'] = True
-                    dados_lesao['Tipo_Lesao'] = np.random.choice(['Contusao', 'Entorse_Leve', 'Lesao_Muscular_Leve'])
-                    dados_lesao['Tempo_Ausencia'] = int(np.random.normal(2, 1))
+                dados_lesao = sortear_lesao('Jogo', minutos_jogados, vo2_max_estimado, media_vo2, distancia_percorrida, media_dist)
 
                 if dados_lesao['Lesao_Ocorreu']:
                     ultima_data_lesao_jogador[nome_original] = data_atual
@@ -190,37 +245,21 @@ def gerar_e_salvar_dados():
 
         else: # Dia de Treino
             for index, jogador in df_jogadores.iterrows():
-                if np.random.rand() < 0.8: # Nem todos os jogadores treinam todos os dias
+                if np.random.rand() < PROB_TREINO:
                     nome_original = jogador['Nome']
                     nome_exibicao = nome_original
 
-                    if jogador['Posicao'] == 'Goleiro':
-                        media_dist = np.random.uniform(2, 5)
-                        media_sprints = np.random.randint(0, 5)
-                        media_vo2 = np.random.uniform(40, 48)
-                        media_fc = np.random.uniform(120, 140)
-                    elif jogador['Posicao'] == 'Zagueiro':
-                        media_dist = np.random.uniform(6, 9)
-                        media_sprints = np.random.randint(8, 20)
-                        media_vo2 = np.random.uniform(48, 53)
-                        media_fc = np.random.uniform(140, 155)
-                    elif jogador['Posicao'] in ['Lateral-direito', 'Lateral-esquerdo', 'Volante', 'Meio-campista']:
-                        media_dist = np.random.uniform(8, 11)
-                        media_sprints = np.random.randint(20, 35)
-                        media_vo2 = np.random.uniform(50, 58)
-                        media_fc = np.random.uniform(150, 170)
-                    else: # Atacante
-                        media_dist = np.random.uniform(7, 10)
-                        media_sprints = np.random.randint(25, 40)
-                        media_vo2 = np.random.uniform(48, 55)
-                        media_fc = np.random.uniform(145, 165)
-                    
-                    distancia_percorrida = np.random.normal(media_dist, 1.0)
-                    num_sprints = np.random.normal(media_sprints, 3)
-                    vo2_max_estimado = np.random.normal(media_vo2, 2)
-                    fc_media = np.random.normal(media_fc, 5)
+                    media_dist, media_sprints, media_vo2, media_fc = sortear_medias_sessao(
+                        PERFIS_SESSAO['Treino'][GRUPOS_PERFIL_POSICAO.get(jogador['Posicao'], 'Atacante')]
+                    )
+
+                    desvios = DESVIOS_SESSAO['Treino']
+                    distancia_percorrida = np.random.normal(media_dist, desvios['Distancia'])
+                    num_sprints = np.random.normal(media_sprints, desvios['Sprints'])
+                    vo2_max_estimado = np.random.normal(media_vo2, desvios['VO2'])
+                    fc_media = np.random.normal(media_fc, desvios['FC'])
 
-                    minutos_jogados = np.random.choice([0, 60, 90, 120], p=[0.1, 0.3, 0.4, 0.2])
+                    minutos_jogados = np.random.choice(MINUTOS_TREINO[0], p=MINUTOS_TREINO[1])
                     if minutos_jogados == 0:
                         distancia_percorrida = 0
                         num_sprints = 0
@@ -234,36 +273,7 @@ def gerar_e_salvar_dados():
                     if nome_original == 'Ronaldo' and np.random.rand() < 0.1: nome_exibicao = 'Ronaldo Fenômeno'
                     elif nome_original == 'Ronaldinho Gaúcho' and np.random.rand() < 0.1: nome_exibicao = 'Ronaldinho'
 
-                    dados_lesao = {
-                        'Lesao_Ocorreu': False,
-                        'Tipo_Lesao': 'Nenhuma_Lesao',
-                        'Tempo_Ausencia': 0
-                    }
-
-                    if minutos_jogados > 0:
-                        if (vo2_max_estimado < (media_vo2 - 4) and np.random.rand() < 0.25):
-                            if np.random.rand() < 0.7:
-                                dados_lesao['Lesao_Ocorreu'] = True
-                                dados_lesao['Tipo_Lesao'] = 'Fadiga_Excessiva/Risco_Lesao'
-                                dados_lesao['Tempo_Ausencia'] = int(np.random.normal(4, 1))
-                            else:
-                                dados_lesao['Lesao_Ocorreu'] = True
-                                dados_lesao['Tipo_Lesao'] = 'Lesao_Muscular_Leve'
-                                dados_lesao['Tempo_Ausencia'] = int(np.random.normal(8, 2))
-                        elif (distancia_percorrida > (media_dist + 4) and np.random.rand() < 0.15):
-                            if np.random.rand() < 0.8:
-                                dados_lesao['Lesao_Ocorreu'] = True
-                                dados_lesao['Tipo_Lesao'] = 'Lesao_Muscular_Leve'
-                                dados_lesao['Tempo_Ausencia'] = int(np.random.normal(8, 2))
-                            else:
-                                dados_lesao['Lesao_Ocorreu'] = True
-                                dados_lesao['Tipo_Lesao'] = 'Lesao_Articular'
-                                dados_lesao['Tempo_Ausencia'] = int(np.random.normal(20, 5))
-                    
-                    if not dados_lesao['Lesao_Ocorreu'] and np.random.rand() < 0.005:
-                        dados_lesao['Lesao_Ocorreu'] = True
-                        dados_lesao['Tipo_Lesao'] = np.random.choice(['Contusao', 'Entorse_Leve', 'Lesao_Muscular_Leve'])
-                        dados_lesao['Tempo_Ausencia'] = int(np.random.normal(2, 1))
+                    dados_lesao = sortear_lesao('Treino', minutos_jogados, vo2_max_estimado, media_vo2, distancia_percorrida, media_dist)
 
                     if dados_lesao['Lesao_Ocorreu']:
                         ultima_data_lesao_jogador[nome_original] = data_atual
@@ -305,10 +315,15 @@ def gerar_e_salvar_dados():
         data_atual += timedelta(days=1)
 
     df_performance = pd.DataFrame(dados_performance)
-    os.makedirs('data', exist_ok=True)
-    df_performance.to_csv('data/performance_completa_gerada.csv', index=False)
 
-    print("Novos dados fictícios com Carga Aguda Crônica (CACR), Histórico de Lesões e outras métricas gerados e salvos em 'data/performance_completa_gerada.csv'")
+    if salvar:
+        catalogo = gravar_conjunto(df_performance, CONJUNTO_GERADO)
+        print("Novos dados fictícios com Carga Aguda Crônica (CACR), Histórico de Lesões e outras métricas gerados e salvos em "
+              f"{len(catalogo['particoes'])} partições ('{caminho_catalogo(CONJUNTO_GERADO)}')")
+    else:
+        print(f"Novos dados fictícios gerados em memória ({len(df_performance)} registros).")
+
+    return df_performance
 
 if __name__ == '__main__':
     gerar_e_salvar_dados()
\ No newline at end of file
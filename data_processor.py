@@ -1,58 +1,175 @@
 import pandas as pd
 import numpy as np
-from fuzzywuzzy import process, fuzz
 from datetime import datetime, timedelta
 import os
-from sqlalchemy import create_engine
+
+from armazenamento_particionado import (CONJUNTO_GERADO, CONJUNTO_PROCESSADO, CONJUNTO_RECEBIDO, adicionar_chaves_particao, ampliar_filtros_elenco,
+                                        caminho_catalogo, gravar_conjunto, gravar_particoes_sql, ler_conjunto, selecionar_linhas)
+from deteccao_anomalias import detectar_anomalias
+from esquema_performance import COLUNAS_SESSAO, ErroEsquema, aplicar_esquema
+from metricas_carga import calcular_metricas_carga
+from perfil_pipeline import marcar_subetapa
+
+# --- Jogadores oficiais e regras compartilhadas com a ingestão em streaming ---
+
+# Lista de jogadores oficiais com algumas variações comuns/esperadas para reconciliação.
+
+JOGADORES_OFICIAIS_E_APELIDOS = [
+    {"Nome": "Marcos", "Posicao": "Goleiro", "Numero": 1},
+    {"Nome": "Cafu", "Posicao": "Lateral-direito", "Numero": 2},
+    {"Nome": "Lúcio", "Posicao": "Zagueiro", "Numero": 3},
+    {"Nome": "Roque Júnior", "Posicao": "Zagueiro", "Numero": 4},
+    {"Nome": "Edmilson", "Posicao": "Volante", "Numero": 5},
+    {"Nome": "Roberto Carlos", "Posicao": "Lateral-esquerdo", "Numero": 6},
+    {"Nome": "Ricardinho", "Posicao": "Meio-campista", "Numero": 7},
+    {"Nome": "Gilberto Silva", "Posicao": "Volante", "Numero": 8},
+    {"Nome": "Ronaldo", "Posicao": "Atacante", "Numero": 9},
+    {"Nome": "Rivaldo", "Posicao": "Atacante", "Numero": 10},
+    {"Nome": "Ronaldinho Gaúcho", "Posicao": "Meio-campista", "Numero": 11},
+    {"Nome": "Dida", "Posicao": "Goleiro", "Numero": 12},
+    {"Nome": "Belletti", "Posicao": "Lateral-direito", "Numero": 13},
+    {"Nome": "Anderson Polga", "Posicao": "Zagueiro", "Numero": 14},
+    {"Nome": "Kléberson", "Posicao": "Volante", "Numero": 15},
+    {"Nome": "Júnior", "Posicao": "Lateral-esquerdo", "Numero": 16},
+    {"Nome": "Denílson", "Posicao": "Meio-campista", "Numero": 17},
+    {"Nome": "Vampeta", "Posicao": "Volante", "Numero": 18},
+    {"Nome": "Juninho Paulista", "Posicao": "Meio-campista", "Numero": 19},
+    {"Nome": "Edílson", "Posicao": "Atacante", "Numero": 20},
+    {"Nome": "Luizão", "Posicao": "Atacante", "Numero": 21},
+    {"Nome": "Rogério Ceni", "Posicao": "Goleiro", "Numero": 22},
+    {"Nome": "Kaká", "Posicao": "Meio-campista", "Numero": 23}
+]
+
+
+# A lista de nomes oficiais para o fuzzywuzzy procurar correspondências.
+
+NOMES_OFICIAIS_PARA_FUZZY = list(dict.fromkeys(j["Nome"] for j in JOGADORES_OFICIAIS_E_APELIDOS)) # Remove duplicatas se houver
+
+APELIDOS_CONHECIDOS = {
+    'Ronaldo Fenômeno': 'Ronaldo',
+    'Ronaldo Nazário': 'Ronaldo',
+    'Ronaldinho': 'Ronaldinho Gaúcho',
+    'Luizao': 'Luizão',
+    'Denilson': 'Denílson'
+}
+
+COLUNAS_NUMERICAS_PARA_PREENCHER = [
+    'Minutos_Jogados', 'Distancia_Percorrida_(km)', 'Num_Sprints',
+    'VO2_Max_Estimado', 'FC_Media_(bpm)',
+    'Dias_Desde_Ultima_Lesao', 'Num_Lesoes_Anteriores'
+]
+
+# As métricas de carga (ACWR etc.) não são preenchidas: são recalculadas por calcular_metricas_carga
+
+COLUNAS_FINAIS = [
+    'Nome_Jogador', 'Nome_Padronizado', 'Posicao', 'Data', 'Tipo_Atividade',
+    'Minutos_Jogados', 'Distancia_Percorrida_(km)', 'Num_Sprints',
+    'VO2_Max_Estimado', 'FC_Media_(bpm)',
+    'Lesao_Ocorreu', 'Tipo_Lesao', 'Tempo_Ausencia',
+    'VO2_Media_7d', 'Dist_Media_7d', 'Sprints_Media_7d',
+    'VO2_DP_7d', 'Dist_DP_7d', 'Sprints_DP_7d',
+    'Alerta_VO2_Anomalo', 'Alerta_Dist_Anomala', 'Alerta_Sprints_Anomalos', 'Alerta_FC_Anomala',
+    'Pontuacao_Risco_Lesao', 'Categoria_Risco_Lesao',
+    'Num_Lesoes_Anteriores', 
+    'Carga_Aguda', 'Carga_Cronica', 'Relacao_Carga_Aguda_Cronica', 'Dias_Desde_Ultima_Lesao', # Nomes das colunas ACWR atualizados
+    'Relacao_Carga_Aguda_Cronica_EWMA', 'Monotonia_Treino', 'Tensao_Treino',
+    'Fonte', 'Elenco', 'Temporada', 'Mes'
+]
+
+# Pontos de cada alerta de anomalia (deteccao_anomalias.py) na pontuação de risco de lesão.
+# O alerta de frequência cardíaca é só informativo e não pontua.
+
+PESOS_ALERTAS_RISCO = {
+    'Alerta_VO2_Anomalo': 3,
+    'Alerta_Dist_Anomala': 2,
+    'Alerta_Sprints_Anomalos': 2,
+}
+
+def padronizar_nome(nome, opcoes=NOMES_OFICIAIS_PARA_FUZZY, limiar=85):
+    from fuzzywuzzy import process, fuzz
+
+    if pd.isna(nome):
+        return None
+
+    if nome in APELIDOS_CONHECIDOS:
+        return APELIDOS_CONHECIDOS[nome]
+    
+    if nome in opcoes:
+        return nome
+
+    correspondencia, pontuacao = process.extractOne(nome, opcoes, scorer=fuzz.ratio)
+    if pontuacao >= limiar:
+        return correspondencia
+    return nome
+
+# Mapear pontuação para categorias de risco (AJUSTADO PARA INCLUIR 1 EM 'BAIXO')
+
+def mapear_pontuacao_risco(pontuacao):
+    if pontuacao >= 6: # Para pontuações 6 ou mais
+        return 'Muito Alto'
+    elif pontuacao >= 4: # Para pontuações 4 ou 5
+        return 'Alto'
+    elif pontuacao >= 2: # Para pontuações 2 ou 3
+        return 'Moderado'
+    elif pontuacao >=0 and pontuacao <= 1: # Para pontuações 0 ou 1
+        return 'Baixo'
+    else: # Caso haja algum score negativo ou inválido
+        return 'Dado Inválido'
+
+def garantir_tipos(df):
+    """
+    Garante os tipos das colunas numéricas e preenche os campos de lesão ausentes (no próprio DataFrame).
+    """
+    for col in ['Minutos_Jogados', 'Num_Sprints', 'FC_Media_(bpm)']:
+        if col in df.columns:
+            df[col] = df[col].astype(int)
+    for col in ['Distancia_Percorrida_(km)', 'VO2_Max_Estimado', 'Carga_Aguda', 'Carga_Cronica', 'Relacao_Carga_Aguda_Cronica']: # Nomes das colunas ACWR atualizados
+        if col in df.columns:
+            df[col] = df[col].astype(float)
+    if 'Num_Lesoes_Anteriores' in df.columns:
+        df['Num_Lesoes_Anteriores'] = df['Num_Lesoes_Anteriores'].astype(int)
+
+    df['Lesao_Ocorreu'] = df['Lesao_Ocorreu'].fillna(False).astype(bool)
+    df['Tipo_Lesao'] = df['Tipo_Lesao'].fillna('Nenhuma_Lesao').astype(str)
+    df['Tempo_Ausencia'] = df['Tempo_Ausencia'].fillna(0).astype(int)
+    return df
+
+def calcular_risco_lesao(df):
+    """
+    A partir dos alertas de anomalia (detectar_anomalias), calcula a pontuação e a
+    categoria de risco de lesão (no próprio DataFrame, que é retornado).
+    """
+
+    # Pontos das anomalias detectadas e +1 para quem já teve lesão ('Num_Lesoes_Anteriores' do gerador_dados)
+
+    pontuacao = (df['Num_Lesoes_Anteriores'].to_numpy() > 0).astype(np.int64)
+    for coluna, peso in PESOS_ALERTAS_RISCO.items():
+        pontuacao += peso * df[coluna].to_numpy(dtype=bool)
+    df['Pontuacao_Risco_Lesao'] = pontuacao
+
+    df['Categoria_Risco_Lesao'] = df['Pontuacao_Risco_Lesao'].apply(mapear_pontuacao_risco)
+    return df
 
 # --- Encapsulando a lógica principal em uma função ---
 
-def executar_processamento_dados():
+def executar_processamento_dados(df_bruto=None, salvar=True, filtros=None):
     """
     Processa, reconcilia e analisa os dados de performance de jogadores,
-    calculando métricas adicionais e salvando em CSV e SQLite.
+    calculando métricas adicionais e salvando em partições e no SQLite (se 'salvar').
+    Se 'df_bruto' for informado (modo em memória), ele é usado no lugar das partições
+    geradas. As sessões recebidas pela ingestão em streaming (CONJUNTO_RECEBIDO) entram
+    junto com as geradas. Com 'filtros' (elencos, temporadas, meses), só os elencos
+    selecionados são lidos (com todo o seu histórico, do qual dependem as imputações e as
+    EWMA) e só as partições selecionadas são regravadas. Retorna o DataFrame processado.
     """
     print("--- Etapa 2: Processando e Reconciliando Dados ---")
 
-    # Lista de jogadores oficiais com algumas variações comuns/esperadas para reconciliação.
-
-    # O fuzzywuzzy usará a lista de "nomes_oficiais_para_fuzzy" para buscar correspondências.
-
-    jogadores_oficiais_e_apelidos = [
-        {"Nome": "Marcos", "Posicao": "Goleiro", "Numero": 1},
-        {"Nome": "Cafu", "Posicao": "Lateral-direito", "Numero": 2},
-        {"Nome": "Lúcio", "Posicao": "Zagueiro", "Numero": 3},
-        {"Nome": "Roque Júnior", "Posicao": "Zagueiro", "Numero": 4},
-        {"Nome": "Edmilson", "Posicao": "Volante", "Numero": 5},
-        {"Nome": "Roberto Carlos", "Posicao": "Lateral-esquerdo", "Numero": 6},
-        {"Nome": "Ricardinho", "Posicao": "Meio-campista", "Numero": 7},
-        {"Nome": "Gilberto Silva", "Posicao": "Volante", "Numero": 8},
-        {"Nome": "Ronaldo", "Posicao": "Atacante", "Numero": 9},
-        {"Nome": "Rivaldo", "Posicao": "Atacante", "Numero": 10},
-        {"Nome": "Ronaldinho Gaúcho", "Posicao": "Meio-campista", "Numero": 11},
-        {"Nome": "Dida", "Posicao": "Goleiro", "Numero": 12},
-        {"Nome": "Belletti", "Posicao": "Lateral-direito", "Numero": 13},
-        {"Nome": "Anderson Polga", "Posicao": "Zagueiro", "Numero": 14},
-        {"Nome": "Kléberson", "Posicao": "Volante", "Numero": 15},
-        {"Nome": "Júnior", "Posicao": "Lateral-esquerdo", "Numero": 16},
-        {"Nome": "Denílson", "Posicao": "Meio-campista", "Numero": 17},
-        {"Nome": "Vampeta", "Posicao": "Volante", "Numero": 18},
-        {"Nome": "Juninho Paulista", "Posicao": "Meio-campista", "Numero": 19},
-        {"Nome": "Edílson", "Posicao": "Atacante", "Numero": 20},
-        {"Nome": "Luizão", "Posicao": "Atacante", "Numero": 21},
-        {"Nome": "Rogério Ceni", "Posicao": "Goleiro", "Numero": 22},
-        {"Nome": "Kaká", "Posicao": "Meio-campista", "Numero": 23}
-    ]
-
-    # A lista de nomes oficiais para o fuzzywuzzy procurar correspondências.
-
-    nomes_oficiais_para_fuzzy = [j["Nome"] for j in jogadores_oficiais_e_apelidos]
-    nomes_oficiais_para_fuzzy = list(set(nomes_oficiais_para_fuzzy)) # Remove duplicatas se houver
-
-    # Criar um DataFrame com a informação oficial (Nome, Posicao, Numero)
-
-    df_info_jogadores_oficiais = pd.DataFrame(jogadores_oficiais_e_apelidos)
-    df_info_jogadores_oficiais = df_info_jogadores_oficiais.drop_duplicates(subset=['Nome']) # Garantir nomes únicos
+    # Dependências pesadas importadas apenas quando a etapa é executada
+
+    from sqlalchemy import create_engine
+
+    nomes_oficiais_para_fuzzy = NOMES_OFICIAIS_PARA_FUZZY
+    df_info_jogadores_oficiais = pd.DataFrame(JOGADORES_OFICIAIS_E_APELIDOS).drop_duplicates(subset=['Nome']) # Garantir nomes únicos
 
     # Criar a pasta 'data' se não existir (garantia)
 
@@ -65,13 +182,28 @@ def executar_processamento_dados():
     NOME_TABELA = 'performance_atletas'
     engine = create_engine(f'sqlite:///{ARQUIVO_DB}')
 
-    # Carregar o arquivo unificado gerado pelo gerador_dados.py
+    # Carregar as partições geradas pelo gerador_dados.py (apenas as dos elencos selecionados pelos filtros)
 
-    ARQUIVO_ENTRADA_PROCESSAMENTO = os.path.join(PASTA_DADOS, 'performance_completa_gerada.csv')
+    ARQUIVO_ENTRADA_PROCESSAMENTO = caminho_catalogo(CONJUNTO_GERADO)
 
+    marcar_subetapa('leitura_csv')
     try:
-        df_bruto = pd.read_csv(ARQUIVO_ENTRADA_PROCESSAMENTO)
-        print(f"Dados carregados com sucesso de: {ARQUIVO_ENTRADA_PROCESSAMENTO}")
+        if df_bruto is None:
+            df_bruto = ler_conjunto(CONJUNTO_GERADO, ampliar_filtros_elenco(CONJUNTO_GERADO, filtros), colunas_obrigatorias=COLUNAS_SESSAO)
+            if df_bruto is None:
+                raise FileNotFoundError(ARQUIVO_ENTRADA_PROCESSAMENTO)
+            if df_bruto.empty:
+                print(f"Erro: nenhuma partição de '{ARQUIVO_ENTRADA_PROCESSAMENTO}' corresponde aos filtros {filtros}.")
+                return False
+            print(f"Dados carregados com sucesso de: {ARQUIVO_ENTRADA_PROCESSAMENTO}")
+        else:
+            print("Dados recebidos em memória da etapa de geração.")
+            aplicar_esquema(df_bruto, origem='dados gerados em memória')
+
+        df_recebido = ler_conjunto(CONJUNTO_RECEBIDO, ampliar_filtros_elenco(CONJUNTO_GERADO, filtros), colunas_obrigatorias=COLUNAS_SESSAO)
+        if df_recebido is not None and not df_recebido.empty:
+            print(f"{len(df_recebido)} sessões recebidas pela ingestão em streaming carregadas de: {caminho_catalogo(CONJUNTO_RECEBIDO)}")
+            df_bruto = aplicar_esquema(pd.concat([df_bruto, df_recebido], ignore_index=True), origem='sessões geradas e recebidas')
         print(f"\nTotal de registros brutos após carregamento: {len(df_bruto)}")
         print("Primeiras 5 linhas dos dados brutos (antes da reconciliação):")
         print(df_bruto.head())
@@ -79,40 +211,20 @@ def executar_processamento_dados():
         print(f"Lista de nomes únicos: {sorted(df_bruto['Nome_Jogador'].unique().tolist())}")
 
     except FileNotFoundError as e:
-        print(f"Erro ao carregar arquivo: {e}. Certifique-se de que '{ARQUIVO_ENTRADA_PROCESSAMENTO}' está na pasta 'data'.")
+        print(f"Erro ao carregar arquivo: {e}. Certifique-se de que '{ARQUIVO_ENTRADA_PROCESSAMENTO}' existe.")
         print("Você precisa rodar o 'gerador_dados.py' atualizado antes de rodar este script.")
-        return # return para sair da função em caso de erro
+        return False # return False para sair da função em caso de erro
+    except ErroEsquema as e:
+        print(f"Erro: dados gerados fora do esquema: {e}")
+        return False
 
-    # Converter 'Data' para datetime
+    # 'Data' já vem convertida pelo esquema (esquema_performance.py)
 
-    print('\nConvertendo \'Data\' para tipo datetime...')
-    df_bruto['Data'] = pd.to_datetime(df_bruto['Data'])
+    adicionar_chaves_particao(df_bruto)
 
     # Tratar inconsistências de nomes (reconciliação)
 
-    def padronizar_nome(nome, opcoes, limiar=85):
-        if pd.isna(nome):
-            return None
-        
-        apelidos_conhecidos = {
-            'Ronaldo Fenômeno': 'Ronaldo',
-            'Ronaldo Nazário': 'Ronaldo',
-            'Ronaldinho': 'Ronaldinho Gaúcho',
-            'Luizao': 'Luizão',
-            'Denilson': 'Denílson'
-        }
-
-        if nome in apelidos_conhecidos:
-            return apelidos_conhecidos[nome]
-        
-        if nome in opcoes:
-            return nome
-
-        correspondencia, pontuacao = process.extractOne(nome, opcoes, scorer=fuzz.ratio)
-        if pontuacao >= limiar:
-            return correspondencia
-        return nome
-
+    marcar_subetapa('reconciliacao_nomes')
     print('\nPadronizando nomes dos jogadores com fuzzywuzzy...')
     df_bruto['Nome_Padronizado'] = df_bruto['Nome_Jogador'].apply(lambda x: padronizar_nome(x, nomes_oficiais_para_fuzzy))
     print('Padronização concluída com sucesso!')
@@ -141,16 +253,12 @@ def executar_processamento_dados():
 
     # Tratar dados ausentes
 
+    marcar_subetapa('tratamento_faltantes')
     print('\nTratando dados faltantes (se houver algum após a geração)...')
-    colunas_numericas_para_preencher = [
-        'Minutos_Jogados', 'Distancia_Percorrida_(km)', 'Num_Sprints',
-        'VO2_Max_Estimado', 'FC_Media_(bpm)',
-        'Carga_Aguda', 'Carga_Cronica', 'Relacao_Carga_Aguda_Cronica', # Nomes das colunas ACWR atualizados
-        'Dias_Desde_Ultima_Lesao', 'Num_Lesoes_Anteriores'
-    ]
-
-    for col in colunas_numericas_para_preencher:
+    for col in COLUNAS_NUMERICAS_PARA_PREENCHER:
         if col in df_bruto.columns:
+            # A média pode ser fracionária: o preenchimento é feito em float (garantir_tipos volta às contagens inteiras)
+            df_bruto[col] = df_bruto[col].astype('float64')
             df_bruto[col] = df_bruto.groupby('Posicao')[col].transform(lambda x: x.fillna(x.mean()))
             df_bruto[col] = df_bruto[col].fillna(df_bruto[col].mean())
         else:
@@ -159,20 +267,14 @@ def executar_processamento_dados():
     if 'Dias_Desde_Ultima_Lesao' in df_bruto.columns:
         df_bruto['Dias_Desde_Ultima_Lesao'] = df_bruto['Dias_Desde_Ultima_Lesao'].fillna(df_bruto['Dias_Desde_Ultima_Lesao'].mean())
 
-    # Garantir tipos de dados para colunas numéricas
+    garantir_tipos(df_bruto)
 
-    for col in ['Minutos_Jogados', 'Num_Sprints', 'FC_Media_(bpm)']:
-        if col in df_bruto.columns:
-            df_bruto[col] = df_bruto[col].astype(int)
-    for col in ['Distancia_Percorrida_(km)', 'VO2_Max_Estimado', 'Carga_Aguda', 'Carga_Cronica', 'Relacao_Carga_Aguda_Cronica']: # Nomes das colunas ACWR atualizados
-        if col in df_bruto.columns:
-            df_bruto[col] = df_bruto[col].astype(float)
-    if 'Num_Lesoes_Anteriores' in df_bruto.columns:
-        df_bruto['Num_Lesoes_Anteriores'] = df_bruto['Num_Lesoes_Anteriores'].astype(int)
+    # Métricas de gestão de carga recalculadas por jogador reconciliado (apelidos somam no
+    # mesmo histórico) e depois do preenchimento das distâncias ausentes
 
-    df_bruto['Lesao_Ocorreu'] = df_bruto['Lesao_Ocorreu'].fillna(False).astype(bool)
-    df_bruto['Tipo_Lesao'] = df_bruto['Tipo_Lesao'].fillna('Nenhuma_Lesao').astype(str)
-    df_bruto['Tempo_Ausencia'] = df_bruto['Tempo_Ausencia'].fillna(0).astype(int)
+    marcar_subetapa('metricas_carga')
+    print('\nCalculando métricas de carga (ACWR, ACWR EWMA, monotonia e tensão de treino)...')
+    calcular_metricas_carga(df_bruto)
 
     print("\nNúmero de valores nulos após tratamento (deve ser 0 ou muito próximo para colunas principais):")
     print(df_bruto.isnull().sum())
@@ -181,69 +283,14 @@ def executar_processamento_dados():
 
     print('\nIniciando análise de performance e risco de lesão (cálculo de métricas móveis e score de risco)...')
 
-    # Calcular métricas de janela móvel (rolling metrics) para cada jogador
-
-    df_bruto['VO2_Media_7d'] = df_bruto.groupby('Nome_Padronizado')['VO2_Max_Estimado'].transform(
-        lambda x: x.rolling(window=7, min_periods=1).mean()
-    )
-    df_bruto['Dist_Media_7d'] = df_bruto.groupby('Nome_Padronizado')['Distancia_Percorrida_(km)'].transform(
-        lambda x: x.rolling(window=7, min_periods=1).mean()
-    )
-    df_bruto['Sprints_Media_7d'] = df_bruto.groupby('Nome_Padronizado')['Num_Sprints'].transform(
-        lambda x: x.rolling(window=7, min_periods=1).mean()
-    )
-
-    # Calcular desvio padrão móvel (para detecção de anomalia)
-
-    df_bruto['VO2_DP_7d'] = df_bruto.groupby('Nome_Padronizado')['VO2_Max_Estimado'].transform(
-        lambda x: x.rolling(window=7, min_periods=1).std()
-    ).fillna(0)
-    df_bruto['Dist_DP_7d'] = df_bruto.groupby('Nome_Padronizado')['Distancia_Percorrida_(km)'].transform(
-        lambda x: x.rolling(window=7, min_periods=1).std()
-    ).fillna(0)
-    df_bruto['Sprints_DP_7d'] = df_bruto.groupby('Nome_Padronizado')['Num_Sprints'].transform(
-        lambda x: x.rolling(window=7, min_periods=1).std()
-    ).fillna(0)
-
-    # Detecção de Anomalias (usando 2 desvios padrão - regra de 95% de confiança)
-
-    df_bruto['Alerta_VO2_Anomalo'] = (df_bruto['VO2_Max_Estimado'] < (df_bruto['VO2_Media_7d'] - 2 * df_bruto['VO2_DP_7d'])) | \
-                                   (df_bruto['VO2_Max_Estimado'] > (df_bruto['VO2_Media_7d'] + 2 * df_bruto['VO2_DP_7d']))
-
-    df_bruto['Alerta_Dist_Anomala'] = (df_bruto['Distancia_Percorrida_(km)'] > (df_bruto['Dist_Media_7d'] + 2 * df_bruto['Dist_DP_7d']))
-    df_bruto['Alerta_Sprints_Anomalos'] = (df_bruto['Num_Sprints'] > (df_bruto['Sprints_Media_7d'] + 2 * df_bruto['Sprints_DP_7d']))
-
-    # Implementar a pontuação de risco de lesão
+    # Médias e desvios móveis de 7 registros e alertas de anomalia de cada métrica monitorada
+    # (detectores vetorizados de deteccao_anomalias.py, sobre os registros ordenados por data)
 
-    df_bruto['Pontuacao_Risco_Lesao'] = 0
+    marcar_subetapa('deteccao_anomalias')
+    detectar_anomalias(df_bruto)
 
-    # Adicionar pontos com base nas anomalias detectadas
-
-    df_bruto.loc[df_bruto['Alerta_VO2_Anomalo'], 'Pontuacao_Risco_Lesao'] += 3
-    df_bruto.loc[df_bruto['Alerta_Dist_Anomala'], 'Pontuacao_Risco_Lesao'] += 2
-    df_bruto.loc[df_bruto['Alerta_Sprints_Anomalos'], 'Pontuacao_Risco_Lesao'] += 2
-
-    # Usar 'Num_Lesoes_Anteriores' do gerador_dados
-
-    df_bruto.loc[df_bruto['Num_Lesoes_Anteriores'] > 0, 'Pontuacao_Risco_Lesao'] += 1
-
-    # --- ALTERAÇÃO PRINCIPAL AQUI PARA O processador_dados.py ---
-
-    # Mapear pontuação para categorias de risco (AJUSTADO PARA INCLUIR 1 EM 'BAIXO')
-
-    def mapear_pontuacao_risco(pontuacao):
-        if pontuacao >= 6: # Para pontuações 6 ou mais
-            return 'Muito Alto'
-        elif pontuacao >= 4: # Para pontuações 4 ou 5
-            return 'Alto'
-        elif pontuacao >= 2: # Para pontuações 2 ou 3
-            return 'Moderado'
-        elif pontuacao >=0 and pontuacao <= 1: # Para pontuações 0 ou 1
-            return 'Baixo'
-        else: # Caso haja algum score negativo ou inválido
-            return 'Dado Inválido'
-
-    df_bruto['Categoria_Risco_Lesao'] = df_bruto['Pontuacao_Risco_Lesao'].apply(mapear_pontuacao_risco)
+    marcar_subetapa('pontuacao_risco')
+    calcular_risco_lesao(df_bruto)
 
     print("\nAnálise de risco de lesão concluída.")
     print("Linhas com as novas métricas de risco (últimas 10):")
@@ -251,6 +298,7 @@ def executar_processamento_dados():
 
     # --- DEBUG: Dados Finais Antes de Salvar (PROCESSADOR DE DADOS) ---
 
+    marcar_subetapa('debug_saida')
     print("\n--- DEBUG: Dados Finais Antes de Salvar (PROCESSADOR DE DADOS) ---")
     print("Amostra de 'Pontuacao_Risco_Lesao' e 'Categoria_Risco_Lesao':")
 
@@ -272,42 +320,35 @@ def executar_processamento_dados():
     print(df_bruto['Categoria_Risco_Lesao'].value_counts(dropna=False))
     print("\n--- Fim DEBUG: PROCESSADOR DE DADOS ---")
 
-    # Definir o caminho para o arquivo de saída
+    # Definir o caminho para o catálogo das partições de saída
 
-    ARQUIVO_SAIDA_PROCESSAMENTO = os.path.join(PASTA_DADOS, 'performance_reconciliada_e_analisada.csv')
+    ARQUIVO_SAIDA_PROCESSAMENTO = caminho_catalogo(CONJUNTO_PROCESSADO)
 
-    # Reordenar colunas e salvar o DataFrame reconciliado e analisado no CSV
+    # Reordenar colunas e manter apenas as partições selecionadas (o histórico anterior só alimentou as janelas)
 
-    colunas_finais = [
-        'Nome_Jogador', 'Nome_Padronizado', 'Posicao', 'Data', 'Tipo_Atividade',
-        'Minutos_Jogados', 'Distancia_Percorrida_(km)', 'Num_Sprints',
-        'VO2_Max_Estimado', 'FC_Media_(bpm)',
-        'Lesao_Ocorreu', 'Tipo_Lesao', 'Tempo_Ausencia',
-        'VO2_Media_7d', 'Dist_Media_7d', 'Sprints_Media_7d',
-        'VO2_DP_7d', 'Dist_DP_7d', 'Sprints_DP_7d',
-        'Alerta_VO2_Anomalo', 'Alerta_Dist_Anomala', 'Alerta_Sprints_Anomalos',
-        'Pontuacao_Risco_Lesao', 'Categoria_Risco_Lesao',
-        'Num_Lesoes_Anteriores', 
-        'Carga_Aguda', 'Carga_Cronica', 'Relacao_Carga_Aguda_Cronica', 'Dias_Desde_Ultima_Lesao', # Nomes das colunas ACWR atualizados
-        'Fonte'
-    ]
+    colunas_existentes_para_salvar = [col for col in COLUNAS_FINAIS if col in df_bruto.columns]
+    df_processado = df_bruto[colunas_existentes_para_salvar]
+    if filtros:
+        df_processado = df_processado[selecionar_linhas(df_processado, filtros)].reset_index(drop=True)
 
-    colunas_existentes_para_salvar = [col for col in colunas_finais if col in df_bruto.columns]
-    df_bruto[colunas_existentes_para_salvar].to_csv(ARQUIVO_SAIDA_PROCESSAMENTO, index=False)
-    print(f"\nDataFrame processado salvo em CSV: {ARQUIVO_SAIDA_PROCESSAMENTO}")
+    if salvar:
+        marcar_subetapa('escrita_csv')
+        catalogo = gravar_conjunto(df_processado, CONJUNTO_PROCESSADO, filtros)
+        print(f"\nDataFrame processado salvo em {len(catalogo['particoes'])} partições: {ARQUIVO_SAIDA_PROCESSAMENTO}")
 
-    # Salvar no banco de dados SQLite
+        # Salvar no banco de dados SQLite, substituindo apenas as partições processadas
 
-    # Usar if_exists='replace' para sobrescrever a tabela existente com os dados processados
-    
-    print(f"\nSalvando DataFrame no banco de dados SQLite: {ARQUIVO_DB} na tabela '{NOME_TABELA}'...")
-    df_bruto[colunas_existentes_para_salvar].to_sql(NOME_TABELA, engine, if_exists='replace', index=False)
-    print("Dados salvos no banco de dados com sucesso.")
+        marcar_subetapa('escrita_sql')
+        print(f"\nSalvando DataFrame no banco de dados SQLite: {ARQUIVO_DB} (partições da tabela '{NOME_TABELA}')...")
+        with engine.begin() as conexao:
+            gravar_particoes_sql(conexao, df_processado, filtros)
+        print("Dados salvos no banco de dados com sucesso.")
 
     print("\nDistribuição de Tipos de Atividade no DataFrame final:")
     print(df_bruto['Tipo_Atividade'].value_counts())
     print("\n--- Etapa 2 Concluída ---")
-    
+    return df_processado
+
 # --- Bloco de execução para permitir que o script rode sozinho ---
 
 if __name__ == "__main__":
@@ -0,0 +1,429 @@
+import argparse
+import json
+import os
+import platform
+import time
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+
+from metricas_carga import resolver_recorrencia_linear
+
+# --- Configurações ---
+
+PASTA_DADOS = 'data'
+ARQUIVO_BENCHMARK_ANOMALIAS = os.path.join(PASTA_DADOS, 'benchmarks', 'ultimo_benchmark_anomalias.json')
+
+# Janela das médias e desvios móveis: os últimos JANELA_ANOMALIAS registros do jogador,
+# incluindo o próprio registro
+
+JANELA_ANOMALIAS = 7
+
+# Métricas monitoradas: coluna do alerta, lado da anomalia ('acima', 'abaixo' ou 'ambos'),
+# detector e, quando a métrica as grava, as colunas da média e do desvio móveis (features
+# do modelo). Os três primeiros alertas entram na pontuação de risco de lesão.
+
+METRICAS_MONITORADAS = {
+    'VO2_Max_Estimado': {'alerta': 'Alerta_VO2_Anomalo', 'lados': 'ambos', 'detector': 'zscore',
+                         'media': 'VO2_Media_7d', 'desvio': 'VO2_DP_7d'},
+    'Distancia_Percorrida_(km)': {'alerta': 'Alerta_Dist_Anomala', 'lados': 'acima', 'detector': 'zscore',
+                                  'media': 'Dist_Media_7d', 'desvio': 'Dist_DP_7d'},
+    'Num_Sprints': {'alerta': 'Alerta_Sprints_Anomalos', 'lados': 'acima', 'detector': 'zscore',
+                    'media': 'Sprints_Media_7d', 'desvio': 'Sprints_DP_7d'},
+    'FC_Media_(bpm)': {'alerta': 'Alerta_FC_Anomala', 'lados': 'acima', 'detector': 'ewma'},
+}
+
+# Parâmetros de cada detector. 'limite' é o número de escalas (desvios, MADs) entre o
+# valor e o centro a partir do qual há anomalia; no EWMA, 'fator' é o peso da sessão
+# mais recente e 'aquecimento' o número de sessões anteriores exigidas antes de alertar.
+
+PARAMETROS_DETECTORES = {
+    'zscore': {'limite': 2.0},
+    'mad': {'limite': 3.5},
+    'ewma': {'fator': 0.25, 'limite': 3.0, 'aquecimento': JANELA_ANOMALIAS - 1},
+}
+
+# Ajustes por posição, sobre os parâmetros acima: {posição: {detector: {parâmetro: valor}}},
+# por exemplo {'Goleiro': {'zscore': {'limite': 2.5}}}. Sem ajustes, todas as posições
+# usam os parâmetros padrão (os mesmos limites de 2 desvios dos alertas originais).
+
+PARAMETROS_POR_POSICAO = {}
+
+# Linhas por bloco: os blocos terminam sempre no fim de um jogador, e limitam a memória
+# das matrizes intermediárias (a mediana móvel empilha JANELA_ANOMALIAS cópias do bloco)
+
+TAMANHO_BLOCO_ANOMALIAS = 1_000_000
+
+# Constante que torna o MAD um estimador do desvio padrão em dados normais
+
+ESCALA_MAD_NORMAL = 1.4826
+
+# --- Núcleos vetorizados ---
+
+def posicao_no_jogador(codigos):
+    """
+    Índice de cada registro dentro do seu jogador (0 no primeiro), com os registros
+    agrupados por jogador.
+    """
+    indices = np.arange(len(codigos))
+    inicio = np.empty(len(codigos), dtype=bool)
+    inicio[:1] = True
+    inicio[1:] = codigos[1:] != codigos[:-1]
+    return indices - np.maximum.accumulate(np.where(inicio, indices, 0))
+
+def _somar_borda(valores, borda, posicao, janela, centro=None):
+    """
+    Para as linhas de 'borda' (os primeiros registros de cada jogador, com a janela
+    incompleta), a soma dos valores da janela (ou, com 'centro', dos quadrados dos
+    afastamentos do centro) considerando só os registros do mesmo jogador.
+    """
+    soma = valores[borda] if centro is None else (valores[borda] - centro) ** 2
+    for atraso in range(1, janela):
+        dentro = posicao[borda] >= atraso
+        anteriores = valores[borda[dentro] - atraso]
+        soma[dentro] += anteriores if centro is None else (anteriores - centro[dentro]) ** 2
+    return soma
+
+def media_desvio_moveis(valores, posicao, janela=JANELA_ANOMALIAS):
+    """
+    Média e desvio padrão amostral (ddof=1) de cada coluna de 'valores' nos últimos
+    'janela' registros do mesmo jogador, incluindo o próprio (0 de desvio com um único
+    registro), como rolling(janela, min_periods=1) por jogador. Soma os valores deslocados
+    em vez de usar somas acumuladas, que perderiam precisão em milhões de linhas, e calcula
+    o desvio em duas passadas, sobre os afastamentos da média. As somas correm sobre a
+    matriz inteira como se toda janela estivesse completa, e só os primeiros registros de
+    cada jogador são refeitos à parte.
+    """
+    borda = np.flatnonzero(posicao < janela - 1)
+    contagem = np.full((len(valores), 1), float(janela))
+    contagem[borda, 0] = posicao[borda] + 1
+
+    media = valores.copy()
+    for atraso in range(1, janela):
+        media[atraso:] += valores[:-atraso]
+    media[borda] = _somar_borda(valores, borda, posicao, janela)
+    media /= contagem
+
+    quadrados = (valores - media) ** 2
+    afastamento = np.empty_like(valores)
+    for atraso in range(1, janela):
+        np.subtract(valores[:-atraso], media[atraso:], out=afastamento[atraso:])
+        quadrados[atraso:] += np.square(afastamento[atraso:], out=afastamento[atraso:])
+    quadrados[borda] = _somar_borda(valores, borda, posicao, janela, media[borda])
+
+    # Com um único registro, o afastamento (e o desvio) já é zero
+    return media, np.sqrt(quadrados / np.maximum(contagem - 1, 1), out=quadrados)
+
+def _mediana_ordenada(ordenados, contagem):
+    """
+    Mediana das 'contagem' primeiras posições de cada janela já ordenada (n x colunas x janela).
+    """
+    meio_inferior = ((contagem - 1) // 2)[:, None, None]
+    meio_superior = (contagem // 2)[:, None, None]
+    return (np.take_along_axis(ordenados, meio_inferior, axis=-1) + np.take_along_axis(ordenados, meio_superior, axis=-1))[..., 0] / 2
+
+def mediana_mad_moveis(valores, posicao, janela=JANELA_ANOMALIAS):
+    """
+    Mediana e desvio absoluto mediano (MAD) de cada coluna nos últimos 'janela' registros
+    do mesmo jogador, incluindo o próprio. As janelas são empilhadas (n x colunas x janela)
+    e ordenadas de uma vez; as posições sem registro (início do jogador) ficam com +inf,
+    no fim da ordem.
+    """
+    contagem = np.minimum(posicao + 1, janela)
+    pilha = np.empty(valores.shape + (janela,))
+    pilha[..., 0] = valores
+    for atraso in range(1, janela):
+        pilha[atraso:, :, atraso] = valores[:-atraso]
+        pilha[posicao < atraso, :, atraso] = np.inf
+    pilha.sort(axis=-1)
+    mediana = _mediana_ordenada(pilha, contagem)
+
+    pilha -= mediana[..., None]
+    np.abs(pilha, out=pilha)
+    pilha.sort(axis=-1)
+    return mediana, _mediana_ordenada(pilha, contagem)
+
+def ewma_controle(valores, posicao, fator, media_inicial=None, variancia_inicial=None):
+    """
+    Média (m) e variância (v) móveis exponenciais de cada coluna, por jogador:
+    d_t = x_t - m_{t-1}, m_t = m_{t-1} + fator * d_t e v_t = (1 - fator) * (v_{t-1} + fator * d_t^2),
+    resolvidas como recorrências lineares. 'fator' é um valor ou um array (n x 1).
+    'media_inicial' e 'variancia_inicial' (n x colunas, NaN sem estado) continuam, no
+    primeiro registro de cada jogador, um cálculo anterior; sem elas, a média começa no
+    primeiro valor e a variância em zero.
+    Retorna (m, v) ao fim de cada registro e (m, v) antes dele.
+    """
+    fator = np.broadcast_to(np.asarray(fator, dtype=np.float64), valores.shape)
+    decaimento = 1.0 - fator
+    inicio = np.broadcast_to((posicao == 0)[:, None], valores.shape)
+    a = np.where(inicio, 0.0, decaimento)
+
+    media_anterior = valores.copy()
+    variancia_anterior = np.zeros_like(valores)
+    if media_inicial is not None:
+        com_estado = inicio & ~np.isnan(media_inicial)
+        np.copyto(media_anterior, media_inicial, where=com_estado)
+        np.copyto(variancia_anterior, variancia_inicial, where=com_estado)
+
+    b = fator * valores
+    np.add(b, decaimento * media_anterior, out=b, where=inicio)
+    media = resolver_recorrencia_linear(a, b)
+    np.copyto(media_anterior[1:], media[:-1], where=~inicio[1:])
+
+    b = decaimento * fator * (valores - media_anterior) ** 2
+    np.add(b, decaimento * variancia_anterior, out=b, where=inicio)
+    variancia = resolver_recorrencia_linear(a, b)
+    np.copyto(variancia_anterior[1:], variancia[:-1], where=~inicio[1:])
+    return media, variancia, media_anterior, variancia_anterior
+
+# --- Detectores ---
+# Cada detector recebe os valores (n x colunas, agrupados por jogador), a posição de cada
+# registro no jogador, os parâmetros por registro ({nome: array n x 1}), as médias e
+# desvios móveis já calculados e o estado inicial (n x colunas x 3, NaN sem estado; só o
+# EWMA o usa) e retorna (centro, escala, avaliável, estado): há anomalia quando o valor se
+# afasta do centro mais que 'limite' escalas, nos registros avaliáveis. 'estado' traz os
+# três componentes do estado ao fim de cada registro (n x colunas), ou None num detector
+# sem estado.
+
+def detector_zscore(valores, posicao, parametros, estatisticas, estado_inicial=None):
+    """
+    Média e desvio padrão móveis da janela (o registro entra na própria janela).
+    """
+    media, desvio = estatisticas
+    return media, desvio, np.ones(valores.shape, dtype=bool), None
+
+def detector_mad(valores, posicao, parametros, estatisticas, estado_inicial=None):
+    """
+    Mediana e MAD móveis da janela (escalado para desvio padrão): robusto a picos isolados.
+    """
+    mediana, mad = mediana_mad_moveis(valores, posicao)
+    return mediana, ESCALA_MAD_NORMAL * mad, np.ones(valores.shape, dtype=bool), None
+
+def detector_ewma(valores, posicao, parametros, estatisticas, estado_inicial=None):
+    """
+    Limites de controle EWMA: o valor é comparado à média e ao desvio exponenciais até a
+    sessão anterior, depois de 'aquecimento' sessões do jogador. O estado guarda a média,
+    a variância e o número de sessões de cada jogador.
+    """
+    sessoes_anteriores = posicao[:, None]
+    if estado_inicial is None:
+        media, variancia, centro, variancia_anterior = ewma_controle(valores, posicao, parametros['fator'])
+    else:
+        media, variancia, centro, variancia_anterior = ewma_controle(
+            valores, posicao, parametros['fator'], estado_inicial[..., 0], estado_inicial[..., 1])
+        sessoes_anteriores = sessoes_anteriores + np.nan_to_num(estado_inicial[np.arange(len(posicao)) - posicao, :, 2])
+    return centro, np.sqrt(variancia_anterior), sessoes_anteriores >= parametros['aquecimento'], (media, variancia, sessoes_anteriores + 1)
+
+DETECTORES = {
+    'zscore': detector_zscore,
+    'mad': detector_mad,
+    'ewma': detector_ewma,
+}
+
+# --- Etapa de detecção ---
+
+def parametros_por_registro(detector, codigos_posicao, posicoes):
+    """
+    Parâmetros do detector para cada registro ({nome: array n x 1}), a partir dos
+    padrões e dos ajustes da posição do registro.
+    """
+    por_posicao = [{**PARAMETROS_DETECTORES[detector], **PARAMETROS_POR_POSICAO.get(posicao, {}).get(detector, {})} for posicao in posicoes]
+    padrao = PARAMETROS_DETECTORES[detector]
+    return {nome: np.array([parametros[nome] for parametros in por_posicao] or [valor], dtype=np.float64)[codigos_posicao][:, None]
+            for nome, valor in padrao.items()}
+
+def _limites_blocos(codigos, tamanho_bloco):
+    """
+    Limites dos blocos de cerca de 'tamanho_bloco' linhas, sempre no início de um jogador.
+    """
+    inicios_jogador = np.flatnonzero(np.r_[True, codigos[1:] != codigos[:-1]]) if len(codigos) else np.empty(0, dtype=np.int64)
+    cortes = np.searchsorted(inicios_jogador, np.arange(0, len(codigos), tamanho_bloco))
+    return [*np.unique(inicios_jogador[cortes[cortes < len(inicios_jogador)]]).tolist(), len(codigos)]
+
+def avaliar_anomalias(valores, codigos, codigos_posicao, posicoes, metricas=METRICAS_MONITORADAS, estado_inicial=None,
+                      guardar_estado=False, tamanho_bloco=TAMANHO_BLOCO_ANOMALIAS):
+    """
+    Avalia todas as métricas monitoradas sobre a matriz 'valores' (n x métricas, na ordem
+    de 'metricas', com os registros agrupados por jogador em 'codigos' e em ordem de data
+    dentro de cada jogador). Cada detector roda uma vez por bloco sobre todas as suas
+    métricas. 'estado_inicial' (n x métricas x 3, NaN sem estado) continua, no primeiro
+    registro de cada jogador, o estado dos detectores que o têm (EWMA: média, variância
+    e sessões). Retorna (média móvel, desvio móvel, alertas, estado ao fim de cada registro,
+    só com 'guardar_estado').
+    """
+    colunas = list(metricas)
+    media = np.empty(valores.shape)
+    desvio = np.empty(valores.shape)
+    alertas = np.zeros(valores.shape, dtype=bool)
+    estado_final = np.full(valores.shape + (3,), np.nan) if guardar_estado else None
+
+    lados = np.array([metricas[coluna]['lados'] for coluna in colunas])
+    grupos = {}
+    for indice, coluna in enumerate(colunas):
+        grupos.setdefault(metricas[coluna]['detector'], []).append(indice)
+    grupos = {detector: slice(indices[0], indices[-1] + 1) if indices[-1] - indices[0] == len(indices) - 1 else indices
+              for detector, indices in grupos.items()}
+
+    limites = _limites_blocos(codigos, tamanho_bloco)
+    for inicio_bloco, fim_bloco in zip(limites[:-1], limites[1:]):
+        bloco = slice(inicio_bloco, fim_bloco)
+        posicao = posicao_no_jogador(codigos[bloco])
+        media[bloco], desvio[bloco] = media_desvio_moveis(valores[bloco], posicao)
+
+        for detector, indices in grupos.items():
+            parametros = parametros_por_registro(detector, codigos_posicao[bloco], posicoes)
+            x = valores[bloco, indices]
+            centro, escala, avaliavel, estado = DETECTORES[detector](
+                x, posicao, parametros, (media[bloco, indices], desvio[bloco, indices]),
+                None if estado_inicial is None else estado_inicial[bloco, indices])
+            if estado is not None and guardar_estado:
+                estado_final[bloco, indices] = np.stack(np.broadcast_arrays(*estado), axis=-1)
+
+            margem = parametros['limite'] * escala
+            acima = x > centro + margem
+            abaixo = x < centro - margem
+            lado = lados[indices]
+            alertas[bloco, indices] = avaliavel & ((acima & (lado != 'abaixo')) | (abaixo & (lado != 'acima')))
+    return media, desvio, alertas, estado_final
+
+def detectar_anomalias(df, metricas=METRICAS_MONITORADAS, coluna_jogador='Nome_Padronizado', coluna_posicao='Posicao',
+                       estado_detectores=None, registros_retidos=0, tamanho_bloco=TAMANHO_BLOCO_ANOMALIAS):
+    """
+    Etapa de detecção de anomalias: grava no próprio DataFrame, que é retornado, as
+    médias e desvios móveis das métricas que os guardam e a coluna de alerta de cada
+    métrica monitorada. Os registros de cada jogador são avaliados na ordem do DataFrame
+    (ordenado por data). Métricas ausentes do DataFrame são ignoradas.
+    'estado_detectores' ({jogador: {métrica: estado do detector}}) continua um cálculo
+    anterior (ingestão em streaming) e é atualizado no lugar com o estado de cada jogador
+    antes dos seus últimos 'registros_retidos' registros (os que serão reavaliados no
+    próximo cálculo como janela).
+    """
+    # As métricas de um mesmo detector ficam em colunas vizinhas da matriz (fatias, sem cópias)
+    metricas = {coluna: configuracao for coluna, configuracao in metricas.items() if coluna in df.columns}
+    metricas = dict(sorted(metricas.items(), key=lambda item: list(DETECTORES).index(item[1]['detector'])))
+    colunas = list(metricas)
+    if df.empty or not colunas:
+        for configuracao in metricas.values():
+            for chave, tipo in (('media', float), ('desvio', float), ('alerta', bool)):
+                if chave in configuracao:
+                    df[configuracao[chave]] = pd.Series(dtype=tipo)
+        return df
+
+    # Os códigos seguem a ordem de aparição: num DataFrame já agrupado por jogador (o caso
+    # do processamento e da ingestão) a reordenação é dispensada
+    codigos, jogadores = pd.factorize(df[coluna_jogador])
+    codigos_posicao, posicoes = pd.factorize(df[coluna_posicao])
+    ordem = None if (codigos[1:] >= codigos[:-1]).all() else np.argsort(codigos, kind='stable')
+    valores = np.empty((len(df), len(colunas)))
+    for indice, coluna in enumerate(colunas):
+        valores[:, indice] = pd.to_numeric(df[coluna], errors='coerce').to_numpy(dtype=np.float64, na_value=np.nan)
+    if ordem is not None:
+        codigos, codigos_posicao, valores = codigos[ordem], codigos_posicao[ordem], valores[ordem]
+
+    estado_inicial = None
+    if estado_detectores:
+        estado_inicial = np.full(valores.shape + (3,), np.nan)
+        inicios = np.flatnonzero(np.r_[True, codigos[1:] != codigos[:-1]])
+        for inicio in inicios:
+            estado_jogador = estado_detectores.get(jogadores[codigos[inicio]], {})
+            for indice, coluna in enumerate(colunas):
+                if coluna in estado_jogador:
+                    estado_inicial[inicio, indice] = estado_jogador[coluna]
+
+    media, desvio, alertas, estado_final = avaliar_anomalias(valores, codigos, codigos_posicao, [str(posicao) for posicao in posicoes],
+                                                             metricas, estado_inicial, estado_detectores is not None, tamanho_bloco)
+
+    for indice, coluna in enumerate(colunas):
+        configuracao = metricas[coluna]
+        for chave, resultado in (('media', media), ('desvio', desvio), ('alerta', alertas)):
+            if chave in configuracao:
+                valores_df = resultado[:, indice]
+                if ordem is not None:
+                    valores_df = np.empty(len(df), dtype=resultado.dtype)
+                    valores_df[ordem] = resultado[:, indice]
+                df[configuracao[chave]] = valores_df
+
+    if estado_detectores is not None:
+        _reter_estado(estado_detectores, estado_final, estado_inicial, codigos, jogadores, colunas, registros_retidos)
+    return df
+
+def _reter_estado(estado_detectores, estado_final, estado_inicial, codigos, jogadores, colunas, registros_retidos):
+    """
+    Atualiza 'estado_detectores' com o estado de cada jogador antes dos seus últimos
+    'registros_retidos' registros (o estado inicial do jogador quando ele tem menos registros).
+    """
+    inicios = np.flatnonzero(np.r_[True, codigos[1:] != codigos[:-1]])
+    fins = np.r_[inicios[1:], len(codigos)]
+    for inicio, fim in zip(inicios, fins):
+        referencia = fim - registros_retidos - 1
+        if referencia >= inicio:
+            estado = estado_final[referencia]
+        elif estado_inicial is not None:
+            estado = estado_inicial[inicio]
+        else:
+            continue
+        estado_jogador = {coluna: tuple(float(valor) for valor in estado[indice]) for indice, coluna in enumerate(colunas)
+                          if not np.isnan(estado[indice, 0])}
+        if estado_jogador:
+            estado_detectores[jogadores[codigos[inicio]]] = estado_jogador
+        else:
+            estado_detectores.pop(jogadores[codigos[inicio]], None)
+
+# --- Benchmark ---
+
+def gerar_registros_sinteticos(num_registros, num_jogadores=1000, semente=42):
+    """
+    Registros sintéticos (ordenados por jogador) com as métricas monitoradas, para o benchmark.
+    """
+    gerador = np.random.default_rng(semente)
+    jogadores = np.sort(gerador.integers(0, num_jogadores, num_registros))
+    posicoes = np.array(['Goleiro', 'Zagueiro', 'Lateral-direito', 'Lateral-esquerdo', 'Volante', 'Meio-campista', 'Atacante'])
+    return pd.DataFrame({
+        'Nome_Padronizado': jogadores,
+        'Posicao': pd.Categorical(posicoes[jogadores % len(posicoes)]),
+        'VO2_Max_Estimado': gerador.normal(55.0, 3.0, num_registros),
+        'Distancia_Percorrida_(km)': gerador.normal(9.0, 1.5, num_registros),
+        'Num_Sprints': gerador.poisson(25, num_registros),
+        'FC_Media_(bpm)': gerador.normal(160.0, 10.0, num_registros).round(),
+    })
+
+def medir_vazao(num_registros=10_000_000, caminho=ARQUIVO_BENCHMARK_ANOMALIAS):
+    """
+    Mede registros por segundo da etapa de detecção (configuração padrão e cada detector
+    aplicado a todas as métricas) e salva o resultado em JSON.
+    """
+    df = gerar_registros_sinteticos(num_registros)
+    configuracoes = {'padrao': METRICAS_MONITORADAS}
+    for detector in DETECTORES:
+        configuracoes[detector] = {coluna: {**configuracao, 'detector': detector} for coluna, configuracao in METRICAS_MONITORADAS.items()}
+
+    medicoes = []
+    for nome, metricas in configuracoes.items():
+        inicio = time.perf_counter()
+        detectar_anomalias(df, metricas)
+        tempo = time.perf_counter() - inicio
+        alertas = int(sum(df[configuracao['alerta']].sum() for configuracao in metricas.values()))
+        medicoes.append({'configuracao': nome, 'registros': num_registros, 'tempo_s': round(tempo, 3),
+                         'registros_por_s': round(num_registros / tempo), 'alertas': alertas})
+        print(f"  {nome:>7}: {num_registros:,} registros em {tempo:.2f} s ({num_registros / tempo:,.0f} registros/s, {alertas:,} alertas)")
+
+    os.makedirs(os.path.dirname(caminho), exist_ok=True)
+    with open(caminho, 'w', encoding='utf-8') as arquivo:
+        json.dump({
+            'data': datetime.now().isoformat(timespec='seconds'),
+            'metricas': list(METRICAS_MONITORADAS),
+            'tamanho_bloco': TAMANHO_BLOCO_ANOMALIAS,
+            'maquina': {'cpus': os.cpu_count(), 'python': platform.python_version()},
+            'medicoes': medicoes,
+        }, arquivo, indent=2, ensure_ascii=False)
+    print(f"Resultado salvo em: {caminho}")
+    return medicoes
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Benchmark da etapa de detecção de anomalias.")
+    parser.add_argument('--registros', type=int, default=10_000_000, help="Número de registros sintéticos avaliados.")
+    args = parser.parse_args()
+
+    print(f"--- Benchmark da detecção de anomalias ({args.registros:,} registros) ---")
+    medir_vazao(args.registros)
@@ -0,0 +1,131 @@
+import csv
+import importlib.util
+
+import pandas as pd
+
+# --- Esquema do registro de performance ---
+# Tipo de cada coluna do registro de performance, usado por todas as etapas para ler e
+# gravar os conjuntos intermediários: textos repetidos como categóricos, contagens como
+# inteiros anuláveis (as sessões geradas podem vir sem minutos), lesões e alertas como
+# booleanos anuláveis e 'Data' como data. Colunas fora do esquema são lidas por inferência.
+
+COLUNA_DATA = 'Data'
+FORMATO_DATA = '%Y-%m-%d'
+
+TIPOS_COLUNAS_PERFORMANCE = {
+    'Nome_Jogador': 'category', 'Nome_Padronizado': 'category', 'Posicao': 'category', COLUNA_DATA: 'datetime64[ns]',
+    'Tipo_Atividade': 'category', 'Minutos_Jogados': 'Int32', 'Distancia_Percorrida_(km)': 'float64', 'Num_Sprints': 'Int32',
+    'VO2_Max_Estimado': 'float64', 'FC_Media_(bpm)': 'Int32', 'Lesao_Ocorreu': 'boolean', 'Tipo_Lesao': 'category',
+    'Tempo_Ausencia': 'Int32', 'Fonte': 'category',
+    'VO2_Media_7d': 'float64', 'Dist_Media_7d': 'float64', 'Sprints_Media_7d': 'float64',
+    'VO2_DP_7d': 'float64', 'Dist_DP_7d': 'float64', 'Sprints_DP_7d': 'float64',
+    'Alerta_VO2_Anomalo': 'boolean', 'Alerta_Dist_Anomala': 'boolean', 'Alerta_Sprints_Anomalos': 'boolean', 'Alerta_FC_Anomala': 'boolean',
+    'Pontuacao_Risco_Lesao': 'Int32', 'Categoria_Risco_Lesao': 'category', 'Num_Lesoes_Anteriores': 'Int32',
+    'Carga_Aguda': 'float64', 'Carga_Cronica': 'float64', 'Relacao_Carga_Aguda_Cronica': 'float64', 'Dias_Desde_Ultima_Lesao': 'float64',
+    'Relacao_Carga_Aguda_Cronica_EWMA': 'float64', 'Monotonia_Treino': 'float64', 'Tensao_Treino': 'float64',
+    'Elenco': 'category', 'Temporada': 'Int32', 'Mes': 'category', 'Risco_Lesao_ML': 'Int32',
+}
+
+# Categóricos de domínio fechado: um valor fora da lista é erro de esquema
+
+CATEGORIAS_FIXAS = {
+    'Tipo_Atividade': ['Treino', 'Jogo'],
+    'Categoria_Risco_Lesao': ['Baixo', 'Moderado', 'Alto', 'Muito Alto', 'Dado Inválido'],
+}
+
+# Colunas de uma sessão bruta (saída do gerador e entrada da ingestão em streaming)
+
+COLUNAS_SESSAO = [
+    'Nome_Jogador', 'Posicao', COLUNA_DATA, 'Tipo_Atividade', 'Minutos_Jogados', 'Distancia_Percorrida_(km)',
+    'Num_Sprints', 'VO2_Max_Estimado', 'FC_Media_(bpm)', 'Lesao_Ocorreu', 'Tipo_Lesao', 'Tempo_Ausencia',
+]
+
+# O pyarrow (dependência opcional) lê CSVs em paralelo; sem ele, o leitor em C do pandas é usado
+
+MOTOR_LEITURA_CSV = 'pyarrow' if importlib.util.find_spec('pyarrow') is not None else 'c'
+
+class ErroEsquema(ValueError):
+    """
+    Dados que não seguem o esquema do registro de performance.
+    """
+
+def _tipo_coluna(coluna, categorizar, dominio_fixo=True):
+    tipo = TIPOS_COLUNAS_PERFORMANCE[coluna]
+    if tipo != 'category':
+        return tipo
+    if not categorizar:
+        return 'str'
+    return pd.CategoricalDtype(CATEGORIAS_FIXAS[coluna]) if dominio_fixo and coluna in CATEGORIAS_FIXAS else 'category'
+
+def verificar_colunas(colunas, colunas_obrigatorias, origem):
+    ausentes = [coluna for coluna in colunas_obrigatorias if coluna not in colunas]
+    if ausentes:
+        raise ErroEsquema(f"{origem}: colunas obrigatórias ausentes: {ausentes}")
+
+def validar_categorias(df, origem):
+    """
+    Falha se algum categórico de domínio fechado tiver um valor fora do domínio.
+    """
+    for coluna, categorias in CATEGORIAS_FIXAS.items():
+        if coluna not in df.columns:
+            continue
+        valores = df[coluna]
+        invalidos = valores[valores.notna() & ~valores.isin(categorias)]
+        if len(invalidos):
+            raise ErroEsquema(f"{origem}: valores fora do domínio de '{coluna}': {sorted(set(map(str, invalidos)))[:5]}")
+
+def aplicar_esquema(df, categorizar=True, origem='DataFrame'):
+    """
+    Converte (no próprio DataFrame) as colunas do esquema presentes em 'df' para os seus
+    tipos. Com 'categorizar' False, os textos ficam como texto simples (útil antes de
+    concatenar partes com categorias diferentes). Retorna o DataFrame.
+    """
+    validar_categorias(df, origem)
+    for coluna in df.columns.intersection(list(TIPOS_COLUNAS_PERFORMANCE)):
+        tipo = _tipo_coluna(coluna, categorizar)
+        try:
+            if coluna == COLUNA_DATA:
+                if not pd.api.types.is_datetime64_any_dtype(df[coluna]):
+                    df[coluna] = pd.to_datetime(df[coluna], format='ISO8601')
+            elif df[coluna].dtype != tipo:
+                df[coluna] = df[coluna].astype(tipo)
+        except (TypeError, ValueError) as e:
+            raise ErroEsquema(f"{origem}: coluna '{coluna}' não pode ser convertida para {tipo}: {e}") from e
+    return df
+
+def _tipo_leitura_csv(coluna, categorizar):
+    """
+    Tipo pedido ao leitor de CSV. Os inteiros anuláveis são lidos como float64 e os
+    booleanos por inferência (os dois convertidos depois), porque o leitor em C do pandas
+    é bem mais lento com tipos anuláveis; os categóricos de domínio fechado são lidos com
+    categorias inferidas e só recebem o domínio depois de validados (o leitor trocaria
+    valores desconhecidos por NaN).
+    """
+    tipo = TIPOS_COLUNAS_PERFORMANCE[coluna]
+    if tipo.startswith('Int'):
+        return 'float64'
+    if tipo == 'boolean':
+        return None
+    return _tipo_coluna(coluna, categorizar, dominio_fixo=False)
+
+def ler_csv_performance(caminho, colunas_obrigatorias=(), categorizar=True):
+    """
+    Lê um CSV de registros de performance já nos tipos do esquema (sem inferência nas
+    colunas numéricas e de texto conhecidas). O cabeçalho é conferido antes da leitura do
+    corpo, e a leitura falha (ErroEsquema) se faltar uma coluna obrigatória, se um valor
+    não couber no tipo da coluna ou se uma data estiver ausente ou inválida.
+    """
+    with open(caminho, newline='', encoding='utf-8') as arquivo:
+        cabecalho = next(csv.reader(arquivo), [])
+    verificar_colunas(cabecalho, colunas_obrigatorias, caminho)
+
+    tipos = {coluna: _tipo_leitura_csv(coluna, categorizar) for coluna in cabecalho if coluna in TIPOS_COLUNAS_PERFORMANCE and coluna != COLUNA_DATA}
+    try:
+        df = pd.read_csv(caminho, dtype={coluna: tipo for coluna, tipo in tipos.items() if tipo is not None}, engine=MOTOR_LEITURA_CSV)
+        if COLUNA_DATA in df.columns and not pd.api.types.is_datetime64_any_dtype(df[COLUNA_DATA]):
+            df[COLUNA_DATA] = pd.to_datetime(df[COLUNA_DATA], format=FORMATO_DATA)
+    except (TypeError, ValueError) as e:
+        raise ErroEsquema(f"{caminho}: {e}") from e
+    if COLUNA_DATA in df.columns and df[COLUNA_DATA].isna().any():
+        raise ErroEsquema(f"{caminho}: registros sem '{COLUNA_DATA}'.")
+    return aplicar_esquema(df, categorizar, origem=caminho)
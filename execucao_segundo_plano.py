@@ -0,0 +1,127 @@
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
+# --- Configurações ---
+
+NUM_THREADS_SEGUNDO_PLANO = 4
+TEMPO_RETENCAO_TAREFAS_S = 300
+
+class TarefaCancelada(Exception):
+    """
+    Lançada dentro de uma tarefa, em um ponto de verificação, quando ela foi substituída ou cancelada.
+    """
+
+_tarefa_atual = threading.local()
+
+# --- Pontos de verificação usados dentro das tarefas ---
+
+def informar_progresso(fracao, descricao=None):
+    """
+    Registra o progresso (0 a 1) da tarefa em execução e interrompe a tarefa se ela
+    tiver sido cancelada. Fora de uma tarefa em segundo plano, não tem efeito.
+    """
+    tarefa = getattr(_tarefa_atual, 'tarefa', None)
+    if tarefa is None:
+        return
+    if tarefa['cancelada'].is_set():
+        raise TarefaCancelada(tarefa['id'])
+    tarefa['progresso'] = fracao
+    if descricao is not None:
+        tarefa['descricao'] = descricao
+
+# --- Executor local ---
+
+class ExecutorSegundoPlano:
+    """
+    Executa tarefas em um pool de threads do próprio processo, sem broker externo.
+    Cada tarefa pertence a um grupo (por exemplo, a sessão do navegador e a visão);
+    submeter uma nova tarefa no grupo cancela a anterior, que é descartada no próximo
+    ponto de verificação (informar_progresso) ou antes mesmo de começar.
+    """
+
+    def __init__(self, num_threads=NUM_THREADS_SEGUNDO_PLANO, tempo_retencao_s=TEMPO_RETENCAO_TAREFAS_S):
+        self._pool = ThreadPoolExecutor(max_workers=num_threads, thread_name_prefix='tarefa-dashboard')
+        self._tarefas = {}
+        self._tarefa_por_grupo = {}
+        self._trava = threading.Lock()
+        self.tempo_retencao_s = tempo_retencao_s
+
+    def submeter(self, grupo, funcao, descricao=None):
+        """
+        Agenda 'funcao()' e retorna o id da tarefa.
+        """
+        tarefa = {
+            'id': uuid.uuid4().hex, 'grupo': grupo, 'cancelada': threading.Event(), 'progresso': 0.0,
+            'descricao': descricao, 'inicio': time.monotonic(), 'future': None,
+        }
+        with self._trava:
+            self._descartar_tarefas_antigas()
+            id_anterior = self._tarefa_por_grupo.get(grupo)
+            if id_anterior is not None:
+                self._cancelar(id_anterior)
+            self._tarefas[tarefa['id']] = tarefa
+            self._tarefa_por_grupo[grupo] = tarefa['id']
+            tarefa['future'] = self._pool.submit(self._executar, tarefa, funcao)
+        return tarefa['id']
+
+    def _executar(self, tarefa, funcao):
+        if tarefa['cancelada'].is_set():
+            raise TarefaCancelada(tarefa['id'])
+        _tarefa_atual.tarefa = tarefa
+        try:
+            return funcao()
+        finally:
+            _tarefa_atual.tarefa = None
+
+    def _cancelar(self, id_tarefa):
+        tarefa = self._tarefas.pop(id_tarefa, None)
+        if tarefa is not None:
+            tarefa['cancelada'].set()
+            tarefa['future'].cancel()
+            if self._tarefa_por_grupo.get(tarefa['grupo']) == id_tarefa:
+                del self._tarefa_por_grupo[tarefa['grupo']]
+
+    def cancelar(self, id_tarefa):
+        with self._trava:
+            self._cancelar(id_tarefa)
+
+    def cancelar_grupo(self, grupo):
+        with self._trava:
+            id_tarefa = self._tarefa_por_grupo.pop(grupo, None)
+            if id_tarefa is not None:
+                self._cancelar(id_tarefa)
+
+    def _descartar_tarefas_antigas(self):
+        # Só expiram as tarefas já terminadas que ninguém consultou; as em execução continuam
+        limite = time.monotonic() - self.tempo_retencao_s
+        antigas = [id_tarefa for id_tarefa, tarefa in self._tarefas.items() if tarefa['future'].done() and tarefa['inicio'] < limite]
+        for id_tarefa in antigas:
+            self._cancelar(id_tarefa)
+
+    def consultar(self, id_tarefa):
+        """
+        Retorna o estado da tarefa: {'estado': 'desconhecida' | 'executando' | 'concluida' | 'falhou',
+        'progresso', 'descricao', 'resultado' | 'erro'}. Tarefas concluídas ou com falha são
+        retiradas do executor ao serem consultadas.
+        """
+        with self._trava:
+            tarefa = self._tarefas.get(id_tarefa)
+            if tarefa is None:
+                return {'estado': 'desconhecida'}
+            future = tarefa['future']
+            if not future.done():
+                return {'estado': 'executando', 'progresso': tarefa['progresso'], 'descricao': tarefa['descricao']}
+            del self._tarefas[id_tarefa]
+            if self._tarefa_por_grupo.get(tarefa['grupo']) == id_tarefa:
+                del self._tarefa_por_grupo[tarefa['grupo']]
+
+        erro = future.exception()
+        if erro is not None:
+            return {'estado': 'falhou', 'erro': erro}
+        return {'estado': 'concluida', 'resultado': future.result()}
+
+    def tarefas_ativas(self):
+        with self._trava:
+            return len(self._tarefas)
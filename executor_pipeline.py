@@ -0,0 +1,279 @@
+import functools
+import hashlib
+import importlib
+import importlib.util
+import json
+import os
+
+import perfil_pipeline
+
+# --- Configurações ---
+
+PASTA_DADOS = 'data'
+ARQUIVO_ESTADO_PIPELINE = os.path.join(PASTA_DADOS, 'estado_pipeline.json')
+
+# Os conjuntos intermediários são particionados (armazenamento_particionado.py); cada um
+# é representado pelo seu catálogo, cujo hash muda sempre que alguma partição muda
+
+PASTA_PARTICOES = os.path.join(PASTA_DADOS, 'particoes')
+ARQUIVO_GERADO = os.path.join(PASTA_PARTICOES, 'gerados', '_catalogo.json')
+ARQUIVO_RECEBIDO = os.path.join(PASTA_PARTICOES, 'recebidos', '_catalogo.json')
+ARQUIVO_PROCESSADO = os.path.join(PASTA_PARTICOES, 'processados', '_catalogo.json')
+ARQUIVO_MODELO = os.path.join(PASTA_DADOS, 'modelo_previsao_lesao.pkl')
+ARQUIVO_CSV_FINAL = os.path.join(PASTA_PARTICOES, 'finais', '_catalogo.json')
+ARQUIVO_DB = os.path.join(PASTA_DADOS, 'dados_performance.db')
+
+# Cada etapa declara os arquivos que lê e grava. As dependências entre etapas
+# são deduzidas desses arquivos (quem grava um arquivo que outra etapa lê vem antes).
+# Módulos auxiliares usados por uma etapa entram no hash do código dela.
+# Os módulos das etapas só são importados quando a etapa é executada, para que
+# rodar uma etapa não pague o custo de importação das dependências das outras.
+# Etapas 'filtraveis' recebem os filtros de partição (elencos, temporadas, meses).
+
+ETAPAS = [
+    {'nome': 'gerar', 'titulo': 'Etapa 1: Gerando dados fictícios',
+     'modulo': 'data_generator', 'funcao': 'gerar_e_salvar_dados', 'modulos_auxiliares': ['armazenamento_particionado', 'esquema_performance'],
+     'entradas': [], 'saidas': [ARQUIVO_GERADO]},
+    {'nome': 'processar', 'titulo': 'Etapa 2: Processando e reconciliando dados',
+     'modulo': 'data_processor', 'funcao': 'executar_processamento_dados', 'modulos_auxiliares': ['metricas_carga', 'deteccao_anomalias', 'armazenamento_particionado', 'esquema_performance'],
+     'entradas': [ARQUIVO_GERADO, ARQUIVO_RECEBIDO], 'saidas': [ARQUIVO_PROCESSADO], 'filtravel': True},
+    {'nome': 'treinar', 'titulo': 'Etapa 3: Analisando e treinando modelo de ML',
+     'modulo': 'analysis_script', 'funcao': 'executar_analise_e_previsao', 'modulos_auxiliares': ['armazenamento_particionado', 'esquema_performance'],
+     'entradas': [ARQUIVO_PROCESSADO], 'saidas': [ARQUIVO_MODELO, ARQUIVO_CSV_FINAL], 'filtravel': True},
+    {'nome': 'carregar', 'titulo': 'Etapa 4: Carregando dados para o banco de dados',
+     'modulo': 'load_to_sql', 'funcao': 'carregar_dados_processados_para_sql', 'modulos_auxiliares': ['armazenamento_particionado', 'esquema_performance'],
+     'entradas': [ARQUIVO_PROCESSADO], 'saidas': [ARQUIVO_DB], 'filtravel': True},
+]
+NOMES_ETAPAS = [etapa['nome'] for etapa in ETAPAS]
+
+def obter_funcao_etapa(etapa):
+    """
+    Importa o módulo da etapa sob demanda e retorna a função que a executa.
+    """
+    return getattr(importlib.import_module(etapa['modulo']), etapa['funcao'])
+
+# --- Hashes de conteúdo ---
+
+_cache_hash_arquivos = {}
+
+def calcular_hash_arquivo(caminho):
+    """
+    Retorna o SHA-256 do conteúdo do arquivo (ou None se não existir). O resultado é
+    reaproveitado enquanto o tamanho e o mtime do arquivo não mudarem.
+    """
+    if not os.path.exists(caminho):
+        return None
+    status = os.stat(caminho)
+    assinatura = (status.st_size, status.st_mtime_ns)
+    em_cache = _cache_hash_arquivos.get(caminho)
+    if em_cache and em_cache[0] == assinatura:
+        return em_cache[1]
+
+    sha = hashlib.sha256()
+    with open(caminho, 'rb') as arquivo:
+        for bloco in iter(lambda: arquivo.read(1024 * 1024), b''):
+            sha.update(bloco)
+    _cache_hash_arquivos[caminho] = (assinatura, sha.hexdigest())
+    return sha.hexdigest()
+
+def calcular_hash_codigo(etapa):
+    """
+    Hash do código-fonte do módulo que implementa a etapa e dos seus módulos auxiliares (sem importá-los).
+    """
+    sha = hashlib.sha256()
+    for modulo in [etapa['modulo'], *etapa.get('modulos_auxiliares', [])]:
+        with open(importlib.util.find_spec(modulo).origin, 'rb') as arquivo:
+            sha.update(arquivo.read())
+    return sha.hexdigest()
+
+def calcular_assinatura_etapa(etapa, filtros=None):
+    """
+    Hash do código e das entradas da etapa. Os filtros de partição também entram na
+    assinatura: uma execução parcial não vale como execução completa (nem o contrário).
+    """
+    assinatura = {
+        'codigo': calcular_hash_codigo(etapa),
+        'entradas': {caminho: calcular_hash_arquivo(caminho) for caminho in etapa['entradas']},
+    }
+    if filtros and etapa.get('filtravel'):
+        assinatura['filtros'] = filtros
+    return assinatura
+
+# --- Estado persistido entre execuções ---
+
+def carregar_estado_pipeline(caminho=ARQUIVO_ESTADO_PIPELINE):
+    if not os.path.exists(caminho):
+        return {}
+    try:
+        with open(caminho, encoding='utf-8') as arquivo:
+            return json.load(arquivo)
+    except (OSError, json.JSONDecodeError):
+        print(f"Aviso: estado da pipeline em '{caminho}' ilegível; todas as etapas serão reexecutadas.")
+        return {}
+
+def salvar_estado_pipeline(estado, caminho=ARQUIVO_ESTADO_PIPELINE):
+    os.makedirs(os.path.dirname(caminho), exist_ok=True)
+    caminho_temporario = caminho + '.tmp'
+    with open(caminho_temporario, 'w', encoding='utf-8') as arquivo:
+        json.dump(estado, arquivo, indent=2, ensure_ascii=False)
+    os.replace(caminho_temporario, caminho)
+
+def etapa_esta_atualizada(etapa, estado, filtros=None):
+    """
+    Uma etapa pode ser pulada quando o hash do código e das entradas (e os filtros) são
+    os mesmos da última execução bem-sucedida e as saídas continuam iguais às que ela gravou.
+    """
+    registro = estado.get(etapa['nome'])
+    if not registro:
+        return False
+    if registro.get('assinatura') != calcular_assinatura_etapa(etapa, filtros):
+        return False
+    return all(
+        calcular_hash_arquivo(caminho) is not None and calcular_hash_arquivo(caminho) == hash_saida
+        for caminho, hash_saida in registro.get('saidas', {}).items()
+    )
+
+# --- Seleção de etapas (DAG) ---
+
+def etapas_dependentes(nome_etapa):
+    """
+    Retorna o nome da etapa e de todas as etapas que dependem dela, direta ou indiretamente.
+    """
+    afetadas = {nome_etapa}
+    arquivos_afetados = set()
+    for etapa in ETAPAS:
+        if etapa['nome'] in afetadas or arquivos_afetados.intersection(etapa['entradas']):
+            afetadas.add(etapa['nome'])
+            arquivos_afetados.update(etapa['saidas'])
+    return [nome for nome in NOMES_ETAPAS if nome in afetadas]
+
+def selecionar_etapas(somente=None, a_partir_de=None):
+    """
+    Define quais etapas serão consideradas e quais serão forçadas:
+    - 'somente': apenas as etapas listadas (ainda sujeitas ao cache);
+    - 'a_partir_de': a etapa indicada e todas as que dependem dela, sempre reexecutadas.
+    """
+    if somente:
+        return [nome for nome in NOMES_ETAPAS if nome in somente], set()
+    if a_partir_de:
+        dependentes = etapas_dependentes(a_partir_de)
+        return dependentes, set(dependentes)
+    return list(NOMES_ETAPAS), set()
+
+# --- Execução ---
+
+def executar_pipeline(somente=None, a_partir_de=None, forcar=False, perfil=False,
+                      usar_tracemalloc=False, usar_cprofile=False, filtros=None):
+    """
+    Executa as etapas selecionadas em ordem, pulando as que já estão atualizadas.
+    Interrompe na primeira falha; as etapas concluídas ficam registradas, e a
+    próxima execução recomeça apenas do que precisa ser recalculado.
+    Com 'filtros' ({'elencos', 'temporadas', 'meses'}), as etapas filtráveis leem e
+    regravam apenas as partições selecionadas.
+    Retorna True se todas as etapas terminaram (executadas ou puladas) com sucesso.
+    """
+    os.makedirs(PASTA_DADOS, exist_ok=True)
+    estado = carregar_estado_pipeline()
+    nomes_selecionados, nomes_forcados = selecionar_etapas(somente, a_partir_de)
+    registros_perfil = []
+    sucesso = True
+
+    for etapa in ETAPAS:
+        if etapa['nome'] not in nomes_selecionados:
+            continue
+
+        print(f"\n--- {etapa['titulo']} ---")
+        forcada = forcar or etapa['nome'] in nomes_forcados
+        if not forcada and etapa_esta_atualizada(etapa, estado, filtros):
+            print(f"Entradas e código inalterados desde a última execução; etapa '{etapa['nome']}' pulada.")
+            continue
+
+        assinatura = calcular_assinatura_etapa(etapa, filtros)
+        estado.pop(etapa['nome'], None)
+        salvar_estado_pipeline(estado)
+
+        funcao = obter_funcao_etapa(etapa)
+        if filtros and etapa.get('filtravel'):
+            funcao = functools.partial(funcao, filtros=filtros)
+        if perfil:
+            retorno, registro = perfil_pipeline.perfilar_etapa(
+                etapa['nome'], funcao, etapa['entradas'], etapa['saidas'],
+                usar_tracemalloc=usar_tracemalloc, usar_cprofile=usar_cprofile
+            )
+            registros_perfil.append(registro)
+        else:
+            retorno = funcao()
+
+        saidas_ausentes = [caminho for caminho in etapa['saidas'] if not os.path.exists(caminho)]
+        if retorno is False or saidas_ausentes:
+            print(f"Erro: a etapa '{etapa['nome']}' falhou" + (f" (saídas ausentes: {saidas_ausentes})." if saidas_ausentes else "."))
+            print("Corrija o problema e execute novamente; as etapas já concluídas serão puladas.")
+            sucesso = False
+            break
+
+        estado[etapa['nome']] = {
+            'assinatura': assinatura,
+            'saidas': {caminho: calcular_hash_arquivo(caminho) for caminho in etapa['saidas']},
+        }
+        salvar_estado_pipeline(estado)
+        print(f"--- {etapa['titulo'].split(':')[0]} Concluída ---")
+
+    if perfil and registros_perfil:
+        perfil_pipeline.imprimir_resumo_perfil(registros_perfil)
+        perfil_pipeline.salvar_relatorio_execucao(registros_perfil)
+
+    return sucesso
+
+# --- Execução em memória ---
+
+def executar_pipeline_em_memoria(persistir_intermediarios=False, perfil=False,
+                                 usar_tracemalloc=False, usar_cprofile=False):
+    """
+    Executa a pipeline completa em um único processo, passando os DataFrames
+    diretamente de uma etapa para a outra, sem reler CSVs. Os CSVs intermediários
+    só são gravados com 'persistir_intermediarios'; o modelo e o banco SQLite
+    (destino final da pipeline) são sempre gravados. Não usa o cache de etapas.
+    Retorna True se todas as etapas terminaram com sucesso.
+    """
+    os.makedirs(PASTA_DADOS, exist_ok=True)
+    registros_perfil = []
+
+    def executar(nome, titulo, funcao, df_entrada=None):
+        print(f"\n--- {titulo} (em memória) ---")
+        if perfil:
+            retorno, registro = perfil_pipeline.perfilar_etapa(
+                nome, funcao, usar_tracemalloc=usar_tracemalloc, usar_cprofile=usar_cprofile, df_entrada=df_entrada
+            )
+            registros_perfil.append(registro)
+        else:
+            retorno = funcao()
+        if retorno is False:
+            print(f"Erro: a etapa '{nome}' falhou.")
+        else:
+            print(f"--- {titulo.split(':')[0]} Concluída ---")
+        return retorno
+
+    titulos = {etapa['nome']: etapa['titulo'] for etapa in ETAPAS}
+    funcoes = {etapa['nome']: obter_funcao_etapa(etapa) for etapa in ETAPAS}
+    sucesso = False
+
+    df_gerado = executar('gerar', titulos['gerar'],
+                         functools.partial(funcoes['gerar'], salvar=persistir_intermediarios))
+    if df_gerado is not False:
+        df_processado = executar('processar', titulos['processar'],
+                                 functools.partial(funcoes['processar'], df_gerado, salvar=persistir_intermediarios),
+                                 df_entrada=df_gerado)
+        if df_processado is not False:
+            df_final = executar('treinar', titulos['treinar'],
+                                functools.partial(funcoes['treinar'], df_processado, salvar=persistir_intermediarios),
+                                df_entrada=df_processado)
+            if df_final is not False:
+                sucesso = executar('carregar', titulos['carregar'],
+                                   functools.partial(funcoes['carregar'], df_processado),
+                                   df_entrada=df_processado) is not False
+
+    if perfil and registros_perfil:
+        perfil_pipeline.imprimir_resumo_perfil(registros_perfil)
+        perfil_pipeline.salvar_relatorio_execucao(registros_perfil)
+
+    return sucesso
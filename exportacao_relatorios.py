@@ -0,0 +1,170 @@
+import argparse
+import importlib.util
+import json
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+from html import escape
+from urllib.parse import quote
+
+import dashboard_app
+from dashboard_app import (ARQUIVO_DB, FORMATOS_RELATORIO, PASTA_RELATORIOS, PASTA_RELATORIOS_JOGADORES, caminho_relatorio,
+                           garantir_plotlyjs_relatorios, gravar_arquivo_relatorio, montar_relatorio_html)
+
+# --- Configurações ---
+
+ARQUIVO_INDICE_RELATORIOS = os.path.join(PASTA_RELATORIOS, 'index.html')
+ARQUIVO_MANIFESTO_RELATORIOS = os.path.join(PASTA_RELATORIOS, '_manifesto.json')
+
+# Cada tarefa do pool consulta os seus jogadores juntos, em uma única consulta ao banco
+
+JOGADORES_POR_TAREFA = 4
+
+# --- Processos do pool ---
+
+def preparar_processo(estado=None):
+    """
+    Abre o banco somente para leitura neste processo (as conexões do processo pai não são
+    reaproveitadas) e, nos processos do pool, usa o mesmo estado dos dados do processo pai.
+    """
+    dashboard_app.engine = dashboard_app.criar_engine_dados(somente_leitura=True)
+    dashboard_app.banco_somente_leitura = True
+    if estado is not None:
+        dashboard_app.estado_dados = estado
+
+def _renderizar_tarefa(argumentos):
+    """
+    Renderiza e grava os relatórios de um grupo de jogadores; retorna os nomes renderizados.
+    """
+    caminhos, formato = argumentos
+    entradas = dashboard_app.obter_entradas_jogadores(list(caminhos))
+    renderizados = []
+    for nome, entrada in entradas.items():
+        if entrada is None:
+            continue
+        gravar_arquivo_relatorio(caminhos[nome], montar_relatorio_html(nome, entrada, formato))
+        renderizados.append(nome)
+    return renderizados
+
+# --- Índice e manifesto ---
+
+def remover_relatorios_desatualizados(estado):
+    """
+    Remove da pasta dos jogadores os relatórios que não correspondem à versão atual dos
+    dados de nenhum jogador (em nenhum formato). Retorna quantos arquivos foram removidos.
+    """
+    if not os.path.isdir(PASTA_RELATORIOS_JOGADORES):
+        return 0
+    atuais = {os.path.basename(caminho_relatorio(nome, formato, estado)) for nome in estado['nomes_jogadores'] for formato in FORMATOS_RELATORIO}
+    desatualizados = [arquivo for arquivo in os.listdir(PASTA_RELATORIOS_JOGADORES) if arquivo.endswith('.html') and arquivo not in atuais]
+    for arquivo in desatualizados:
+        os.remove(os.path.join(PASTA_RELATORIOS_JOGADORES, arquivo))
+    return len(desatualizados)
+
+def gravar_indice_relatorios(estado):
+    """
+    Grava o manifesto (jogador -> arquivo de cada formato e versão dos dados) e uma página
+    de índice com links para os relatórios atualizados de todos os jogadores.
+    """
+    jogadores = {}
+    for nome in estado['nomes_jogadores']:
+        arquivos = {formato: os.path.relpath(caminho_relatorio(nome, formato, estado), PASTA_RELATORIOS) for formato in FORMATOS_RELATORIO}
+        arquivos = {formato: arquivo for formato, arquivo in arquivos.items() if os.path.exists(os.path.join(PASTA_RELATORIOS, arquivo))}
+        if arquivos:
+            jogadores[nome] = {'posicao': estado['posicoes_jogadores'].get(nome), 'hash_dados': dashboard_app.obter_hash_jogador(nome, estado), 'arquivos': arquivos}
+
+    gravar_arquivo_relatorio(ARQUIVO_MANIFESTO_RELATORIOS, json.dumps(
+        {'data': datetime.now().isoformat(timespec='seconds'), 'jogadores': jogadores}, indent=2, ensure_ascii=False
+    ))
+
+    linhas = ''.join(
+        f"<tr><td>{escape(nome)}</td><td>{escape(str(registro['posicao'] or 'N/A'))}</td><td>"
+        + ' | '.join(f'<a href="{quote(arquivo)}">{formato}</a>' for formato, arquivo in registro['arquivos'].items())
+        + '</td></tr>'
+        for nome, registro in sorted(jogadores.items())
+    )
+    gravar_arquivo_relatorio(ARQUIVO_INDICE_RELATORIOS, f"""<!DOCTYPE html>
+<html lang="pt-BR">
+<head><meta charset="utf-8"><title>Relatórios dos Jogadores</title><style>{dashboard_app.ESTILO_RELATORIO}</style></head>
+<body><div class="pagina">
+<h1>Relatórios dos Jogadores</h1>
+<table><thead><tr><th>Jogador</th><th>Posição</th><th>Relatório</th></tr></thead><tbody>{linhas}</tbody></table>
+<p class="rodape">{len(jogadores)} jogadores. Índice gerado em {datetime.now().strftime('%Y-%m-%d %H:%M')}.</p>
+</div></body>
+</html>
+""")
+    return jogadores
+
+# --- Exportação ---
+
+def exportar_relatorios(formato='interativo', num_processos=None, jogadores=None, forcar=False, jogadores_por_tarefa=JOGADORES_POR_TAREFA):
+    """
+    Exporta o relatório estático de cada jogador (ou só dos 'jogadores' informados) para
+    PASTA_RELATORIOS, renderizando em um pool de processos (num_processos=1 roda no
+    próprio processo). A exportação é incremental: só são renderizados os jogadores sem
+    relatório para a versão atual dos seus dados (todos, com 'forcar'), e os relatórios
+    de versões anteriores são removidos. Retorna um resumo da exportação ou False em caso de erro.
+    """
+    if formato not in FORMATOS_RELATORIO:
+        print(f"Erro: formato de relatório desconhecido: '{formato}' (use {', '.join(FORMATOS_RELATORIO)}).")
+        return False
+    if formato == 'imagem' and importlib.util.find_spec('kaleido') is None:
+        print("Erro: os relatórios com imagens usam o kaleido, que não está instalado. Instale-o com: pip install kaleido")
+        return False
+    if not os.path.exists(ARQUIVO_DB):
+        print(f"Erro: banco '{ARQUIVO_DB}' não encontrado. Execute a pipeline (python main.py) antes de exportar os relatórios.")
+        return False
+
+    preparar_processo()
+    estado = dashboard_app.carregar_estado_dados()
+    if estado is None:
+        return False
+    dashboard_app.estado_dados = estado
+
+    desconhecidos = sorted(set(jogadores or []) - estado['conjunto_jogadores'])
+    if desconhecidos:
+        print(f"Aviso: jogadores sem dados no banco ignorados: {desconhecidos}")
+    nomes = [nome for nome in estado['nomes_jogadores'] if not jogadores or nome in jogadores]
+    caminhos = {nome: caminho_relatorio(nome, formato, estado) for nome in nomes}
+    pendentes = [nome for nome, caminho in caminhos.items() if forcar or not os.path.exists(caminho)]
+
+    if formato == 'interativo':
+        garantir_plotlyjs_relatorios()
+    tarefas = [
+        ({nome: caminhos[nome] for nome in pendentes[inicio:inicio + jogadores_por_tarefa]}, formato)
+        for inicio in range(0, len(pendentes), jogadores_por_tarefa)
+    ]
+
+    inicio_exportacao = time.perf_counter()
+    if num_processos == 1 or len(tarefas) <= 1:
+        renderizados = [_renderizar_tarefa(tarefa) for tarefa in tarefas]
+    else:
+        with ProcessPoolExecutor(max_workers=num_processos, initializer=preparar_processo, initargs=(estado,)) as pool:
+            renderizados = list(pool.map(_renderizar_tarefa, tarefas))
+    tempo_s = time.perf_counter() - inicio_exportacao
+    renderizados = [nome for parcial in renderizados for nome in parcial]
+
+    removidos = remover_relatorios_desatualizados(estado)
+    indice = gravar_indice_relatorios(estado)
+    print(f"{len(renderizados)} relatório(s) renderizado(s) em {tempo_s:.2f} s, {len(nomes) - len(pendentes)} já atualizado(s), "
+          f"{removidos} desatualizado(s) removido(s). Índice: {ARQUIVO_INDICE_RELATORIOS}")
+    return {
+        'jogadores': len(nomes),
+        'renderizados': renderizados,
+        'atualizados': len(nomes) - len(pendentes),
+        'removidos': removidos,
+        'indexados': len(indice),
+        'tempo_s': tempo_s,
+    }
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Exporta os perfis dos jogadores como relatórios HTML estáticos.")
+    parser.add_argument('--formato', choices=FORMATOS_RELATORIO, default='interativo',
+                        help="Gráficos interativos (plotly.js) ou imagens PNG (requer o kaleido).")
+    parser.add_argument('--processos', type=int, help="Processos do pool (padrão: um por CPU).")
+    parser.add_argument('--jogador', dest='jogadores', nargs='+', help="Exporta apenas estes jogadores.")
+    parser.add_argument('--forcar', action='store_true', help="Renderiza novamente mesmo os relatórios já atualizados.")
+    args = parser.parse_args()
+
+    raise SystemExit(0 if exportar_relatorios(args.formato, args.processos, args.jogadores, args.forcar) else 1)
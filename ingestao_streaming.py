@@ -0,0 +1,487 @@
+import argparse
+import copy
+import functools
+import glob
+import hashlib
+import json
+import os
+import queue
+import socketserver
+import threading
+import time
+
+import pandas as pd
+
+from armazenamento_particionado import (COLUNAS_PARTICAO, CONJUNTO_PROCESSADO, CONJUNTO_RECEBIDO, adicionar_chaves_particao,
+                                        consultar_particoes, gravar_conjunto, gravar_particoes_sql)
+from esquema_performance import COLUNAS_SESSAO, ErroEsquema, aplicar_esquema, ler_csv_performance, verificar_colunas
+from data_processor import COLUNAS_FINAIS, COLUNAS_NUMERICAS_PARA_PREENCHER, calcular_risco_lesao, garantir_tipos, padronizar_nome
+from deteccao_anomalias import JANELA_ANOMALIAS, METRICAS_MONITORADAS, detectar_anomalias
+from load_to_sql import (ARQUIVO_DB, NOME_TABELA, NOME_TABELA_VERSOES, NOME_TABELA_SITUACAO_ATUAL, NOME_TABELA_CARGA_DIARIA,
+                         NOME_TABELA_ACWR_SEMANAL, calcular_agregados_elenco)
+from metricas_carga import COLUNA_CARGA, EstadoCarga
+
+# --- Configurações ---
+
+PASTA_DADOS = 'data'
+PASTA_ENTRADA_STREAMING = os.path.join(PASTA_DADOS, 'entrada_streaming')
+PASTA_PROCESSADOS_STREAMING = os.path.join(PASTA_ENTRADA_STREAMING, 'processados')
+PASTA_REJEITADOS_STREAMING = os.path.join(PASTA_ENTRADA_STREAMING, 'rejeitados')
+HOST_STREAMING = '127.0.0.1'
+PORTA_STREAMING = 8052
+INTERVALO_MICRO_LOTE_S = 1.0
+MAX_REGISTROS_POR_LOTE = 5000
+NOME_TABELA_PREVISOES = 'previsoes_streaming'
+
+# Campos sem os quais uma sessão recebida não pode ser atribuída (os numéricos ausentes são preenchidos)
+
+COLUNAS_IDENTIFICACAO_SESSAO = ['Nome_Jogador', 'Posicao', 'Data']
+
+# Registros guardados na janela de cada jogador e colunas gravadas pela detecção de anomalias
+
+COLUNAS_JANELA = ['Nome_Padronizado', 'Posicao', 'Data', *METRICAS_MONITORADAS]
+COLUNAS_ANOMALIAS = [configuracao[chave] for configuracao in METRICAS_MONITORADAS.values()
+                     for chave in ('media', 'desvio', 'alerta') if chave in configuracao]
+
+# Histórico de lesões de cada sessão, derivado do estado (como no gerador) quando a sessão não o traz
+
+COLUNAS_HISTORICO_LESOES = ['Num_Lesoes_Anteriores', 'Dias_Desde_Ultima_Lesao']
+
+# Colunas das sessões aceitas guardadas em CONJUNTO_RECEBIDO (como chegaram, com o histórico de lesões derivado)
+
+COLUNAS_SESSOES_RECEBIDAS = [*COLUNAS_SESSAO, 'Fonte', *COLUNAS_HISTORICO_LESOES, *COLUNAS_PARTICAO]
+
+# Os nomes recebidos se repetem a cada sessão; a reconciliação (fuzzy) roda uma vez por nome
+
+padronizar_nome_em_cache = functools.lru_cache(maxsize=1024)(padronizar_nome)
+
+# --- Estado incremental por jogador ---
+
+def tipos_atividade(df):
+    """
+    Tipo de atividade de cada sessão como texto ('' quando ausente), parte da chave de sessões repetidas.
+    """
+    if 'Tipo_Atividade' not in df.columns:
+        return pd.Series('', index=df.index, dtype=object)
+    return df['Tipo_Atividade'].astype(object).where(df['Tipo_Atividade'].notna(), '').astype(str)
+
+class EstadoIncremental:
+    """
+    Estado mínimo para processar novas sessões sem reler o histórico: os últimos
+    JANELA_ANOMALIAS - 1 registros de cada jogador (para as janelas móveis da detecção de
+    anomalias) e o estado dos detectores antes deles (EWMA), a data mais recente de cada
+    jogador e os tipos de atividade já registrados nessa data, o número de lesões e a data
+    da última lesão de cada jogador, as somas por posição usadas para preencher valores
+    ausentes (a média por posição do processamento em lote, mantida de forma incremental)
+    e o estado das métricas de carga (EstadoCarga).
+    """
+
+    def __init__(self, janelas, ultimas_datas, somas_posicao, carga, anomalias, atividades_ultima_data=None,
+                 num_lesoes=None, ultimas_lesoes=None):
+        self.janelas = janelas
+        self.ultimas_datas = ultimas_datas
+        self.atividades_ultima_data = atividades_ultima_data if atividades_ultima_data is not None else {}
+        self.num_lesoes = num_lesoes if num_lesoes is not None else {}
+        self.ultimas_lesoes = ultimas_lesoes if ultimas_lesoes is not None else {}
+        self.somas_posicao = somas_posicao
+        self.carga = carga
+        self.anomalias = anomalias
+
+    @classmethod
+    def carregar(cls, engine):
+        from sqlalchemy import text
+
+        colunas_historico = ', '.join(f'"{coluna}"' for coluna in dict.fromkeys(
+            [*COLUNAS_JANELA, 'Tipo_Atividade', 'Lesao_Ocorreu', 'Num_Lesoes_Anteriores', COLUNA_CARGA]))
+        with engine.connect() as conexao:
+            agregados_posicao = pd.read_sql(text(
+                'SELECT "Posicao", ' + ', '.join(f'SUM("{coluna}") AS "soma_{coluna}", COUNT("{coluna}") AS "n_{coluna}"' for coluna in COLUNAS_NUMERICAS_PARA_PREENCHER)
+                + f' FROM {NOME_TABELA} GROUP BY "Posicao"'
+            ), conexao)
+            historico = pd.read_sql(text(
+                f'SELECT {colunas_historico} FROM {NOME_TABELA} ORDER BY "Nome_Padronizado", "Data"'
+            ), conexao, parse_dates=['Data'])
+
+        # O estado de carga guarda só as EWMA e as cargas diárias recentes de cada jogador
+        carga = EstadoCarga()
+        carga.processar(historico['Nome_Padronizado'].to_numpy(), historico['Data'], historico[COLUNA_CARGA])
+
+        # Os detectores percorrem o histórico uma vez, para o estado antes da janela de cada jogador
+        anomalias = {}
+        detectar_anomalias(historico, estado_detectores=anomalias, registros_retidos=JANELA_ANOMALIAS - 1)
+        janelas = historico[COLUNAS_JANELA].groupby('Nome_Padronizado').tail(JANELA_ANOMALIAS - 1).reset_index(drop=True)
+
+        somas_posicao = {
+            (linha['Posicao'], coluna): [float(linha[f'soma_{coluna}'] or 0.0), int(linha[f'n_{coluna}'])]
+            for _, linha in agregados_posicao.iterrows() for coluna in COLUNAS_NUMERICAS_PARA_PREENCHER
+        }
+        ultimas_datas = historico.groupby('Nome_Padronizado')['Data'].max().to_dict()
+        na_ultima_data = historico[historico['Data'] == historico['Nome_Padronizado'].map(ultimas_datas)]
+        atividades_ultima_data = tipos_atividade(na_ultima_data).groupby(na_ultima_data['Nome_Padronizado']).agg(set).to_dict()
+
+        # O número de lesões é o da sessão mais recente de cada jogador (o gerador já conta a lesão da própria sessão)
+        ultimas_sessoes = historico.groupby('Nome_Padronizado').tail(1)
+        num_lesoes = dict(zip(ultimas_sessoes['Nome_Padronizado'],
+                              pd.to_numeric(ultimas_sessoes['Num_Lesoes_Anteriores'], errors='coerce').fillna(0).astype(int).tolist()))
+        com_lesao = historico[historico['Lesao_Ocorreu'].fillna(False).astype(bool)]
+        ultimas_lesoes = com_lesao.groupby('Nome_Padronizado')['Data'].max().to_dict()
+        return cls(janelas, ultimas_datas, somas_posicao, carga, anomalias, atividades_ultima_data, num_lesoes, ultimas_lesoes)
+
+    def copiar(self):
+        """
+        Cópia independente do estado: cada micro-lote é processado sobre uma cópia, que só
+        substitui o estado em uso depois que o lote é gravado no banco.
+        """
+        return copy.deepcopy(self)
+
+    def _derivar_historico_lesoes(self, lote):
+        """
+        Número de lesões e dias desde a última lesão de cada sessão (ordenadas por jogador e
+        data), como no gerador: a lesão da própria sessão já conta. Valores informados na
+        sessão são mantidos; o histórico do estado avança com as lesões do lote. Sem lesão
+        anterior, os dias ficam ausentes e são preenchidos pela média da posição.
+        """
+        informados = {coluna: pd.to_numeric(lote[coluna], errors='coerce') if coluna in lote.columns else pd.Series(float('nan'), index=lote.index)
+                      for coluna in COLUNAS_HISTORICO_LESOES}
+        lesoes = lote['Lesao_Ocorreu'].fillna(False).astype(bool) if 'Lesao_Ocorreu' in lote.columns else pd.Series(False, index=lote.index)
+
+        num_lesoes, dias_desde_ultima = [], []
+        for nome, data, lesao, num_informado, dias_informados in zip(
+            lote['Nome_Padronizado'], lote['Data'], lesoes, informados['Num_Lesoes_Anteriores'], informados['Dias_Desde_Ultima_Lesao']
+        ):
+            if lesao:
+                self.num_lesoes[nome] = self.num_lesoes.get(nome, 0) + 1
+                self.ultimas_lesoes[nome] = data
+            if pd.notna(num_informado):
+                self.num_lesoes[nome] = int(num_informado)
+            if pd.notna(dias_informados):
+                self.ultimas_lesoes[nome] = data - pd.Timedelta(days=float(dias_informados))
+            ultima_lesao = self.ultimas_lesoes.get(nome)
+            num_lesoes.append(self.num_lesoes.get(nome, 0))
+            dias_desde_ultima.append((data - ultima_lesao).days if ultima_lesao is not None else float('nan'))
+
+        lote['Num_Lesoes_Anteriores'] = num_lesoes
+        lote['Dias_Desde_Ultima_Lesao'] = pd.Series(dias_desde_ultima, index=lote.index, dtype='float64').where(
+            informados['Dias_Desde_Ultima_Lesao'].isna(), informados['Dias_Desde_Ultima_Lesao'])
+        return lote
+
+    def _preencher_faltantes(self, lote):
+        """
+        Preenche os valores ausentes com a média da posição (histórico + sessões já recebidas)
+        e atualiza as somas com os valores presentes no lote.
+        """
+        for coluna in COLUNAS_NUMERICAS_PARA_PREENCHER:
+            if coluna not in lote.columns:
+                lote[coluna] = float('nan')
+            valores = pd.to_numeric(lote[coluna], errors='coerce').astype('float64')
+            presentes = valores.notna()
+            for posicao, (soma, n) in valores[presentes].groupby(lote.loc[presentes, 'Posicao']).agg(['sum', 'count']).iterrows():
+                acumulado = self.somas_posicao.setdefault((posicao, coluna), [0.0, 0])
+                acumulado[0] += soma
+                acumulado[1] += n
+
+            medias = {posicao: soma / n for (posicao, coluna_soma), (soma, n) in self.somas_posicao.items() if coluna_soma == coluna and n}
+            soma_total = sum(soma for (_, coluna_soma), (soma, _) in self.somas_posicao.items() if coluna_soma == coluna)
+            n_total = sum(n for (_, coluna_soma), (_, n) in self.somas_posicao.items() if coluna_soma == coluna)
+            lote[coluna] = valores.fillna(lote['Posicao'].map(medias)).fillna(soma_total / n_total if n_total else 0.0)
+        return lote
+
+    def processar(self, lote_bruto):
+        """
+        Reconcilia, completa e analisa um micro-lote de sessões com as mesmas regras do
+        processamento em lote (data_processor.py), usando apenas o estado incremental.
+        Sessões anteriores à última data já registrada do jogador são descartadas, assim
+        como as repetidas (mesmo jogador, data e tipo de atividade de uma sessão já
+        registrada ou já presente no lote), por exemplo ao reenviar um arquivo ou um dia.
+        Retorna (lote processado, sessões aceitas como recebidas, número de sessões descartadas).
+        """
+        lote = lote_bruto.copy()
+        lote['Data'] = pd.to_datetime(lote['Data'], errors='coerce', format='ISO8601')
+        lote = lote.dropna(subset=['Nome_Jogador', 'Data', 'Posicao'])
+        lote['Nome_Padronizado'] = lote['Nome_Jogador'].map(padronizar_nome_em_cache)
+        adicionar_chaves_particao(lote)
+
+        ultima_data = lote['Nome_Padronizado'].map(self.ultimas_datas)
+        fora_de_ordem = ultima_data.notna() & (lote['Data'] < ultima_data)
+        tipos = tipos_atividade(lote)
+        ja_registrada = (lote['Data'] == ultima_data) & pd.Series(
+            [tipo in self.atividades_ultima_data.get(nome, ()) for nome, tipo in zip(lote['Nome_Padronizado'], tipos)], index=lote.index)
+        repetida_no_lote = pd.DataFrame({'nome': lote['Nome_Padronizado'], 'data': lote['Data'], 'tipo': tipos}).duplicated()
+        descartar = fora_de_ordem | ja_registrada | repetida_no_lote
+        descartadas = int(descartar.sum()) + len(lote_bruto) - len(lote)
+        lote = lote[~descartar].sort_values(['Nome_Padronizado', 'Data'], kind='stable').reset_index(drop=True)
+        if lote.empty:
+            return lote, lote, descartadas
+
+        self._derivar_historico_lesoes(lote)
+        if 'Fonte' not in lote.columns:
+            lote['Fonte'] = 'Streaming'
+        sessoes = lote[[coluna for coluna in COLUNAS_SESSOES_RECEBIDAS if coluna in lote.columns]].copy()
+        self._preencher_faltantes(lote)
+        garantir_tipos(lote)
+        for coluna, valores in self.carga.processar(lote['Nome_Padronizado'].to_numpy(), lote['Data'], lote[COLUNA_CARGA]).items():
+            lote[coluna] = valores
+
+        # Médias e desvios móveis e alertas: janela do estado seguida das novas sessões de
+        # cada jogador (a detecção também avança o estado dos detectores até a nova janela)
+
+        combinado = pd.concat([self.janelas.assign(_novo=False), lote[COLUNAS_JANELA].assign(_novo=True)],
+                              ignore_index=True).sort_values(['Nome_Padronizado', 'Data'], kind='stable').reset_index(drop=True)
+        detectar_anomalias(combinado, estado_detectores=self.anomalias, registros_retidos=JANELA_ANOMALIAS - 1)
+        novos = combinado['_novo'].to_numpy()
+        for coluna in COLUNAS_ANOMALIAS:
+            lote[coluna] = combinado[coluna].to_numpy()[novos]
+
+        calcular_risco_lesao(lote)
+
+        # Atualiza o estado: últimos registros, data mais recente de cada jogador e atividades nessa data
+
+        self.janelas = combinado[COLUNAS_JANELA].groupby('Nome_Padronizado').tail(JANELA_ANOMALIAS - 1).reset_index(drop=True)
+        novas_ultimas_datas = lote.groupby('Nome_Padronizado')['Data'].max().to_dict()
+        na_ultima_data = lote[lote['Data'] == lote['Nome_Padronizado'].map(novas_ultimas_datas)]
+        for nome, tipos_dia in tipos_atividade(na_ultima_data).groupby(na_ultima_data['Nome_Padronizado']).agg(set).items():
+            anteriores = self.atividades_ultima_data.get(nome, set()) if self.ultimas_datas.get(nome) == novas_ultimas_datas[nome] else set()
+            self.atividades_ultima_data[nome] = anteriores | tipos_dia
+        self.ultimas_datas.update(novas_ultimas_datas)
+        return lote[[coluna for coluna in COLUNAS_FINAIS if coluna in lote.columns]], sessoes, descartadas
+
+# --- Pontuação do modelo e gravação ---
+
+def pontuar_lote(lote):
+    """
+    Probabilidade de lesão do modelo treinado para cada sessão, ou None se o modelo ainda
+    não existir ou tiver sido treinado com outras features.
+    """
+    from servico_previsao import ModeloDesatualizado, pontuar_sessoes
+    try:
+        previsoes = pontuar_sessoes(lote)
+    except FileNotFoundError:
+        return None
+    except ModeloDesatualizado as e:
+        print(f"Aviso: previsões do micro-lote não gravadas: {e}")
+        return None
+    return pd.concat([lote[['Nome_Padronizado', 'Data']].reset_index(drop=True), pd.DataFrame(previsoes)], axis=1)
+
+def atualizar_versoes_jogadores(conexao, lote):
+    """
+    Encadeia o hash de cada jogador com o hash das novas sessões, para que o dashboard
+    recarregue apenas os jogadores que receberam dados.
+    """
+    from sqlalchemy import text
+
+    hashes_linhas = pd.util.hash_pandas_object(lote, index=False).to_numpy()
+    nomes = sorted(lote['Nome_Padronizado'].unique())
+    parametros = {f'nome_{i}': nome for i, nome in enumerate(nomes)}
+    filtro = f'"Nome_Padronizado" IN ({", ".join(":" + chave for chave in parametros)})'
+    anteriores = {nome: (hash_dados, linhas) for nome, hash_dados, linhas in conexao.execute(
+        text(f'SELECT "Nome_Padronizado", "Hash_Dados", "Linhas" FROM {NOME_TABELA_VERSOES} WHERE {filtro}'), parametros
+    )}
+
+    versoes = []
+    for nome, posicoes in lote.groupby('Nome_Padronizado').indices.items():
+        hash_anterior, linhas = anteriores.get(nome, ('', 0))
+        hash_novo = hashlib.sha256(hash_anterior.encode() + hashes_linhas[posicoes].tobytes()).hexdigest()[:16]
+        versoes.append({'Nome_Padronizado': nome, 'Hash_Dados': hash_novo, 'Linhas': linhas + len(posicoes)})
+
+    conexao.execute(text(f'DELETE FROM {NOME_TABELA_VERSOES} WHERE {filtro}'), parametros)
+    pd.DataFrame(versoes).to_sql(NOME_TABELA_VERSOES, conexao, if_exists='append', index=False)
+
+def atualizar_agregados_elenco(conexao, lote):
+    """
+    Recalcula os agregados do elenco apenas a partir da semana da sessão mais antiga do lote
+    e a situação atual apenas dos jogadores do lote.
+    """
+    from sqlalchemy import inspect, text
+
+    if not {NOME_TABELA_SITUACAO_ATUAL, NOME_TABELA_CARGA_DIARIA, NOME_TABELA_ACWR_SEMANAL} <= set(inspect(conexao).get_table_names()):
+        return
+
+    data_inicial = lote['Data'].min()
+    inicio_semana = (data_inicial - pd.Timedelta(days=data_inicial.dayofweek)).normalize()
+    parametros = {'inicio': str(inicio_semana)}
+    cauda = consultar_particoes(conexao, filtros={'data_inicio': inicio_semana})
+    agregados = calcular_agregados_elenco(cauda)
+
+    conexao.execute(text(f'DELETE FROM {NOME_TABELA_CARGA_DIARIA} WHERE "Data" >= :inicio'), parametros)
+    conexao.execute(text(f'DELETE FROM {NOME_TABELA_ACWR_SEMANAL} WHERE "Semana" >= :inicio'), parametros)
+    agregados[NOME_TABELA_CARGA_DIARIA].to_sql(NOME_TABELA_CARGA_DIARIA, conexao, if_exists='append', index=False)
+    agregados[NOME_TABELA_ACWR_SEMANAL].to_sql(NOME_TABELA_ACWR_SEMANAL, conexao, if_exists='append', index=False)
+
+    situacao = agregados[NOME_TABELA_SITUACAO_ATUAL]
+    situacao = situacao[situacao['Nome_Padronizado'].isin(lote['Nome_Padronizado'].unique())]
+    parametros_nomes = {f'nome_{i}': nome for i, nome in enumerate(situacao['Nome_Padronizado'])}
+    if parametros_nomes:
+        conexao.execute(text(
+            f'DELETE FROM {NOME_TABELA_SITUACAO_ATUAL} WHERE "Nome_Padronizado" IN ({", ".join(":" + chave for chave in parametros_nomes)})'
+        ), parametros_nomes)
+        situacao.to_sql(NOME_TABELA_SITUACAO_ATUAL, conexao, if_exists='append', index=False)
+
+def gravar_lote(engine, lote, sessoes, previsoes=None):
+    """
+    Acrescenta as sessões processadas às partições do banco (elenco, temporada e mês) e
+    atualiza, na mesma transação, as versões por jogador e os agregados do elenco. O
+    dashboard em execução detecta a mudança e recarrega apenas os jogadores alterados.
+    Antes do commit, as sessões também são acrescentadas às partições em arquivo: as
+    processadas a CONJUNTO_PROCESSADO e as recebidas a CONJUNTO_RECEBIDO, de onde a
+    próxima execução da pipeline as reprocessa (sem isso, a etapa de carga reconstruiria
+    o banco sem elas). Se a gravação dos arquivos falhar, a transação é desfeita.
+    """
+    with engine.begin() as conexao:
+        gravar_particoes_sql(conexao, lote, acrescentar=True)
+        if previsoes is not None:
+            previsoes.to_sql(NOME_TABELA_PREVISOES, conexao, if_exists='append', index=False)
+        atualizar_versoes_jogadores(conexao, lote)
+        atualizar_agregados_elenco(conexao, lote)
+
+        # As sessões recebidas são a fonte da verdade e são gravadas por último: se só o
+        # conjunto processado for gravado, a próxima execução da pipeline o refaz
+        gravar_conjunto(lote.copy(), CONJUNTO_PROCESSADO, acrescentar=True)
+        gravar_conjunto(sessoes.copy(), CONJUNTO_RECEBIDO, acrescentar=True)
+
+# --- Fontes: pasta de entrada e socket ---
+
+def ler_arquivos_pendentes(pasta, limite_registros=MAX_REGISTROS_POR_LOTE):
+    """
+    Lê os arquivos .csv e .jsonl da pasta (em ordem de nome) até 'limite_registros', nos
+    tipos do esquema do registro de performance; um arquivo fora do esquema é rejeitado
+    por inteiro. Arquivos ainda sendo escritos devem usar outro nome e ser renomeados ao final.
+    Retorna (registros, arquivos lidos, arquivos rejeitados).
+    """
+    arquivos = sorted(glob.glob(os.path.join(pasta, '*.csv')) + glob.glob(os.path.join(pasta, '*.jsonl')))
+    partes, lidos, rejeitados, total = [], [], [], 0
+    for arquivo in arquivos:
+        if total >= limite_registros:
+            break
+        try:
+            if arquivo.endswith('.jsonl'):
+                parte = aplicar_esquema(pd.read_json(arquivo, lines=True, dtype=False), categorizar=False, origem=arquivo)
+                verificar_colunas(parte.columns, COLUNAS_IDENTIFICACAO_SESSAO, arquivo)
+            else:
+                parte = ler_csv_performance(arquivo, COLUNAS_IDENTIFICACAO_SESSAO, categorizar=False)
+        except (ValueError, OSError) as e:
+            print(f"Aviso: arquivo '{arquivo}' rejeitado: {e}")
+            rejeitados.append(arquivo)
+            continue
+        partes.append(parte)
+        lidos.append(arquivo)
+        total += len(parte)
+    return (pd.concat(partes, ignore_index=True) if partes else pd.DataFrame()), lidos, rejeitados
+
+def mover_arquivos(arquivos, pasta_destino):
+    os.makedirs(pasta_destino, exist_ok=True)
+    for arquivo in arquivos:
+        os.replace(arquivo, os.path.join(pasta_destino, os.path.basename(arquivo)))
+
+def iniciar_servidor_socket(fila, host=HOST_STREAMING, porta=PORTA_STREAMING):
+    """
+    Recebe sessões por TCP, um objeto JSON por linha, e as coloca em 'fila'.
+    """
+    class ReceptorSessoes(socketserver.StreamRequestHandler):
+        def handle(self):
+            for linha in self.rfile:
+                if not linha.strip():
+                    continue
+                try:
+                    fila.put(json.loads(linha))
+                except json.JSONDecodeError:
+                    print(f"Aviso: linha inválida recebida de {self.client_address[0]} ignorada.")
+
+    socketserver.ThreadingTCPServer.allow_reuse_address = True
+    servidor = socketserver.ThreadingTCPServer((host, porta), ReceptorSessoes)
+    servidor.daemon_threads = True
+    threading.Thread(target=servidor.serve_forever, name='receptor-streaming', daemon=True).start()
+    print(f"Recebendo sessões por socket em {host}:{porta} (JSON por linha)")
+    return servidor
+
+def drenar_fila(fila, limite_registros=MAX_REGISTROS_POR_LOTE):
+    """
+    Sessões recebidas pelo socket, nos tipos do esquema; as que não seguem o esquema são
+    descartadas com um aviso (sem elas, o micro-lote inteiro falharia a cada tentativa).
+    """
+    registros = []
+    while len(registros) < limite_registros:
+        try:
+            registros.append(fila.get_nowait())
+        except queue.Empty:
+            break
+    try:
+        return aplicar_esquema(pd.DataFrame(registros), categorizar=False, origem='socket')
+    except ErroEsquema:
+        pass
+
+    validos = []
+    for registro in registros:
+        try:
+            validos.append(aplicar_esquema(pd.DataFrame([registro]), categorizar=False, origem='socket'))
+        except ErroEsquema as e:
+            print(f"Aviso: sessão recebida pelo socket descartada: {e}")
+    return pd.concat(validos, ignore_index=True) if validos else pd.DataFrame()
+
+# --- Laço de ingestão ---
+
+def executar_ingestao_streaming(pasta=PASTA_ENTRADA_STREAMING, porta=None, intervalo_s=INTERVALO_MICRO_LOTE_S,
+                                caminho_db=ARQUIVO_DB, parar=None):
+    """
+    A cada 'intervalo_s', junta as sessões novas da pasta de entrada (e do socket, se
+    'porta' for informada) em um micro-lote, processa com o estado incremental e grava
+    no banco. Um lote que falha (por exemplo, com o banco bloqueado por uma etapa da
+    pipeline) não altera o estado: os arquivos ficam na pasta e as sessões do socket são
+    guardadas, e o lote é tentado novamente no próximo intervalo. Roda até Ctrl+C ou até
+    o evento 'parar' ser acionado.
+    """
+    from sqlalchemy import create_engine, inspect
+
+    inspetor = inspect(create_engine(f'sqlite:///{caminho_db}')) if os.path.exists(caminho_db) else None
+    if inspetor is None or NOME_TABELA not in inspetor.get_table_names() + inspetor.get_view_names():
+        print(f"Erro: banco '{caminho_db}' sem a tabela '{NOME_TABELA}'. Execute a pipeline (python main.py) antes da ingestão em streaming.")
+        return False
+
+    engine = create_engine(f'sqlite:///{caminho_db}')
+    estado = EstadoIncremental.carregar(engine)
+    print(f"Estado incremental carregado: {len(estado.ultimas_datas)} jogadores.")
+
+    os.makedirs(pasta, exist_ok=True)
+    fila = queue.Queue()
+    servidor = iniciar_servidor_socket(fila, porta=porta) if porta else None
+    parar = parar or threading.Event()
+    print(f"Aguardando sessões em '{pasta}' (micro-lotes a cada {intervalo_s} s). Ctrl+C para encerrar.")
+
+    registros_socket = pd.DataFrame()
+    try:
+        while not parar.wait(intervalo_s):
+            registros_arquivos, arquivos, rejeitados = ler_arquivos_pendentes(pasta)
+            mover_arquivos(rejeitados, PASTA_REJEITADOS_STREAMING)
+            registros_socket = pd.concat([registros_socket, drenar_fila(fila)], ignore_index=True)
+            registros = pd.concat([registros_arquivos, registros_socket], ignore_index=True)
+            if registros.empty:
+                mover_arquivos(arquivos, PASTA_PROCESSADOS_STREAMING)
+                continue
+
+            inicio = time.perf_counter()
+            try:
+                novo_estado = estado.copiar()
+                lote, sessoes, descartadas = novo_estado.processar(registros)
+                if not lote.empty:
+                    gravar_lote(engine, lote, sessoes, pontuar_lote(lote))
+            except Exception as e:
+                print(f"Erro no micro-lote ({len(registros)} sessões), que será tentado novamente: {e}")
+                continue
+            estado = novo_estado
+            registros_socket = pd.DataFrame()
+            mover_arquivos(arquivos, PASTA_PROCESSADOS_STREAMING)
+            print(f"Micro-lote: {len(lote)} sessões de {lote['Nome_Padronizado'].nunique() if len(lote) else 0} jogadores gravadas "
+                  f"({descartadas} descartadas) em {(time.perf_counter() - inicio) * 1000:.0f} ms")
+    except KeyboardInterrupt:
+        print("\nIngestão em streaming encerrada.")
+    finally:
+        if servidor is not None:
+            servidor.shutdown()
+    return True
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Ingestão em streaming de novas sessões (pasta de entrada e/ou socket).")
+    parser.add_argument('--pasta', default=PASTA_ENTRADA_STREAMING, help="Pasta observada (arquivos .csv ou .jsonl).")
+    parser.add_argument('--porta', type=int, help=f"Também recebe sessões por TCP nesta porta (por exemplo, {PORTA_STREAMING}).")
+    parser.add_argument('--intervalo', type=float, default=INTERVALO_MICRO_LOTE_S, help="Segundos entre micro-lotes.")
+    args = parser.parse_args()
+    raise SystemExit(0 if executar_ingestao_streaming(args.pasta, args.porta, args.intervalo) else 1)
@@ -1,42 +1,132 @@
 import pandas as pd
-from sqlalchemy import create_engine
 import os
 
+from armazenamento_particionado import (CONJUNTO_PROCESSADO, COLUNA_ELENCO, COLUNA_TEMPORADA, NOME_TABELA, caminho_catalogo,
+                                        adicionar_chaves_particao, calcular_versoes_jogadores, consultar_particoes, criar_indices_particoes, gravar_particoes_sql,
+                                        ler_conjunto, listar_particoes_sql, selecionar_linhas)
+from esquema_performance import COLUNAS_SESSAO
+from perfil_pipeline import marcar_subetapa
+
 # --- Configurações ---
 PASTA_DADOS = 'data'
-ARQUIVO_CSV_PROCESSADO = os.path.join(PASTA_DADOS, 'performance_reconciliada_e_analisada.csv')
+ARQUIVO_CSV_PROCESSADO = caminho_catalogo(CONJUNTO_PROCESSADO)
 ARQUIVO_DB = os.path.join(PASTA_DADOS, 'dados_performance.db')
-NOME_TABELA = 'performance_atletas'
+NOME_TABELA_VERSOES = 'versao_dados_jogadores'
+COLUNAS_OBRIGATORIAS_CARGA = ['Nome_Padronizado', *COLUNAS_SESSAO]
+
+# Agregados do elenco pré-calculados na carga, lidos pela visão do elenco no dashboard
+# (calculados sobre a temporada atual de cada elenco)
+
+NOME_TABELA_SITUACAO_ATUAL = 'elenco_situacao_atual'
+NOME_TABELA_CARGA_DIARIA = 'elenco_carga_diaria'
+NOME_TABELA_ACWR_SEMANAL = 'elenco_acwr_semanal_posicao'
 
-def carregar_dados_processados_para_sql():
+def criar_indice_consultas(engine):
     """
-    Carrega dados de performance processados de um arquivo CSV para um banco de dados SQLite.
+    Cria (se ainda não existirem) os índices por jogador e data de cada partição, usados pelas consultas do dashboard.
+    """
+    with engine.begin() as conexao:
+        criar_indices_particoes(conexao, list(listar_particoes_sql(conexao)))
+
+def calcular_agregados_elenco(df):
+    """
+    Calcula, com agregações agrupadas do pandas (sem laços por jogador), os agregados
+    usados pela visão do elenco:
+    - situação atual de cada jogador (último registro: posição, risco, ACWR e métricas de carga);
+    - carga diária da equipe (totais de distância, sprints e minutos e ACWR médio);
+    - ACWR semanal por posição (média e máximo, semanas iniciando na segunda-feira).
+    Retorna {nome_tabela: DataFrame}.
+    """
+    df = df.sort_values(['Nome_Padronizado', 'Data'], kind='stable')
+    datas = pd.to_datetime(df['Data'])
+
+    colunas_situacao = [
+        'Nome_Padronizado', 'Posicao', 'Data', 'Pontuacao_Risco_Lesao', 'Categoria_Risco_Lesao',
+        'Relacao_Carga_Aguda_Cronica', 'Relacao_Carga_Aguda_Cronica_EWMA', 'Monotonia_Treino', 'Tensao_Treino',
+        'Num_Lesoes_Anteriores', 'Dias_Desde_Ultima_Lesao'
+    ]
+    situacao_atual = df.drop_duplicates('Nome_Padronizado', keep='last')[
+        [coluna for coluna in colunas_situacao if coluna in df.columns]
+    ].sort_values('Pontuacao_Risco_Lesao', ascending=False, kind='stable')
+
+    carga_diaria = df.groupby(datas.rename('Data'), sort=True).agg(
+        Distancia_Total_km=('Distancia_Percorrida_(km)', 'sum'),
+        Sprints_Total=('Num_Sprints', 'sum'),
+        Minutos_Total=('Minutos_Jogados', 'sum'),
+        ACWR_Medio=('Relacao_Carga_Aguda_Cronica', 'mean'),
+        Jogadores=('Nome_Padronizado', 'nunique'),
+    ).reset_index()
+
+    semana = (datas - pd.to_timedelta(datas.dt.dayofweek, unit='D')).dt.normalize().rename('Semana')
+    acwr_semanal = df.groupby([semana, df['Posicao']], sort=True).agg(
+        ACWR_Medio=('Relacao_Carga_Aguda_Cronica', 'mean'),
+        ACWR_Maximo=('Relacao_Carga_Aguda_Cronica', 'max'),
+        Distancia_Total_km=('Distancia_Percorrida_(km)', 'sum'),
+    ).reset_index()
+
+    return {
+        NOME_TABELA_SITUACAO_ATUAL: situacao_atual,
+        NOME_TABELA_CARGA_DIARIA: carga_diaria,
+        NOME_TABELA_ACWR_SEMANAL: acwr_semanal,
+    }
+
+def carregar_dados_processados_para_sql(df=None, filtros=None):
+    """
+    Carrega dados de performance processados das partições (ou do DataFrame informado,
+    no modo em memória) para as partições do banco de dados SQLite. Com 'filtros'
+    (elencos, temporadas, meses), apenas as partições selecionadas são lidas e substituídas.
     """
     os.makedirs(PASTA_DADOS, exist_ok=True)
 
     try:
-        if not os.path.exists(ARQUIVO_CSV_PROCESSADO):
-            print(f"Erro: Arquivo '{ARQUIVO_CSV_PROCESSADO}' não encontrado.")
-            print("Por favor, execute 'processador_dados.py' primeiro para gerar os dados processados.")
-            return
+        if df is None:
+            if not os.path.exists(ARQUIVO_CSV_PROCESSADO):
+                print(f"Erro: Arquivo '{ARQUIVO_CSV_PROCESSADO}' não encontrado.")
+                print("Por favor, execute 'processador_dados.py' primeiro para gerar os dados processados.")
+                return False
 
-        df = pd.read_csv(ARQUIVO_CSV_PROCESSADO)
-        print(f"Dados carregados do CSV processado com sucesso. Total de {len(df)} registros.")
+            marcar_subetapa('leitura_csv')
+            df = ler_conjunto(CONJUNTO_PROCESSADO, filtros, colunas_obrigatorias=COLUNAS_OBRIGATORIAS_CARGA)
+            if df.empty:
+                print(f"Erro: nenhuma partição processada corresponde aos filtros {filtros}.")
+                return False
+            print(f"Dados carregados das partições processadas com sucesso. Total de {len(df)} registros.")
+        else:
+            print(f"Dados processados recebidos em memória. Total de {len(df)} registros.")
+            if COLUNA_TEMPORADA not in df.columns:
+                df = adicionar_chaves_particao(df.copy())
+            if filtros:
+                df = df[selecionar_linhas(df, filtros)]
 
-        # Observação: A conversão para datetime pode ser redundante se o script anterior
+        marcar_subetapa('escrita_sql')
+        from sqlalchemy import create_engine
+        engine = create_engine(f'sqlite:///{ARQUIVO_DB}')
 
-        df['Data'] = pd.to_datetime(df['Data'])
+        # Salva o DataFrame nas partições do banco, junto com a versão dos dados de cada
+        # jogador (usada pelo dashboard para recarregar só o que mudou)
 
-        engine = create_engine(f'sqlite:///{ARQUIVO_DB}')
-        
-        # Salva o DataFrame no banco de dados SQLite
-        
-        df.to_sql(NOME_TABELA, engine, if_exists='replace', index=False)
+        with engine.begin() as conexao:
+            tabelas = gravar_particoes_sql(conexao, df, filtros)
+            calcular_versoes_jogadores(conexao).to_sql(NOME_TABELA_VERSOES, conexao, if_exists='replace', index=False)
+
+        # Agregados do elenco (temporada atual de cada elenco), para que a visão do elenco não
+        # percorra as linhas brutas a cada acesso. Em uma carga parcial, a temporada atual é
+        # lida das partições do banco
+
+        marcar_subetapa('agregados_elenco')
+        with engine.begin() as conexao:
+            if filtros:
+                df_atual = consultar_particoes(conexao, filtros={'temporadas_recentes': 1})
+            else:
+                df_atual = df[df[COLUNA_TEMPORADA] == df.groupby(COLUNA_ELENCO)[COLUNA_TEMPORADA].transform('max')]
+            for nome_tabela, agregado in calcular_agregados_elenco(df_atual).items():
+                agregado.to_sql(nome_tabela, conexao, if_exists='replace', index=False)
 
-        print(f"Dados salvos com sucesso no banco de dados SQLite: {ARQUIVO_DB}, tabela: {NOME_TABELA}")
+        print(f"Dados salvos com sucesso no banco de dados SQLite: {ARQUIVO_DB}, {len(tabelas)} partições da tabela {NOME_TABELA}")
 
     except Exception as e:
         print(f"Erro ao carregar dados para o banco de dados: {e}")
+        return False
 
 if __name__ == '__main__':
     carregar_dados_processados_para_sql()
\ No newline at end of file
@@ -1,42 +1,172 @@
-import dashboard_app
-import data_generator
-import data_processor
-import analysis_script
-import load_to_sql
+import argparse
 import os
+import sys
+
+# Apenas módulos leves são importados aqui. O executor da pipeline importa o
+# módulo de cada etapa sob demanda, e o dashboard (dash, plotly, SQLAlchemy)
+# só é importado pelo subcomando 'serve' (a ingestão em streaming pelo 'stream' e a
+# exportação dos relatórios pelo 'export').
+
+import executor_pipeline
+
+# Subcomando -> etapa da pipeline (os nomes em português também são aceitos)
+
+SUBCOMANDOS_ETAPAS = {
+    'generate': 'gerar',
+    'process': 'processar',
+    'train': 'treinar',
+    'load': 'carregar',
+}
+
+def adicionar_opcoes_perfil(parser):
+    parser.add_argument('--forcar', action='store_true', help="Ignora o cache e reexecuta as etapas selecionadas.")
+    parser.add_argument('--perfil', action='store_true', help="Mede tempo, CPU, memória e linhas de cada etapa e grava um relatório da execução.")
+    parser.add_argument('--tracemalloc', action='store_true', help="Com --perfil, mede também o pico de alocações Python (mais lento).")
+    parser.add_argument('--cprofile', action='store_true', help="Com --perfil, grava um dump do cProfile por etapa.")
+
+def adicionar_opcoes_filtros(parser):
+    parser.add_argument('--elenco', dest='elencos', nargs='+', help="Processa apenas as partições destes elencos.")
+    parser.add_argument('--temporada', dest='temporadas', nargs='+', type=int, help="Processa apenas as partições destas temporadas.")
+    parser.add_argument('--mes', dest='meses', nargs='+', help="Processa apenas as partições destes meses (AAAA-MM).")
+
+def obter_filtros(args):
+    """
+    Filtros de partição informados na linha de comando (None se nenhum).
+    """
+    return {chave: getattr(args, chave) for chave in ('elencos', 'temporadas', 'meses') if getattr(args, chave, None)} or None
+
+def criar_parser():
+    parser = argparse.ArgumentParser(description="Pipeline de dados BR-2002 e dashboard interativo.")
+    subparsers = parser.add_subparsers(dest='comando', metavar='{generate,process,train,load,serve,stream,export,all}')
+
+    for subcomando, etapa in SUBCOMANDOS_ETAPAS.items():
+        parser_etapa = subparsers.add_parser(subcomando, aliases=[etapa], help=f"Executa apenas a etapa '{etapa}'.")
+        adicionar_opcoes_perfil(parser_etapa)
+        adicionar_opcoes_filtros(parser_etapa)
+        parser_etapa.set_defaults(etapa=etapa)
+
+    parser_servir = subparsers.add_parser('serve', aliases=['servir'], help="Inicia o dashboard interativo.")
+    parser_servir.add_argument('--producao', action='store_true',
+                               help="Serve com vários workers (gunicorn), sem modo de depuração e com o banco somente para leitura.")
+    parser_servir.add_argument('--workers', type=int, help="Com --producao, número de processos workers.")
+    parser_servir.add_argument('--porta', type=int, help="Com --producao, porta HTTP do dashboard.")
+    parser_servir.add_argument('--log-callbacks-lentos', dest='limite_callback_lento_ms', type=float, metavar='MS',
+                               help="Registra em data/logs/callbacks_lentos.jsonl os callbacks mais lentos que MS milissegundos.")
+
+    parser_streaming = subparsers.add_parser('stream', aliases=['streaming'], help="Ingere novas sessões em micro-lotes (pasta de entrada e/ou socket).")
+    parser_streaming.add_argument('--pasta', help="Pasta observada (arquivos .csv ou .jsonl); padrão: data/entrada_streaming.")
+    parser_streaming.add_argument('--porta', type=int, help="Também recebe sessões por TCP (uma sessão JSON por linha) nesta porta.")
+    parser_streaming.add_argument('--intervalo', type=float, help="Segundos entre micro-lotes.")
+
+    parser_exportar = subparsers.add_parser('export', aliases=['exportar'], help="Exporta os perfis dos jogadores como relatórios HTML estáticos.")
+    parser_exportar.add_argument('--formato', choices=['interativo', 'imagem'], default='interativo',
+                                 help="Gráficos interativos (plotly.js) ou imagens PNG (requer o kaleido).")
+    parser_exportar.add_argument('--processos', type=int, help="Processos do pool de renderização (padrão: um por CPU).")
+    parser_exportar.add_argument('--jogador', dest='jogadores', nargs='+', help="Exporta apenas estes jogadores.")
+    parser_exportar.add_argument('--forcar', action='store_true', help="Renderiza novamente mesmo os relatórios já atualizados.")
+
+    parser_tudo = subparsers.add_parser('all', aliases=['tudo'], help="Executa a pipeline completa e inicia o dashboard (padrão).")
+    parser_tudo.add_argument('--only', '--somente', dest='somente', nargs='+', choices=executor_pipeline.NOMES_ETAPAS,
+                             help="Executa apenas estas etapas (etapas atualizadas continuam sendo puladas).")
+    parser_tudo.add_argument('--from-stage', '--a-partir-de', dest='a_partir_de', choices=executor_pipeline.NOMES_ETAPAS,
+                             help="Reexecuta esta etapa e todas as que dependem dela, ignorando o cache.")
+    parser_tudo.add_argument('--em-memoria', action='store_true', help="Passa os DataFrames entre as etapas em memória, sem reler CSVs.")
+    parser_tudo.add_argument('--persistir-intermediarios', action='store_true', help="Com --em-memoria, grava também os CSVs intermediários.")
+    parser_tudo.add_argument('--sem-dashboard', action='store_true', help="Encerra após a pipeline, sem iniciar o dashboard.")
+    adicionar_opcoes_perfil(parser_tudo)
+    adicionar_opcoes_filtros(parser_tudo)
+
+    return parser
+
+def interpretar_argumentos(argv=None):
+    """
+    Sem subcomando (ou só com opções), 'all' é assumido, como no comportamento original do main.py.
+    """
+    argv = list(sys.argv[1:] if argv is None else argv)
+    if not argv or (argv[0].startswith('-') and argv[0] not in ('-h', '--help')):
+        argv.insert(0, 'all')
+
+    parser = criar_parser()
+    args = parser.parse_args(argv)
+    if args.comando in ('all', 'tudo'):
+        if args.somente and args.a_partir_de:
+            parser.error("use --only ou --from-stage, não os dois.")
+        if args.em_memoria and (args.somente or args.a_partir_de or obter_filtros(args)):
+            parser.error("--em-memoria executa a pipeline completa; não use com --only, --from-stage ou filtros de partição.")
+    return args
+
+def iniciar_dashboard_producao(workers=None, porta=None, limite_callback_lento_ms=None):
+    import wsgi
+
+    opcoes = {'workers': workers, 'porta': porta, 'limite_callback_lento_ms': limite_callback_lento_ms}
+    return wsgi.executar_servidor_producao(**{nome: valor for nome, valor in opcoes.items() if valor is not None})
+
+def iniciar_ingestao_streaming(pasta=None, porta=None, intervalo_s=None):
+    import ingestao_streaming
+
+    opcoes = {'pasta': pasta, 'porta': porta, 'intervalo_s': intervalo_s}
+    return ingestao_streaming.executar_ingestao_streaming(**{nome: valor for nome, valor in opcoes.items() if valor is not None})
+
+def iniciar_exportacao_relatorios(formato='interativo', processos=None, jogadores=None, forcar=False):
+    import exportacao_relatorios
+
+    return exportacao_relatorios.exportar_relatorios(formato, processos, jogadores, forcar)
+
+def iniciar_dashboard(limite_callback_lento_ms=None):
+    import dashboard_app
+
+    # Esta função irá bloquear a execução e manter o servidor rodando
+
+    dashboard_app.executar_app_dashboard(limite_callback_lento_ms)
 
 if __name__ == '__main__':
+    args = interpretar_argumentos()
+
+    if args.comando in ('serve', 'servir'):
+        if args.producao:
+            raise SystemExit(0 if iniciar_dashboard_producao(args.workers, args.porta, args.limite_callback_lento_ms) else 1)
+        iniciar_dashboard(args.limite_callback_lento_ms)
+        raise SystemExit(0)
+
+    if args.comando in ('stream', 'streaming'):
+        raise SystemExit(0 if iniciar_ingestao_streaming(args.pasta, args.porta, args.intervalo) else 1)
+
+    if args.comando in ('export', 'exportar'):
+        raise SystemExit(0 if iniciar_exportacao_relatorios(args.formato, args.processos, args.jogadores, args.forcar) else 1)
+
     print("=====================================================")
     print("=             Iniciando Pipeline de Dados           =")
     print("=====================================================")
 
     # Garante que a pasta 'data' existe para evitar erros
-    
+
     if not os.path.exists('data'):
         os.makedirs('data')
 
-    # Etapa 1: Gerar os dados fictícios
-    print("\n--- Etapa 1: Gerando dados fictícios ---")
-    data_generator.gerar_e_salvar_dados()
-    print("--- Etapa 1 Concluída ---")
-
-    # Etapa 2: Processar, reconciliar e analisar os dados
+    opcoes_perfil = dict(perfil=args.perfil, usar_tracemalloc=args.tracemalloc, usar_cprofile=args.cprofile)
 
-    print("\n--- Etapa 2: Processando e reconciliando dados ---")
-    data_processor.executar_processamento_dados()
-    print("--- Etapa 2 Concluída ---")
+    if hasattr(args, 'etapa'):
+        sucesso = executor_pipeline.executar_pipeline(somente=[args.etapa], forcar=args.forcar, filtros=obter_filtros(args), **opcoes_perfil)
+    elif args.em_memoria:
+        sucesso = executor_pipeline.executar_pipeline_em_memoria(
+            persistir_intermediarios=args.persistir_intermediarios, **opcoes_perfil
+        )
+    else:
+        sucesso = executor_pipeline.executar_pipeline(
+            somente=args.somente, a_partir_de=args.a_partir_de, forcar=args.forcar, filtros=obter_filtros(args), **opcoes_perfil
+        )
 
-    # Etapa 3: Analisar e treinar modelo de ML
+    if not sucesso:
+        print("\n=====================================================")
+        print("=        Pipeline interrompida por uma falha        =")
+        print("=====================================================")
+        raise SystemExit(1)
 
-    print("\n--- Etapa 3: Analisando e treinando modelo de ML ---")
-    analysis_script.executar_analise_e_previsao()
-    print("--- Etapa 3 Concluída ---")
-
-    # Etapa 4: Carregar os dados processados e analisados para o SQL
-
-    print("\n--- Etapa 4: Carregando dados para o banco de dados ---")
-    load_to_sql.carregar_dados_processados_para_sql()
-    print("--- Etapa 4 Concluída ---")
+    if hasattr(args, 'etapa') or args.sem_dashboard:
+        print("\n=====================================================")
+        print("=             Pipeline Concluída!                   =")
+        print("=====================================================")
+        raise SystemExit(0)
 
     print("\n=====================================================")
     print("=             Pipeline Concluída!                   =")
@@ -45,6 +175,4 @@ if __name__ == '__main__':
 
     # Etapa 5: Iniciar o dashboard
 
-    # Esta função irá bloquear a execução e manter o servidor rodando
-
-    dashboard_app.executar_app_dashboard()
\ No newline at end of file
+    iniciar_dashboard()
@@ -0,0 +1,249 @@
+import contextlib
+import functools
+import json
+import os
+import threading
+import time
+from datetime import datetime
+
+# --- Configurações ---
+
+ROTA_METRICAS = '/metricas'
+ROTA_CALLBACKS_DASH = '/_dash-update-component'
+PASTA_LOGS = os.path.join('data', 'logs')
+ARQUIVO_LOG_CALLBACKS_LENTOS = os.path.join(PASTA_LOGS, 'callbacks_lentos.jsonl')
+
+# Fases medidas em cada callback: 'consulta' (acesso aos dados), 'figura' (montagem dos
+# componentes e gráficos, o restante do callback) e 'serializacao' (do retorno do
+# callback até a resposta JSON pronta, medida no servidor Flask).
+
+FASES_CALLBACK = ('consulta', 'figura', 'serializacao')
+LIMITES_HISTOGRAMA_S = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0)
+
+# As métricas são por processo: com vários workers, cada um expõe as suas.
+
+_trava_metricas = threading.Lock()
+_metricas_callbacks = {}
+_caches_monitorados = {}
+_medicao_atual = threading.local()
+
+# Limite e arquivo do log de callbacks lentos, definidos por registrar_rota_metricas (também
+# usados pelas tarefas em segundo plano, que terminam fora de uma requisição)
+
+_configuracao_log = {'limite_callback_lento_ms': None, 'caminho_log': ARQUIVO_LOG_CALLBACKS_LENTOS}
+
+# --- Coleta ---
+
+def registrar_cache(nome, cache):
+    """
+    Inclui as estatísticas de um CacheLRU (acertos, faltas, entradas) nas métricas expostas.
+    """
+    _caches_monitorados[nome] = cache
+
+@contextlib.contextmanager
+def medir_fase(fase):
+    """
+    Acumula o tempo do bloco na fase informada do callback em execução (sem efeito fora de um callback instrumentado).
+    """
+    medicao = getattr(_medicao_atual, 'callback', None)
+    inicio = time.perf_counter()
+    try:
+        yield
+    finally:
+        if medicao is not None:
+            medicao['fases'][fase] = medicao['fases'].get(fase, 0.0) + time.perf_counter() - inicio
+
+def _obter_registro(nome_callback):
+    registro = _metricas_callbacks.get(nome_callback)
+    if registro is None:
+        registro = _metricas_callbacks[nome_callback] = {
+            'chamadas': 0,
+            'segundos_fases': dict.fromkeys(FASES_CALLBACK, 0.0),
+            'buckets': [0] * len(LIMITES_HISTOGRAMA_S),
+            'segundos_total': 0.0,
+            'requisicoes': 0,
+            'bytes_resposta': 0,
+        }
+    return registro
+
+def _registrar_duracao(registro, duracao_s):
+    for i, limite in enumerate(LIMITES_HISTOGRAMA_S):
+        if duracao_s <= limite:
+            registro['buckets'][i] += 1
+    registro['segundos_total'] += duracao_s
+
+def _em_requisicao():
+    from flask import has_request_context
+    return has_request_context()
+
+def instrumentar_callback(nome_callback):
+    """
+    Decorador dos callbacks do dashboard: mede o tempo de consulta (blocos marcados com
+    medir_fase('consulta')) e de montagem da saída. Dentro de uma requisição, a medição
+    fica pendente até a resposta ficar pronta, para somar a serialização e o tamanho.
+    Fora de uma requisição (tarefas em segundo plano), a duração da execução entra no
+    histograma e no log de callbacks lentos assim que ela termina.
+    """
+    def decorador(funcao):
+        @functools.wraps(funcao)
+        def callback_instrumentado(*args, **kwargs):
+            medicao = {'callback': nome_callback, 'fases': {}}
+            _medicao_atual.callback = medicao
+            inicio = time.perf_counter()
+            try:
+                return funcao(*args, **kwargs)
+            finally:
+                medicao['segundos_callback'] = time.perf_counter() - inicio
+                medicao['fases']['figura'] = max(medicao['segundos_callback'] - medicao['fases'].get('consulta', 0.0), 0.0)
+                _medicao_atual.callback = None
+                with _trava_metricas:
+                    registro = _obter_registro(nome_callback)
+                    registro['chamadas'] += 1
+                    for fase, segundos in medicao['fases'].items():
+                        registro['segundos_fases'][fase] += segundos
+                if _em_requisicao():
+                    _medicao_atual.concluida = medicao
+                else:
+                    _registrar_execucao(medicao)
+        return callback_instrumentado
+    return decorador
+
+def atribuir_resposta(nome_callback):
+    """
+    Soma o tamanho e a serialização da resposta do callback em execução à série de outro
+    callback: a consulta periódica que entrega o resultado de uma tarefa em segundo plano
+    atribui a resposta à série da tarefa ('tarefa_<visão>').
+    """
+    medicao = getattr(_medicao_atual, 'callback', None)
+    if medicao is not None:
+        medicao['serie_resposta'] = nome_callback
+
+def _registrar_execucao(medicao):
+    segundos = medicao['segundos_callback']
+    with _trava_metricas:
+        registro = _obter_registro(medicao['callback'])
+        registro['requisicoes'] += 1
+        _registrar_duracao(registro, segundos)
+    limite_ms = _configuracao_log['limite_callback_lento_ms']
+    if limite_ms is not None and segundos * 1000 > limite_ms:
+        registrar_callback_lento(medicao, segundos, 0, None, _configuracao_log['caminho_log'])
+
+def _registrar_requisicao(medicao, segundos_requisicao, bytes_resposta):
+    segundos_serializacao = max(segundos_requisicao - medicao['segundos_callback'], 0.0)
+    medicao['fases']['serializacao'] = segundos_serializacao
+    with _trava_metricas:
+        registro = _obter_registro(medicao['callback'])
+        registro['requisicoes'] += 1
+        _registrar_duracao(registro, segundos_requisicao)
+        registro_resposta = _obter_registro(medicao.get('serie_resposta', medicao['callback']))
+        registro_resposta['segundos_fases']['serializacao'] += segundos_serializacao
+        registro_resposta['bytes_resposta'] += bytes_resposta
+
+def registrar_callback_lento(medicao, segundos_requisicao, bytes_resposta, entradas, caminho_log=ARQUIVO_LOG_CALLBACKS_LENTOS):
+    linha = {
+        'data': datetime.now().isoformat(timespec='seconds'),
+        'callback': medicao['callback'],
+        'total_ms': round(segundos_requisicao * 1000, 2),
+        'fases_ms': {fase: round(segundos * 1000, 2) for fase, segundos in medicao['fases'].items()},
+        'bytes_resposta': bytes_resposta,
+        'entradas': entradas,
+    }
+    os.makedirs(os.path.dirname(caminho_log), exist_ok=True)
+    with _trava_metricas, open(caminho_log, 'a', encoding='utf-8') as arquivo:
+        arquivo.write(json.dumps(linha, ensure_ascii=False, default=str) + '\n')
+    print(f"Callback lento: {medicao['callback']} em {linha['total_ms']} ms ({bytes_resposta} bytes)")
+
+# --- Exposição ---
+
+def obter_metricas():
+    """
+    Retorna uma cópia das métricas por callback e das estatísticas dos caches.
+    """
+    with _trava_metricas:
+        callbacks = json.loads(json.dumps(_metricas_callbacks))
+    return {'callbacks': callbacks, 'caches': {nome: cache.estatisticas() for nome, cache in _caches_monitorados.items()}}
+
+def formatar_metricas_prometheus():
+    """
+    Métricas no formato de texto do Prometheus.
+    """
+    metricas = obter_metricas()
+    linhas = [
+        '# HELP br2002_callback_chamadas_total Execuções de cada callback do dashboard.',
+        '# TYPE br2002_callback_chamadas_total counter',
+    ]
+    linhas += [f'br2002_callback_chamadas_total{{callback="{nome}"}} {registro["chamadas"]}' for nome, registro in metricas['callbacks'].items()]
+
+    linhas += [
+        '# HELP br2002_callback_fase_segundos_total Tempo acumulado de cada fase do callback (consulta, figura, serializacao).',
+        '# TYPE br2002_callback_fase_segundos_total counter',
+    ]
+    linhas += [
+        f'br2002_callback_fase_segundos_total{{callback="{nome}",fase="{fase}"}} {segundos:.6f}'
+        for nome, registro in metricas['callbacks'].items() for fase, segundos in registro['segundos_fases'].items()
+    ]
+
+    linhas += [
+        '# HELP br2002_callback_duracao_segundos Duração das requisições de cada callback, da chegada à resposta pronta.',
+        '# TYPE br2002_callback_duracao_segundos histogram',
+    ]
+    for nome, registro in metricas['callbacks'].items():
+        for limite, contagem in zip(LIMITES_HISTOGRAMA_S, registro['buckets']):
+            linhas.append(f'br2002_callback_duracao_segundos_bucket{{callback="{nome}",le="{limite}"}} {contagem}')
+        linhas.append(f'br2002_callback_duracao_segundos_bucket{{callback="{nome}",le="+Inf"}} {registro["requisicoes"]}')
+        linhas.append(f'br2002_callback_duracao_segundos_sum{{callback="{nome}"}} {registro["segundos_total"]:.6f}')
+        linhas.append(f'br2002_callback_duracao_segundos_count{{callback="{nome}"}} {registro["requisicoes"]}')
+
+    linhas += [
+        '# HELP br2002_callback_resposta_bytes_total Bytes acumulados das respostas de cada callback.',
+        '# TYPE br2002_callback_resposta_bytes_total counter',
+    ]
+    linhas += [f'br2002_callback_resposta_bytes_total{{callback="{nome}"}} {registro["bytes_resposta"]}' for nome, registro in metricas['callbacks'].items()]
+
+    for metrica, chave, tipo, descricao in [
+        ('br2002_cache_acertos_total', 'acertos', 'counter', 'Acertos do cache.'),
+        ('br2002_cache_faltas_total', 'faltas', 'counter', 'Faltas do cache.'),
+        ('br2002_cache_taxa_acerto', 'taxa_acerto', 'gauge', 'Fração das consultas ao cache que foram acertos.'),
+        ('br2002_cache_entradas', 'entradas', 'gauge', 'Entradas atualmente no cache.'),
+    ]:
+        linhas += [f'# HELP {metrica} {descricao}', f'# TYPE {metrica} {tipo}']
+        linhas += [f'{metrica}{{cache="{nome}"}} {estatisticas[chave]}' for nome, estatisticas in metricas['caches'].items()]
+    return '\n'.join(linhas) + '\n'
+
+def registrar_rota_metricas(servidor, limite_callback_lento_ms=None, caminho_log=ARQUIVO_LOG_CALLBACKS_LENTOS):
+    """
+    Registra o endpoint de métricas em um servidor Flask (o 'app.server' do dashboard) e
+    mede as requisições de callback do Dash. Com 'limite_callback_lento_ms', as requisições
+    mais lentas que o limite são registradas em 'caminho_log' (uma linha JSON por callback).
+    """
+    from flask import Response, g, request
+
+    _configuracao_log.update(limite_callback_lento_ms=limite_callback_lento_ms, caminho_log=caminho_log)
+
+    @servidor.before_request
+    def iniciar_medicao_requisicao():
+        if request.path == ROTA_CALLBACKS_DASH:
+            g.inicio_callback = time.perf_counter()
+            _medicao_atual.concluida = None
+
+    @servidor.after_request
+    def concluir_medicao_requisicao(resposta):
+        medicao = getattr(_medicao_atual, 'concluida', None)
+        if request.path != ROTA_CALLBACKS_DASH or medicao is None or 'inicio_callback' not in g:
+            return resposta
+        _medicao_atual.concluida = None
+
+        segundos_requisicao = time.perf_counter() - g.inicio_callback
+        bytes_resposta = resposta.calculate_content_length() or 0
+        _registrar_requisicao(medicao, segundos_requisicao, bytes_resposta)
+        if limite_callback_lento_ms is not None and segundos_requisicao * 1000 > limite_callback_lento_ms:
+            corpo = request.get_json(silent=True) or {}
+            entradas = [{'id': entrada.get('id'), 'valor': entrada.get('value')} for entrada in corpo.get('inputs', []) if isinstance(entrada, dict)]
+            registrar_callback_lento(medicao, segundos_requisicao, bytes_resposta, entradas, caminho_log)
+        return resposta
+
+    @servidor.route(ROTA_METRICAS, methods=['GET'])
+    def rota_metricas():
+        return Response(formatar_metricas_prometheus(), mimetype='text/plain; version=0.0.4')
+
+    return servidor
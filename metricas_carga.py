@@ -0,0 +1,221 @@
+import numpy as np
+import pandas as pd
+
+# --- Configurações ---
+
+# Carga de cada sessão: a distância percorrida, como no gerador de dados
+
+COLUNA_CARGA = 'Distancia_Percorrida_(km)'
+
+# Janelas em dias de calendário. Como no gerador, as métricas de uma sessão usam apenas
+# os dias anteriores a ela (a carga com que o jogador chega à sessão); dias sem sessão
+# contam com carga zero.
+
+JANELA_AGUDA_DIAS = 7
+JANELA_CRONICA_DIAS = 28
+
+# Fatores de decaimento das médias móveis exponenciais (EWMA): lambda = 2 / (N + 1)
+
+LAMBDA_AGUDA = 2 / (JANELA_AGUDA_DIAS + 1)
+LAMBDA_CRONICA = 2 / (JANELA_CRONICA_DIAS + 1)
+
+COLUNAS_METRICAS_CARGA = [
+    'Carga_Aguda', 'Carga_Cronica', 'Relacao_Carga_Aguda_Cronica',
+    'Relacao_Carga_Aguda_Cronica_EWMA', 'Monotonia_Treino', 'Tensao_Treino',
+]
+
+# --- Núcleos vetorizados ---
+
+def agregar_carga_diaria(codigos, dias, cargas):
+    """
+    Soma as cargas das sessões de um mesmo jogador no mesmo dia (por exemplo, registros
+    de apelidos já reconciliados). As sessões devem estar ordenadas por jogador e dia.
+    Retorna (códigos, dias e cargas por dia, índice do dia de cada sessão).
+    """
+    novo_dia = np.empty(len(codigos), dtype=bool)
+    novo_dia[:1] = True
+    novo_dia[1:] = (codigos[1:] != codigos[:-1]) | (dias[1:] != dias[:-1])
+    inicios = np.flatnonzero(novo_dia)
+    return codigos[inicios], dias[inicios], np.add.reduceat(cargas, inicios) if len(inicios) else cargas[:0], np.cumsum(novo_dia) - 1
+
+def somar_janela_calendario(codigos, dias, valores, janela_dias):
+    """
+    Para cada dia (ordenado por jogador e dia), a soma de 'valores' (uma ou mais colunas)
+    do mesmo jogador nos 'janela_dias' dias de calendário anteriores, sem incluir o
+    próprio dia. Usa somas acumuladas e busca binária: O(n log n), sem laços por jogador.
+    """
+    deslocamento = dias - int(dias.min()) + janela_dias
+    chaves = codigos.astype(np.int64) * (int(deslocamento.max()) + 1) + deslocamento
+    acumulado = np.concatenate([np.zeros((1,) + valores.shape[1:]), np.cumsum(valores, axis=0, dtype=np.float64)])
+    inicio = np.searchsorted(chaves, chaves - janela_dias, side='left')
+    fim = np.arange(len(chaves))
+    return acumulado[fim] - acumulado[inicio]
+
+def resolver_recorrencia_linear(a, b):
+    """
+    Resolve y[i] = a[i] * y[i-1] + b[i] (com y[-1] = 0) por varredura prefixada: log2(n)
+    passos vetorizados em vez de um laço por elemento. Um a[i] = 0 reinicia a recorrência.
+    """
+    a = a.astype(np.float64)
+    y = b.astype(np.float64)
+    passo = 1
+    while passo < len(y) and a[passo:].any():
+        y[passo:] += a[passo:] * y[:-passo]
+        a[passo:] *= a[:-passo]
+        passo *= 2
+    return y
+
+def calcular_ewma_calendario(codigos, dias, cargas, fator, ewma_inicial=None, dia_inicial=None):
+    """
+    EWMA diária da carga (ewma_t = fator * carga_t + (1 - fator) * ewma_{t-1}), com os dias
+    sem sessão decaindo a média, calculada apenas nos dias com sessão (ordenados por
+    jogador e dia). 'ewma_inicial' e 'dia_inicial' (por dia) trazem o valor de cada
+    jogador ao fim de um dia anterior, para continuar um cálculo incremental.
+    Retorna (EWMA ao fim de cada dia, EWMA ao fim do dia anterior a cada dia).
+    """
+    decaimento = 1.0 - fator
+    inicio_jogador = np.empty(len(codigos), dtype=bool)
+    inicio_jogador[:1] = True
+    inicio_jogador[1:] = codigos[1:] != codigos[:-1]
+
+    intervalo = np.diff(dias, prepend=dias[:1])
+    a = np.where(inicio_jogador, 0.0, decaimento ** intervalo)
+    b = fator * cargas
+    if ewma_inicial is not None:
+        b = b + np.where(inicio_jogador, ewma_inicial * decaimento ** (dias - dia_inicial), 0.0)
+
+    ewma = resolver_recorrencia_linear(a, b)
+    return ewma, (ewma - fator * cargas) / decaimento
+
+def calcular_metricas_carga_dias(codigos, dias, cargas, ewma_inicial=None, dia_inicial=None):
+    """
+    Métricas de gestão de carga por dia (ordenados por jogador e dia):
+    - Carga_Aguda / Carga_Cronica: soma da carga nos 7 / 28 dias anteriores;
+    - Relacao_Carga_Aguda_Cronica: razão entre as duas (0 sem carga crônica), como no gerador;
+    - Relacao_Carga_Aguda_Cronica_EWMA: razão entre as EWMA aguda e crônica;
+    - Monotonia_Treino: média diária / desvio padrão diário da carga nos 7 dias anteriores (Foster);
+    - Tensao_Treino: carga semanal x monotonia.
+    'ewma_inicial' (n x 2, aguda e crônica) e 'dia_inicial' continuam uma EWMA já calculada.
+    Retorna ({coluna: valores por dia}, EWMA aguda e crônica ao fim de cada dia).
+    """
+    carga_aguda, quadrados_agudos = somar_janela_calendario(codigos, dias, np.column_stack([cargas, cargas * cargas]), JANELA_AGUDA_DIAS).T
+    carga_cronica = somar_janela_calendario(codigos, dias, cargas, JANELA_CRONICA_DIAS)
+
+    media_diaria = carga_aguda / JANELA_AGUDA_DIAS
+    variancia = np.maximum(quadrados_agudos - JANELA_AGUDA_DIAS * media_diaria ** 2, 0.0) / (JANELA_AGUDA_DIAS - 1)
+    desvio_diario = np.sqrt(variancia)
+
+    # Sem variação mensurável (por exemplo, uma semana sem sessões) a monotonia fica em 0
+    monotonia = np.divide(media_diaria, desvio_diario, out=np.zeros_like(media_diaria), where=desvio_diario > 1e-9)
+
+    ewma_aguda, ewma_aguda_anterior = calcular_ewma_calendario(
+        codigos, dias, cargas, LAMBDA_AGUDA, None if ewma_inicial is None else ewma_inicial[:, 0], dia_inicial)
+    ewma_cronica, ewma_cronica_anterior = calcular_ewma_calendario(
+        codigos, dias, cargas, LAMBDA_CRONICA, None if ewma_inicial is None else ewma_inicial[:, 1], dia_inicial)
+
+    metricas = {
+        'Carga_Aguda': carga_aguda,
+        'Carga_Cronica': carga_cronica,
+        'Relacao_Carga_Aguda_Cronica': np.divide(carga_aguda, carga_cronica, out=np.zeros_like(carga_aguda), where=carga_cronica > 0),
+        'Relacao_Carga_Aguda_Cronica_EWMA': np.divide(ewma_aguda_anterior, ewma_cronica_anterior, out=np.zeros_like(carga_aguda),
+                                                      where=ewma_cronica_anterior > 1e-9),
+        'Monotonia_Treino': monotonia,
+        'Tensao_Treino': carga_aguda * monotonia,
+    }
+    return metricas, np.column_stack([ewma_aguda, ewma_cronica])
+
+def calcular_metricas_carga(df, coluna_jogador='Nome_Padronizado', coluna_data='Data', coluna_carga=COLUNA_CARGA):
+    """
+    Recalcula as métricas de gestão de carga (COLUNAS_METRICAS_CARGA) por jogador
+    reconciliado, sobre janelas de dias de calendário, e as grava no próprio DataFrame,
+    que é retornado. Cargas ausentes contam como zero. Os valores são arredondados a
+    2 casas, como os gerados pelo gerador de dados.
+    """
+    if df.empty:
+        for coluna in COLUNAS_METRICAS_CARGA:
+            df[coluna] = pd.Series(dtype=float)
+        return df
+
+    codigos = pd.factorize(df[coluna_jogador], sort=True)[0]
+    dias = pd.to_datetime(df[coluna_data]).to_numpy(dtype='datetime64[D]').astype(np.int64)
+    cargas = pd.to_numeric(df[coluna_carga], errors='coerce').fillna(0.0).to_numpy(dtype=np.float64)
+
+    ordem = np.lexsort((dias, codigos))
+    codigos_dia, dias_dia, cargas_dia, indice_dia = agregar_carga_diaria(codigos[ordem], dias[ordem], cargas[ordem])
+    metricas, _ = calcular_metricas_carga_dias(codigos_dia, dias_dia, cargas_dia)
+
+    for coluna, valores in metricas.items():
+        valores_sessoes = np.empty(len(df))
+        valores_sessoes[ordem] = valores[indice_dia]
+        df[coluna] = np.round(valores_sessoes, 2)
+    return df
+
+# --- Estado incremental (ingestão em streaming) ---
+
+class EstadoCarga:
+    """
+    Estado de carga de cada jogador para continuar as métricas sem reler o histórico:
+    as cargas diárias dos últimos JANELA_CRONICA_DIAS dias e as EWMA aguda e crônica ao
+    fim do dia anterior a essa janela.
+    """
+
+    def __init__(self, cargas_recentes=None, ewma_referencia=None):
+        self.cargas_recentes = cargas_recentes if cargas_recentes is not None else pd.DataFrame(
+            {'Nome_Padronizado': pd.Series(dtype=object), 'Dia': pd.Series(dtype=np.int64), 'Carga': pd.Series(dtype=np.float64)})
+        self.ewma_referencia = ewma_referencia if ewma_referencia is not None else {}
+
+    def processar(self, nomes, datas, cargas):
+        """
+        Acrescenta as sessões (de dias iguais ou posteriores aos já vistos de cada jogador)
+        e retorna {coluna: valores} com as métricas de carga de cada sessão, na ordem recebida.
+        """
+        novas = pd.DataFrame({
+            'Nome_Padronizado': np.asarray(nomes, dtype=object),
+            'Dia': pd.to_datetime(datas).to_numpy(dtype='datetime64[D]').astype(np.int64),
+            'Carga': pd.to_numeric(pd.Series(cargas), errors='coerce').fillna(0.0).to_numpy(dtype=np.float64),
+            '_sessao': np.arange(len(nomes)),
+        })
+        combinado = pd.concat([self.cargas_recentes.assign(_sessao=-1), novas], ignore_index=True)
+        combinado = combinado.sort_values(['Nome_Padronizado', 'Dia'], kind='stable').reset_index(drop=True)
+        if combinado.empty:
+            return {coluna: np.empty(0) for coluna in COLUNAS_METRICAS_CARGA}
+
+        codigos, jogadores = pd.factorize(combinado['Nome_Padronizado'])
+        codigos_dia, dias_dia, cargas_dia, indice_dia = agregar_carga_diaria(codigos, combinado['Dia'].to_numpy(), combinado['Carga'].to_numpy())
+
+        # EWMA de referência de cada jogador (zero para jogadores novos)
+        referencia = [self.ewma_referencia.get(nome, (0.0, 0.0, 0)) for nome in jogadores]
+        ewma_inicial = np.array([[ref[0], ref[1]] for ref in referencia])[codigos_dia]
+        dia_inicial = np.array([ref[2] for ref in referencia], dtype=np.int64)[codigos_dia]
+        metricas, ewma_dias = calcular_metricas_carga_dias(codigos_dia, dias_dia, cargas_dia, ewma_inicial, dia_inicial)
+
+        sessoes = combinado['_sessao'].to_numpy()
+        novas_linhas = sessoes >= 0
+        resultado = {}
+        for coluna, valores in metricas.items():
+            resultado[coluna] = np.empty(len(novas))
+            resultado[coluna][sessoes[novas_linhas]] = np.round(valores[indice_dia[novas_linhas]], 2)
+
+        self._avancar(jogadores, codigos_dia, dias_dia, cargas_dia, ewma_dias)
+        return resultado
+
+    def _avancar(self, jogadores, codigos_dia, dias_dia, cargas_dia, ewma_dias):
+        ultimo_dia = np.full(len(jogadores), np.iinfo(np.int64).min)
+        np.maximum.at(ultimo_dia, codigos_dia, dias_dia)
+        dia_corte = ultimo_dia - JANELA_CRONICA_DIAS
+        manter = dias_dia > dia_corte[codigos_dia]
+
+        # Nova referência: a EWMA do último dia descartado de cada jogador, decaída até o dia de corte
+        descartados = np.flatnonzero(~manter)
+        ultimo_descartado = descartados[np.r_[codigos_dia[descartados][1:] != codigos_dia[descartados][:-1], True]] if len(descartados) else descartados
+        codigos_corte = codigos_dia[ultimo_descartado]
+        decaimentos = np.array([1.0 - LAMBDA_AGUDA, 1.0 - LAMBDA_CRONICA]) ** (dia_corte[codigos_corte] - dias_dia[ultimo_descartado])[:, None]
+        ewma_corte = ewma_dias[ultimo_descartado] * decaimentos
+        for codigo, (ewma_aguda, ewma_cronica), corte in zip(codigos_corte, ewma_corte, dia_corte[codigos_corte]):
+            self.ewma_referencia[jogadores[codigo]] = (float(ewma_aguda), float(ewma_cronica), int(corte))
+
+        self.cargas_recentes = pd.DataFrame({
+            'Nome_Padronizado': np.asarray(jogadores, dtype=object)[codigos_dia[manter]],
+            'Dia': dias_dia[manter],
+            'Carga': cargas_dia[manter],
+        })
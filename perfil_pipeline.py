@@ -0,0 +1,148 @@
+import contextlib
+import cProfile
+import json
+import os
+import resource
+import sqlite3
+import time
+import tracemalloc
+from datetime import datetime
+
+# --- Configurações ---
+
+PASTA_DADOS = 'data'
+PASTA_RELATORIOS_EXECUCAO = os.path.join(PASTA_DADOS, 'relatorios_execucao')
+TABELA_PADRAO_DB = 'performance_atletas'
+
+# Subetapas registradas pela etapa em execução (None quando o perfil está desligado)
+
+_subetapas_ativas = None
+
+# --- Contagem de linhas dos artefatos ---
+
+def contar_linhas_artefato(caminho):
+    """
+    Conta as linhas de um artefato da pipeline: registros de um CSV, de um conjunto
+    particionado (pelo seu catálogo) ou da tabela principal de um banco SQLite.
+    Retorna None para outros tipos ou arquivos ausentes.
+    """
+    if not os.path.exists(caminho):
+        return None
+    if caminho.endswith('.csv'):
+        with open(caminho, 'rb') as arquivo:
+            return max(sum(1 for _ in arquivo) - 1, 0)
+    if caminho.endswith('_catalogo.json'):
+        with open(caminho, encoding='utf-8') as arquivo:
+            return sum(particao['Linhas'] for particao in json.load(arquivo)['particoes'])
+    if caminho.endswith('.db'):
+        try:
+            with contextlib.closing(sqlite3.connect(caminho)) as conexao:
+                return conexao.execute(f"SELECT COUNT(*) FROM {TABELA_PADRAO_DB}").fetchone()[0]
+        except sqlite3.Error:
+            return None
+    return None
+
+def _pico_rss_mb():
+    # ru_maxrss é reportado em KB no Linux
+    return round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1)
+
+# --- Medição ---
+
+def marcar_subetapa(nome):
+    """
+    Marca o início de um trecho dentro da etapa em execução (ex.: reconciliação,
+    janelas móveis). O trecho anterior é encerrado nesse momento e o último é
+    encerrado ao fim da etapa. Não faz nada quando o perfil da pipeline não está ativo.
+    """
+    if _subetapas_ativas is None:
+        return
+    agora = time.perf_counter()
+    _encerrar_subetapa_aberta(agora)
+    _subetapas_ativas.append({'nome': nome, 'inicio': agora})
+
+def _encerrar_subetapa_aberta(agora):
+    if _subetapas_ativas and 'inicio' in _subetapas_ativas[-1]:
+        aberta = _subetapas_ativas[-1]
+        aberta['tempo_s'] = round(agora - aberta.pop('inicio'), 4)
+
+def perfilar_etapa(nome, funcao, entradas=(), saidas=(), usar_tracemalloc=False, usar_cprofile=False,
+                   pasta_relatorio=PASTA_RELATORIOS_EXECUCAO, df_entrada=None):
+    """
+    Executa 'funcao' medindo tempo de parede, tempo de CPU, pico de memória e linhas
+    de entrada/saída. Opcionalmente grava um dump do cProfile da etapa.
+    No modo em memória, as linhas do DataFrame de entrada ('df_entrada') e do
+    DataFrame retornado também são contadas.
+    Retorna (retorno_da_funcao, registro_de_perfil).
+    """
+    global _subetapas_ativas
+
+    registro = {
+        'etapa': nome,
+        'linhas_entrada': {caminho: contar_linhas_artefato(caminho) for caminho in entradas},
+    }
+    if df_entrada is not None:
+        registro['linhas_entrada']['memoria'] = len(df_entrada)
+    pico_rss_antes = _pico_rss_mb()
+    _subetapas_ativas = []
+
+    if usar_tracemalloc:
+        tracemalloc.start()
+    perfilador = cProfile.Profile() if usar_cprofile else None
+
+    inicio_cpu = time.process_time()
+    inicio = time.perf_counter()
+    try:
+        if perfilador:
+            retorno = perfilador.runcall(funcao)
+        else:
+            retorno = funcao()
+    finally:
+        fim = time.perf_counter()
+        _encerrar_subetapa_aberta(fim)
+        registro['tempo_s'] = round(fim - inicio, 4)
+        registro['tempo_cpu_s'] = round(time.process_time() - inicio_cpu, 4)
+        registro['subetapas'] = _subetapas_ativas
+        _subetapas_ativas = None
+
+        if usar_tracemalloc:
+            _, pico_bytes = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+            registro['pico_tracemalloc_mb'] = round(pico_bytes / 1024 ** 2, 1)
+
+        registro['pico_rss_mb'] = _pico_rss_mb()
+        registro['aumento_pico_rss_mb'] = round(registro['pico_rss_mb'] - pico_rss_antes, 1)
+
+        if perfilador:
+            os.makedirs(pasta_relatorio, exist_ok=True)
+            caminho_dump = os.path.join(pasta_relatorio, f"cprofile_{nome}_{datetime.now():%Y%m%d_%H%M%S}.prof")
+            perfilador.dump_stats(caminho_dump)
+            registro['cprofile'] = caminho_dump
+
+    registro['linhas_saida'] = {caminho: contar_linhas_artefato(caminho) for caminho in saidas}
+    if getattr(retorno, 'shape', None) is not None:
+        registro['linhas_saida']['memoria'] = len(retorno)
+    return retorno, registro
+
+def imprimir_resumo_perfil(registros):
+    print("\nResumo do perfil por etapa:")
+    for registro in registros:
+        print(f"  {registro['etapa']:<12} parede={registro['tempo_s']:>8.3f} s  cpu={registro['tempo_cpu_s']:>8.3f} s  "
+              f"pico RSS={registro['pico_rss_mb']:>8.1f} MB (+{registro['aumento_pico_rss_mb']:.1f})"
+              + (f"  tracemalloc={registro['pico_tracemalloc_mb']:.1f} MB" if 'pico_tracemalloc_mb' in registro else ''))
+        for item in registro['subetapas']:
+            print(f"      - {item['nome']:<28} {item['tempo_s']:>8.3f} s")
+
+def salvar_relatorio_execucao(registros, pasta_relatorio=PASTA_RELATORIOS_EXECUCAO):
+    """
+    Grava o relatório de perfil da execução em JSON e retorna o caminho do arquivo.
+    """
+    os.makedirs(pasta_relatorio, exist_ok=True)
+    caminho = os.path.join(pasta_relatorio, f"execucao_{datetime.now():%Y%m%d_%H%M%S}.json")
+    with open(caminho, 'w', encoding='utf-8') as arquivo:
+        json.dump({
+            'data_execucao': datetime.now().isoformat(timespec='seconds'),
+            'tempo_total_s': round(sum(r['tempo_s'] for r in registros), 4),
+            'etapas': registros,
+        }, arquivo, indent=2, ensure_ascii=False)
+    print(f"Relatório de perfil da execução salvo em: {caminho}")
+    return caminho
@@ -0,0 +1,86 @@
+import argparse
+import json
+import os
+import socket
+import time
+
+from armazenamento_particionado import COLUNAS_PARTICAO, CONJUNTO_GERADO, ler_conjunto, selecionar_linhas
+from esquema_performance import COLUNA_DATA, COLUNAS_SESSAO, FORMATO_DATA, ler_csv_performance
+from ingestao_streaming import HOST_STREAMING, PASTA_ENTRADA_STREAMING, PORTA_STREAMING
+
+# --- Configurações ---
+
+DIAS_POR_SEGUNDO_PADRAO = 1.0
+
+# --- Reprodução do histórico ---
+
+def carregar_historico(caminho=None, a_partir_de=None, ate=None):
+    """
+    Sem 'caminho', lê apenas as partições geradas que cobrem o período reproduzido.
+    As sessões são lidas no esquema do registro de performance e enviadas com a data
+    como texto (AAAA-MM-DD), como no CSV.
+    """
+    periodo = {'data_inicio': a_partir_de, 'data_fim': ate}
+    if caminho is None:
+        historico = ler_conjunto(CONJUNTO_GERADO, periodo, colunas_obrigatorias=COLUNAS_SESSAO)
+        if historico is None:
+            raise FileNotFoundError("partições geradas não encontradas; execute a etapa 'gerar' primeiro.")
+        historico = historico.drop(columns=COLUNAS_PARTICAO, errors='ignore')
+    else:
+        historico = ler_csv_performance(caminho, COLUNAS_SESSAO)
+        historico = historico[selecionar_linhas(historico, periodo)]
+    historico = historico.sort_values(COLUNA_DATA, kind='stable')
+    historico[COLUNA_DATA] = historico[COLUNA_DATA].dt.strftime(FORMATO_DATA)
+    return historico
+
+def enviar_para_pasta(sessoes, data, pasta):
+    """
+    Grava as sessões de um dia na pasta de entrada. O arquivo é escrito com outro nome
+    e renomeado ao final, para que a ingestão nunca leia um arquivo incompleto.
+    """
+    destino = os.path.join(pasta, f"sessoes_{data.replace('-', '')}.jsonl")
+    temporario = os.path.join(pasta, f".{os.path.basename(destino)}.tmp")
+    sessoes.to_json(temporario, orient='records', lines=True, force_ascii=False)
+    os.replace(temporario, destino)
+
+def reproduzir_historico(historico, dias_por_segundo=DIAS_POR_SEGUNDO_PADRAO, destino='pasta', pasta=PASTA_ENTRADA_STREAMING,
+                         host=HOST_STREAMING, porta=PORTA_STREAMING):
+    """
+    Envia o histórico dia a dia, como uma fonte ao vivo, a 'dias_por_segundo' dias simulados
+    por segundo (0 envia tudo sem pausa), para a pasta de entrada ou para o socket da ingestão.
+    """
+    conexao = socket.create_connection((host, porta)) if destino == 'socket' else None
+    if destino == 'pasta':
+        os.makedirs(pasta, exist_ok=True)
+
+    print(f"Reproduzindo {len(historico)} sessões de {historico['Data'].nunique()} dias ({dias_por_segundo} dias/s) para: "
+          f"{pasta if destino == 'pasta' else f'{host}:{porta}'}")
+    try:
+        for data, sessoes in historico.groupby('Data', sort=True):
+            inicio = time.perf_counter()
+            if conexao is not None:
+                linhas = ''.join(json.dumps(registro, ensure_ascii=False) + '\n' for registro in json.loads(sessoes.to_json(orient='records')))
+                conexao.sendall(linhas.encode('utf-8'))
+            else:
+                enviar_para_pasta(sessoes, data, pasta)
+            print(f"  {data}: {len(sessoes)} sessões enviadas")
+            if dias_por_segundo > 0:
+                time.sleep(max(1 / dias_por_segundo - (time.perf_counter() - inicio), 0))
+    finally:
+        if conexao is not None:
+            conexao.close()
+    return True
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Reproduz o histórico de sessões como fonte para a ingestão em streaming.")
+    parser.add_argument('--arquivo', help="CSV de sessões brutas (padrão: partições geradas pelo gerador).")
+    parser.add_argument('--a-partir-de', help="Primeira data reproduzida (AAAA-MM-DD).")
+    parser.add_argument('--ate', help="Última data reproduzida (AAAA-MM-DD).")
+    parser.add_argument('--dias-por-segundo', type=float, default=DIAS_POR_SEGUNDO_PADRAO, help="Velocidade da reprodução (0 = sem pausa).")
+    parser.add_argument('--destino', choices=['pasta', 'socket'], default='pasta', help="Envia para a pasta de entrada ou para o socket.")
+    parser.add_argument('--pasta', default=PASTA_ENTRADA_STREAMING, help="Pasta de entrada da ingestão.")
+    parser.add_argument('--porta', type=int, default=PORTA_STREAMING, help="Porta TCP da ingestão (com --destino socket).")
+    args = parser.parse_args()
+
+    historico = carregar_historico(args.arquivo, args.a_partir_de, args.ate)
+    raise SystemExit(0 if reproduzir_historico(historico, args.dias_por_segundo, args.destino, args.pasta, porta=args.porta) else 1)
@@ -0,0 +1,180 @@
+import pandas as pd
+import numpy as np
+import threading
+import time
+import os
+
+from analysis_script import ARQUIVO_MODELO, FEATURES_MODELO
+
+# --- Configurações ---
+
+ROTA_PREVISAO = '/api/previsao'
+PORTA_SERVICO_PREVISAO = 8051
+LIMITE_REGISTROS_POR_LOTE = 500
+
+# O modelo fica carregado em memória uma única vez por processo.
+# Se o arquivo .pkl for substituído (novo treino), ele é recarregado na próxima chamada.
+
+_cache_modelo = {'modelo': None, 'mtime': None, 'indice_classe_lesao': None, 'erro': None}
+_trava_modelo = threading.Lock()
+
+class ModeloDesatualizado(RuntimeError):
+    """
+    O modelo em disco foi treinado com outra lista de features (FEATURES_MODELO mudou desde o treino).
+    """
+
+def carregar_modelo(caminho_modelo=ARQUIVO_MODELO):
+    """
+    Retorna o modelo de previsão de lesões, carregando-o do disco apenas
+    na primeira chamada ou quando o arquivo foi alterado. Levanta
+    ModeloDesatualizado se as features do modelo não forem FEATURES_MODELO.
+    """
+    mtime = os.path.getmtime(caminho_modelo)
+    if _cache_modelo['mtime'] != mtime:
+        with _trava_modelo:
+            if _cache_modelo['mtime'] != mtime:
+                import joblib
+                modelo = joblib.load(caminho_modelo)
+                features_modelo = list(getattr(modelo, 'feature_names_in_', FEATURES_MODELO))
+                classes = list(modelo.classes_)
+                _cache_modelo['indice_classe_lesao'] = classes.index(1) if 1 in classes else None
+                _cache_modelo['modelo'] = modelo
+                _cache_modelo['erro'] = None if features_modelo == FEATURES_MODELO else (
+                    f"Modelo '{caminho_modelo}' treinado com outras features ({len(features_modelo)} em vez de "
+                    f"{len(FEATURES_MODELO)}). Treine o modelo novamente (python main.py train --forcar).")
+                _cache_modelo['mtime'] = mtime
+                print(f"Modelo de previsão carregado de: {caminho_modelo}")
+
+    if _cache_modelo['erro'] is not None:
+        raise ModeloDesatualizado(_cache_modelo['erro'])
+    return _cache_modelo['modelo'], _cache_modelo['indice_classe_lesao']
+
+def montar_matriz_features(registros):
+    """
+    Converte um registro (dict), uma lista de registros ou um DataFrame na
+    matriz de features esperada pelo modelo. Features ausentes são preenchidas
+    com 0, como no treino.
+    """
+    if isinstance(registros, pd.DataFrame):
+        return registros.reindex(columns=FEATURES_MODELO).fillna(0)
+    if isinstance(registros, dict):
+        registros = [registros]
+    if not isinstance(registros, (list, tuple)) or not registros:
+        raise ValueError("Envie um registro ou uma lista não vazia de registros.")
+    if len(registros) > LIMITE_REGISTROS_POR_LOTE:
+        raise ValueError(f"Lote muito grande: máximo de {LIMITE_REGISTROS_POR_LOTE} registros por chamada.")
+
+    linhas = []
+    for registro in registros:
+        if not isinstance(registro, dict):
+            raise ValueError("Cada registro deve ser um objeto com os valores das features.")
+        linha = []
+        for feature in FEATURES_MODELO:
+            valor = registro.get(feature)
+            try:
+                valor = float(valor) if valor is not None else 0.0
+            except (TypeError, ValueError):
+                raise ValueError(f"Valor inválido para a feature '{feature}': {valor!r}")
+            linha.append(0.0 if np.isnan(valor) else valor)
+        linhas.append(linha)
+    return pd.DataFrame(linhas, columns=FEATURES_MODELO)
+
+def pontuar_sessoes(registros, caminho_modelo=ARQUIVO_MODELO):
+    """
+    Calcula a classe prevista e a probabilidade de lesão para uma sessão
+    ou um pequeno lote de sessões, usando o modelo já carregado em memória.
+    """
+    modelo, indice_classe_lesao = carregar_modelo(caminho_modelo)
+    X = montar_matriz_features(registros)
+
+    matriz_probabilidades = modelo.predict_proba(X)
+    classes = modelo.classes_[np.argmax(matriz_probabilidades, axis=1)]
+    if indice_classe_lesao is None:
+        probabilidades = np.zeros(len(X))
+    else:
+        probabilidades = matriz_probabilidades[:, indice_classe_lesao]
+
+    return [
+        {'Risco_Lesao_ML': int(classe), 'Probabilidade_Lesao_ML': round(float(probabilidade), 4)}
+        for classe, probabilidade in zip(classes, probabilidades)
+    ]
+
+def medir_latencia_previsao(n_repeticoes=1000, caminho_modelo=ARQUIVO_MODELO):
+    """
+    Mede a latência de previsão de uma única sessão e reporta p50, p95 e p99 (em ms).
+    """
+    carregar_modelo(caminho_modelo)
+    registro_exemplo = {feature: 1.0 for feature in FEATURES_MODELO}
+
+    latencias = []
+    for _ in range(n_repeticoes):
+        inicio = time.perf_counter()
+        pontuar_sessoes(registro_exemplo, caminho_modelo)
+        latencias.append((time.perf_counter() - inicio) * 1000)
+
+    p50, p95, p99 = np.percentile(latencias, [50, 95, 99])
+    resultado = {'n_repeticoes': n_repeticoes, 'p50_ms': round(p50, 3), 'p95_ms': round(p95, 3), 'p99_ms': round(p99, 3)}
+    print(f"Latência de previsão (1 registro, {n_repeticoes} repetições): p50={p50:.2f} ms, p95={p95:.2f} ms, p99={p99:.2f} ms")
+    return resultado
+
+# --- Endpoint HTTP ---
+
+def registrar_rota_previsao(servidor):
+    """
+    Registra o endpoint de previsão em um servidor Flask (por exemplo, o 'app.server' do dashboard).
+    Aceita um objeto JSON, uma lista de objetos ou {"registros": [...]}. O modelo é carregado
+    já no registro, para que a primeira requisição não pague o tempo de carga.
+    """
+    from flask import request, jsonify
+
+    try:
+        carregar_modelo()
+    except FileNotFoundError:
+        pass
+    except ModeloDesatualizado as e:
+        print(f"Aviso: {e} O endpoint responderá 503 até o novo treino.")
+
+    @servidor.route(ROTA_PREVISAO, methods=['POST'])
+    def rota_previsao():
+        corpo = request.get_json(silent=True)
+        if isinstance(corpo, dict) and 'registros' in corpo:
+            corpo = corpo['registros']
+        if corpo is None:
+            return jsonify({'erro': 'Corpo da requisição deve ser JSON.'}), 400
+
+        inicio = time.perf_counter()
+        try:
+            previsoes = pontuar_sessoes(corpo)
+        except ValueError as e:
+            return jsonify({'erro': str(e)}), 400
+        except FileNotFoundError:
+            return jsonify({'erro': f"Modelo '{ARQUIVO_MODELO}' não encontrado. Treine o modelo primeiro."}), 503
+        except ModeloDesatualizado as e:
+            return jsonify({'erro': str(e)}), 503
+
+        return jsonify({
+            'previsoes': previsoes,
+            'latencia_ms': round((time.perf_counter() - inicio) * 1000, 3)
+        })
+
+    return servidor
+
+def executar_servico_previsao(porta=PORTA_SERVICO_PREVISAO):
+    """
+    Sobe o serviço de previsão isolado, com o modelo pré-carregado.
+    """
+    from flask import Flask
+
+    servidor = Flask(__name__)
+    registrar_rota_previsao(servidor)
+    try:
+        medir_latencia_previsao()
+    except FileNotFoundError:
+        print(f"Aviso: modelo '{ARQUIVO_MODELO}' ainda não existe. O endpoint responderá 503 até o treino.")
+    except ModeloDesatualizado:
+        pass
+    print(f"Serviço de previsão disponível em http://127.0.0.1:{porta}{ROTA_PREVISAO}")
+    servidor.run(host='127.0.0.1', port=porta, threaded=True)
+
+if __name__ == '__main__':
+    executar_servico_previsao()
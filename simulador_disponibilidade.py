@@ -0,0 +1,337 @@
+import argparse
+import json
+import os
+import platform
+import time
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+
+from data_generator import (JOGADORES_SELECAO_2002, ESCALADOS_POR_JOGO, MINUTOS_JOGO, MINUTOS_TREINO, PROB_SESSAO_LEVE_FORA_DO_JOGO,
+                            PROB_TREINO, GRUPOS_PERFIL_POSICAO, PERFIS_SESSAO, DESVIOS_SESSAO, REGRAS_LESAO, TEMPO_AUSENCIA_LESAO,
+                            PROB_LESAO_ALEATORIA, TIPOS_LESAO_ALEATORIA, TEMPO_AUSENCIA_LESAO_ALEATORIA)
+
+# --- Configurações ---
+
+PASTA_DADOS = 'data'
+ARQUIVO_DB = os.path.join(PASTA_DADOS, 'dados_performance.db')
+ARQUIVO_DISPONIBILIDADE_JOGADORES = os.path.join(PASTA_DADOS, 'simulacao_disponibilidade_jogadores.csv')
+ARQUIVO_DISPONIBILIDADE_POSICOES = os.path.join(PASTA_DADOS, 'simulacao_disponibilidade_posicoes.csv')
+ARQUIVO_BENCHMARK_SIMULACAO = os.path.join(PASTA_DADOS, 'benchmarks', 'ultimo_benchmark_simulacao.json')
+
+NUM_CENARIOS_PADRAO = 10000
+CENARIOS_POR_TAREFA = 256
+SEMENTE_PADRAO = 2002
+
+# Plano de atividades dos dias que antecedem a final (um caractere por dia); a
+# disponibilidade é medida no dia seguinte ao último dia do plano
+
+CODIGOS_ATIVIDADE = {'T': 'Treino', 'J': 'Jogo', 'D': 'Descanso'}
+PLANO_PADRAO = 'TTJDTTTJDTTTTD'
+
+# Sorteios de cada jogador em cada dia de um cenário (colunas das matrizes aleatórias)
+
+(U_PARTICIPACAO, U_MINUTOS, U_MEDIA_DIST, U_MEDIA_VO2, U_REGRA_VO2, U_REGRA_DIST,
+ U_TIPO_LESAO, U_LESAO_ALEATORIA, U_TIPO_ALEATORIO, U_ESCALACAO) = range(10)
+(Z_DISTANCIA, Z_VO2, Z_AUSENCIA) = range(3)
+
+# --- Plano e elenco ---
+
+def interpretar_plano(plano):
+    """
+    Converte o plano ('TTJD...' ou lista de tipos de atividade) na lista de atividades por dia.
+    """
+    if isinstance(plano, str):
+        codigos_invalidos = sorted(set(plano.upper()) - set(CODIGOS_ATIVIDADE))
+        if codigos_invalidos:
+            raise ValueError(f"Códigos de atividade desconhecidos no plano: {codigos_invalidos} (use {', '.join(CODIGOS_ATIVIDADE)}).")
+        return [CODIGOS_ATIVIDADE[codigo] for codigo in plano.upper()]
+    atividades = list(plano)
+    desconhecidas = sorted(set(atividades) - set(CODIGOS_ATIVIDADE.values()))
+    if desconhecidas:
+        raise ValueError(f"Atividades desconhecidas no plano: {desconhecidas}.")
+    return atividades
+
+def carregar_ausencias_iniciais(data_inicio=None, caminho_db=ARQUIVO_DB):
+    """
+    Dias de ausência que ainda restam, no primeiro dia do plano, para os jogadores cuja
+    última lesão registrada no banco ainda não terminou. Sem 'data_inicio', o plano
+    começa no dia seguinte ao último registro. Retorna {jogador: dias}.
+    """
+    from sqlalchemy import create_engine, text
+
+    engine = create_engine(f'sqlite:///{caminho_db}')
+    with engine.connect() as conexao:
+        lesoes = pd.read_sql(text(
+            'SELECT "Nome_Padronizado", "Data", "Tempo_Ausencia", MAX("Data") OVER () AS "Ultima_Data" FROM performance_atletas'
+        ), conexao, parse_dates=['Data', 'Ultima_Data'])
+    data_inicio = pd.Timestamp(data_inicio) if data_inicio is not None else lesoes['Ultima_Data'].max() + pd.Timedelta(days=1)
+
+    # Lesão no dia t com ausência de k dias: o jogador fica fora de t+1 a t+k
+    restantes = (lesoes['Data'] + pd.to_timedelta(lesoes['Tempo_Ausencia'], unit='D') - data_inicio).dt.days + 1
+    restantes = restantes.groupby(lesoes['Nome_Padronizado']).max()
+    return {nome: int(dias) for nome, dias in restantes.items() if dias > 0}
+
+def preparar_parametros_elenco(jogadores):
+    """
+    Parâmetros vetorizados por jogador: limites das médias sorteadas de distância e VO2
+    por tipo de atividade e os índices de cada posição.
+    """
+    posicoes = [jogador['Posicao'] for jogador in jogadores]
+    parametros = {'posicoes': {posicao: np.flatnonzero(np.array(posicoes) == posicao) for posicao in dict.fromkeys(posicoes)}}
+    for atividade, perfis in PERFIS_SESSAO.items():
+        perfis_jogadores = [perfis[GRUPOS_PERFIL_POSICAO.get(posicao, 'Atacante')] for posicao in posicoes]
+        for medida in ('Distancia', 'VO2'):
+            limites = np.array([perfil[medida] for perfil in perfis_jogadores], dtype=np.float64)
+            parametros[(atividade, medida)] = (limites[:, 0], limites[:, 1] - limites[:, 0])
+    return parametros
+
+# Tipos de lesão indexados, com o tempo de ausência (média, desvio) de cada tipo por atividade
+
+TIPOS_LESAO = list(dict.fromkeys(
+    [tipo for regras in REGRAS_LESAO.values() for regra in regras.values() for tipo in regra['tipos']] + TIPOS_LESAO_ALEATORIA
+))
+
+def _sortear_opcao(uniformes, opcoes):
+    valores, probabilidades = opcoes
+    return np.asarray(valores)[np.searchsorted(np.cumsum(probabilidades), uniformes, side='right').clip(max=len(valores) - 1)]
+
+# --- Simulação vetorizada ---
+
+def simular_cenarios(jogadores, atividades, ausencias_iniciais, semente, primeiro_cenario, num_cenarios):
+    """
+    Simula 'num_cenarios' cenários (a partir do índice 'primeiro_cenario') com as regras
+    de sessão e lesão do gerador de dados, vetorizados em cenários x jogadores, dia a dia.
+    Cada cenário tem sua própria semente (SeedSequence(semente, spawn_key=(índice,))), de
+    modo que o resultado não depende de como os cenários são divididos entre processos.
+    Retorna somas por jogador e o histograma de disponíveis por posição no dia da final.
+    """
+    parametros = preparar_parametros_elenco(jogadores)
+    num_jogadores, num_dias = len(jogadores), len(atividades)
+
+    # Sorteios de todos os dias de cada cenário, gerados pela semente do próprio cenário
+    uniformes = np.empty((num_cenarios, num_dias, num_jogadores, U_ESCALACAO + 1))
+    normais = np.empty((num_cenarios, num_dias, num_jogadores, Z_AUSENCIA + 1))
+    escalados_por_dia = np.empty((num_cenarios, num_dias), dtype=np.int64)
+    for i in range(num_cenarios):
+        gerador = np.random.default_rng(np.random.SeedSequence(semente, spawn_key=(primeiro_cenario + i,)))
+        uniformes[i] = gerador.random(uniformes.shape[1:])
+        normais[i] = gerador.standard_normal(normais.shape[1:])
+        escalados_por_dia[i] = gerador.integers(*ESCALADOS_POR_JOGO, size=num_dias)
+
+    ausencia = np.zeros((num_cenarios, num_jogadores), dtype=np.int64)
+    for indice, jogador in enumerate(jogadores):
+        ausencia[:, indice] = (ausencias_iniciais or {}).get(jogador['Nome'], 0)
+
+    dias_disponiveis = np.zeros(num_jogadores, dtype=np.int64)
+    lesoes = np.zeros(num_jogadores, dtype=np.int64)
+    dias_ausencia = np.zeros(num_jogadores, dtype=np.int64)
+
+    for dia, atividade in enumerate(atividades):
+        disponivel = ausencia == 0
+        dias_disponiveis += disponivel.sum(axis=0)
+        ausencia = np.maximum(ausencia - 1, 0)
+        if atividade == 'Descanso':
+            continue
+
+        u = uniformes[:, dia]
+        z = normais[:, dia]
+        if atividade == 'Treino':
+            registrada = disponivel & (u[..., U_PARTICIPACAO] < PROB_TREINO)
+            com_minutos = registrada & (_sortear_opcao(u[..., U_MINUTOS], MINUTOS_TREINO) > 0)
+        else:
+            # Escalados: os jogadores disponíveis com as menores chaves sorteadas
+            chaves = np.where(disponivel, u[..., U_ESCALACAO], np.inf)
+            ordem = np.argsort(np.argsort(chaves, axis=1), axis=1)
+            escalado = disponivel & (ordem < escalados_por_dia[:, dia, None])
+            registrada = escalado | (disponivel & (u[..., U_PARTICIPACAO] < PROB_SESSAO_LEVE_FORA_DO_JOGO))
+            com_minutos = escalado & (_sortear_opcao(u[..., U_MINUTOS], MINUTOS_JOGO) > 0)
+
+        inicio_dist, amplitude_dist = parametros[(atividade, 'Distancia')]
+        inicio_vo2, amplitude_vo2 = parametros[(atividade, 'VO2')]
+        media_dist = inicio_dist + amplitude_dist * u[..., U_MEDIA_DIST]
+        media_vo2 = inicio_vo2 + amplitude_vo2 * u[..., U_MEDIA_VO2]
+        distancia = media_dist + DESVIOS_SESSAO[atividade]['Distancia'] * z[..., Z_DISTANCIA]
+        vo2 = media_vo2 + DESVIOS_SESSAO[atividade]['VO2'] * z[..., Z_VO2]
+
+        regras = REGRAS_LESAO[atividade]
+        regra_vo2, regra_dist = regras['deficit_vo2'], regras['excesso_distancia']
+        lesao_vo2 = com_minutos & (vo2 < media_vo2 - regra_vo2['limiar']) & (u[..., U_REGRA_VO2] < regra_vo2['probabilidade'])
+        lesao_dist = com_minutos & ~lesao_vo2 & (distancia > media_dist + regra_dist['limiar']) & (u[..., U_REGRA_DIST] < regra_dist['probabilidade'])
+        lesao_aleatoria = registrada & ~lesao_vo2 & ~lesao_dist & (u[..., U_LESAO_ALEATORIA] < PROB_LESAO_ALEATORIA)
+
+        # Tipo de lesão e tempo de ausência (a parte inteira de uma normal, como no gerador)
+        tipo = np.where(u[..., U_TIPO_LESAO] < regra_vo2['prob_primeiro_tipo'],
+                        TIPOS_LESAO.index(regra_vo2['tipos'][0]), TIPOS_LESAO.index(regra_vo2['tipos'][1]))
+        tipo = np.where(lesao_dist, np.where(u[..., U_TIPO_LESAO] < regra_dist['prob_primeiro_tipo'],
+                                             TIPOS_LESAO.index(regra_dist['tipos'][0]), TIPOS_LESAO.index(regra_dist['tipos'][1])), tipo)
+        tempos = np.array([TEMPO_AUSENCIA_LESAO[atividade].get(tipo_lesao, (0, 0)) for tipo_lesao in TIPOS_LESAO], dtype=np.float64)
+        media_ausencia, desvio_ausencia = tempos[tipo, 0], tempos[tipo, 1]
+        media_ausencia = np.where(lesao_aleatoria, TEMPO_AUSENCIA_LESAO_ALEATORIA[0], media_ausencia)
+        desvio_ausencia = np.where(lesao_aleatoria, TEMPO_AUSENCIA_LESAO_ALEATORIA[1], desvio_ausencia)
+        ausencia_sorteada = np.trunc(media_ausencia + desvio_ausencia * z[..., Z_AUSENCIA]).astype(np.int64).clip(min=0)
+
+        lesionado = lesao_vo2 | lesao_dist | lesao_aleatoria
+        ausencia = np.where(lesionado, ausencia_sorteada, ausencia)
+        lesoes += lesionado.sum(axis=0)
+        dias_ausencia += np.where(lesionado, ausencia_sorteada, 0).sum(axis=0)
+
+    disponivel_final = ausencia == 0
+    return {
+        'cenarios': num_cenarios,
+        'disponivel_final': disponivel_final.sum(axis=0),
+        'dias_disponiveis': dias_disponiveis,
+        'lesoes': lesoes,
+        'dias_ausencia': dias_ausencia,
+        'histogramas_posicoes': {
+            posicao: np.bincount(disponivel_final[:, indices].sum(axis=1), minlength=len(indices) + 1)
+            for posicao, indices in parametros['posicoes'].items()
+        },
+    }
+
+def _simular_tarefa(argumentos):
+    return simular_cenarios(*argumentos)
+
+def _somar_resultados(parciais):
+    total = parciais[0]
+    for parcial in parciais[1:]:
+        for chave in ('cenarios', 'disponivel_final', 'dias_disponiveis', 'lesoes', 'dias_ausencia'):
+            total[chave] = total[chave] + parcial[chave]
+        for posicao, histograma in parcial['histogramas_posicoes'].items():
+            total['histogramas_posicoes'][posicao] = total['histogramas_posicoes'][posicao] + histograma
+    return total
+
+def simular_disponibilidade(plano=PLANO_PADRAO, num_cenarios=NUM_CENARIOS_PADRAO, num_processos=None, semente=SEMENTE_PADRAO,
+                           jogadores=None, ausencias_iniciais=None, cenarios_por_tarefa=CENARIOS_POR_TAREFA):
+    """
+    Executa 'num_cenarios' cenários do plano em um pool de processos (num_processos=1
+    roda no próprio processo) e retorna:
+    - 'jogadores': probabilidade de cada jogador estar disponível na final, fração dos
+      dias do plano em que esteve disponível, lesões e dias de ausência médios por cenário;
+    - 'posicoes': distribuição do número de disponíveis de cada posição na final
+      (probabilidade de exatamente k e de pelo menos k);
+    - 'tempo_s' e 'cenarios_por_s'.
+    """
+    if num_cenarios < 1:
+        raise ValueError(f"O número de cenários deve ser pelo menos 1 (recebido: {num_cenarios}).")
+    jogadores = jogadores or JOGADORES_SELECAO_2002
+    atividades = interpretar_plano(plano)
+    tarefas = [
+        (jogadores, atividades, ausencias_iniciais, semente, inicio, min(cenarios_por_tarefa, num_cenarios - inicio))
+        for inicio in range(0, num_cenarios, cenarios_por_tarefa)
+    ]
+
+    inicio_simulacao = time.perf_counter()
+    if num_processos == 1:
+        parciais = [_simular_tarefa(tarefa) for tarefa in tarefas]
+    else:
+        with ProcessPoolExecutor(max_workers=num_processos) as pool:
+            parciais = list(pool.map(_simular_tarefa, tarefas))
+    tempo_s = time.perf_counter() - inicio_simulacao
+    total = _somar_resultados(parciais)
+
+    disponibilidade_jogadores = pd.DataFrame({
+        'Nome_Padronizado': [jogador['Nome'] for jogador in jogadores],
+        'Posicao': [jogador['Posicao'] for jogador in jogadores],
+        'Prob_Disponivel_Final': total['disponivel_final'] / num_cenarios,
+        'Fracao_Dias_Disponivel': total['dias_disponiveis'] / (num_cenarios * len(atividades)) if atividades else 1.0,
+        'Lesoes_Medias': total['lesoes'] / num_cenarios,
+        'Dias_Ausencia_Medios': total['dias_ausencia'] / num_cenarios,
+    })
+
+    linhas_posicoes = []
+    for posicao, histograma in total['histogramas_posicoes'].items():
+        probabilidades = histograma / num_cenarios
+        pelo_menos = histograma[::-1].cumsum()[::-1] / num_cenarios
+        linhas_posicoes += [
+            {'Posicao': posicao, 'Disponiveis': k, 'Prob_Exatamente': probabilidades[k], 'Prob_Pelo_Menos': pelo_menos[k]}
+            for k in range(len(histograma))
+        ]
+
+    return {
+        'jogadores': disponibilidade_jogadores,
+        'posicoes': pd.DataFrame(linhas_posicoes),
+        'plano': ''.join(codigo for atividade in atividades for codigo, nome in CODIGOS_ATIVIDADE.items() if nome == atividade),
+        'cenarios': num_cenarios,
+        'tempo_s': tempo_s,
+        'cenarios_por_s': num_cenarios / tempo_s if tempo_s > 0 else float('inf'),
+    }
+
+def probabilidade_minimo_disponiveis(resultado, posicao, minimo):
+    """
+    Probabilidade de pelo menos 'minimo' jogadores da posição estarem disponíveis na final.
+    """
+    posicoes = resultado['posicoes']
+    linha = posicoes[(posicoes['Posicao'] == posicao) & (posicoes['Disponiveis'] == minimo)]
+    if linha.empty:
+        return 0.0 if minimo > 0 and (posicoes['Posicao'] == posicao).any() else float('nan')
+    return float(linha['Prob_Pelo_Menos'].iloc[0])
+
+# --- Benchmark de vazão ---
+
+def medir_vazao(plano=PLANO_PADRAO, num_cenarios=NUM_CENARIOS_PADRAO, numeros_processos=None, semente=SEMENTE_PADRAO,
+                caminho=ARQUIVO_BENCHMARK_SIMULACAO):
+    """
+    Mede cenários por segundo com diferentes números de processos e salva o resultado em JSON.
+    """
+    numeros_processos = numeros_processos or sorted({1, 2, 4, os.cpu_count() or 1})
+    medicoes = []
+    for num_processos in numeros_processos:
+        resultado = simular_disponibilidade(plano, num_cenarios, num_processos, semente)
+        medicoes.append({'processos': num_processos, 'cenarios': num_cenarios, 'tempo_s': round(resultado['tempo_s'], 3),
+                         'cenarios_por_s': round(resultado['cenarios_por_s'], 1)})
+        print(f"  {num_processos:>2} processo(s): {num_cenarios} cenários em {resultado['tempo_s']:.2f} s ({resultado['cenarios_por_s']:,.0f} cenários/s)")
+
+    os.makedirs(os.path.dirname(caminho), exist_ok=True)
+    with open(caminho, 'w', encoding='utf-8') as arquivo:
+        json.dump({
+            'data': datetime.now().isoformat(timespec='seconds'),
+            'plano': plano,
+            'dias_plano': len(interpretar_plano(plano)),
+            'maquina': {'cpus': os.cpu_count(), 'python': platform.python_version()},
+            'medicoes': medicoes,
+        }, arquivo, indent=2, ensure_ascii=False)
+    print(f"Resultado salvo em: {caminho}")
+    return medicoes
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Simulação Monte Carlo da disponibilidade do elenco até a final.")
+    parser.add_argument('--plano', default=PLANO_PADRAO, help="Atividades dos dias antes da final: T (treino), J (jogo), D (descanso).")
+    parser.add_argument('--cenarios', type=int, default=NUM_CENARIOS_PADRAO, help="Número de cenários simulados.")
+    parser.add_argument('--processos', type=int, help="Processos do pool (padrão: um por CPU).")
+    parser.add_argument('--semente', type=int, default=SEMENTE_PADRAO, help="Semente da simulação (cada cenário deriva a sua).")
+    parser.add_argument('--lesoes-atuais', action='store_true', help="Parte das lesões ainda em curso no banco de dados.")
+    parser.add_argument('--posicao', help="Posição para a pergunta 'pelo menos N disponíveis' (por exemplo, Meio-campista).")
+    parser.add_argument('--minimo', type=int, default=1, help="Com --posicao, número mínimo de jogadores disponíveis.")
+    parser.add_argument('--benchmark', action='store_true', help="Mede cenários por segundo com 1, 2, 4 e todos os processos.")
+    args = parser.parse_args()
+
+    if args.benchmark:
+        print(f"--- Benchmark da simulação ({args.cenarios} cenários, plano '{args.plano}') ---")
+        medir_vazao(args.plano, args.cenarios, semente=args.semente)
+        raise SystemExit(0)
+
+    ausencias = None
+    if args.lesoes_atuais:
+        if not os.path.exists(ARQUIVO_DB):
+            print(f"Erro: banco '{ARQUIVO_DB}' não encontrado. Execute a pipeline (python main.py) antes de usar --lesoes-atuais.")
+            raise SystemExit(1)
+        ausencias = carregar_ausencias_iniciais()
+        print(f"Lesões em curso: {ausencias or 'nenhuma'}")
+
+    resultado = simular_disponibilidade(args.plano, args.cenarios, args.processos, args.semente, ausencias_iniciais=ausencias)
+    print(f"{resultado['cenarios']} cenários do plano '{resultado['plano']}' em {resultado['tempo_s']:.2f} s "
+          f"({resultado['cenarios_por_s']:,.0f} cenários/s)")
+    print("\nDisponibilidade na final por jogador:")
+    print(resultado['jogadores'].sort_values('Prob_Disponivel_Final').to_string(index=False, float_format=lambda valor: f'{valor:.3f}'))
+
+    os.makedirs(PASTA_DADOS, exist_ok=True)
+    resultado['jogadores'].to_csv(ARQUIVO_DISPONIBILIDADE_JOGADORES, index=False)
+    resultado['posicoes'].to_csv(ARQUIVO_DISPONIBILIDADE_POSICOES, index=False)
+    print(f"\nDistribuições salvas em: {ARQUIVO_DISPONIBILIDADE_JOGADORES} e {ARQUIVO_DISPONIBILIDADE_POSICOES}")
+
+    if args.posicao:
+        probabilidade = probabilidade_minimo_disponiveis(resultado, args.posicao, args.minimo)
+        print(f"\nProbabilidade de pelo menos {args.minimo} jogador(es) na posição '{args.posicao}' disponível(is) na final: {probabilidade:.1%}")
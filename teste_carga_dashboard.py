@@ -0,0 +1,205 @@
+import argparse
+import contextlib
+import functools
+import json
+import os
+import sqlite3
+import threading
+import time
+import urllib.request
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+
+import numpy as np
+
+# --- Configurações ---
+
+PASTA_DADOS = 'data'
+ARQUIVO_DB = os.path.join(PASTA_DADOS, 'dados_performance.db')
+NOME_TABELA = 'performance_atletas'
+ARQUIVO_RESULTADO_CARGA = os.path.join(PASTA_DADOS, 'benchmarks', 'ultimo_teste_carga.json')
+
+URL_PADRAO = 'http://127.0.0.1:8050'
+ROTA_CALLBACKS_DASH = '/_dash-update-component'
+ROTA_DEPENDENCIAS_DASH = '/_dash-dependencies'
+INTERVALO_CONSULTA_TAREFAS_S = 0.05
+NUM_REQUISICOES_PADRAO = 200
+CONCORRENCIA_PADRAO = 8
+JOGADORES_POR_COMPARACAO_PADRAO = 2
+
+# --- Requisições dos callbacks ---
+
+# As visões são montadas em segundo plano: o primeiro callback devolve o id da tarefa e o
+# callback de acompanhamento é repetido até a visão ficar pronta. Os identificadores dos
+# callbacks são lidos de /_dash-dependencies, como faz o navegador.
+
+ENTRADAS_VISOES = {
+    'jogador': 'dropdown-jogador',
+    'comparacao': 'dropdown-jogadores-comparacao',
+}
+
+def carregar_callbacks_visoes(enviar):
+    """
+    Retorna {visao: (callback de início, callback de acompanhamento)}.
+    """
+    status, _, dependencias = enviar(ROTA_DEPENDENCIAS_DASH)
+    if status != 200:
+        raise RuntimeError(f"Não foi possível ler os callbacks do dashboard (HTTP {status}).")
+    callbacks = {}
+    for visao, id_entrada in ENTRADAS_VISOES.items():
+        inicio = next(d for d in dependencias if [e['id'] for e in d['inputs']] == [id_entrada])
+        acompanhamento = next(d for d in dependencias if [e['id'] for e in d['inputs']] == [f'intervalo-{visao}'])
+        callbacks[visao] = (inicio, acompanhamento)
+    return callbacks
+
+def montar_requisicao_callback(dependencia, valores_entradas, valores_estados):
+    saidas = []
+    for saida in dependencia['output'].strip('.').split('...'):
+        id_componente, propriedade = saida.rsplit('.', 1)
+        saidas.append({'id': id_componente, 'property': propriedade})
+    entradas = [{**e, 'value': valor} for e, valor in zip(dependencia['inputs'], valores_entradas)]
+    return {
+        'output': dependencia['output'],
+        'outputs': saidas,
+        'inputs': entradas,
+        'changedPropIds': [f"{e['id']}.{e['property']}" for e in entradas],
+        'state': [{**e, 'value': valor} for e, valor in zip(dependencia['state'], valores_estados)],
+    }
+
+def executar_visao(enviar, callbacks, visao, valor):
+    """
+    Abre uma visão em uma sessão nova e acompanha a tarefa até a visão ficar pronta.
+    Retorna (status, bytes somados das respostas).
+    """
+    inicio, acompanhamento = callbacks[visao]
+    id_sessao = uuid.uuid4().hex
+    status, tamanho, resposta = enviar(ROTA_CALLBACKS_DASH, montar_requisicao_callback(inicio, [valor], [id_sessao]))
+    tamanho_total = tamanho
+    id_tarefa, n_consultas = None, 0
+    while status == 200:
+        saidas = resposta['response']
+        id_tarefa = saidas.get(f'tarefa-{visao}', {}).get('data', id_tarefa)
+        if saidas.get(f'intervalo-{visao}', {}).get('disabled', True) or not id_tarefa:
+            break
+        time.sleep(INTERVALO_CONSULTA_TAREFAS_S)
+        n_consultas += 1
+        status, tamanho, resposta = enviar(ROTA_CALLBACKS_DASH, montar_requisicao_callback(acompanhamento, [n_consultas], [id_tarefa, valor, id_sessao]))
+        tamanho_total += tamanho
+    return status, tamanho_total
+
+def listar_jogadores(caminho_db=ARQUIVO_DB):
+    with contextlib.closing(sqlite3.connect(caminho_db)) as conexao:
+        return [linha[0] for linha in conexao.execute(
+            f'SELECT DISTINCT "Nome_Padronizado" FROM {NOME_TABELA} ORDER BY "Nome_Padronizado"'
+        )]
+
+# --- Clientes ---
+
+def criar_cliente_http(url_base):
+    """
+    Envia os callbacks para um dashboard em execução (por exemplo, o modo de produção com vários workers).
+    Retorna (status, bytes, JSON da resposta); sem 'corpo', faz um GET.
+    """
+    def enviar(rota, corpo=None):
+        requisicao = urllib.request.Request(
+            url_base.rstrip('/') + rota, data=json.dumps(corpo).encode('utf-8') if corpo is not None else None,
+            headers={'Content-Type': 'application/json'}, method='POST' if corpo is not None else 'GET'
+        )
+        with urllib.request.urlopen(requisicao, timeout=60) as resposta:
+            dados = resposta.read()
+            return resposta.status, len(dados), json.loads(dados) if dados else None
+    return enviar
+
+def criar_cliente_em_processo():
+    """
+    Envia os callbacks para a aplicação WSGI no próprio processo (sem rede), um cliente de teste por thread.
+    """
+    import wsgi
+    servidor = wsgi.criar_servidor()
+    clientes = threading.local()
+
+    def enviar(rota, corpo=None):
+        if not hasattr(clientes, 'cliente'):
+            clientes.cliente = servidor.test_client()
+        resposta = clientes.cliente.post(rota, json=corpo) if corpo is not None else clientes.cliente.get(rota)
+        return resposta.status_code, len(resposta.data), resposta.get_json(silent=True)
+    return enviar
+
+# --- Execução ---
+
+def medir_carga(executar_requisicao, requisicoes, concorrencia):
+    """
+    Executa as requisições (cada uma é a abertura completa de uma visão) com 'concorrencia'
+    threads e retorna vazão e latências (ms).
+    """
+    def executar(requisicao):
+        inicio = time.perf_counter()
+        try:
+            status, tamanho = executar_requisicao(requisicao)
+        except Exception:
+            status, tamanho = None, 0
+        return (time.perf_counter() - inicio) * 1000, status, tamanho
+
+    inicio = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concorrencia) as executor:
+        resultados = list(executor.map(executar, requisicoes))
+    duracao = time.perf_counter() - inicio
+
+    latencias = [latencia for latencia, status, _ in resultados if status == 200]
+    erros = len(resultados) - len(latencias)
+    p50, p95, p99 = np.percentile(latencias, [50, 95, 99]) if latencias else (float('nan'),) * 3
+    return {
+        'requisicoes': len(resultados),
+        'erros': erros,
+        'requisicoes_por_s': round(len(latencias) / duracao, 2) if duracao else None,
+        'p50_ms': round(float(p50), 2),
+        'p95_ms': round(float(p95), 2),
+        'p99_ms': round(float(p99), 2),
+        'bytes_medios_resposta': int(np.mean([tamanho for _, status, tamanho in resultados if status == 200])) if latencias else 0,
+    }
+
+def executar_teste_carga(url=URL_PADRAO, em_processo=False, num_requisicoes=NUM_REQUISICOES_PADRAO,
+                         concorrencia=CONCORRENCIA_PADRAO, jogadores_por_comparacao=JOGADORES_POR_COMPARACAO_PADRAO,
+                         caminho_resultado=ARQUIVO_RESULTADO_CARGA):
+    jogadores = listar_jogadores()
+    if len(jogadores) < max(2, jogadores_por_comparacao):
+        print(f"Erro: são necessários ao menos {max(2, jogadores_por_comparacao)} jogadores no banco para o teste de carga.")
+        return None
+
+    enviar = criar_cliente_em_processo() if em_processo else criar_cliente_http(url)
+    callbacks = carregar_callbacks_visoes(enviar)
+    # Grupos consecutivos (circulares) de 'jogadores_por_comparacao' jogadores
+    grupos = [[jogadores[(i + j) % len(jogadores)] for j in range(jogadores_por_comparacao)] for i in range(len(jogadores))]
+    cenarios = {
+        'jogador': [jogadores[i % len(jogadores)] for i in range(num_requisicoes)],
+        'comparacao': [grupos[i % len(grupos)] for i in range(num_requisicoes)],
+    }
+
+    print(f"Teste de carga ({'em processo' if em_processo else url}): {num_requisicoes} requisições por visão, concorrência {concorrencia}")
+    resultado = {'data_execucao': datetime.now().isoformat(timespec='seconds'), 'alvo': 'em_processo' if em_processo else url,
+                 'concorrencia': concorrencia, 'jogadores_por_comparacao': jogadores_por_comparacao, 'visoes': {}}
+    for nome, requisicoes in cenarios.items():
+        metricas = medir_carga(functools.partial(executar_visao, enviar, callbacks, nome), requisicoes, concorrencia)
+        resultado['visoes'][nome] = metricas
+        print(f"  {nome:<12} {metricas['requisicoes_por_s']:>8} req/s  p50={metricas['p50_ms']:>8.2f} ms  "
+              f"p95={metricas['p95_ms']:>8.2f} ms  p99={metricas['p99_ms']:>8.2f} ms  erros={metricas['erros']}")
+
+    os.makedirs(os.path.dirname(caminho_resultado), exist_ok=True)
+    with open(caminho_resultado, 'w', encoding='utf-8') as arquivo:
+        json.dump(resultado, arquivo, indent=2, ensure_ascii=False)
+    print(f"Resultado do teste de carga salvo em: {caminho_resultado}")
+    return resultado
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Teste de carga das visões de jogador e de comparação do dashboard.")
+    parser.add_argument('--url', default=URL_PADRAO, help="URL do dashboard em execução.")
+    parser.add_argument('--em-processo', action='store_true', help="Testa a aplicação WSGI no próprio processo, sem servidor HTTP.")
+    parser.add_argument('--requisicoes', type=int, default=NUM_REQUISICOES_PADRAO, help="Requisições por visão.")
+    parser.add_argument('--concorrencia', type=int, default=CONCORRENCIA_PADRAO, help="Requisições simultâneas.")
+    parser.add_argument('--jogadores-por-comparacao', type=int, default=JOGADORES_POR_COMPARACAO_PADRAO,
+                        help="Jogadores em cada requisição da visão de comparação.")
+    args = parser.parse_args()
+
+    resultado = executar_teste_carga(args.url, args.em_processo, args.requisicoes, args.concorrencia, args.jogadores_por_comparacao)
+    raise SystemExit(0 if resultado and all(v['erros'] == 0 for v in resultado['visoes'].values()) else 1)
@@ -0,0 +1,53 @@
+import os
+
+# --- Configurações ---
+
+HOST_PRODUCAO = '0.0.0.0'
+PORTA_PRODUCAO = 8050
+NUM_WORKERS_PADRAO = 2 * (os.cpu_count() or 1) + 1
+NUM_THREADS_POR_WORKER = 4
+
+# --- Fábrica da aplicação WSGI ---
+
+def criar_servidor(limite_callback_lento_ms=None):
+    """
+    Fábrica WSGI do dashboard para servidores com vários workers, por exemplo:
+
+        gunicorn -w 4 --threads 4 -b 0.0.0.0:8050 "wsgi:criar_servidor()"
+
+    Cada worker carrega apenas a lista de jogadores e abre o banco SQLite somente
+    para leitura, mapeado em memória, compartilhando as páginas do arquivo com os
+    demais workers. O modo de depuração do Dash não é ativado. As métricas dos
+    callbacks ficam em /metricas (por worker).
+    """
+    import dashboard_app
+    app = dashboard_app.criar_app_dashboard(somente_leitura=True, limite_callback_lento_ms=limite_callback_lento_ms)
+    return app.server
+
+def executar_servidor_producao(host=HOST_PRODUCAO, porta=PORTA_PRODUCAO, workers=NUM_WORKERS_PADRAO,
+                               threads=NUM_THREADS_POR_WORKER, limite_callback_lento_ms=None):
+    """
+    Sobe o dashboard com o gunicorn (dependência opcional, apenas para produção).
+    Retorna False se o gunicorn não estiver instalado.
+    """
+    try:
+        from gunicorn.app.base import BaseApplication
+    except ImportError:
+        print("Erro: o modo de produção usa o gunicorn, que não está instalado. Instale-o com: pip install gunicorn")
+        return False
+
+    class AplicacaoGunicorn(BaseApplication):
+        def load_config(self):
+            self.cfg.set('bind', f'{host}:{porta}')
+            self.cfg.set('workers', workers)
+            self.cfg.set('threads', threads)
+
+        def load(self):
+            return criar_servidor(limite_callback_lento_ms)
+
+    print(f"Dashboard em modo de produção: http://{host}:{porta} ({workers} workers, {threads} threads cada)")
+    AplicacaoGunicorn().run()
+    return True
+
+if __name__ == '__main__':
+    executar_servidor_producao()